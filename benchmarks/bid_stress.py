@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+Stress tests the runner's bid protocol by having many local processes drain
+a run directory of trivial calculation instances, then checks that every
+instance was claimed by exactly one process.  With --jobqueue, the instances
+are taken from a sqlite job queue in which every tenth instance is a parent
+of the next nine, and the check also verifies that no instance was claimed
+before its parent finished.
+
+Example:
+    python bid_stress.py --runners 32 --jobs 5000
+    python bid_stress.py --runners 32 --jobs 5000 --jobqueue
+"""
+# Standard Python libraries
+import argparse
+from collections import Counter
+from multiprocessing import Process
+import os
+from pathlib import Path
+import random
+import tempfile
+import time
+
+# https://github.com/usnistgov/iprPy
+from iprPy.database import SQLiteJobQueue
+from iprPy.database.runner import bid, list_calcs, next_calcs, removecalc
+
+def drain(run_directory, claims_file, use_jobqueue=False):
+    """Mimics runner(): select, bid, then run and remove."""
+    os.chdir(run_directory)
+    if use_jobqueue:
+        jobqueue = SQLiteJobQueue(run_directory)
+    else:
+        jobqueue = None
+    claimed = []
+    flist = next_calcs(run_directory, jobqueue)
+    while len(flist) > 0:
+        index = random.randint(0, len(flist)-1)
+        sim = flist[index]
+        if bid(sim):
+            # Trivial calculation: record claim time and touch a results file
+            claimed.append(f'{sim} {time.time()!r}')
+            with open(os.path.join(sim, 'results.json'), 'w') as f:
+                f.write('{}')
+            removecalc(os.path.join(run_directory, sim))
+            if jobqueue is not None:
+                jobqueue.finish(sim)
+                claimed[-1] += f' {time.time()!r}'
+        elif jobqueue is not None:
+            jobqueue.finish(sim, 'skipped')
+        else:
+            del flist[index]
+            if len(flist) > 0:
+                continue
+        flist = next_calcs(run_directory, jobqueue)
+
+    with open(claims_file, 'w') as f:
+        f.write('\n'.join(claimed))
+
+def main(args):
+    with tempfile.TemporaryDirectory() as root:
+        run_directory = Path(root, 'run')
+        claims_directory = Path(root, 'claims')
+        run_directory.mkdir()
+        claims_directory.mkdir()
+
+        # Prepare trivial calculation instances
+        if args.jobqueue:
+            jobqueue = SQLiteJobQueue(run_directory)
+        for i in range(args.jobs):
+            sim = Path(run_directory, f'job-{i:06d}')
+            sim.mkdir()
+            with open(Path(sim, 'calc_trivial.in'), 'w') as f:
+                f.write('')
+            if args.jobqueue:
+                if i % 10 == 0:
+                    jobqueue.add(sim.name)
+                else:
+                    jobqueue.add(sim.name, parents=[f'job-{i - i % 10:06d}'])
+
+        # Start runners
+        start = time.perf_counter()
+        runners = []
+        for i in range(args.runners):
+            claims_file = Path(claims_directory, f'{i}.txt')
+            runner = Process(target=drain, args=(run_directory, claims_file,
+                                                 args.jobqueue))
+            runner.start()
+            runners.append(runner)
+        for runner in runners:
+            runner.join()
+        elapsed = time.perf_counter() - start
+
+        # Collect and check claims
+        counts = Counter()
+        claim_times = {}
+        finish_times = {}
+        for claims_file in claims_directory.glob('*.txt'):
+            with open(claims_file) as f:
+                for line in f.read().splitlines():
+                    terms = line.split()
+                    counts[terms[0]] += 1
+                    claim_times[terms[0]] = float(terms[1])
+                    if len(terms) == 3:
+                        finish_times[terms[0]] = float(terms[2])
+        duplicates = [sim for sim, count in counts.items() if count > 1]
+        remaining = [name for name in os.listdir(run_directory)
+                     if name != SQLiteJobQueue.filename]
+
+        # Check that children were only claimed after their parents finished
+        early = 0
+        if args.jobqueue:
+            for i in range(args.jobs):
+                if i % 10 != 0:
+                    sim = f'job-{i:06d}'
+                    parent = f'job-{i - i % 10:06d}'
+                    if claim_times[sim] < finish_times[parent]:
+                        early += 1
+
+        print(f'{args.runners} runners claimed {len(counts)} of {args.jobs} jobs in {elapsed:.2f} seconds')
+        print(f'{len(duplicates)} jobs claimed more than once')
+        print(f'{len(remaining)} jobs left in run directory')
+        if args.jobqueue:
+            print(f'{early} jobs claimed before their parent finished')
+        if (len(duplicates) > 0 or len(counts) != args.jobs
+            or len(remaining) > 0 or early > 0):
+            raise SystemExit('FAILED')
+        print('PASSED')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runners', type=int, default=32,
+                        help='number of runner processes')
+    parser.add_argument('--jobs', type=int, default=5000,
+                        help='number of calculation instances to drain')
+    parser.add_argument('--jobqueue', action='store_true',
+                        help='select instances from a sqlite job queue')
+    main(parser.parse_args())
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Benchmarks building the test records of all prepare combinations of
+potentials and crystal prototypes for E_vs_r_scan, with and without the
+parsecache that shares the systems, data models and LAMMPS potentials
+parsed for previous combinations.
+
+Example:
+    python build_testrecords.py --potentials 10 50 200
+"""
+# Standard Python libraries
+import argparse
+from contextlib import contextmanager
+from pathlib import Path
+import tempfile
+import time
+
+# https://github.com/usnistgov/iprPy
+import iprPy
+from iprPy.database import prepare as prepare_module
+from iprPy.database.prepare import fill_kwargs, build_testrecords
+
+@contextmanager
+def noparsecache():
+    """Stand-in for parsecache that caches nothing."""
+    yield None
+
+def time_build(database, calculation, potential_ids, cache):
+    """Times fill_kwargs plus build_testrecords for a set of potentials."""
+    kwargs = dict(lammps_command='lmp',
+                  buildcombos='crystalprototype load_file prototype',
+                  prototype_potential_id=potential_ids,
+                  prototype_potential_currentIPR=False,
+                  sizemults='3 3 3', minimum_r='2.0', maximum_r='5.0',
+                  number_of_steps_r='31')
+
+    prepare_module.parsecache = iprPy.input.parsecache if cache else noparsecache
+    try:
+        start = time.perf_counter()
+        kwargs, content_dict = fill_kwargs(database, calculation, kwargs)
+        records = build_testrecords(database, calculation, content_dict, **kwargs)[0]
+        return len(records), time.perf_counter() - start
+    finally:
+        prepare_module.parsecache = iprPy.input.parsecache
+
+def main(args):
+    calculation = iprPy.load_calculation('E_vs_r_scan')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = iprPy.load_database(style='local', host=Path(tmpdir, 'db'))
+        database.build_refs(include=['potential_LAMMPS', 'crystal_prototype'])
+        potential_df = database.get_records_df(style='potential_LAMMPS')
+        potential_ids = sorted(potential_df.id)
+
+        print('potentials  combinations  uncached seconds  cached seconds  speedup')
+        for count in args.potentials:
+            ids = potential_ids[:count]
+            nold, old_time = time_build(database, calculation, ids, False)
+            nnew, new_time = time_build(database, calculation, ids, True)
+            assert nold == nnew
+            print(f'{len(ids):10d}  {nnew:12d}  {old_time:16.3f}  {new_time:14.3f}  {old_time / new_time:7.2f}',
+                  flush=True)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--potentials', nargs='+', type=int,
+                        default=[10, 50, 200],
+                        help='numbers of potentials to combine with the prototypes')
+    main(parser.parse_args())
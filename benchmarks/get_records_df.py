@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Benchmarks building records DataFrames from a local database of synthetic
+calculation_relax_box records, both serially and using a process pool.  The
+pool DataFrames are checked against the serial one, and the smallest tested
+record count at which each pool size is faster than serial is reported, as
+starting the workers and transferring the records outweighs the parallel
+parsing for small counts.
+
+Example:
+    python get_records_df.py --counts 1000 10000 100000 --workers 1 4 8
+"""
+# Standard Python libraries
+import argparse
+from pathlib import Path
+import tempfile
+import time
+import uuid
+
+# https://pandas.pydata.org/
+import pandas as pd
+
+# https://github.com/usnistgov/atomman
+import atomman.lammps as lmp
+
+# https://github.com/usnistgov/iprPy
+import iprPy
+
+def synthetic_content(potential):
+    """
+    Builds the content of an unfinished calculation_relax_box record with
+    a random key.
+    """
+    input_dict = {}
+    input_dict['calc_key'] = str(uuid.uuid4())
+    input_dict['strainrange'] = 1e-6
+    input_dict['sizemults'] = [[0, 3], [0, 3], [0, 3]]
+    input_dict['potential'] = potential
+    input_dict['load_file'] = 'A1--Cu--fcc.json'
+    input_dict['load_style'] = 'system_model'
+    input_dict['load_options'] = ''
+    input_dict['family'] = 'A1--Cu--fcc'
+    input_dict['symbols'] = potential.symbols[:1]
+    input_dict['temperature'] = 0.0
+    for key in ['xx', 'yy', 'zz', 'xy', 'xz', 'yz']:
+        input_dict[f'pressure_{key}'] = 0.0
+    input_dict['pressure_unit'] = 'GPa'
+
+    record = iprPy.load_record('calculation_relax_box', name=input_dict['calc_key'])
+    record.buildcontent('calc_relax_box', input_dict)
+    return record
+
+def build_database(host, count, potential):
+    """Fills a local database with count synthetic records."""
+    database = iprPy.load_database(style='local', host=host, index=False)
+    style_dir = Path(database.host, 'calculation_relax_box')
+    style_dir.mkdir(exist_ok=True)
+
+    # Write the same content with unique keys to save setup time
+    record = synthetic_content(potential)
+    xml = record.content.xml()
+    for i in range(count):
+        key = str(uuid.uuid4())
+        with open(Path(style_dir, key + '.xml'), 'w') as f:
+            f.write(xml.replace(record.name, key))
+    return database
+
+def main(args):
+    potential_file = Path(iprPy.libdir, 'potential_LAMMPS',
+                          '2001--Mishin-Y--Cu-1--LAMMPS--ipr1.json')
+    potential = lmp.Potential(potential_file)
+
+    # Serial results are the reference for checking and timing the pools
+    workers_list = [1] + [workers for workers in args.workers if workers != 1]
+    faster = {}
+
+    print('records  workers  seconds  records/second')
+    for count in args.counts:
+        with tempfile.TemporaryDirectory() as host:
+            database = build_database(host, count, potential)
+            for workers in workers_list:
+                start = time.perf_counter()
+                df = database.get_records_df(style='calculation_relax_box',
+                                             full=True, flat=False,
+                                             workers=workers)
+                elapsed = time.perf_counter() - start
+                assert len(df) == count
+                if workers == 1:
+                    serial_df = df
+                    serial_elapsed = elapsed
+                else:
+                    pd.testing.assert_frame_equal(df, serial_df)
+                    if elapsed < serial_elapsed and workers not in faster:
+                        faster[workers] = count
+                print(f'{count:7d}  {workers:7d}  {elapsed:7.2f}  {count / elapsed:14.1f}',
+                      flush=True)
+
+    # Report the smallest tested count where each pool beat serial
+    print()
+    for workers in workers_list[1:]:
+        if workers in faster:
+            print(f'{workers} workers faster than serial from {faster[workers]} records')
+        else:
+            print(f'{workers} workers not faster than serial for any tested count')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--counts', nargs='+', type=int,
+                        default=[1000, 10000, 100000],
+                        help='numbers of synthetic records to test')
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 4],
+                        help='numbers of worker processes to test')
+    main(parser.parse_args())
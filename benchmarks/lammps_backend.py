@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+Benchmarks the LAMMPS simulations of relax_box and E_vs_r_scan with the
+subprocess and library backends of iprPy.tools.lammps_run.  The relax_box
+cij.template simulation is run once per relax_box cycle, and the
+E_vs_r_scan run0.template simulation once per scanned lattice parameter.
+A Lennard-Jones fcc crystal is used so that no potential files are needed.
+
+Example:
+    python lammps_backend.py --lammps_command lmp --cycles 20 --scan 50
+"""
+# Standard Python libraries
+import argparse
+import os
+from pathlib import Path
+import tempfile
+import time
+
+# http://www.numpy.org/
+import numpy as np
+
+# https://github.com/usnistgov/atomman
+import atomman as am
+
+# https://github.com/usnistgov/iprPy
+import iprPy
+
+system_info = '''
+units metal
+atom_style atomic
+boundary p p p
+read_data {datafile}
+'''
+
+lj_info = '''
+pair_style lj/cut 6.0
+pair_coeff * * 0.4093 2.338
+mass 1 63.546
+'''
+
+def fcc_system(a, sizemults):
+    """Builds an fcc system with lattice parameter a."""
+    box = am.Box.cubic(a)
+    atoms = am.Atoms(pos=[[0.0, 0.0, 0.0], [0.0, 0.5, 0.5],
+                          [0.5, 0.0, 0.5], [0.5, 0.5, 0.0]])
+    ucell = am.System(atoms=atoms, box=box, scale=True, symbols='Cu')
+    return ucell.supersize(*sizemults)
+
+def render(template_file, script_name, system, datafile, **kwargs):
+    """Writes a LAMMPS script from an iprPy calculation template."""
+    system.dump('atom_data', f=datafile, units='metal', atom_style='atomic',
+                return_info=False)
+    lammps_variables = dict(kwargs)
+    lammps_variables['atomman_system_info'] = system_info.format(datafile=datafile)
+    lammps_variables['atomman_pair_info'] = lj_info
+    with open(template_file) as f:
+        template = f.read()
+    with open(script_name, 'w') as f:
+        f.write(iprPy.tools.filltemplate(template, lammps_variables, '<', '>'))
+
+def relax_box_runs(lammps_command, cycles):
+    """Runs the relax_box cij simulation once per cycle."""
+    template_file = Path(iprPy.rootdir, 'calculation', 'relax_box', 'cij.template')
+    system = fcc_system(3.6, (3, 3, 3))
+    values = []
+    for cycle in range(cycles):
+        render(template_file, 'cij.in', system, f'init{cycle}.dat',
+               delta=1e-5, steps=2)
+        log = iprPy.tools.lammps_run(lammps_command, 'cij.in')
+        thermo = log.simulations[-1]['thermo']
+        values.append(thermo.Pxx.values[-1])
+    return np.array(values)
+
+def E_vs_r_scan_runs(lammps_command, scan):
+    """Runs the E_vs_r_scan run0 simulation once per lattice parameter."""
+    template_file = Path(iprPy.rootdir, 'calculation', 'E_vs_r_scan', 'run0.template')
+    values = []
+    for a in np.linspace(3.0, 5.0, scan):
+        system = fcc_system(a, (3, 3, 3))
+        render(template_file, 'run0.in', system, 'atom.dat')
+        log = iprPy.tools.lammps_run(lammps_command, 'run0.in')
+        values.append(log.simulations[0]['thermo'].v_peatom.values[-1])
+    return np.array(values)
+
+def main(args):
+    print('simulation    runs  subprocess seconds  library seconds  speedup  max diff')
+    for name, func, runs in [('relax_box', relax_box_runs, args.cycles),
+                             ('E_vs_r_scan', E_vs_r_scan_runs, args.scan)]:
+        times = {}
+        values = {}
+        for backend in ['subprocess', 'library']:
+            os.environ['IPRPY_LAMMPS_BACKEND'] = backend
+            with tempfile.TemporaryDirectory() as tmpdir:
+                cwd = os.getcwd()
+                os.chdir(tmpdir)
+                try:
+                    start = time.perf_counter()
+                    values[backend] = func(args.lammps_command, runs)
+                    times[backend] = time.perf_counter() - start
+                finally:
+                    os.chdir(cwd)
+        assert np.array_equal(np.isnan(values['subprocess']),
+                              np.isnan(values['library']))
+        diff = np.nanmax(np.abs(values['subprocess'] - values['library']))
+        speedup = times['subprocess'] / times['library']
+        print(f"{name:12s}  {runs:4d}  {times['subprocess']:18.3f}  {times['library']:15.3f}  {speedup:7.2f}  {diff:.2e}",
+              flush=True)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lammps_command', default='lmp',
+                        help='LAMMPS executable for the subprocess backend')
+    parser.add_argument('--cycles', type=int, default=20,
+                        help='number of relax_box cij simulations')
+    parser.add_argument('--scan', type=int, default=50,
+                        help='number of E_vs_r_scan lattice parameters')
+    main(parser.parse_args())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""
+Benchmarks finding new calculations during prepare against growing numbers
+of existing calculation_relax_box records, comparing the hash-bucketed
+DuplicateIndex used by iprPy.database.prepare.new_calculations with the
+previous pairing of pandas.concat and atomman.tools.duplicates_allclose.
+The time to update a DuplicateIndex saved by a previous prepare run is also
+measured.
+
+Example:
+    python new_calculations.py --counts 1000 10000 100000 --tests 1000
+"""
+# Standard Python libraries
+import argparse
+from pathlib import Path
+import tempfile
+import time
+import uuid
+
+# http://www.numpy.org/
+import numpy as np
+
+# https://pandas.pydata.org/
+import pandas as pd
+
+# https://github.com/usnistgov/atomman
+import atomman as am
+
+# https://github.com/usnistgov/iprPy
+import iprPy
+from iprPy.database import DuplicateIndex
+from iprPy.database.prepare import new_calculations
+
+def synthetic_df(count, rng):
+    """
+    Builds a flat DataFrame of count unique relax_box-like records spread
+    over 100 potentials, 50 prototypes and a range of pressures.
+    """
+    df = pd.DataFrame()
+    df['key'] = [str(uuid.uuid4()) for i in range(count)]
+    df['script'] = 'calc_relax_box'
+    df['load_file'] = [f'proto{i}.json' for i in rng.integers(50, size=count)]
+    df['load_options'] = ''
+    df['symbols'] = 'Cu'
+    df['potential_LAMMPS_key'] = [f'pot{i}' for i in rng.integers(100, size=count)]
+    for mult in ['a_mult', 'b_mult', 'c_mult']:
+        df[mult + '1'] = 0
+        df[mult + '2'] = 3
+    df['temperature'] = 0.0
+    for key in ['xx', 'yy', 'zz', 'xy', 'xz', 'yz']:
+        df[f'pressure_{key}'] = 0.0
+    df['pressure_xx'] = np.arange(count) * 0.1
+    return df
+
+def old_new_calculations(old, test, dterms, fterms):
+    """The previous new_calculations implementation."""
+    old_count = len(old)
+    allrecords = pd.concat([old, test], ignore_index=True)
+    for mult in ['a_mult', 'b_mult', 'c_mult']:
+        if mult in dterms:
+            allrecords[mult] = allrecords[mult + '2'] - allrecords[mult + '1']
+    isdup = am.tools.duplicates_allclose(allrecords, dterms, fterms)
+
+    # duplicates_allclose gives an object Series with newer pandas, for which
+    # ~ is an integer rather than a logical not
+    isnew = ~np.asarray(isdup[old_count:], dtype=bool)
+    return test[isnew]
+
+def main(args):
+    record = iprPy.load_record('calculation_relax_box')
+    dterms = record.compare_terms
+    fterms = record.compare_fterms
+    rng = np.random.default_rng(0)
+
+    print('records  tests  concat seconds  index seconds  saved index seconds  new found')
+    for count in args.counts:
+        old = synthetic_df(count, rng)
+
+        # Half of the tests duplicate existing records to within tolerance.
+        # duplicates_allclose only compares rows that are neighbors after
+        # sorting by the compare terms, so the last sorted term is shifted.
+        test = synthetic_df(args.tests, rng)
+        ndup = args.tests // 2
+        dups = old.sample(ndup, random_state=0)
+        for column in dups:
+            if column != 'key':
+                test.loc[:ndup-1, column] = dups[column].values
+        test.loc[:ndup-1, list(fterms)[-1]] += 0.005
+        test['pressure_xx'] += np.where(np.arange(args.tests) < ndup, 0.0, 0.05)
+
+        start = time.perf_counter()
+        old_new = old_new_calculations(old, test, dterms, fterms)
+        old_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new = new_calculations(old, test, dterms, fterms)
+        new_time = time.perf_counter() - start
+
+        # Both implementations must find the same new calculations
+        assert sorted(old_new['key']) == sorted(new['key'])
+        nnew = len(new)
+
+        # Update a saved index that is missing the last 1% of the records
+        with tempfile.TemporaryDirectory() as tmpdir:
+            index_file = Path(tmpdir, 'index.pickle')
+            index = DuplicateIndex(dterms, fterms)
+            new_calculations(old.iloc[:count - count // 100], old.iloc[:0], dterms,
+                             fterms, index=index)
+            index.save(index_file)
+
+            start = time.perf_counter()
+            index = DuplicateIndex.load(index_file, dterms, fterms)
+            nsaved = len(new_calculations(old, test, dterms, fterms, index=index))
+            saved_time = time.perf_counter() - start
+        assert nsaved == nnew
+
+        print(f'{count:7d}  {args.tests:5d}  {old_time:14.3f}  {new_time:13.3f}  {saved_time:19.3f}  {nnew:9d}',
+              flush=True)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--counts', nargs='+', type=int,
+                        default=[1000, 10000, 100000],
+                        help='numbers of existing records to test')
+    parser.add_argument('--tests', type=int, default=1000,
+                        help='number of candidate records to check')
+    main(parser.parse_args())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Benchmarks the iterative box relaxations of relax_static and relax_box with
+the subprocess and library backends of iprPy.tools.lammps_run.  relax_static
+runs all of its minimization cycles in a single LAMMPS simulation with either
+backend, while relax_box evaluates each cycle in a new simulation with the
+subprocess backend and all cycles in one persistent session with the library
+backend.  A distorted Lennard-Jones fcc crystal is used so that no potential
+files are needed, and the relaxed boxes of both backends are compared.
+
+Example:
+    python relax_cycles.py --lammps_command lmp --repeats 5
+"""
+# Standard Python libraries
+import argparse
+import os
+import tempfile
+import time
+
+# http://www.numpy.org/
+import numpy as np
+
+# https://github.com/usnistgov/atomman
+import atomman as am
+import atomman.unitconvert as uc
+
+# https://github.com/usnistgov/iprPy
+import iprPy
+from iprPy.calculation.relax_static.calc_relax_static import relax_static
+from iprPy.calculation.relax_box.calc_relax_box import relax_box
+
+class LJPotential(object):
+    """Minimal stand-in for atomman.lammps.Potential of a Lennard-Jones potential."""
+    units = 'metal'
+    atom_style = 'atomic'
+
+    def pair_info(self, symbols):
+        return 'pair_style lj/cut 6.0\npair_coeff * * 0.4093 2.338\nmass 1 63.546\n'
+
+system_info = '''
+units metal
+atom_style atomic
+boundary p p p
+read_data {datafile}
+'''
+
+class LJSystem(am.System):
+    """
+    System whose atom_data dumps return the LAMMPS commands for reading the
+    data file with the units and atom_style of LJPotential, as the read info
+    given by atomman does not include them.
+    """
+
+    def dump(self, style, **kwargs):
+        if style != 'atom_data' or kwargs.get('return_info', True) is False:
+            return super().dump(style, **kwargs)
+        kwargs['return_info'] = False
+        super().dump(style, **kwargs)
+        return system_info.format(datafile=kwargs['f'])
+
+def fcc_system(a, sizemults):
+    """Builds an fcc system with slightly different a, b and c."""
+    box = am.Box(a=a, b=a * 1.01, c=a * 0.99)
+    atoms = am.Atoms(pos=[[0.0, 0.0, 0.0], [0.0, 0.5, 0.5],
+                          [0.5, 0.0, 0.5], [0.5, 0.5, 0.0]])
+    ucell = am.System(atoms=atoms, box=box, scale=True, symbols='Cu')
+    system = ucell.supersize(*sizemults)
+    return LJSystem(atoms=system.atoms, box=system.box, symbols=system.symbols)
+
+def relax(function, lammps_command, backend, repeats, size, **kwargs):
+    """Times repeated relaxations in new directories with a backend."""
+    os.environ['IPRPY_LAMMPS_BACKEND'] = backend
+    potential = LJPotential()
+    pressure = uc.set_in_units(0.01, 'GPa')
+    seconds = 0.0
+    cwd = os.getcwd()
+    for repeat in range(repeats):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.chdir(tmpdir)
+            try:
+                system = fcc_system(3.6, (size, size, size))
+                start = time.perf_counter()
+                results = function(lammps_command, system, potential,
+                                   p_xx=pressure, p_zz=-pressure, **kwargs)
+                seconds += time.perf_counter() - start
+            finally:
+                os.chdir(cwd)
+    box = np.array([results[key] for key in ['lx', 'ly', 'lz']])
+    return seconds / repeats, box
+
+def main(args):
+    # Without the library, the library backend silently runs subprocesses
+    os.environ['IPRPY_LAMMPS_BACKEND'] = 'library'
+    if iprPy.tools.lammps_session(lammps_command=args.lammps_command) is None:
+        raise SystemExit('The LAMMPS library cannot be loaded or is not the '
+                         'same version as lammps_command')
+
+    natoms = 4 * args.size**3
+    print(f'{natoms} atoms')
+    print('calculation   subprocess (s)  library (s)  speedup  max box difference')
+    force_tol = uc.set_in_units(1e-10, 'eV/angstrom')
+    for function, kwargs in [(relax_static, {'ftol': force_tol}),
+                             (relax_box, {})]:
+        sub_time, sub_box = relax(function, args.lammps_command, 'subprocess',
+                                  args.repeats, args.size, **kwargs)
+        lib_time, lib_box = relax(function, args.lammps_command, 'library',
+                                  args.repeats, args.size, **kwargs)
+        diff = np.max(np.abs(sub_box - lib_box) / np.abs(sub_box))
+        print(f'{function.__name__:12s}  {sub_time:14.3f}  {lib_time:11.3f}  '
+              f'{sub_time / lib_time:7.2f}  {diff:18.2e}', flush=True)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lammps_command', default='lmp',
+                        help='the LAMMPS executable used by the subprocess backend')
+    parser.add_argument('--repeats', type=int, default=5,
+                        help='number of relaxations to time for each backend')
+    parser.add_argument('--size', type=int, default=3,
+                        help='number of fcc unit cells along each box vector')
+    main(parser.parse_args())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+Benchmarks relax_dynamic with a fixed run length against the adaptive run
+length mode, which integrates in chunks, detects the equilibration time and
+stops once the requested uncertainties are reached.  npt relaxations of a
+Lennard-Jones fcc crystal are run at several temperatures so that no
+potential files are needed, and the steps integrated, run times, mean values
+and standard errors of both modes are reported.
+
+Example:
+    python relax_dynamic_adaptive.py --lammps_command lmp --runsteps 40000
+"""
+# Standard Python libraries
+import argparse
+import os
+import tempfile
+import time
+
+# https://github.com/usnistgov/atomman
+import atomman as am
+import atomman.unitconvert as uc
+
+# https://github.com/usnistgov/iprPy
+from iprPy.calculation.relax_dynamic.calc_relax_dynamic import relax_dynamic
+
+class LJPotential(object):
+    """Minimal stand-in for atomman.lammps.Potential of a Lennard-Jones potential."""
+    units = 'metal'
+    atom_style = 'atomic'
+
+    def pair_info(self, symbols):
+        return 'pair_style lj/cut 6.0\npair_coeff * * 0.4093 2.338\nmass 1 63.546\n'
+
+system_info = '''
+units metal
+atom_style atomic
+boundary p p p
+read_data {datafile}
+'''
+
+class LJSystem(am.System):
+    """
+    System whose atom_data dumps return the LAMMPS commands for reading the
+    data file with the units and atom_style of LJPotential, as the read info
+    given by atomman does not include them.
+    """
+
+    def dump(self, style, **kwargs):
+        if style != 'atom_data' or kwargs.get('return_info', True) is False:
+            return super().dump(style, **kwargs)
+        kwargs['return_info'] = False
+        super().dump(style, **kwargs)
+        return system_info.format(datafile=kwargs['f'])
+
+def fcc_system(a, sizemults):
+    """Builds an fcc system with lattice parameter a."""
+    box = am.Box.cubic(a)
+    atoms = am.Atoms(pos=[[0.0, 0.0, 0.0], [0.0, 0.5, 0.5],
+                          [0.5, 0.0, 0.5], [0.5, 0.5, 0.0]])
+    ucell = am.System(atoms=atoms, box=box, scale=True, symbols='Cu')
+    system = ucell.supersize(*sizemults)
+    return LJSystem(atoms=system.atoms, box=system.box, symbols=system.symbols)
+
+def relax(lammps_command, temperature, args, **kwargs):
+    """Times a relax_dynamic run in a new directory."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        try:
+            start = time.perf_counter()
+            results = relax_dynamic(lammps_command, fcc_system(3.6, (4, 4, 4)),
+                                    LJPotential(), temperature=temperature,
+                                    runsteps=args.runsteps, thermosteps=10,
+                                    equilsteps=args.runsteps // 10,
+                                    randomseed=args.randomseed, **kwargs)
+            seconds = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+    steps = int(results['dumpfile_final'].split('.')[0])
+    return steps, seconds, results
+
+def main(args):
+    energy_uncertainty = uc.set_in_units(args.energy_uncertainty, 'eV')
+    print('temperature  mode      steps  seconds  E_coh (eV)  E_coh_err (eV)  lx (angstrom)  lx_err (angstrom)')
+    for temperature in args.temperatures:
+        for mode, kwargs in [('fixed', {}),
+                             ('adaptive', {'chunksteps': args.chunksteps,
+                                           'energy_uncertainty': energy_uncertainty,
+                                           'length_uncertainty': args.length_uncertainty})]:
+            steps, seconds, results = relax(args.lammps_command, temperature,
+                                            args, **kwargs)
+            E_coh = uc.get_in_units(results['E_coh'], 'eV')
+            E_coh_err = uc.get_in_units(results['E_coh_err'], 'eV')
+            lx = uc.get_in_units(results['lx'], 'angstrom')
+            lx_err = uc.get_in_units(results['lx_err'], 'angstrom')
+            print(f'{temperature:11.1f}  {mode:8s}  {steps:5d}  {seconds:7.2f}  '
+                  f'{E_coh:10.6f}  {E_coh_err:14.2e}  {lx:13.6f}  {lx_err:17.2e}',
+                  flush=True)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lammps_command', default='lmp',
+                        help='the LAMMPS executable to use')
+    parser.add_argument('--temperatures', type=float, nargs='+',
+                        default=[100.0, 300.0, 600.0],
+                        help='temperatures to relax at')
+    parser.add_argument('--runsteps', type=int, default=40000,
+                        help='run length of the fixed mode and the maximum of the adaptive mode')
+    parser.add_argument('--chunksteps', type=int, default=2000,
+                        help='chunk length of the adaptive mode')
+    parser.add_argument('--energy_uncertainty', type=float, default=2e-4,
+                        help='requested standard error of E_coh in eV')
+    parser.add_argument('--length_uncertainty', type=float, default=2e-4,
+                        help='requested relative standard error of the box lengths')
+    parser.add_argument('--randomseed', type=int, default=12345,
+                        help='random number seed of the velocities')
+    main(parser.parse_args())
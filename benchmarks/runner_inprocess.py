@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Benchmarks the runner on crystal_space_group calculations of the reference
+crystal prototypes, running the calculations as separate Python processes
+and in the runner's warm in-process worker, and reports jobs/second for
+each mode.
+
+Example:
+    python runner_inprocess.py --repeats 2
+"""
+# Standard Python libraries
+import argparse
+from pathlib import Path
+import tempfile
+import time
+
+# https://github.com/usnistgov/iprPy
+import iprPy
+
+def time_runner(database, calculation, directory, inprocess):
+    """
+    Prepares the calculations, times the runner finishing them and counts
+    the calculations that finished without errors.
+    """
+    run_directory = Path(directory, 'run')
+    run_directory.mkdir()
+    database.prepare(run_directory, calculation, jobqueue=False,
+                     buildcombos='crystalprototype load_file',
+                     symmetryprecision=['0.01', '0.001'])
+    count = len([path for path in run_directory.iterdir()
+                 if path.is_dir() and path.name[0] != '.'])
+
+    start = time.perf_counter()
+    database.runner(run_directory, jobqueue=False, inprocess=inprocess)
+    seconds = time.perf_counter() - start
+
+    # Finished records have no status
+    finished = 0
+    for record in database.get_records(style=calculation.record_style):
+        if len(record.content.finds('status')) == 0:
+            finished += 1
+    return count, finished, seconds
+
+def main(args):
+    calculation = iprPy.load_calculation('crystal_space_group')
+    results = {}
+    for inprocess in [False, True]:
+        for repeat in range(args.repeats):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                database = iprPy.load_database(style='local', host=Path(tmpdir, 'db'))
+                database.build_refs(include=['crystal_prototype'])
+                count, finished, seconds = time_runner(database, calculation,
+                                                       tmpdir, inprocess)
+                total = results.setdefault(inprocess, [0, 0, 0.0])
+                total[0] += count
+                total[1] += finished
+                total[2] += seconds
+
+    print('mode        jobs  finished  seconds  jobs/second')
+    for inprocess, (count, finished, seconds) in results.items():
+        mode = 'in-process' if inprocess else 'subprocess'
+        print(f'{mode:10s}  {count:4d}  {finished:8d}  {seconds:7.3f}  {count / seconds:11.3f}',
+              flush=True)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=1,
+                        help='number of times to prepare and run the calculations')
+    main(parser.parse_args())
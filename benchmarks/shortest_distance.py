@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+Benchmarks finding the shortest interatomic distance of triclinic unit cells
+with the vectorized iprPy.tools.shortest_distance search against the pairwise
+System.dvect loop previously used by E_vs_r_scan's r_a_ratio.
+
+Example:
+    python shortest_distance.py --natoms 10 100 1000
+"""
+# Standard Python libraries
+import argparse
+import time
+
+# http://www.numpy.org/
+import numpy as np
+
+# https://github.com/usnistgov/atomman
+import atomman as am
+
+# https://github.com/usnistgov/iprPy
+import iprPy
+
+def build_cell(natoms, seed=0):
+    """
+    Builds a triclinic cell with natoms atoms placed on a jittered grid
+    so that the number density matches fcc Cu.
+    """
+    rng = np.random.default_rng(seed)
+    volume = natoms * 11.8
+    box = am.Box(a=1.0, b=1.1, c=0.9, alpha=80.0, beta=95.0, gamma=105.0)
+    scale = (volume / box.volume) ** (1 / 3)
+    box = am.Box(a=scale, b=1.1*scale, c=0.9*scale,
+                 alpha=80.0, beta=95.0, gamma=105.0)
+
+    # Jittered grid of relative positions
+    n = int(np.ceil(natoms ** (1 / 3)))
+    grid = np.array(np.meshgrid(*[np.arange(n)]*3, indexing='ij')).reshape(3, -1).T
+    grid = grid[rng.permutation(len(grid))[:natoms]]
+    spos = (grid + 0.5 + rng.uniform(-0.2, 0.2, (natoms, 3))) / n
+
+    atoms = am.Atoms(atype=1, pos=spos)
+    return am.System(atoms=atoms, box=box, scale=True)
+
+def loop_shortest_distance(ucell):
+    """The pairwise loop formerly used by r_a_ratio."""
+    r = ucell.box.a
+    for i in range(ucell.natoms):
+        for j in range(i):
+            dmag = np.linalg.norm(ucell.dvect(i, j))
+            if dmag < r:
+                r = dmag
+    return r
+
+def main(args):
+    print('natoms  loop seconds  vectorized seconds  speedup  loop r      vectorized r')
+    for natoms in args.natoms:
+        ucell = build_cell(natoms)
+
+        start = time.perf_counter()
+        r_loop = loop_shortest_distance(ucell)
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        r_vect = min(ucell.box.a, iprPy.tools.shortest_distance(ucell))
+        vect_time = time.perf_counter() - start
+
+        print(f'{natoms:6d}  {loop_time:12.4f}  {vect_time:18.4f}  {loop_time / vect_time:7.1f}  {r_loop:9.6f}  {r_vect:12.6f}',
+              flush=True)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--natoms', nargs='+', type=int,
+                        default=[10, 100, 1000],
+                        help='numbers of atoms in the cells to test')
+    main(parser.parse_args())
@@ -23,7 +23,7 @@ __all__ = ['__version__', 'rootdir', 'libdir', 'compatibility', 'tools', 'input'
            'database', 'list_databases', 'load_database', 'set_database',
            'unset_database', 'list_run_directories',
            'load_run_directory', 'set_run_directory', 'unset_run_directory',
-           'analysis', 'workflow', 'check_modules']
+           'analysis', 'workflow', 'check_modules', 'import_profile']
 __all__.sort()
 
 # iprPy imports
@@ -47,4 +47,4 @@ from .database import (list_databases, load_database, set_database, unset_databa
 
 from . import workflow
 
-from .check_modules import check_modules
\ No newline at end of file
+from .check_modules import check_modules, import_profile
\ No newline at end of file
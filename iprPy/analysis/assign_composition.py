@@ -7,9 +7,6 @@ from DataModelDict import DataModelDict as DM
 # http://www.numpy.org/
 import numpy as np
 
-# https://github.com/usnistgov/atomman
-import atomman as am
-
 # iprPy imports
 from .. import libdir
 
@@ -17,6 +14,9 @@ def assign_composition(df, database, lib_directory=None):
     """
     Assigns compositions to calculations.
     """
+    # Function-specific imports
+    import atomman as am
+    
     # Build counts for available prototypes
     prototypes = database.get_records(style='crystal_prototype')
     counts = {}
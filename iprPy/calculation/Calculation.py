@@ -100,6 +100,16 @@ class Calculation(object):
         """
         raise AttributeError('calc not defined for Calculation style')
 
+    @property
+    def inprocess(self):
+        """
+        bool: Indicates if the calculation's main function can be called
+        repeatedly in a running Python process, letting the runner skip the
+        interpreter startup for each calculation.  Calculations that run
+        external programs like LAMMPS are run as separate processes.
+        """
+        return False
+
     @property
     def files(self):
         """
@@ -34,6 +34,7 @@ class EvsRScan(Calculation):
         # Specify calculation-specific keys 
         files = [
             'run0.template',
+            'run0_scan.template',
         ]
         for i in range(len(files)):
             files[i] = Path(self.directory, files[i])
@@ -59,7 +60,8 @@ class EvsRScan(Calculation):
         runkeys = [
             'minimum_r', 
             'maximum_r', 
-            'number_of_steps_r'
+            'number_of_steps_r',
+            'refine_tolerance_r',
         ]
         
         return self._buildtemplate(subsets, runkeys)
@@ -96,6 +98,7 @@ class EvsRScan(Calculation):
                 'minimum_r',
                 'maximum_r',
                 'number_of_steps_r',
+                'refine_tolerance_r',
             ],
         ]
                
@@ -8,6 +8,7 @@ import sys
 import uuid
 import shutil
 import datetime
+import warnings
 from copy import deepcopy
 
 # http://www.numpy.org/
@@ -45,7 +46,8 @@ def main(*args):
                           ucell = input_dict['ucell'],
                           rmin = input_dict['minimum_r'],
                           rmax = input_dict['maximum_r'],
-                          rsteps = input_dict['number_of_steps_r'])
+                          rsteps = input_dict['number_of_steps_r'],
+                          rtol = input_dict['refine_tolerance_r'])
     
     # Save data model of results
     script = Path(__file__).stem
@@ -59,9 +61,12 @@ def main(*args):
 def e_vs_r(lammps_command, system, potential,
            mpi_command=None, ucell=None, 
            rmin=uc.set_in_units(2.0, 'angstrom'), 
-           rmax=uc.set_in_units(6.0, 'angstrom'), rsteps=200):
+           rmax=uc.set_in_units(6.0, 'angstrom'), rsteps=200, batch=True,
+           rtol=None):
     """
     Performs a cohesive energy scan over a range of interatomic spaces, r.
+    If rtol is given, each energy minimum found on the r grid is further
+    refined using golden-section searches.
     
     Parameters
     ----------
@@ -84,6 +89,17 @@ def e_vs_r(lammps_command, system, potential,
         The maximum r spacing to use (default value is 6.0 angstroms).
     rsteps : int, optional
         The number of r spacing steps to evaluate (default value is 200).
+    batch : bool, optional
+        If True (default), all r values are evaluated in a single LAMMPS run
+        that rescales the box between energy evaluations.  If False, or if
+        the single run fails, a separate LAMMPS run is performed for each r
+        value.
+    rtol : float, optional
+        If given, the r values of the identified energy minima are refined
+        until each minimum is bracketed by an interval of r less than rtol.
+        The searches for all minima are advanced together, with each
+        iteration evaluating one new r value per unconverged minimum.  If
+        not given (default), the minima are taken from the r grid.
     
     Returns
     -------
@@ -91,7 +107,7 @@ def e_vs_r(lammps_command, system, potential,
         Dictionary of results consisting of keys:
         
         - **'r_values'** (*numpy.array of float*) - All interatomic spacings,
-          r, explored.
+          r, explored, including any values added during refinement.
         - **'a_values'** (*numpy.array of float*) - All unit cell a lattice
           constants corresponding to the values explored.
         - **'Ecoh_values'** (*numpy.array of float*) - The computed cohesive
@@ -99,9 +115,6 @@ def e_vs_r(lammps_command, system, potential,
         - **'min_cell'** (*list of atomman.System*) - Systems corresponding to
           the minima identified in the Ecoh_values.
     """
-    # Get script's location
-    script_dir = Path(__file__).parent
-
     # Make system a deepcopy of itself (protect original from changes)
     system = deepcopy(system)
     
@@ -123,74 +136,83 @@ def e_vs_r(lammps_command, system, potential,
     # Build lists of values
     r_values = np.linspace(rmin, rmax, rsteps)
     a_values = r_values / r_a
-    Ecoh_values = np.empty(rsteps)
     
-    # Loop over values
-    for i in range(rsteps):
-        
-        # Rescale system's box
-        a = a_values[i]
-        system.box_set(a = a * lx_a, 
-                       b = a * ly_a, 
-                       c = a * lz_a, 
-                       alpha=alpha, beta=beta, gamma=gamma, scale=True)
-        
-        # Get lammps units
-        lammps_units = lmp.style.unit(potential.units)
-        
-        # Define lammps variables
-        lammps_variables = {}
-        system_info = system.dump('atom_data', f='atom.dat',
-                                  units=potential.units,
-                                  atom_style=potential.atom_style)
-        lammps_variables['atomman_system_info'] = system_info
-        lammps_variables['atomman_pair_info'] = potential.pair_info(system.symbols)
-        
-        # Write lammps input script
-        template_file = Path(script_dir, 'run0.template')
-        lammps_script = 'run0.in'
-        with open(template_file) as f:
-            template = f.read()
-        with open(lammps_script, 'w') as f:
-            f.write(iprPy.tools.filltemplate(template, lammps_variables,
-                                             '<', '>'))
-        
-        # Run lammps and extract data
-        try:
-            output = lmp.run(lammps_command, lammps_script, mpi_command)
-        except:
-            Ecoh_values[i] = np.nan
-        else:
-            thermo = output.simulations[0]['thermo']
-            
-            if output.lammps_date < datetime.date(2016, 8, 1):
-                Ecoh_values[i] = uc.set_in_units(thermo.peatom.values[-1],
-                                                lammps_units['energy'])
-            else:
-                Ecoh_values[i] = uc.set_in_units(thermo.v_peatom.values[-1],
-                                                lammps_units['energy'])
-        
-        # Rename log.lammps
-        try:
-            shutil.move('log.lammps', 'run0-'+str(i)+'-log.lammps')
-        except:
-            pass
+    # Evaluate the energies
+    Ecoh_values = e_vs_r_energies(lammps_command, system, potential,
+                                  a_values, lx_a, ly_a, lz_a,
+                                  mpi_command=mpi_command, batch=batch)
 
     if len(Ecoh_values[np.isfinite(Ecoh_values)]) == 0:
         raise ValueError('All LAMMPS runs failed. Potential likely invalid or incompatible.')  
     
-    # Find unit cell systems at the energy minimums
-    min_cells = []
+    # Bracket the energy minimums with [r, E] values
+    brackets = []
     for i in range(1, rsteps - 1):
         if (Ecoh_values[i] < Ecoh_values[i-1]
             and Ecoh_values[i] < Ecoh_values[i+1]):
-            a = a_values[i]
-            cell = deepcopy(ucell)
-            cell.box_set(a = a,
-                         b = a * ucell.box.b / ucell.box.a,
-                         c = a * ucell.box.c / ucell.box.a, 
-                         alpha=alpha, beta=beta, gamma=gamma, scale=True)
-            min_cells.append(cell)
+            brackets.append([[r_values[i-1], Ecoh_values[i-1]],
+                             [r_values[i], Ecoh_values[i]],
+                             [r_values[i+1], Ecoh_values[i+1]]])
+    
+    # Refine the minimums using golden-section searches
+    if rtol is not None:
+        golden = (3 - 5**0.5) / 2
+        new_r_values = []
+        new_Ecoh_values = []
+        iteration = 0
+        while True:
+            active = [b for b in brackets if b[2][0] - b[0][0] > rtol]
+            if len(active) == 0:
+                break
+            
+            # Place new points in the larger part of each bracket
+            r_trials = []
+            for lo, mid, hi in active:
+                if hi[0] - mid[0] > mid[0] - lo[0]:
+                    r_trials.append(mid[0] + golden * (hi[0] - mid[0]))
+                else:
+                    r_trials.append(mid[0] - golden * (mid[0] - lo[0]))
+            r_trials = np.array(r_trials)
+            E_trials = e_vs_r_energies(lammps_command, system, potential,
+                                       r_trials / r_a, lx_a, ly_a, lz_a,
+                                       mpi_command=mpi_command, batch=batch,
+                                       name=f'refine{iteration}')
+            
+            # Shrink the brackets (failed evaluations never replace the minimum)
+            for b, r, E in zip(active, r_trials, E_trials):
+                lo, mid, hi = b
+                if E < mid[1]:
+                    if r > mid[0]:
+                        b[:] = [mid, [r, E], hi]
+                    else:
+                        b[:] = [lo, [r, E], mid]
+                elif r > mid[0]:
+                    b[2] = [r, E]
+                else:
+                    b[0] = [r, E]
+            
+            new_r_values.extend(r_trials)
+            new_Ecoh_values.extend(E_trials)
+            iteration += 1
+        
+        # Merge refinement values with the grid values
+        r_values = np.concatenate([r_values, new_r_values])
+        Ecoh_values = np.concatenate([Ecoh_values, new_Ecoh_values])
+        sort = np.argsort(r_values)
+        r_values = r_values[sort]
+        Ecoh_values = Ecoh_values[sort]
+        a_values = r_values / r_a
+    
+    # Find unit cell systems at the energy minimums
+    min_cells = []
+    for lo, mid, hi in brackets:
+        a = mid[0] / r_a
+        cell = deepcopy(ucell)
+        cell.box_set(a = a,
+                     b = a * ucell.box.b / ucell.box.a,
+                     c = a * ucell.box.c / ucell.box.a, 
+                     alpha=alpha, beta=beta, gamma=gamma, scale=True)
+        min_cells.append(cell)
     
     # Collect results
     results_dict = {}
@@ -201,10 +223,259 @@ def e_vs_r(lammps_command, system, potential,
     
     return results_dict
     
+def e_vs_r_energies(lammps_command, system, potential, a_values,
+                    lx_a, ly_a, lz_a, mpi_command=None, batch=True,
+                    name='run0'):
+    """
+    Evaluates the cohesive energies of a system rescaled to a series of
+    lattice constants.
+    
+    Parameters
+    ----------
+    lammps_command :str
+        Command for running LAMMPS.
+    system : atomman.System
+        The system to perform the calculation on.
+    potential : atomman.lammps.Potential
+        The LAMMPS implemented potential to use.
+    a_values : numpy.array of float
+        The unit cell a lattice constants to evaluate.
+    lx_a : float
+        The ratio of the system's a box parameter to the unit cell's a.
+    ly_a : float
+        The ratio of the system's b box parameter to the unit cell's a.
+    lz_a : float
+        The ratio of the system's c box parameter to the unit cell's a.
+    mpi_command : str, optional
+        The MPI command for running LAMMPS in parallel.  If not given, LAMMPS
+        will run serially.
+    batch : bool, optional
+        If True (default), all values are evaluated in a single LAMMPS run.
+        If False, or if the single run fails, a separate LAMMPS run is
+        performed for each value.
+    name : str, optional
+        The base name to use for the LAMMPS input and log files (default is
+        'run0').
+    
+    Returns
+    -------
+    numpy.array of float
+        The computed cohesive energies for each a value.  Values for failed
+        LAMMPS runs are NaN.
+    """
+    # Get script's location
+    script_dir = Path(__file__).parent
+    
+    # Make system a deepcopy of itself (protect original from changes)
+    system = deepcopy(system)
+    alpha = system.box.alpha
+    beta =  system.box.beta
+    gamma = system.box.gamma
+    
+    # Get lammps units
+    lammps_units = lmp.style.unit(potential.units)
+    
+    # Evaluate all values with a single LAMMPS run
+    Ecoh_values = None
+    if batch:
+        try:
+            Ecoh_values = e_vs_r_batch(lammps_command, system, potential,
+                                       a_values, lx_a, ly_a, lz_a,
+                                       mpi_command=mpi_command, name=name)
+        except (lmp.LammpsError, ValueError) as e:
+            # Fall back on individual runs to identify failed values
+            warnings.warn(f'batch LAMMPS run failed, evaluating each a value separately: {e}')
+            Ecoh_values = None
+    
+    # Evaluate each value with a separate LAMMPS run
+    if Ecoh_values is None:
+        Ecoh_values = np.empty(len(a_values))
+        for i in range(len(a_values)):
+            
+            # Rescale system's box
+            a = a_values[i]
+            system.box_set(a = a * lx_a, 
+                           b = a * ly_a, 
+                           c = a * lz_a, 
+                           alpha=alpha, beta=beta, gamma=gamma, scale=True)
+            
+            # Define lammps variables
+            lammps_variables = {}
+            system_info = system.dump('atom_data', f='atom.dat',
+                                      units=potential.units,
+                                      atom_style=potential.atom_style)
+            lammps_variables['atomman_system_info'] = system_info
+            lammps_variables['atomman_pair_info'] = potential.pair_info(system.symbols)
+            
+            # Write lammps input script
+            template_file = Path(script_dir, 'run0.template')
+            lammps_script = f'{name}.in'
+            with open(template_file) as f:
+                template = f.read()
+            with open(lammps_script, 'w') as f:
+                f.write(iprPy.tools.filltemplate(template, lammps_variables,
+                                                 '<', '>'))
+            
+            # Run lammps and extract data
+            try:
+                output = iprPy.tools.lammps_run(lammps_command, lammps_script, mpi_command)
+            except:
+                Ecoh_values[i] = np.nan
+            else:
+                thermo = output.simulations[0]['thermo']
+                
+                if output.lammps_date < datetime.date(2016, 8, 1):
+                    Ecoh_values[i] = uc.set_in_units(thermo.peatom.values[-1],
+                                                    lammps_units['energy'])
+                else:
+                    Ecoh_values[i] = uc.set_in_units(thermo.v_peatom.values[-1],
+                                                    lammps_units['energy'])
+            
+            # Rename log.lammps
+            try:
+                shutil.move('log.lammps', f'{name}-{i}-log.lammps')
+            except:
+                pass
+    
+    return Ecoh_values
+
+def e_vs_r_batch(lammps_command, system, potential, a_values,
+                 lx_a, ly_a, lz_a, mpi_command=None, name='run0'):
+    """
+    Evaluates the cohesive energies of a system rescaled to a series of
+    lattice constants using a single LAMMPS run.  The box is changed between
+    each energy evaluation with change_box using the same box dimensions that
+    would be obtained by rescaling the system with atomman.
+    
+    Parameters
+    ----------
+    lammps_command :str
+        Command for running LAMMPS.
+    system : atomman.System
+        The system to perform the calculation on.
+    potential : atomman.lammps.Potential
+        The LAMMPS implemented potential to use.
+    a_values : numpy.array of float
+        The unit cell a lattice constants to evaluate.
+    lx_a : float
+        The ratio of the system's a box parameter to the unit cell's a.
+    ly_a : float
+        The ratio of the system's b box parameter to the unit cell's a.
+    lz_a : float
+        The ratio of the system's c box parameter to the unit cell's a.
+    mpi_command : str, optional
+        The MPI command for running LAMMPS in parallel.  If not given, LAMMPS
+        will run serially.
+    name : str, optional
+        The base name to use for the LAMMPS input and log files (default is
+        'run0').
+    
+    Returns
+    -------
+    numpy.array of float
+        The computed cohesive energies for each a value.
+    
+    Raises
+    ------
+    ValueError
+        If the LAMMPS log does not contain a simulation for every a value.
+    """
+    # Get script's location
+    script_dir = Path(__file__).parent
+    
+    # Make system a deepcopy of itself (protect original from changes)
+    system = deepcopy(system)
+    alpha = system.box.alpha
+    beta =  system.box.beta
+    gamma = system.box.gamma
+    
+    # Get lammps units
+    lammps_units = lmp.style.unit(potential.units)
+    lunit = lammps_units['length']
+    
+    # Build change_box and run commands for each value
+    scan_commands = []
+    for i in range(len(a_values)):
+        
+        # Rescale system's box
+        a = a_values[i]
+        system.box_set(a = a * lx_a, 
+                       b = a * ly_a, 
+                       c = a * lz_a, 
+                       alpha=alpha, beta=beta, gamma=gamma, scale=True)
+        
+        # Save initial configuration
+        if i == 0:
+            system_info = system.dump('atom_data', f='atom.dat',
+                                      units=potential.units,
+                                      atom_style=potential.atom_style)
+            
+            # Tilt factors can only be changed if the data file has them
+            with open('atom.dat') as f:
+                triclinic = 'xy xz yz' in f.read()
+        
+        # Change box to match the rescaled system
+        else:
+            box = system.box
+            command = 'change_box all'
+            for dim in ['x', 'y', 'z']:
+                lo = uc.get_in_units(getattr(box, dim+'lo'), lunit)
+                hi = uc.get_in_units(getattr(box, dim+'hi'), lunit)
+                command += f' {dim} final {lo:.17e} {hi:.17e}'
+            if triclinic:
+                for tilt in ['xy', 'xz', 'yz']:
+                    value = uc.get_in_units(getattr(box, tilt), lunit)
+                    command += f' {tilt} final {value:.17e}'
+            command += ' remap units box'
+            scan_commands.append(command)
+        scan_commands.append('run 0')
+    
+    # Define lammps variables
+    lammps_variables = {}
+    lammps_variables['atomman_system_info'] = system_info
+    lammps_variables['atomman_pair_info'] = potential.pair_info(system.symbols)
+    lammps_variables['scan_commands'] = '\n'.join(scan_commands)
+    
+    # Write lammps input script
+    template_file = Path(script_dir, 'run0_scan.template')
+    lammps_script = f'{name}_scan.in'
+    with open(template_file) as f:
+        template = f.read()
+    with open(lammps_script, 'w') as f:
+        f.write(iprPy.tools.filltemplate(template, lammps_variables,
+                                         '<', '>'))
+    
+    # Run lammps
+    try:
+        output = iprPy.tools.lammps_run(lammps_command, lammps_script, mpi_command)
+    finally:
+        # Rename log.lammps
+        try:
+            shutil.move('log.lammps', f'{name}_scan-log.lammps')
+        except:
+            pass
+    
+    if len(output.simulations) != len(a_values):
+        raise ValueError('LAMMPS log missing simulation results')
+    
+    # Extract data
+    Ecoh_values = np.empty(len(a_values))
+    for i, simulation in enumerate(output.simulations):
+        thermo = simulation['thermo']
+        if output.lammps_date < datetime.date(2016, 8, 1):
+            Ecoh_values[i] = uc.set_in_units(thermo.peatom.values[-1],
+                                             lammps_units['energy'])
+        else:
+            Ecoh_values[i] = uc.set_in_units(thermo.v_peatom.values[-1],
+                                             lammps_units['energy'])
+    
+    return Ecoh_values
+
 def r_a_ratio(ucell):
     """
     Calculates the r/a ratio by identifying the shortest interatomic spacing, r,
-    for a unit cell.
+    for a unit cell.  All periodic images are considered, including those of
+    an atom with itself.
     
     Parameters
     ----------
@@ -217,12 +488,7 @@ def r_a_ratio(ucell):
         The shortest interatomic spacing, r, divided by the unit cell's a
         lattice parameter.
     """
-    r_a = ucell.box.a
-    for i in range(ucell.natoms):
-        for j in range(i):
-            dmag = np.linalg.norm(ucell.dvect(i,j))
-            if dmag < r_a:
-                r_a = dmag
+    r_a = min(ucell.box.a, iprPy.tools.shortest_distance(ucell))
     return r_a / ucell.box.a
 
 def process_input(input_dict, UUID=None, build=True):
@@ -274,6 +540,11 @@ def process_input(input_dict, UUID=None, build=True):
     input_dict['maximum_r'] = iprPy.input.value(input_dict, 'maximum_r',
                                       default_unit=input_dict['length_unit'],
                                       default_term='6.0 angstrom')
+    if input_dict.get('refine_tolerance_r', None) is not None:
+        input_dict['refine_tolerance_r'] = iprPy.input.value(input_dict, 'refine_tolerance_r',
+                                          default_unit=input_dict['length_unit'])
+    else:
+        input_dict['refine_tolerance_r'] = None
     
     # Check lammps_command and mpi_command
     iprPy.input.subset('lammps_commands').interpret(input_dict)
@@ -91,7 +91,7 @@ def bain_run_calcs(input_dict, __calc_type__, step):
                                 maxiter = input_dict['maximum_iterations'], 
                                 maxeval = input_dict['maximum_evaluations']))
     #run LAMMPS
-    output = lmp.run(input_dict['lammps_command'], 'bain.in', input_dict['mpi_command'])
+    output = iprPy.tools.lammps_run(input_dict['lammps_command'], 'bain.in', input_dict['mpi_command'])
     
     atom_last = 'atom.%i' % output.finds('Step')[-1] #prints number of iterations (?)
     
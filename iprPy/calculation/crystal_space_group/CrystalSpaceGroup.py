@@ -23,6 +23,14 @@ class CrystalSpaceGroup(Calculation):
         # Define calc shortcut
         self.calc = self.script.crystal_space_group
     
+    @property
+    def inprocess(self):
+        """
+        bool: Indicates if the calculation's main function can be called
+        repeatedly in a running Python process.
+        """
+        return True
+
     @property
     def files(self):
         """
@@ -4,6 +4,7 @@
 
 # Standard library imports
 from pathlib import Path
+import dataclasses
 import sys
 import uuid
 import random
@@ -142,8 +143,11 @@ def crystal_space_group(system, symprec=1e-5, to_primitive=False,
         fingerprint.append(''.join(sorted(fingerprint_dict[atype])))
     fingerprint = ' '.join(fingerprint)
 
-    # Return results
-    results_dict = spg_type
+    # Return results: spglib 2 gives the space group type as a dataclass
+    if dataclasses.is_dataclass(spg_type):
+        results_dict = dataclasses.asdict(spg_type)
+    else:
+        results_dict = dict(spg_type)
     results_dict['ucell'] = ucell
     results_dict['hall_number'] = sym_data['hall_number']
     results_dict['wyckoffs'] = sym_data['wyckoffs']
@@ -34,6 +34,7 @@ class DiatomScan(Calculation):
         # Specify calculation-specific keys 
         files = [
             'run0.template',
+            'run0_scan.template',
         ]
         for i in range(len(files)):
             files[i] = Path(self.directory, files[i])
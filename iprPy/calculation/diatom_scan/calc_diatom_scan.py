@@ -8,6 +8,7 @@ import sys
 import uuid
 import shutil
 import datetime
+import warnings
 from copy import deepcopy
 
 # http://www.numpy.org/
@@ -58,7 +59,7 @@ def main(*args):
 def diatom(lammps_command, potential, symbols,
            mpi_command=None, 
            rmin=uc.set_in_units(0.02, 'angstrom'), 
-           rmax=uc.set_in_units(6.0, 'angstrom'), rsteps=300):
+           rmax=uc.set_in_units(6.0, 'angstrom'), rsteps=300, batch=True):
     """
     Performs a diatom energy scan over a range of interatomic spaces, r.
     
@@ -79,6 +80,11 @@ def diatom(lammps_command, potential, symbols,
         The maximum r spacing to use (default value is 6.0 angstroms).
     rsteps : int, optional
         The number of r spacing steps to evaluate (default value is 300).
+    batch : bool, optional
+        If True (default), all r values are evaluated in a single LAMMPS run
+        that moves the second atom between energy evaluations.  If False, or
+        if the single run fails, a separate LAMMPS run is performed for each
+        r value.
     
     Returns
     -------
@@ -118,35 +124,46 @@ def diatom(lammps_command, potential, symbols,
     lammps_variables = {}
     lammps_variables['atomman_pair_info'] = potential.pair_info(symbols)
 
-    # Loop over values
-    for i in range(rsteps):
+    # Evaluate all values with a single LAMMPS run
+    if batch:
+        try:
+            energy_values = diatom_batch(lammps_command, system, potential,
+                                         r_values, mpi_command=mpi_command)
+        except (lmp.LammpsError, ValueError) as e:
+            # Fall back on individual runs to identify failed values
+            warnings.warn(f'batch LAMMPS run failed, evaluating each r value separately: {e}')
+            batch = False
+    
+    # Evaluate each value with a separate LAMMPS run
+    if not batch:
+        for i in range(rsteps):
         
-        # Shift second atom's x position
-        system.atoms.pos[1] = np.array([0.1 + r_values[i], 0.1, 0.1])
-
-        # Save configuration
-        system_info = system.dump('atom_data', f='diatom.dat',
-                                  units=potential.units,
-                                  atom_style=potential.atom_style)
-        lammps_variables['atomman_system_info'] = system_info
+            # Shift second atom's x position
+            system.atoms.pos[1] = np.array([0.1 + r_values[i], 0.1, 0.1])
+
+            # Save configuration
+            system_info = system.dump('atom_data', f='diatom.dat',
+                                      units=potential.units,
+                                      atom_style=potential.atom_style)
+            lammps_variables['atomman_system_info'] = system_info
         
-        # Write lammps input script
-        template_file = Path(script_dir, 'run0.template')
-        lammps_script = 'run0.in'
-        with open(template_file) as f:
-            template = f.read()
-        with open(lammps_script, 'w') as f:
-            f.write(iprPy.tools.filltemplate(template, lammps_variables,
-                                             '<', '>'))
+            # Write lammps input script
+            template_file = Path(script_dir, 'run0.template')
+            lammps_script = 'run0.in'
+            with open(template_file) as f:
+                template = f.read()
+            with open(lammps_script, 'w') as f:
+                f.write(iprPy.tools.filltemplate(template, lammps_variables,
+                                                 '<', '>'))
         
-        # Run lammps and extract data
-        try:
-            output = lmp.run(lammps_command, lammps_script, mpi_command)
-        except:
-            energy_values[i] = np.nan
-        else:
-            energy = output.simulations[0]['thermo'].PotEng.values[-1]
-            energy_values[i] = uc.set_in_units(energy, lammps_units['energy'])
+            # Run lammps and extract data
+            try:
+                output = iprPy.tools.lammps_run(lammps_command, lammps_script, mpi_command)
+            except:
+                energy_values[i] = np.nan
+            else:
+                energy = output.simulations[0]['thermo'].PotEng.values[-1]
+                energy_values[i] = uc.set_in_units(energy, lammps_units['energy'])
 
     if len(energy_values[np.isfinite(energy_values)]) == 0:
         raise ValueError('All LAMMPS runs failed. Potential likely invalid or incompatible.')
@@ -158,6 +175,90 @@ def diatom(lammps_command, potential, symbols,
     
     return results_dict
 
+def diatom_batch(lammps_command, system, potential, r_values,
+                 mpi_command=None):
+    """
+    Evaluates the energies of a diatom at a series of interatomic spacings
+    using a single LAMMPS run.  The second atom is moved along x between each
+    energy evaluation.
+    
+    Parameters
+    ----------
+    lammps_command :str
+        Command for running LAMMPS.
+    system : atomman.System
+        The two atom system with the second atom at the first atom's
+        position.
+    potential : atomman.lammps.Potential
+        The LAMMPS implemented potential to use.
+    r_values : numpy.array of float
+        The interatomic spacings to evaluate.
+    mpi_command : str, optional
+        The MPI command for running LAMMPS in parallel.  If not given, LAMMPS
+        will run serially.
+    
+    Returns
+    -------
+    numpy.array of float
+        The computed potential energies for each r value.
+    
+    Raises
+    ------
+    ValueError
+        If the LAMMPS log does not contain a simulation for every r value.
+    """
+    # Get script's location
+    script_dir = Path(__file__).parent
+    
+    # Make system a deepcopy of itself (protect original from changes)
+    system = deepcopy(system)
+    
+    # Get lammps units
+    lammps_units = lmp.style.unit(potential.units)
+    
+    # Save initial configuration
+    system.atoms.pos[1] = np.array([0.1 + r_values[0], 0.1, 0.1])
+    system_info = system.dump('atom_data', f='diatom.dat',
+                              units=potential.units,
+                              atom_style=potential.atom_style)
+    
+    # Build set and run commands for each value
+    scan_commands = []
+    for i in range(len(r_values)):
+        if i > 0:
+            x = uc.get_in_units(0.1 + r_values[i], lammps_units['length'])
+            scan_commands.append(f'set atom 2 x {x:.17e}')
+        scan_commands.append('run 0')
+    
+    # Define lammps variables
+    lammps_variables = {}
+    lammps_variables['atomman_system_info'] = system_info
+    lammps_variables['atomman_pair_info'] = potential.pair_info(system.symbols)
+    lammps_variables['scan_commands'] = '\n'.join(scan_commands)
+    
+    # Write lammps input script
+    template_file = Path(script_dir, 'run0_scan.template')
+    lammps_script = 'run0_scan.in'
+    with open(template_file) as f:
+        template = f.read()
+    with open(lammps_script, 'w') as f:
+        f.write(iprPy.tools.filltemplate(template, lammps_variables,
+                                         '<', '>'))
+    
+    # Run lammps
+    output = iprPy.tools.lammps_run(lammps_command, lammps_script, mpi_command)
+    
+    if len(output.simulations) != len(r_values):
+        raise ValueError('LAMMPS log missing simulation results')
+    
+    # Extract data
+    energy_values = np.empty(len(r_values))
+    for i, simulation in enumerate(output.simulations):
+        energy = simulation['thermo'].PotEng.values[-1]
+        energy_values[i] = uc.set_in_units(energy, lammps_units['energy'])
+    
+    return energy_values
+
 def process_input(input_dict, UUID=None, build=True):
     """
     Processes str input parameters, assigns default values if needed, and
@@ -20,6 +20,14 @@ class DislocationSDVPN(Calculation):
         # Define calc shortcut
         self.calc = self.script.peierlsnabarro
 
+    @property
+    def inprocess(self):
+        """
+        bool: Indicates if the calculation's main function can be called
+        repeatedly in a running Python process.
+        """
+        return True
+
     @property
     def files(self):
         """
@@ -184,7 +184,7 @@ def dislocationarray(lammps_command, system, potential, burgers,
     lammps_units = lmp.style.unit(potential.units)
     
     #Get lammps version date
-    lammps_date = lmp.checkversion(lammps_command)['date']
+    lammps_date = iprPy.tools.lammps_checkversion(lammps_command, mpi_command)['date']
     
     # Define lammps variables
     lammps_variables = {}
@@ -218,7 +218,7 @@ def dislocationarray(lammps_command, system, potential, burgers,
                                          '<', '>'))
     
     # Run LAMMPS
-    output = lmp.run(lammps_command, lammps_script, mpi_command)
+    output = iprPy.tools.lammps_run(lammps_command, lammps_script, mpi_command)
     thermo = output.simulations[-1]['thermo']
     
     # Extract output values
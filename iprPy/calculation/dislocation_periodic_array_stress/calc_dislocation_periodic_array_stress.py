@@ -147,7 +147,7 @@ def dislocationarraystress(lammps_command, system, potential, temperature,
     lammps_units = lmp.style.unit(potential.units)
     
     # Get lammps version date
-    lammps_date = lmp.checkversion(lammps_command)['date']
+    lammps_date = iprPy.tools.lammps_checkversion(lammps_command, mpi_command)['date']
     
     # Define lammps variables
     lammps_variables = {}
@@ -189,7 +189,7 @@ def dislocationarraystress(lammps_command, system, potential, temperature,
                                          '<', '>'))
     
     # Run LAMMPS
-    output = lmp.run(lammps_command, lammps_script, mpi_command)
+    output = iprPy.tools.lammps_run(lammps_command, lammps_script, mpi_command)
     thermo = output.simulations[-1]['thermo']
     steps = thermo.Step.values
     times = uc.set_in_units(steps * lmp.style.timestep(potential.units),
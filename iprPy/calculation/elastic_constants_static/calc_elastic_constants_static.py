@@ -122,7 +122,7 @@ def elastic_constants_static(lammps_command, system, potential, mpi_command=None
     lammps_units = lmp.style.unit(potential.units)
     
     # Get lammps version date
-    lammps_date = lmp.checkversion(lammps_command)['date']
+    lammps_date = iprPy.tools.lammps_checkversion(lammps_command, mpi_command)['date']
     
     # Define lammps variables
     lammps_variables = {}
@@ -153,7 +153,7 @@ def elastic_constants_static(lammps_command, system, potential, mpi_command=None
         f.write(iprPy.tools.filltemplate(template, lammps_variables, '<', '>'))
     
     # Run LAMMPS
-    output = lmp.run(lammps_command, lammps_script, mpi_command)
+    output = iprPy.tools.lammps_run(lammps_command, lammps_script, mpi_command)
     
     # Pull out initial state
     thermo = output.simulations[0]['thermo']
@@ -69,7 +69,7 @@ def phonon(lammps_command, ucell, potential, mpi_command=None, a_mult=5, b_mult=
     lammps_units = lmp.style.unit(potential.units)
     
     # Get lammps version date
-    lammps_date = lmp.checkversion(lammps_command)['date']
+    lammps_date = iprPy.tools.lammps_checkversion(lammps_command, mpi_command)['date']
 
     # Generate pair_info
     pair_info = potential.pair_info(ucell.symbols)
@@ -83,38 +83,58 @@ def phonon(lammps_command, ucell, potential, mpi_command=None, a_mult=5, b_mult=
     phonon = phonopy.Phonopy(primucell.dump('phonopy_Atoms'), [[a_mult, 0, 0], [0, b_mult, 0], [0, 0, c_mult]])
     phonon.generate_displacements(distance=distance)
     
-    # Loop over displaced supercells to compute forces
-    forcearrays = []
-    for supercell in phonon.supercells_with_displacements:
-        
-        # Save to LAMMPS data file
-        system = am.load('phonopy_Atoms', supercell)
-        system_info = system.dump('atom_data', f='disp.dat')
-        
-        # Define lammps variables
-        lammps_variables = {}
-        lammps_variables['atomman_system_info'] = system_info
-        lammps_variables['atomman_pair_info'] = pair_info
-
-        # Set dump_modify_format based on lammps_date
-        if lammps_date < datetime.date(2016, 8, 3):
-            lammps_variables['dump_modify_format'] = '"%d %d %.13e %.13e %.13e %.13e %.13e %.13e"'
-        else:
-            lammps_variables['dump_modify_format'] = 'float %.13e'
-
-        # Write lammps input script
-        template_file = 'phonon.template'
-        lammps_script = 'phonon.in'
-        with open(template_file) as f:
-            template = f.read()
-        with open(lammps_script, 'w') as f:
-            f.write(iprPy.tools.filltemplate(template, lammps_variables, '<', '>'))
+    # Save perfect supercell to LAMMPS data file
+    system = am.load('phonopy_Atoms', phonon.supercell)
+    system_info = system.dump('atom_data', f='disp.dat')
+    
+    # Set dump_modify_format based on lammps_date
+    if lammps_date < datetime.date(2016, 8, 3):
+        dump_modify_format = '"%d %d %.13e %.13e %.13e %.13e %.13e %.13e"'
+    else:
+        dump_modify_format = 'float %.13e'
+    
+    # Build commands that evaluate each displaced supercell in turn
+    # (positions match disp.dat, which uses atomman's default metal units)
+    lunit = lmp.style.unit('metal')['length']
+    displacement_commands = []
+    for i, supercell in enumerate(phonon.supercells_with_displacements):
         
-        # Run LAMMPS
-        lmp.run(lammps_command, 'phonon.in', mpi_command=mpi_command)
+        # Identify displaced atoms
+        dispsystem = am.load('phonopy_Atoms', supercell)
+        moved = np.where(np.any(dispsystem.atoms.pos != system.atoms.pos, axis=1))[0]
         
-        # Extract forces from dump file
-        results = am.load('atom_dump', 'forces.dump')
+        # Displace atoms, evaluate, then restore atoms
+        for index in moved:
+            x, y, z = uc.get_in_units(dispsystem.atoms.pos[index], lunit)
+            displacement_commands.append(f'set atom {index + 1} x {x:.17e} y {y:.17e} z {z:.17e}')
+        displacement_commands.append('run 0')
+        displacement_commands.append(f'write_dump all custom forces-{i}.dump id type x y z fx fy fz '
+                                     f'modify sort id format {dump_modify_format}')
+        for index in moved:
+            x, y, z = uc.get_in_units(system.atoms.pos[index], lunit)
+            displacement_commands.append(f'set atom {index + 1} x {x:.17e} y {y:.17e} z {z:.17e}')
+    
+    # Define lammps variables
+    lammps_variables = {}
+    lammps_variables['atomman_system_info'] = system_info
+    lammps_variables['atomman_pair_info'] = pair_info
+    lammps_variables['displacement_commands'] = '\n'.join(displacement_commands)
+    
+    # Write lammps input script
+    template_file = 'phonon.template'
+    lammps_script = 'phonon.in'
+    with open(template_file) as f:
+        template = f.read()
+    with open(lammps_script, 'w') as f:
+        f.write(iprPy.tools.filltemplate(template, lammps_variables, '<', '>'))
+    
+    # Run LAMMPS once for all displaced supercells
+    iprPy.tools.lammps_run(lammps_command, 'phonon.in', mpi_command=mpi_command)
+    
+    # Extract forces from dump files in order
+    forcearrays = []
+    for i in range(len(phonon.supercells_with_displacements)):
+        results = am.load('atom_dump', f'forces-{i}.dump')
         forces = uc.set_in_units(results.atoms.force, lammps_units['force'])
         forcearrays.append(forces)
     
@@ -147,7 +147,7 @@ def pointdiffusion(lammps_command, system, potential, point_kwargs,
     lammps_units = lmp.style.unit(potential.units)
     
     #Get lammps version date
-    lammps_date = lmp.checkversion(lammps_command)['date']
+    lammps_date = iprPy.tools.lammps_checkversion(lammps_command, mpi_command)['date']
     
     # Check that temperature is greater than zero
     if temperature <= 0.0:
@@ -205,7 +205,7 @@ def pointdiffusion(lammps_command, system, potential, point_kwargs,
         f.write(iprPy.tools.filltemplate(template, lammps_variables, '<', '>'))
     
     # Run lammps
-    output = lmp.run(lammps_command, 'diffusion.in', mpi_command)
+    output = iprPy.tools.lammps_run(lammps_command, 'diffusion.in', mpi_command)
     
     # Extract LAMMPS thermo data.
     thermo = output.simulations[1]['thermo']
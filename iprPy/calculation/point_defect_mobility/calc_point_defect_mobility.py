@@ -324,7 +324,7 @@ def calc_neb(lammps_command, system_info, potential, initial_defect_number,
     lammps_units = lmp.style.unit(potential.units)
     
     #Get lammps version date
-    lammps_date = lmp.checkversion(lammps_command)['date']
+    lammps_date = iprPy.tools.lammps_checkversion(lammps_command, mpi_command)['date']
     
     # Define lammps variables
     lammps_terms = {}
@@ -358,7 +358,7 @@ def calc_neb(lammps_command, system_info, potential, initial_defect_number,
         f.write(am.tools.filltemplate(template, lammps_terms, '<', '>'))
     
     #Running the calc_neb    
-    output = lmp.run(lammps_command, 'neb_lammps.in', mpi_command=mpi_command)
+    output = iprPy.tools.lammps_run(lammps_command, 'neb_lammps.in', mpi_command=mpi_command)
     neb = lmp.NEBLog()
     
     return neb
@@ -225,7 +225,7 @@ def pointdefect(lammps_command, system, potential, point_kwargs,
     lammps_units = lmp.style.unit(potential.units)
     
     #Get lammps version date
-    lammps_date = lmp.checkversion(lammps_command)['date']
+    lammps_date = iprPy.tools.lammps_checkversion(lammps_command, mpi_command)['date']
     
     # Define lammps variables
     lammps_variables = {}
@@ -254,33 +254,65 @@ def pointdefect(lammps_command, system, potential, point_kwargs,
     with open(lammps_script, 'w') as f:
         f.write(iprPy.tools.filltemplate(template, lammps_variables, '<', '>'))
 
-    # Run lammps to relax perfect.dat
-    output = lmp.run(lammps_command, lammps_script, mpi_command)
-    
-    # Extract LAMMPS thermo data.
-    thermo = output.simulations[0]['thermo']
-    E_total_base = uc.set_in_units(thermo.PotEng.values[-1],
-                                   lammps_units['energy'])
+    # Check for a cached relaxation of the perfect system
+    cache = iprPy.tools.ReferenceCache.from_environ()
+    if cache is not None:
+        cache_key = cache.key(calculation=record_style,
+                              template=template,
+                              potential_key=potential.key,
+                              potential_id=potential.id,
+                              system=cache.fingerprint(system, potential),
+                              lammps_date=lammps_date,
+                              etol=etol, ftol=ftol, maxiter=maxiter,
+                              maxeval=maxeval, dmax=dmax)
+        cached = cache.get(cache_key)
+    else:
+        cached = None
+
+    if cached is not None:
+        E_total_base = cached['E_total_base']
+        pressure_base = np.array(cached['pressure_base'])
+
+        # Load relaxed system from cached dump file
+        system_base = am.load('atom_dump', 'perfect.dump', symbols=system.symbols)
+        system_base.box_set(vects=system.box.vects)
+
+    else:
+        # Run lammps to relax perfect.dat
+        output = iprPy.tools.lammps_run(lammps_command, lammps_script, mpi_command)
+        
+        # Extract LAMMPS thermo data.
+        thermo = output.simulations[0]['thermo']
+        E_total_base = uc.set_in_units(thermo.PotEng.values[-1],
+                                       lammps_units['energy'])
+        
+        pxx = uc.set_in_units(thermo.Pxx.values[-1], lammps_units['pressure'])
+        pyy = uc.set_in_units(thermo.Pyy.values[-1], lammps_units['pressure'])
+        pzz = uc.set_in_units(thermo.Pzz.values[-1], lammps_units['pressure'])
+        pxy = uc.set_in_units(thermo.Pxy.values[-1], lammps_units['pressure'])
+        pxz = uc.set_in_units(thermo.Pxz.values[-1], lammps_units['pressure'])
+        pyz = uc.set_in_units(thermo.Pyz.values[-1], lammps_units['pressure'])
+        pressure_base = np.array([[pxx, pxy, pxz], [pxy, pyy, pyz], [pxz, pyz, pzz]])
+        
+        # Rename log file
+        shutil.move('log.lammps', 'min-perfect-log.lammps')
+        
+        # Load relaxed system from dump file and copy old box vectors because 
+        # dump files crop the values.
+        last_dump_file = 'atom.' + str(thermo.Step.values[-1])
+        system_base = am.load('atom_dump', last_dump_file, symbols=system.symbols)
+        system_base.box_set(vects=system.box.vects)
+        system_base.dump('atom_dump', f='perfect.dump')
+
+        # Save the relaxed perfect system for other defects
+        if cache is not None:
+            cache.put(cache_key,
+                      {'E_total_base': float(E_total_base),
+                       'pressure_base': pressure_base.tolist()},
+                      files=['perfect.dump', 'min-perfect-log.lammps'])
+
     E_coh = E_total_base / system.natoms
     
-    pxx = uc.set_in_units(thermo.Pxx.values[-1], lammps_units['pressure'])
-    pyy = uc.set_in_units(thermo.Pyy.values[-1], lammps_units['pressure'])
-    pzz = uc.set_in_units(thermo.Pzz.values[-1], lammps_units['pressure'])
-    pxy = uc.set_in_units(thermo.Pxy.values[-1], lammps_units['pressure'])
-    pxz = uc.set_in_units(thermo.Pxz.values[-1], lammps_units['pressure'])
-    pyz = uc.set_in_units(thermo.Pyz.values[-1], lammps_units['pressure'])
-    pressure_base = np.array([[pxx, pxy, pxz], [pxy, pyy, pyz], [pxz, pyz, pzz]])
-    
-    # Rename log file
-    shutil.move('log.lammps', 'min-perfect-log.lammps')
-    
-    # Load relaxed system from dump file and copy old box vectors because 
-    # dump files crop the values.
-    last_dump_file = 'atom.' + str(thermo.Step.values[-1])
-    system_base = am.load('atom_dump', last_dump_file, symbols=system.symbols)
-    system_base.box_set(vects=system.box.vects)
-    system_base.dump('atom_dump', f='perfect.dump')
-    
     # Add defect(s)
     system_ptd = deepcopy(system_base)
     if not isinstance(point_kwargs, (list, tuple)):
@@ -300,7 +332,7 @@ def pointdefect(lammps_command, system, potential, point_kwargs,
                                          '<', '>'))
     
     # Run lammps
-    output = lmp.run(lammps_command, lammps_script, mpi_command)
+    output = iprPy.tools.lammps_run(lammps_command, lammps_script, mpi_command)
     
     # Extract lammps thermo data
     thermo = output.simulations[0]['thermo']
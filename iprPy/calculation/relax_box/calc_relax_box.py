@@ -27,6 +27,13 @@ import iprPy
 # Define record_style
 record_style = 'calculation_relax_box'
 
+# LAMMPS thermo keywords used by cij.template and their log file headers
+thermo_keys = {'lx': 'Lx', 'ly': 'Ly', 'lz': 'Lz',
+               'yz': 'Yz', 'xz': 'Xz', 'xy': 'Xy',
+               'pxx': 'Pxx', 'pyy': 'Pyy', 'pzz': 'Pzz',
+               'pyz': 'Pyz', 'pxz': 'Pxz', 'pxy': 'Pxy',
+               'pe': 'PotEng'}
+
 def main(*args):
     """Main function  called when script is executed directly."""
     
@@ -62,10 +69,12 @@ def main(*args):
 def relax_box(lammps_command, system, potential,
               mpi_command=None, strainrange=1e-6,
               p_xx=0.0, p_yy=0.0, p_zz=0.0, p_xy=0.0, p_xz=0.0, p_yz=0.0,
-              tol=1e-10, diverge_scale=3.):
+              tol=1e-10, diverge_scale=3., savecycles=False):
     """
     Quickly refines static orthorhombic system by evaluating the elastic
-    constants and the virial pressure.
+    constants and the virial pressure.  If the library LAMMPS backend is
+    used, the system is read in once and all cycles are evaluated within the
+    same LAMMPS session.
     
     Parameters
     ----------
@@ -99,6 +108,9 @@ def relax_box(lammps_command, system, potential,
         original dimension multiplied by diverge_scale, or if any current box
         dimension is less than the original dimension divided by diverge_scale.
         (Default is 3.0).
+    savecycles : bool, optional
+        If True, the LAMMPS data and log files of each cycle are saved.  If
+        False (default), only the files needed to run LAMMPS are written.
     
     Returns
     -------
@@ -133,13 +145,18 @@ def relax_box(lammps_command, system, potential,
     
     system.dump('atom_dump', f='initial.dump')
     
+    # Get the persistent LAMMPS session, if available
+    session = iprPy.tools.lammps_session(mpi_command, lammps_command)
+    
     for cycle in range(100):
         
         # Run LAMMPS and evaluate results based on system_old
         results = calc_cij(lammps_command, system_current, potential,
                            mpi_command=mpi_command,
                            p_xx=p_xx, p_yy=p_yy, p_zz=p_zz,
-                           strainrange=strainrange, cycle=cycle)
+                           strainrange=strainrange, cycle=cycle,
+                           session=session, initialize=cycle==0,
+                           savecycles=savecycles)
         system_new = results['system_new']
         
         # Compare new and current to test for convergence
@@ -162,7 +179,9 @@ def relax_box(lammps_command, system, potential,
             results = calc_cij(lammps_command, system_current, potential,
                                mpi_command=mpi_command,
                                p_xx=p_xx, p_yy=p_yy, p_zz=p_zz, 
-                               strainrange=strainrange, cycle=cycle+1)
+                               strainrange=strainrange, cycle=cycle+1,
+                               session=session, initialize=False,
+                               savecycles=savecycles)
             system_new = results['system_new']
             converged = True
             break
@@ -219,7 +238,8 @@ def relax_box(lammps_command, system, potential,
 
 def calc_cij(lammps_command, system, potential,
              mpi_command=None, p_xx=0.0, p_yy=0.0, p_zz=0.0,
-             strainrange=1e-6, cycle=0):
+             strainrange=1e-6, cycle=0, session=None, initialize=True,
+             savecycles=True):
     """
     Runs cij.in LAMMPS script to evaluate Cij, and E_coh of the current system,
     and define a new system with updated box dimensions to test.
@@ -250,6 +270,17 @@ def calc_cij(lammps_command, system, potential,
     cycle : int, optional
         Indicates the iteration cycle of quick_a_Cij().  This is used to
         uniquely save the LAMMPS input and output files.
+    session : iprPy.tools.LammpsSession, optional
+        A persistent LAMMPS session to evaluate the system in.  If not given,
+        lammps_command is run with the cij.in script.
+    initialize : bool, optional
+        Only used with session.  If True (default), the session is reset and
+        the system is read in.  If False, the box of the system left in the
+        session by the previous call is changed to the box of system.
+    savecycles : bool, optional
+        If True (default), the LAMMPS data and log files are saved with the
+        cycle number in their names.  If False, only the files needed to run
+        LAMMPS are written.
     
     Returns
     -------
@@ -275,47 +306,68 @@ def calc_cij(lammps_command, system, potential,
     # Get lammps units
     lammps_units = lmp.style.unit(potential.units)
     
-    # Define lammps variables
-    lammps_variables = {}
-    system_info = system.dump('atom_data', f='init' + str(cycle) + '.dat',
-                              units=potential.units,
-                              atom_style=potential.atom_style)
-    lammps_variables['atomman_system_info'] = system_info
-    lammps_variables['atomman_pair_info'] = potential.pair_info(system.symbols)
-    lammps_variables['delta'] = strainrange
-    lammps_variables['steps'] = 2
-    
-    # Write lammps input script
-    template_file = Path(script_dir, 'cij.template')
-    lammps_script = 'cij.in'
-    with open(template_file) as f:
-        template = f.read()
-    with open(lammps_script, 'w') as f:
-        f.write(iprPy.tools.filltemplate(template, lammps_variables,
-                                         '<', '>'))
-    
-    # Run lammps
-    output = lmp.run(lammps_command, lammps_script, mpi_command=mpi_command,
-                     return_style='model')
-    shutil.move('log.lammps', 'cij-'+str(cycle)+'-log.lammps')
+    if session is not None:
+        if savecycles:
+            logfile = 'cij-' + str(cycle) + '-log.lammps'
+        else:
+            logfile = None
+        thermo = session_thermo(session, system, potential,
+                                strainrange=strainrange, steps=2,
+                                initialize=initialize, logfile=logfile)
+    
+    else:
+        # Define lammps variables
+        lammps_variables = {}
+        if savecycles:
+            datafile = 'init' + str(cycle) + '.dat'
+        else:
+            datafile = 'init.dat'
+        system_info = system.dump('atom_data', f=datafile,
+                                  units=potential.units,
+                                  atom_style=potential.atom_style)
+        lammps_variables['atomman_system_info'] = system_info
+        lammps_variables['atomman_pair_info'] = potential.pair_info(system.symbols)
+        lammps_variables['delta'] = strainrange
+        lammps_variables['steps'] = 2
+        
+        # Write lammps input script
+        template_file = Path(script_dir, 'cij.template')
+        lammps_script = 'cij.in'
+        with open(template_file) as f:
+            template = f.read()
+        with open(lammps_script, 'w') as f:
+            f.write(iprPy.tools.filltemplate(template, lammps_variables,
+                                             '<', '>'))
+        
+        # Run lammps
+        output = iprPy.tools.lammps_run(lammps_command, lammps_script,
+                                        mpi_command=mpi_command)
+        if savecycles:
+            shutil.move('log.lammps', 'cij-'+str(cycle)+'-log.lammps')
+        
+        # Each run 0 of the script is a separate simulation in the log
+        thermo = {}
+        for key in thermo_keys.values():
+            thermo[key] = np.concatenate([simulation['thermo'][key].values
+                                          for simulation in output.simulations])
     
     # Extract LAMMPS thermo data. Each term ranges i=0-12 where i=0 is undeformed
     # The remaining values are for -/+ strain pairs in the six unique directions
-    lx = uc.set_in_units(np.array(output.finds('Lx')), lammps_units['length'])
-    ly = uc.set_in_units(np.array(output.finds('Ly')), lammps_units['length'])
-    lz = uc.set_in_units(np.array(output.finds('Lz')), lammps_units['length'])
-    xy = uc.set_in_units(np.array(output.finds('Xy')), lammps_units['length'])
-    xz = uc.set_in_units(np.array(output.finds('Xz')), lammps_units['length'])
-    yz = uc.set_in_units(np.array(output.finds('Yz')), lammps_units['length'])
-    
-    pxx = uc.set_in_units(np.array(output.finds('Pxx')), lammps_units['pressure'])
-    pyy = uc.set_in_units(np.array(output.finds('Pyy')), lammps_units['pressure'])
-    pzz = uc.set_in_units(np.array(output.finds('Pzz')), lammps_units['pressure'])
-    pxy = uc.set_in_units(np.array(output.finds('Pxy')), lammps_units['pressure'])
-    pxz = uc.set_in_units(np.array(output.finds('Pxz')), lammps_units['pressure'])
-    pyz = uc.set_in_units(np.array(output.finds('Pyz')), lammps_units['pressure'])
-    
-    pe = uc.set_in_units(np.array(output.finds('PotEng')) / system.natoms,
+    lx = uc.set_in_units(thermo['Lx'], lammps_units['length'])
+    ly = uc.set_in_units(thermo['Ly'], lammps_units['length'])
+    lz = uc.set_in_units(thermo['Lz'], lammps_units['length'])
+    xy = uc.set_in_units(thermo['Xy'], lammps_units['length'])
+    xz = uc.set_in_units(thermo['Xz'], lammps_units['length'])
+    yz = uc.set_in_units(thermo['Yz'], lammps_units['length'])
+    
+    pxx = uc.set_in_units(thermo['Pxx'], lammps_units['pressure'])
+    pyy = uc.set_in_units(thermo['Pyy'], lammps_units['pressure'])
+    pzz = uc.set_in_units(thermo['Pzz'], lammps_units['pressure'])
+    pxy = uc.set_in_units(thermo['Pxy'], lammps_units['pressure'])
+    pxz = uc.set_in_units(thermo['Pxz'], lammps_units['pressure'])
+    pyz = uc.set_in_units(thermo['Pyz'], lammps_units['pressure'])
+    
+    pe = uc.set_in_units(thermo['PotEng'] / system.natoms,
                          lammps_units['energy'])
     
     # Set the six non-zero strain values
@@ -376,6 +428,106 @@ def calc_cij(lammps_command, system, potential,
     results_dict['measured_pyz'] = pyz[0]
     return results_dict
 
+def session_thermo(session, system, potential, strainrange=1e-6, steps=2,
+                   initialize=True, logfile=None):
+    """
+    Evaluates the same system states as the cij.template LAMMPS script within
+    a persistent LAMMPS session, and reads the thermo values of each state
+    directly from the session.
+    
+    Parameters
+    ----------
+    session : iprPy.tools.LammpsSession
+        The persistent LAMMPS session to use.
+    system : atomman.System
+        The system to evaluate.
+    potential : atomman.lammps.Potential
+        The LAMMPS implemented potential to use.
+    strainrange : float, optional
+        The small strain value to apply when calculating the elastic
+        constants (default is 1e-6).
+    steps : int, optional
+        The number of strains to evaluate in each direction (default is 2).
+    initialize : bool, optional
+        If True (default), the session is reset and the system is read in.
+        If False, the box of the system left in the session by the previous
+        call is changed to the box of system.
+    logfile : str, optional
+        If given, the LAMMPS output is appended to this log file.
+    
+    Returns
+    -------
+    dict
+        The thermo values of all states in LAMMPS units, keyed by the log
+        file headers.  The first state is undeformed, followed by the
+        strained states of the six unique directions.
+    """
+    if initialize:
+        system_info = system.dump('atom_data', f='init.dat',
+                                  units=potential.units,
+                                  atom_style=potential.atom_style)
+        script = '\n'.join(['box tilt large', system_info,
+                            'change_box all triclinic',
+                            potential.pair_info(system.symbols),
+                            'thermo_style custom step ' + ' '.join(thermo_keys),
+                            'thermo_modify format float %.13e'])
+        session.reset()
+    else:
+        # Remap the atoms to the new box
+        lammps_units = lmp.style.unit(potential.units)
+        lo = uc.get_in_units(system.box.origin, lammps_units['length'])
+        hi = lo + uc.get_in_units(np.array([system.box.lx, system.box.ly,
+                                            system.box.lz]),
+                                  lammps_units['length'])
+        xy = uc.get_in_units(system.box.xy, lammps_units['length'])
+        xz = uc.get_in_units(system.box.xz, lammps_units['length'])
+        yz = uc.get_in_units(system.box.yz, lammps_units['length'])
+        script = ' '.join(['change_box all',
+                           f'x final {lo[0]!r} {hi[0]!r}',
+                           f'y final {lo[1]!r} {hi[1]!r}',
+                           f'z final {lo[2]!r} {hi[2]!r}',
+                           f'xy final {xy!r} xz final {xz!r} yz final {yz!r}',
+                           'remap units box'])
+    
+    thermo = {}
+    for key in thermo_keys.values():
+        thermo[key] = []
+    library = session.lammps
+    
+    def state(script):
+        """Evaluates the system after running script"""
+        session.commands(script + '\nrun 0', logfile=logfile)
+        for keyword, key in thermo_keys.items():
+            thermo[key].append(library.get_thermo(keyword))
+    
+    # Compute properties for the initial configuration
+    state(script)
+    lx0 = thermo['Lx'][0]
+    ly0 = thermo['Ly'][0]
+    lz0 = thermo['Lz'][0]
+    
+    # Strains from -strainrange/2 to +strainrange/2
+    deltax = strainrange / (steps - 1)
+    strains = [-strainrange / 2. + i * deltax for i in range(steps)]
+    
+    # Compute properties for normal strains
+    for dim, l0 in zip(['x', 'y', 'z'], [lx0, ly0, lz0]):
+        for strain in strains:
+            state(f'change_box all {dim} final 0 {(1 + strain) * l0!r} remap units box')
+        session.commands(f'change_box all {dim} final 0 {l0!r} remap units box',
+                         logfile=logfile)
+    
+    # Compute properties for shear strains
+    for tilt, l0 in zip(['yz', 'xz', 'xy'], [lz0, lz0, ly0]):
+        for strain in strains:
+            state(f'change_box all {tilt} final {strain * l0!r} remap units box')
+        session.commands(f'change_box all {tilt} final 0 remap units box',
+                         logfile=logfile)
+    
+    for key in thermo:
+        thermo[key] = np.array(thermo[key])
+    return thermo
+
 def process_input(input_dict, UUID=None, build=True):
     """
     Processes str input parameters, assigns default values if needed, and
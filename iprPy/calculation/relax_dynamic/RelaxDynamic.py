@@ -69,6 +69,9 @@ class RelaxDynamic(Calculation):
             'runsteps',
             'equilsteps',
             'randomseed',
+            'chunksteps',
+            'energy_uncertainty',
+            'length_uncertainty',
         ]
         
         return self._buildtemplate(subsets, runkeys)
@@ -119,6 +122,9 @@ class RelaxDynamic(Calculation):
                 'runsteps',
                 'equilsteps',
                 'randomseed',
+                'chunksteps',
+                'energy_uncertainty',
+                'length_uncertainty',
             ],
         ]
                
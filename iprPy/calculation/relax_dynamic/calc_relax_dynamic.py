@@ -13,6 +13,9 @@ from copy import deepcopy
 # http://www.numpy.org/
 import numpy as np
 
+# https://pandas.pydata.org/
+import pandas as pd
+
 # https://github.com/usnistgov/DataModelDict 
 from DataModelDict import DataModelDict as DM
 
@@ -54,7 +57,10 @@ def main(*args):
                                  thermosteps = input_dict['thermosteps'],
                                  dumpsteps = input_dict['dumpsteps'],
                                  equilsteps = input_dict['equilsteps'],
-                                 randomseed = input_dict['randomseed'])
+                                 randomseed = input_dict['randomseed'],
+                                 chunksteps = input_dict['chunksteps'],
+                                 energy_uncertainty = input_dict['energy_uncertainty'],
+                                 length_uncertainty = input_dict['length_uncertainty'])
     
     # Save data model of results
     script = Path(__file__).stem
@@ -69,11 +75,18 @@ def relax_dynamic(lammps_command, system, potential, mpi_command=None,
                   p_xx=0.0, p_yy=0.0, p_zz=0.0, p_xy=0.0, p_xz=0.0, p_yz=0.0,
                   temperature=0.0, integrator=None, runsteps=220000,
                   thermosteps=100, dumpsteps=None, equilsteps=20000,
-                  randomseed=None):
+                  randomseed=None, chunksteps=0, energy_uncertainty=0.0,
+                  length_uncertainty=0.0, minsamples=20):
     """
     Performs a full dynamic relax on a given system at the given temperature
     to the specified pressure state.
     
+    If chunksteps is given, the simulation is integrated in chunks of that
+    many steps, each continuing from the restart file of the previous chunk.
+    After each chunk, the end of the equilibration is detected from the thermo
+    data, and the simulation stops early once the standard errors of the
+    mean cohesive energy and box lengths reach the requested uncertainties.
+    
     Parameters
     ----------
     lammps_command :str
@@ -119,6 +132,26 @@ def relax_dynamic(lammps_command, system, potential, mpi_command=None,
         Random number seed used by LAMMPS in creating velocities and with
         the Langevin thermostat.  (Default is None which will select a
         random int between 1 and 900000000.)
+    chunksteps : int, optional
+        If greater than 0, the simulation is integrated in chunks of this
+        many steps, up to a total of runsteps, and equilsteps is replaced by
+        the detected equilibration time.  Default value is 0, which
+        integrates runsteps in a single chunk.
+    energy_uncertainty : float, optional
+        Only used with chunksteps.  The simulation stops once the standard
+        error of the mean cohesive energy is no more than this.  Default
+        value is 0.0, which does not check the cohesive energy.
+    length_uncertainty : float, optional
+        Only used with chunksteps.  The simulation stops once the standard
+        errors of the mean box lengths relative to the box lengths are no
+        more than this.  Default value is 0.0, which does not check the box
+        lengths.  If neither uncertainty is given, the full runsteps are
+        integrated.
+    minsamples : int, optional
+        Only used with chunksteps.  The simulation does not stop before the
+        equilibrated thermo data contains at least this many effectively
+        uncorrelated samples, as the standard errors are not reliable with
+        fewer (default is 20).
     
     Returns
     -------
@@ -126,6 +159,11 @@ def relax_dynamic(lammps_command, system, potential, mpi_command=None,
         Dictionary of results consisting of keys:
         
         - **'relaxed_system'** (*float*) - The relaxed system.
+        - **'equilsteps'** (*int*) - The number of equilibration steps
+          excluded from the mean values, which is detected if chunksteps is
+          given.
+        - **'nsamples'** (*int*) - The number of thermo samples used for the
+          mean values.
         - **'E_coh'** (*float*) - The mean measured cohesive energy.
         - **'measured_pxx'** (*float*) - The measured x tensile pressure of the
           relaxed system.
@@ -156,6 +194,11 @@ def relax_dynamic(lammps_command, system, potential, mpi_command=None,
           measured yz shear pressure of the relaxed system.
         - **'temp_std'** (*float*) - The standard deviation in the measured
           temperature values.
+        - **'E_coh_err'** (*float*) - The standard error of the mean
+          cohesive energy, which accounts for the correlation between
+          samples.
+        - **'lx_err'**, **'ly_err'**, **'lz_err'** (*float*) - The standard
+          errors of the mean box lengths.
     """
     # Get script's location
     script_dir = Path(__file__).parent
@@ -164,11 +207,16 @@ def relax_dynamic(lammps_command, system, potential, mpi_command=None,
     lammps_units = lmp.style.unit(potential.units)
     
     #Get lammps version date
-    lammps_date = lmp.checkversion(lammps_command)['date']
+    lammps_date = iprPy.tools.lammps_checkversion(lammps_command, mpi_command)['date']
     
     # Handle default values
     if dumpsteps is None:
         dumpsteps = runsteps
+    if randomseed is None:
+        randomseed = random.randint(1, 900000000)
+    adaptive = chunksteps is not None and chunksteps > 0
+    if not adaptive:
+        chunksteps = runsteps
     
     # Define lammps variables
     lammps_variables = {}
@@ -187,6 +235,7 @@ def relax_dynamic(lammps_command, system, potential, mpi_command=None,
     lammps_variables['thermosteps'] = thermosteps
     lammps_variables['runsteps'] = runsteps
     lammps_variables['dumpsteps'] = dumpsteps
+    lammps_variables['chunk_info'] = ''
     
     # Set compute stress/atom based on LAMMPS version
     if lammps_date < datetime.date(2014, 2, 12):
@@ -212,20 +261,89 @@ def relax_dynamic(lammps_command, system, potential, mpi_command=None,
     else:
         lammps_variables['dump_modify_format'] = 'float %.13e'
     
-    # Write lammps input script
+    # Read template
     template_file = Path(script_dir, 'full_relax.template')
     lammps_script = 'full_relax.in'
     with open(template_file) as f:
         template = f.read()
-    with open(lammps_script, 'w') as f:
-        f.write(iprPy.tools.filltemplate(template, lammps_variables, '<', '>'))
     
-    # Run lammps 
-    output = lmp.run(lammps_command, lammps_script, mpi_command)
+    # Convert the requested uncertainties to lammps units
+    energy_tol = uc.get_in_units(energy_uncertainty, lammps_units['energy'])
+    natoms = system.natoms
+    
+    # Integrate the simulation in chunks until runsteps or converged
+    restart_file = 'relax_dynamic.restart'
+    chunk_thermos = []
+    step = 0
+    chunk = 0
+    while True:
+        endstep = min(step + chunksteps, runsteps)
+        lammps_variables['runsteps'] = endstep
+        
+        # Continue from the previous chunk's restart file
+        if chunk > 0:
+            lammps_variables['atomman_system_info'] = 'read_restart ' + restart_file
+            lammps_variables['integrator_info'] = integrator_info(
+                integrator=integrator, p_xx=p_xx, p_yy=p_yy, p_zz=p_zz,
+                p_xy=p_xy, p_xz=p_xz, p_yz=p_yz, temperature=temperature,
+                randomseed=randomseed+chunk, units=potential.units,
+                create_velocities=False)
+        
+        # Save the restart file and final configuration of unfinished runs
+        if endstep < runsteps:
+            lammps_variables['chunk_info'] = '\n'.join([
+                'write_restart ' + restart_file,
+                'run 0',
+                ' '.join(['write_dump all custom *.dump',
+                          lammps_variables['dump_keys'], 'modify format',
+                          lammps_variables['dump_modify_format']])])
+        else:
+            lammps_variables['chunk_info'] = ''
+        
+        # Write lammps input script
+        with open(lammps_script, 'w') as f:
+            f.write(iprPy.tools.filltemplate(template, lammps_variables, '<', '>'))
+        
+        # Run lammps
+        if endstep == runsteps and chunk == 0:
+            output = iprPy.tools.lammps_run(lammps_command, lammps_script,
+                                            mpi_command)
+        else:
+            output = iprPy.tools.lammps_run(lammps_command, lammps_script,
+                                            mpi_command,
+                                            logfile='log-' + str(chunk) + '.lammps')
+        
+        # Collect thermo data, skipping the repeated first step of continued chunks
+        chunk_thermo = output.simulations[0]['thermo']
+        if chunk > 0:
+            chunk_thermo = chunk_thermo[chunk_thermo.Step > step]
+        chunk_thermos.append(chunk_thermo)
+        
+        # Remove the previous chunk's configuration if not a dumpsteps step
+        if chunk > 0 and step % dumpsteps != 0:
+            Path(str(step) + '.dump').unlink(missing_ok=True)
+        step = endstep
+        chunk += 1
+        if step >= runsteps:
+            break
+        
+        # Stop if the requested uncertainties have been reached
+        if energy_tol > 0.0 or length_uncertainty > 0.0:
+            thermo = pd.concat(chunk_thermos, ignore_index=True)
+            equilsteps, errors, neff = thermo_errors(thermo, natoms)
+            lengths = thermo[thermo.Step >= equilsteps][['Lx', 'Ly', 'Lz']].mean()
+            if (neff >= minsamples
+                and (energy_tol <= 0.0 or errors['E_coh'] <= energy_tol)
+                and (length_uncertainty <= 0.0
+                     or all(errors[key] <= length_uncertainty * abs(lengths[key])
+                            for key in lengths.index))):
+                break
+    
+    Path(restart_file).unlink(missing_ok=True)
     
     # Extract LAMMPS thermo data. 
     results = {}
-    thermo = output.simulations[0]['thermo']
+    thermo = pd.concat(chunk_thermos, ignore_index=True)
     
     results['dumpfile_initial'] = '0.dump'
     results['symbols_initial'] = system.symbols
@@ -236,21 +354,32 @@ def relax_dynamic(lammps_command, system, potential, mpi_command=None,
     system = am.load('atom_dump', last_dump_file, symbols=system.symbols)
     results['symbols_final'] = system.symbols
     
+    # Detect the equilibration time of chunked runs
+    if adaptive:
+        equilsteps, errors, neff = thermo_errors(thermo, natoms)
+    else:
+        equilsteps, errors, neff = thermo_errors(thermo, natoms,
+                                                 equilsteps=equilsteps)
+    
     # Only consider values where Step >= equilsteps
     thermo = thermo[thermo.Step >= equilsteps]
+    results['equilsteps'] = equilsteps
     results['nsamples'] = len(thermo)
     
     # Get cohesive energy estimates
-    natoms = system.natoms
     results['E_coh'] = uc.set_in_units(thermo.PotEng.mean() / natoms, lammps_units['energy'])
     results['E_coh_std'] = uc.set_in_units(thermo.PotEng.std() / natoms, lammps_units['energy'])
+    results['E_coh_err'] = uc.set_in_units(errors['E_coh'], lammps_units['energy'])
     
     results['lx'] = uc.set_in_units(thermo.Lx.mean(), lammps_units['length'])
     results['lx_std'] = uc.set_in_units(thermo.Lx.std(), lammps_units['length'])
+    results['lx_err'] = uc.set_in_units(errors['Lx'], lammps_units['length'])
     results['ly'] = uc.set_in_units(thermo.Ly.mean(), lammps_units['length'])
     results['ly_std'] = uc.set_in_units(thermo.Ly.std(), lammps_units['length'])
+    results['ly_err'] = uc.set_in_units(errors['Ly'], lammps_units['length'])
     results['lz'] = uc.set_in_units(thermo.Lz.mean(), lammps_units['length'])
     results['lz_std'] = uc.set_in_units(thermo.Lz.std(), lammps_units['length'])
+    results['lz_err'] = uc.set_in_units(errors['Lz'], lammps_units['length'])
     results['xy'] = uc.set_in_units(thermo.Xy.mean(), lammps_units['length'])
     results['xy_std'] = uc.set_in_units(thermo.Xy.std(), lammps_units['length'])
     results['xz'] = uc.set_in_units(thermo.Xz.mean(), lammps_units['length'])
@@ -275,9 +404,60 @@ def relax_dynamic(lammps_command, system, potential, mpi_command=None,
     
     return results
 
+def thermo_errors(thermo, natoms, equilsteps=None):
+    """
+    Estimates the standard errors of the mean cohesive energy and box
+    lengths from correlated thermo data.
+    
+    Parameters
+    ----------
+    thermo : pandas.DataFrame
+        The thermo data, with Step, PotEng, Lx, Ly and Lz columns.
+    natoms : int
+        The number of atoms in the system.
+    equilsteps : int, optional
+        The number of equilibration steps to exclude.  If not given, the end
+        of the equilibration is detected as the latest of the detected
+        equilibration times of the cohesive energy and box lengths.
+    
+    Returns
+    -------
+    equilsteps : int
+        The number of equilibration steps excluded.
+    errors : dict
+        The standard errors of the means of the 'E_coh', 'Lx', 'Ly' and 'Lz'
+        values, in the thermo data's units.
+    neff : float
+        The smallest number of effectively uncorrelated samples of the values.
+    """
+    values = {}
+    values['E_coh'] = thermo.PotEng.values / natoms
+    values['Lx'] = thermo.Lx.values
+    values['Ly'] = thermo.Ly.values
+    values['Lz'] = thermo.Lz.values
+    
+    # Detect the equilibration time
+    if equilsteps is None:
+        nskip = max(1, len(thermo) // 100)
+        start = 0
+        for key in values:
+            start = max(start, iprPy.tools.detect_equilibration(values[key], nskip=nskip)[0])
+        equilsteps = int(thermo.Step.values[start])
+    
+    # Estimate the standard errors of the equilibrated values
+    samples = thermo.Step.values >= equilsteps
+    errors = {}
+    neff = np.inf
+    for key in values:
+        g = iprPy.tools.statistical_inefficiency(values[key][samples])
+        errors[key] = iprPy.tools.standard_error(values[key][samples], g=g)
+        neff = min(neff, samples.sum() / g)
+    
+    return equilsteps, errors, neff
+
 def integrator_info(integrator=None, p_xx=0.0, p_yy=0.0, p_zz=0.0, p_xy=0.0,
                     p_xz=0.0, p_yz=0.0, temperature=0.0, randomseed=None,
-                    units='metal'):
+                    units='metal', create_velocities=True):
     """
     Generates LAMMPS commands for velocity creation and fix integrators. 
     
@@ -314,6 +494,10 @@ def integrator_info(integrator=None, p_xx=0.0, p_yy=0.0, p_zz=0.0, p_xy=0.0,
         random int between 1 and 900000000.)
     units : str, optional
         The LAMMPS units style to use (default is 'metal').
+    create_velocities : bool, optional
+        If True (default), the velocity create command is included for the
+        integrators that use it.  False is used when continuing a simulation
+        from a restart file, which retains the atomic velocities.
     
     Returns
     -------
@@ -408,6 +592,10 @@ def integrator_info(integrator=None, p_xx=0.0, p_yy=0.0, p_zz=0.0, p_xy=0.0,
     else:
         raise ValueError('Invalid integrator style')
     
+    if not create_velocities:
+        int_info = '\n'.join([line for line in int_info.split('\n')
+                              if not line.startswith('velocity')])
+    
     return int_info
 
 def process_input(input_dict, UUID=None, build=True):
@@ -456,11 +644,16 @@ def process_input(input_dict, UUID=None, build=True):
         raise ValueError('runsteps must be greater than equilsteps')
     input_dict['randomseed'] = int(input_dict.get('randomseed',
                                       random.randint(1, 900000000)))
+    input_dict['chunksteps'] = int(input_dict.get('chunksteps', 0))
     
     # These are calculation-specific default unitless floats
     input_dict['temperature'] = float(input_dict.get('temperature', 0.0))
+    input_dict['length_uncertainty'] = float(input_dict.get('length_uncertainty', 0.0))
     
     # These are calculation-specific default floats with units
+    input_dict['energy_uncertainty'] = iprPy.input.value(input_dict, 'energy_uncertainty',
+                                    default_unit=input_dict['energy_unit'],
+                                    default_term='0.0 eV')
     input_dict['pressure_xx'] = iprPy.input.value(input_dict, 'pressure_xx',
                                     default_unit=input_dict['pressure_unit'],
                                     default_term='0.0 GPa')
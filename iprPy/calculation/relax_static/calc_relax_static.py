@@ -71,10 +71,11 @@ def relax_static(lammps_command, system, potential, mpi_command=None,
                  p_xx=0.0, p_yy=0.0, p_zz=0.0, p_xy=0.0, p_xz=0.0, p_yz=0.0,
                  dispmult=0.0, etol=0.0, ftol=0.0,  maxiter=10000,
                  maxeval=100000, dmax=uc.set_in_units(0.01, 'angstrom'),
-                 maxcycles=100, ctol=1e-10):
+                 maxcycles=100, ctol=1e-10, savecycles=False):
     """
     Repeatedly runs the ELASTIC example distributed with LAMMPS until box
-    dimensions converge within a tolerance.
+    dimensions converge within a tolerance.  All cycles are run by a loop
+    within a single LAMMPS simulation.
     
     Parameters
     ----------
@@ -132,6 +133,10 @@ def relax_static(lammps_command, system, potential, mpi_command=None,
     ctol : float, optional
         The relative tolerance used to determine if the lattice constants have
         converged (default is 1e-10).
+    savecycles : bool, optional
+        If True, the relaxed system of each cycle is saved to a
+        relax_static-<cycle>.dump file.  If False (default), only the final
+        relaxed system is saved.
     
     Returns
     -------
@@ -160,7 +165,7 @@ def relax_static(lammps_command, system, potential, mpi_command=None,
     lammps_units = lmp.style.unit(potential.units)
     
     # Get lammps version date
-    lammps_date = lmp.checkversion(lammps_command)['date']
+    lammps_date = iprPy.tools.lammps_checkversion(lammps_command, mpi_command)['date']
     
     # Save initial configuration as a dump file
     system.dump('atom_dump', f='initial.dump')
@@ -168,80 +173,76 @@ def relax_static(lammps_command, system, potential, mpi_command=None,
     # Apply small random distortions to atoms
     system.atoms.pos += dispmult * np.random.rand(*system.atoms.pos.shape) - dispmult / 2
     
-    # Initialize parameters
-    old_vects = system.box.vects
-    converged = False
+    # Define lammps variables
+    lammps_variables = {}
+    system_info = system.dump('atom_data', f='init.dat',
+                              units=potential.units,
+                              atom_style=potential.atom_style)
+    lammps_variables['atomman_system_info'] = system_info
+    lammps_variables['atomman_pair_info'] = potential.pair_info(system.symbols)
+    lammps_variables['p_xx'] = uc.get_in_units(p_xx, lammps_units['pressure'])
+    lammps_variables['p_yy'] = uc.get_in_units(p_yy, lammps_units['pressure'])
+    lammps_variables['p_zz'] = uc.get_in_units(p_zz, lammps_units['pressure'])
+    lammps_variables['p_xy'] = uc.get_in_units(p_xy, lammps_units['pressure'])
+    lammps_variables['p_xz'] = uc.get_in_units(p_xz, lammps_units['pressure'])
+    lammps_variables['p_yz'] = uc.get_in_units(p_yz, lammps_units['pressure'])
+    lammps_variables['etol'] = etol
+    lammps_variables['ftol'] = uc.get_in_units(ftol, lammps_units['force'])
+    lammps_variables['maxiter'] = maxiter
+    lammps_variables['maxeval'] = maxeval
+    lammps_variables['dmax'] = uc.get_in_units(dmax, lammps_units['length'])
+    lammps_variables['maxcycles'] = maxcycles
+    lammps_variables['ctol'] = ctol
     
-    # Run minimizations up to maxcycles times
-    for cycle in range(maxcycles):
-        
-        # Define lammps variables
-        lammps_variables = {}
-        system_info = system.dump('atom_data', f='init.dat',
-                                  units=potential.units,
-                                  atom_style=potential.atom_style)
-        lammps_variables['atomman_system_info'] = system_info
-        lammps_variables['atomman_pair_info'] = potential.pair_info(system.symbols)
-        lammps_variables['p_xx'] = uc.get_in_units(p_xx, lammps_units['pressure'])
-        lammps_variables['p_yy'] = uc.get_in_units(p_yy, lammps_units['pressure'])
-        lammps_variables['p_zz'] = uc.get_in_units(p_zz, lammps_units['pressure'])
-        lammps_variables['p_xy'] = uc.get_in_units(p_xy, lammps_units['pressure'])
-        lammps_variables['p_xz'] = uc.get_in_units(p_xz, lammps_units['pressure'])
-        lammps_variables['p_yz'] = uc.get_in_units(p_yz, lammps_units['pressure'])
-        lammps_variables['etol'] = etol
-        lammps_variables['ftol'] = uc.get_in_units(ftol, lammps_units['force'])
-        lammps_variables['maxiter'] = maxiter
-        lammps_variables['maxeval'] = maxeval
-        lammps_variables['dmax'] = uc.get_in_units(dmax, lammps_units['length'])
-        
-        # Set dump_keys based on atom_style
+    # Set dump_keys based on atom_style
+    if potential.atom_style in ['charge']:
+        lammps_variables['dump_keys'] = 'id type q x y z c_peatom'
+    else:
+        lammps_variables['dump_keys'] = 'id type x y z c_peatom'
+    
+    # Set dump_modify_format based on lammps_date
+    if lammps_date < datetime.date(2016, 8, 3):
         if potential.atom_style in ['charge']:
-            lammps_variables['dump_keys'] = 'id type q x y z c_peatom'
-        else:
-            lammps_variables['dump_keys'] = 'id type x y z c_peatom'
-        
-        # Set dump_modify_format based on lammps_date
-        if lammps_date < datetime.date(2016, 8, 3):
-            if potential.atom_style in ['charge']:
-                lammps_variables['dump_modify_format'] = '"%d %d %.13e %.13e %.13e %.13e %.13e"'
-            else:
-                lammps_variables['dump_modify_format'] = '"%d %d %.13e %.13e %.13e %.13e"'
-        else:
-            lammps_variables['dump_modify_format'] = 'float %.13e'
-        
-        # Write lammps input script
-        template_file = Path(script_dir, 'minbox.template')
-        lammps_script = 'minbox.in'
-        with open(template_file) as f:
-            template = f.read()
-        with open(lammps_script, 'w') as f:
-            f.write(iprPy.tools.filltemplate(template, lammps_variables, '<', '>'))
-        
-        # Run LAMMPS and extract thermo data
-        logfile = 'log-' + str(cycle) + '.lammps'
-        output = lmp.run(lammps_command, lammps_script, mpi_command, logfile=logfile)
-        thermo = output.simulations[0]['thermo']
-        
-        # Clean up dump files
-        Path('0.dump').unlink()
-        last_dump_file = str(thermo.Step.values[-1]) + '.dump'
-        renamed_dump_file = 'relax_static-' + str(cycle) + '.dump'
-        shutil.move(last_dump_file, renamed_dump_file)
-        
-        # Load relaxed system
-        system = am.load('atom_dump', renamed_dump_file, symbols=system.symbols)
-        
-        # Test if box dimensions have converged
-        if np.allclose(old_vects, system.box.vects, rtol=ctol, atol=0):
-            converged = True
-            break
+            lammps_variables['dump_modify_format'] = '"%d %d %.13e %.13e %.13e %.13e %.13e"'
         else:
-            old_vects = system.box.vects
+            lammps_variables['dump_modify_format'] = '"%d %d %.13e %.13e %.13e %.13e"'
+    else:
+        lammps_variables['dump_modify_format'] = 'float %.13e'
     
-    # Check for convergence
-    if converged is False:
+    # Only dump the system of each cycle if requested
+    if savecycles:
+        lammps_variables['cycle_dump'] = ' '.join([
+            'write_dump all custom relax_static-$(v_cycle-1).dump',
+            lammps_variables['dump_keys'], 'modify format',
+            lammps_variables['dump_modify_format']])
+    else:
+        lammps_variables['cycle_dump'] = ''
+    
+    # Write lammps input script
+    template_file = Path(script_dir, 'minbox.template')
+    lammps_script = 'minbox.in'
+    with open(template_file) as f:
+        template = f.read()
+    with open(lammps_script, 'w') as f:
+        f.write(iprPy.tools.filltemplate(template, lammps_variables, '<', '>'))
+    
+    # Run LAMMPS, which cycles until converged or maxcycles is reached
+    final_dump_file = Path('relax_static.dump')
+    if final_dump_file.is_file():
+        final_dump_file.unlink()
+    output = iprPy.tools.lammps_run(lammps_command, lammps_script, mpi_command)
+    
+    # Check for convergence, as the final system is only dumped if converged
+    if not final_dump_file.is_file():
         raise RuntimeError('Failed to converge after ' + str(maxcycles) + ' cycles')
     
+    # Extract thermo data of the last cycle and load the relaxed system
+    cycle = len(output.simulations) - 1
+    thermo = output.simulations[cycle]['thermo']
+    renamed_dump_file = 'relax_static-' + str(cycle) + '.dump'
+    shutil.move(final_dump_file, renamed_dump_file)
+    system = am.load('atom_dump', renamed_dump_file, symbols=system.symbols)
+    
     # Zero out near-zero tilt factors
     lx = system.box.lx
     ly = system.box.ly
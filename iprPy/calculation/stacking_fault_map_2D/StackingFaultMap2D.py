@@ -60,6 +60,8 @@ class StackingFaultMap2D(Calculation):
         runkeys = [
             'stackingfault_numshifts1', 
             'stackingfault_numshifts2', 
+            'processes',
+            'usesymmetry',
         ]
         
         return self._buildtemplate(subsets, runkeys)
@@ -76,7 +78,10 @@ class StackingFaultMap2D(Calculation):
         keys = (
             subset('lammps_commands').keyset 
             + subset('units').keyset
-            + []
+            + [
+                'processes',
+                'usesymmetry',
+            ]
         )
         
         # Join and return
@@ -5,10 +5,12 @@
 # Standard library imports
 from pathlib import Path
 import sys
+import json
 import uuid
 import shutil
 import datetime
 from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 
 # http://www.numpy.org/
 import numpy as np 
@@ -27,6 +29,9 @@ import iprPy
 # Define record_style
 record_style = 'calculation_stacking_fault_map_2D'
 
+# Marker file written in the directory of each completed shift relaxation
+completedfile = 'completed.json'
+
 def main(*args):
     """Main function called when script is executed directly."""
     
@@ -53,7 +58,9 @@ def main(*args):
                                      ftol = input_dict['forcetolerance'],
                                      maxiter = input_dict['maxiterations'],
                                      maxeval = input_dict['maxevaluations'],
-                                     dmax = input_dict['maxatommotion'])
+                                     dmax = input_dict['maxatommotion'],
+                                     processes = input_dict['processes'],
+                                     usesymmetry = input_dict['usesymmetry'])
 
     # Save data model of results
     script = Path(__file__).stem
@@ -157,7 +164,7 @@ def stackingfaultrelax(lammps_command, system, potential,
     
     #Get lammps version date
     if lammps_date is None:
-        lammps_date = lmp.checkversion(lammps_command)['date']
+        lammps_date = iprPy.tools.lammps_checkversion(lammps_command, mpi_command)['date']
     
     # Define lammps variables
     lammps_variables = {}
@@ -191,8 +198,38 @@ def stackingfaultrelax(lammps_command, system, potential,
                                          '<', '>'))
     
     # Run LAMMPS
-    output = lmp.run(lammps_command, lammps_script.as_posix(), mpi_command,
-                     logfile=Path(sim_directory, 'log.lammps').as_posix())
+    output = iprPy.tools.lammps_run(lammps_command, lammps_script.as_posix(),
+                                    mpi_command, logfile=Path(sim_directory, 'log.lammps').as_posix())
+    
+    return stackingfaultrelaxresults(output, system.symbols, potential,
+                                     sim_directory=sim_directory)
+
+def stackingfaultrelaxresults(output, symbols, potential, sim_directory=None):
+    """
+    Extracts the results of a stacking fault relaxation simulation.
+    
+    Parameters
+    ----------
+    output : atomman.lammps.Log
+        The LAMMPS log output of the relaxation.
+    symbols : list
+        The potential symbols associated with the system's atom types.
+    potential : atomman.lammps.Potential
+        The LAMMPS implemented potential that was used.
+    sim_directory : str, optional
+        The path to the directory the simulation was performed in.  If not
+        given, will use the current working directory.
+    
+    Returns
+    -------
+    dict
+        Dictionary of results with the same keys as stackingfaultrelax.
+    """
+    if sim_directory is None:
+        sim_directory = ''
+    
+    # Get lammps units
+    lammps_units = lmp.style.unit(potential.units)
     
     # Extract output values
     thermo = output.simulations[-1]['thermo']
@@ -202,7 +239,7 @@ def stackingfaultrelax(lammps_command, system, potential,
                               lammps_units['energy'])
     
     # Load relaxed system
-    system = am.load('atom_dump', dumpfile, symbols=system.symbols)
+    system = am.load('atom_dump', dumpfile, symbols=symbols)
     
     # Return results
     results_dict = {}
@@ -213,16 +250,190 @@ def stackingfaultrelax(lammps_command, system, potential,
     
     return results_dict
 
+def completedstackingfaultrelax(sim_directory, symbols, potential):
+    """
+    Checks if a stacking fault relaxation simulation has already been
+    completed in a directory, allowing for interrupted maps to be resumed.
+    A relaxation is completed if the directory contains the marker file
+    written by markstackingfaultrelax and the final dump file it names.
+    
+    Parameters
+    ----------
+    sim_directory : str
+        The path to the directory to check.
+    symbols : list
+        The potential symbols associated with the system's atom types.
+    potential : atomman.lammps.Potential
+        The LAMMPS implemented potential that was used.
+    
+    Returns
+    -------
+    dict or None
+        The results of the simulation as returned by stackingfaultrelax, or
+        None if no finished simulation was found.
+    """
+    try:
+        with open(Path(sim_directory, completedfile)) as f:
+            completed = json.load(f)
+        dumpfile = Path(sim_directory, completed['dumpfile'])
+        system = am.load('atom_dump', dumpfile.as_posix(), symbols=symbols)
+        E_total = float(completed['E_total'])
+    except Exception:
+        return None
+    
+    results_dict = {}
+    results_dict['logfile'] = Path(sim_directory, 'log.lammps').as_posix()
+    results_dict['dumpfile'] = dumpfile.as_posix()
+    results_dict['system'] = system
+    results_dict['E_total'] = E_total
+    
+    return results_dict
+
+def markstackingfaultrelax(sim_directory, relax):
+    """
+    Writes the marker file that identifies a stacking fault relaxation
+    simulation as completed.  The marker names the final dump file and
+    stores the final total energy.  It is written only after the results
+    have been extracted, and by renaming a temporary file so that it is
+    never partially written.
+    
+    Parameters
+    ----------
+    sim_directory : str
+        The path to the directory the simulation was performed in.
+    relax : dict
+        The results of the simulation as returned by stackingfaultrelax.
+    """
+    completed = {}
+    completed['dumpfile'] = Path(relax['dumpfile']).name
+    completed['E_total'] = relax['E_total']
+    
+    tmpfile = Path(sim_directory, completedfile + '.tmp')
+    with open(tmpfile, 'w') as f:
+        json.dump(completed, f)
+    tmpfile.replace(Path(sim_directory, completedfile))
+
+def uniqueshifts(ucell, a1vect, a2vect, normal, a1vals, a2vals,
+                 num_a1, num_a2, symprec=1e-5):
+    """
+    Identifies which of the shifts of a stacking fault map are equivalent
+    according to the symmetry operations of the crystal that leave the fault
+    plane orientation unchanged and map the fault plane onto a plane that
+    is equivalent by a lattice translation.
+    
+    Parameters
+    ----------
+    ucell : atomman.System
+        The crystal's unit cell.
+    a1vect : numpy.ndarray
+        The a1 shift vector as a Cartesian vector relative to ucell.
+    a2vect : numpy.ndarray
+        The a2 shift vector as a Cartesian vector relative to ucell.
+    normal : numpy.ndarray
+        The fault plane's unit normal as a Cartesian vector relative to ucell.
+    a1vals : list of float
+        The fractional a1 coordinates of the shifts.
+    a2vals : list of float
+        The fractional a2 coordinates of the shifts.
+    num_a1 : int
+        The number of fractional coordinates along a1vect.
+    num_a2 : int
+        The number of fractional coordinates along a2vect.
+    symprec : float, optional
+        The tolerance in length units to use for identifying symmetry
+        operations (Default is 1e-5).
+    
+    Returns
+    -------
+    numpy.ndarray of int
+        The index of the representative shift for each shift.  Shifts that
+        are symmetry equivalent share the same representative, which is the
+        lowest index in the set.
+    
+    Raises
+    ------
+    ValueError
+        If a1vect or a2vect is not a lattice vector of ucell.
+    """
+    # https://atztogo.github.io/spglib/python-spglib.html
+    import spglib
+    
+    # Get the symmetry operations of the crystal
+    symmetry = spglib.get_symmetry(ucell.dump('spglib_cell'), symprec=symprec)
+    tocart = ucell.box.vects.T
+    tofrac = np.linalg.inv(tocart)
+    
+    # Get the lattice translations within the cell
+    identity = np.all(symmetry['rotations'] == np.identity(3, dtype=int), axis=(1,2))
+    translations = symmetry['translations'][identity]
+    
+    # Check that the shift vectors are lattice translations
+    for vect in [a1vect, a2vect]:
+        delta = translations - tofrac.dot(vect)
+        delta -= np.round(delta)
+        if not np.any(np.linalg.norm(delta.dot(tocart.T), axis=1) < symprec):
+            raise ValueError('usesymmetry requires a1vect and a2vect to be lattice vectors')
+    
+    # Find the spacing between planes related by lattice translations
+    m = np.arange(-6, 7)
+    cells = np.array(np.meshgrid(m, m, m)).reshape(3, -1).T
+    lattice = (cells[:, np.newaxis, :] + translations[np.newaxis, :, :]).reshape(-1, 3)
+    heights = np.abs(tocart.dot(lattice.T).T.dot(normal))
+    spacing = heights[heights > symprec].min()
+    
+    # Find Cartesian rotations that keep the fault plane orientation and
+    # move the fault plane by a multiple of the spacing
+    rotations = []
+    for rotation, translation in zip(symmetry['rotations'], symmetry['translations']):
+        rotation = tocart.dot(rotation).dot(tofrac)
+        height = tocart.dot(translation).dot(normal) / spacing
+        if (np.allclose(rotation.dot(normal), normal)
+            and abs(height - np.rint(height)) * spacing < symprec):
+            if not np.any([np.allclose(rotation, r) for r in rotations]):
+                rotations.append(rotation)
+    
+    # Map grid coordinates to shift indices
+    basis = np.array([a1vect, a2vect]).T
+    nums = np.array([num_a1, num_a2])
+    grid = np.rint(np.array([a1vals, a2vals]).T * nums).astype(int) % nums
+    indices = {tuple(point): i for i, point in enumerate(grid)}
+    
+    # Join each shift with the shifts it maps to
+    representative = np.arange(len(grid))
+    def find(i):
+        while representative[i] != i:
+            i = representative[i]
+        return i
+    for i, point in enumerate(grid):
+        shift = basis.dot(point / nums)
+        for rotation in rotations:
+            newshift = rotation.dot(shift)
+            coeffs = np.linalg.lstsq(basis, newshift, rcond=None)[0]
+            if not np.allclose(basis.dot(coeffs), newshift, atol=symprec):
+                continue
+            newpoint = coeffs * nums
+            if not np.allclose(newpoint, np.rint(newpoint), atol=1e-6):
+                continue
+            j = indices.get(tuple(np.rint(newpoint).astype(int) % nums))
+            if j is not None:
+                ri = find(i)
+                rj = find(j)
+                representative[max(ri, rj)] = min(ri, rj)
+    
+    return np.array([find(i) for i in range(len(grid))])
+
 def stackingfaultmap(lammps_command, system, potential, 
                      mpi_command=None,
                      a1vect=None, a2vect=None, ucell=None,
                      transform=None, cutboxvector=None,
                      faultposrel=0.5, num_a1=10, num_a2=10, 
                      etol=0.0, ftol=0.0, maxiter=10000, maxeval=100000,
-                     dmax=uc.set_in_units(0.01, 'angstrom')):
+                     dmax=uc.set_in_units(0.01, 'angstrom'),
+                     processes=1, usesymmetry=False):
     """
     Computes a generalized stacking fault map for shifts along a regular 2D
-    grid.
+    grid.  Each shift is relaxed in its own subdirectory, and shifts whose
+    subdirectories contain a finished relaxation are not rerun.
     
     Parameters
     ----------
@@ -281,6 +492,16 @@ def stackingfaultmap(lammps_command, system, potential,
         The maximum distance in length units that any atom is allowed to relax
         in any direction during a single minimization iteration (default is
         0.01 Angstroms).
+    processes : int, optional
+        The number of shifts to relax at the same time.  Each relaxation
+        uses its own LAMMPS run with mpi_command, so the total number of
+        cores used is processes times the number of MPI ranks in
+        mpi_command (default is 1).
+    usesymmetry : bool, optional
+        If True, only one shift of each set of shifts that are equivalent
+        according to the symmetry of the system is relaxed, and its results
+        are used for the whole set.  Requires a1vect and a2vect to be lattice
+        vectors (default is False).
     
     Returns
     -------
@@ -300,37 +521,73 @@ def stackingfaultmap(lammps_command, system, potential,
     A_fault = gsf_gen.faultarea
 
     # Identify lammps_date version
-    lammps_date = lmp.checkversion(lammps_command)['date']
+    lammps_date = iprPy.tools.lammps_checkversion(lammps_command, mpi_command)['date']
     
-    # Define lists
+    # Define lists of shifts
     a1vals = []
     a2vals = []
-    E_totals = []
-    disps = []
-
-    # Loop over all shift combinations
     for a1, a2, sfsystem in gsf_gen.iterfaultmap(num_a1=num_a1, num_a2=num_a2):
         a1vals.append(a1)
         a2vals.append(a2)
-
-        # Evaluate the system at the shift
-        sim_directory = Path('a%.10f-b%.10f' % (a1, a2))
-        relax = stackingfaultrelax(lammps_command, sfsystem, potential,
-                                   mpi_command=mpi_command, 
-                                   sim_directory=sim_directory,
-                                   cutboxvector=cutboxvector,
-                                   etol=etol,
-                                   ftol=ftol,
-                                   maxiter=maxiter,
-                                   maxeval=maxeval,
-                                   dmax=dmax,
-                                   lammps_date=lammps_date)
+    
+    # Identify the shifts to relax
+    if usesymmetry:
+        # Express shift vectors and plane normal relative to ucell
+        if transform is None:
+            toucell = np.identity(3)
+        else:
+            toucell = np.asarray(transform).T
+        normal = np.zeros(3)
+        normal[cutindex] = 1.0
+        representatives = uniqueshifts(ucell, toucell.dot(gsf_gen.a1vectcart),
+                                       toucell.dot(gsf_gen.a2vectcart),
+                                       toucell.dot(normal), a1vals, a2vals,
+                                       num_a1, num_a2)
+    else:
+        representatives = np.arange(len(a1vals))
+    
+    def evaluate(i):
+        """Relaxes shift i, or loads the results of a previous relaxation"""
+        sim_directory = Path('a%.10f-b%.10f' % (a1vals[i], a2vals[i]))
+        relax = completedstackingfaultrelax(sim_directory, system.symbols,
+                                            potential)
+        if relax is None:
+            sfsystem = gsf_gen.fault(a1=a1vals[i], a2=a2vals[i])
+            relax = stackingfaultrelax(lammps_command, sfsystem, potential,
+                                       mpi_command=mpi_command, 
+                                       sim_directory=sim_directory,
+                                       cutboxvector=cutboxvector,
+                                       etol=etol,
+                                       ftol=ftol,
+                                       maxiter=maxiter,
+                                       maxeval=maxeval,
+                                       dmax=dmax,
+                                       lammps_date=lammps_date)
+            markstackingfaultrelax(sim_directory, relax)
         
         # Extract terms
-        E_totals.append(relax['E_total'])
         pos = relax['system'].atoms.pos
-        disps.append(pos[abovefault, cutindex].mean()
-                   - pos[~abovefault, cutindex].mean())
+        disp = (pos[abovefault, cutindex].mean()
+              - pos[~abovefault, cutindex].mean())
+        return relax['E_total'], disp
+    
+    # Evaluate the unique shifts
+    unique = sorted(set(representatives))
+    if processes > 1:
+        # Threads are sufficient as the relaxations run as LAMMPS subprocesses.
+        # Each runs with the full mpi_command, using processes times its
+        # MPI ranks cores in total.
+        with ThreadPoolExecutor(max_workers=processes) as executor:
+            results = dict(zip(unique, executor.map(evaluate, unique)))
+    else:
+        results = {i: evaluate(i) for i in unique}
+    
+    # Collect results for all shifts
+    E_totals = []
+    disps = []
+    for i in representatives:
+        E_totals.append(results[i][0])
+        disps.append(results[i][1])
     
     E_totals = np.array(E_totals)
     disps = np.array(disps)
@@ -392,11 +649,12 @@ def process_input(input_dict, UUID=None, build=True):
                                                   '1.0e-6 eV/angstrom')
     
     # These are calculation-specific default booleans
-    # None for this calculation
+    input_dict['usesymmetry'] = iprPy.input.boolean(input_dict.get('usesymmetry', False))
     
     # These are calculation-specific default integers
     input_dict['stackingfault_numshifts1'] = int(input_dict.get('stackingfault_numshifts1', 10))
     input_dict['stackingfault_numshifts2'] = int(input_dict.get('stackingfault_numshifts2', 10))
+    input_dict['processes'] = int(input_dict.get('processes', 1))
     
     # These are calculation-specific default unitless floats
     # None for this calculation
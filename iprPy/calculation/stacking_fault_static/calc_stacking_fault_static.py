@@ -157,7 +157,7 @@ def stackingfaultrelax(lammps_command, system, potential,
     
     #Get lammps version date
     if lammps_date is None:
-        lammps_date = lmp.checkversion(lammps_command)['date']
+        lammps_date = iprPy.tools.lammps_checkversion(lammps_command, mpi_command)['date']
     
     # Define lammps variables
     lammps_variables = {}
@@ -191,8 +191,8 @@ def stackingfaultrelax(lammps_command, system, potential,
                                          '<', '>'))
     
     # Run LAMMPS
-    output = lmp.run(lammps_command, lammps_script.as_posix(), mpi_command,
-                     logfile=Path(sim_directory, 'log.lammps').as_posix())
+    output = iprPy.tools.lammps_run(lammps_command, lammps_script.as_posix(),
+                                    mpi_command, logfile=Path(sim_directory, 'log.lammps').as_posix())
     
     # Extract output values
     thermo = output.simulations[-1]['thermo']
@@ -121,17 +121,43 @@ def surface_energy(lammps_command, system, potential,
         For invalid cutboxvectors
     """
     
-    # Evaluate perfect system
+    # Check for a cached relaxation of the perfect system
     system.pbc = [True, True, True]
-    perfect = relax_system(lammps_command, system, potential,
-                           mpi_command=mpi_command, etol=etol, ftol=ftol,
-                           maxiter=maxiter, maxeval=maxeval, dmax=dmax)
-    
-    # Extract results from perfect system
     dumpfile_base = 'perfect.dump'
-    shutil.move(perfect['finaldumpfile'], dumpfile_base)
-    shutil.move('log.lammps', 'perfect-log.lammps')
-    E_total_base = perfect['potentialenergy']
+    cache = iprPy.tools.ReferenceCache.from_environ()
+    if cache is not None:
+        with open(Path(Path(__file__).parent, 'min.template')) as f:
+            template = f.read()
+        cache_key = cache.key(calculation=record_style,
+                              template=template,
+                              potential_key=potential.key,
+                              potential_id=potential.id,
+                              system=cache.fingerprint(system, potential),
+                              lammps_date=iprPy.tools.lammps_checkversion(lammps_command, mpi_command)['date'],
+                              etol=etol, ftol=ftol, maxiter=maxiter,
+                              maxeval=maxeval, dmax=dmax)
+        cached = cache.get(cache_key)
+    else:
+        cached = None
+
+    if cached is not None:
+        E_total_base = cached['E_total_base']
+    
+    else:
+        # Evaluate perfect system
+        perfect = relax_system(lammps_command, system, potential,
+                               mpi_command=mpi_command, etol=etol, ftol=ftol,
+                               maxiter=maxiter, maxeval=maxeval, dmax=dmax)
+        
+        # Extract results from perfect system
+        shutil.move(perfect['finaldumpfile'], dumpfile_base)
+        shutil.move('log.lammps', 'perfect-log.lammps')
+        E_total_base = perfect['potentialenergy']
+
+        # Save the relaxed perfect system for other surfaces
+        if cache is not None:
+            cache.put(cache_key, {'E_total_base': float(E_total_base)},
+                      files=[dumpfile_base, 'perfect-log.lammps'])
     
     # Set up defect system
     # A_surf is area of parallelogram defined by the two box vectors not along
@@ -238,7 +264,7 @@ def relax_system(lammps_command, system, potential,
     lammps_units = lmp.style.unit(potential.units)
       
     #Get lammps version date
-    lammps_date = lmp.checkversion(lammps_command)['date']
+    lammps_date = iprPy.tools.lammps_checkversion(lammps_command, mpi_command)['date']
     
     # Define lammps variables
     lammps_variables = {}
@@ -273,7 +299,7 @@ def relax_system(lammps_command, system, potential,
                                          '<', '>'))
     
     # Run LAMMPS
-    output = lmp.run(lammps_command, lammps_script, mpi_command)
+    output = iprPy.tools.lammps_run(lammps_command, lammps_script, mpi_command)
     
     # Extract output values
     thermo = output.simulations[-1]['thermo']
@@ -1,4 +1,8 @@
+# Standard Python libraries
+import sys
+
 # iprPy imports
+from .tools.dynamic_import import import_times
 from .input.subset_classes import loaded as input_subset_loaded
 from .input.subset_classes import failed as input_subset_failed
 from .input.buildcombos_functions import loaded as input_buildcombos_loaded
@@ -10,7 +14,7 @@ from .calculation import failed as calculation_failed
 from .database import loaded as database_loaded
 from .database import failed as database_failed
 
-__all__ = ['check_modules']
+__all__ = ['check_modules', 'import_profile']
 
 def check_modules():
     """
@@ -55,4 +59,23 @@ def check_modules():
     print('database styles that failed import:')
     for style in database_failed.keys():
         print(f'- {style}: {database_failed[style]}')
-    print()
\ No newline at end of file
+    print()
+
+def import_profile(import_seconds=None):
+    """
+    Prints how long importing iprPy took and which style modules have been
+    imported so far.  Style modules are only imported when first used, so
+    calling this at the end of a command shows the styles that the command
+    needed.
+
+    Parameters
+    ----------
+    import_seconds : float, optional
+        The measured time for importing iprPy to include in the report.
+    """
+    if import_seconds is not None:
+        print(f'import iprPy: {import_seconds:.3f} s')
+    print(f'{len(sys.modules)} modules imported')
+    print(f'{len(import_times)} style modules imported:')
+    for name, seconds in sorted(import_times.items(), key=lambda x: -x[1]):
+        print(f'- {name}: {seconds:.3f} s')
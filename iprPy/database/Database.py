@@ -12,12 +12,13 @@ import pandas as pd
 from DataModelDict import DataModelDict as DM
 
 # iprPy imports
-from .. import rootdir, libdir
+from .. import rootdir, libdir, load_record
 from ..record import loaded as record_loaded
 from ..tools import screen_input, aslist
 from .prepare import prepare
 from .runner import runner
 from .settings import load_run_directory
+from .jobqueue import load_jobqueue
 
 class Database(object):
     """
@@ -47,6 +48,9 @@ class Database(object):
         
         # Set property values
         self.__host = host
+        
+        # Cache of known record name to record style pairs
+        self.__record_styles = {}
     
     def __str__(self):
         """
@@ -69,7 +73,7 @@ class Database(object):
         return self.__host
     
     def get_records(self, name=None, style=None, query=None, return_df=False,
-                    **kwargs):
+                    workers=None, executor=None, **kwargs):
         """
         Produces a list of all matching records in the database.
         
@@ -79,6 +83,14 @@ class Database(object):
             The record name or id to limit the search by.
         style : str, optional
             The record style to limit the search by.
+        workers : int, optional
+            The number of processes to use for parsing the records.  Default
+            value of None handles all records serially.  Starting the
+            processes and sending them the records costs more than is saved
+            for small numbers of records, typically fewer than a few thousand.
+        executor : concurrent.futures.Executor, optional
+            An existing executor (i.e. process pool) to use for parsing the
+            records.  Cannot be given with workers.
             
         Returns
         ------
@@ -117,7 +129,7 @@ class Database(object):
         raise AttributeError('get_record not defined for Database style')
     
     def get_records_df(self, name=None, style=None, query=None, full=True,
-                       flat=False, **kwargs):
+                       flat=False, workers=None, executor=None, **kwargs):
         """
         Produces a pandas.DataFrame of all matching records in the database.
         
@@ -135,6 +147,15 @@ class Database(object):
             values, which is useful for comparisons.  If False, the term
             values can be of any data type, which is convenient for analysis.
             (Default is False).
+        workers : int, optional
+            The number of processes to use for parsing the records and
+            building the dictionaries.  Default value of None handles all
+            records serially.  Starting the processes and sending them the
+            records costs more than is saved for small numbers of records,
+            typically fewer than a few thousand.
+        executor : concurrent.futures.Executor, optional
+            An existing executor (i.e. process pool) to use for parsing the
+            records.  Cannot be given with workers.
         
         Returns
         ------
@@ -235,6 +256,72 @@ class Database(object):
             If delete_record is not defined for database style.
         """
         raise AttributeError('delete_record not defined for Database style')
+
+    def add_records(self, records, ignore_existing=False):
+        """
+        Adds multiple new records to the database.  The default implementation
+        calls add_record for each record, and database styles can override it
+        to add the records in bulk.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record
+            The new records to add to the database.
+        ignore_existing : bool, optional
+            If False (default), a ValueError is issued if any of the records
+            already exist in the database.  If True, records that already
+            exist are skipped and left unchanged.
+        
+        Returns
+        -------
+        list of iprPy.Record
+            The records that were added.
+        """
+        added = []
+        for record in records:
+            try:
+                self.add_record(record=record)
+            except ValueError:
+                if not ignore_existing:
+                    raise
+            else:
+                added.append(record)
+        return added
+    
+    def update_records(self, records):
+        """
+        Replaces multiple existing records with new records of matching names
+        and styles, but new content.  The default implementation calls
+        update_record for each record, and database styles can override it to
+        update the records in bulk.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record
+            The records with new content to update in the database.
+        
+        Returns
+        -------
+        list of iprPy.Record
+            The updated records.
+        """
+        for record in records:
+            self.update_record(record=record)
+        return list(records)
+    
+    def delete_records(self, records):
+        """
+        Permanently deletes multiple records from the database.  The default
+        implementation calls delete_record for each record, and database
+        styles can override it to delete the records in bulk.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record
+            The records to delete from the database.
+        """
+        for record in records:
+            self.delete_record(record=record)
     
     def get_tar(self, record=None, name=None, style=None, raw=False):
         """
@@ -266,8 +353,108 @@ class Database(object):
             If get_tar is not defined for database style.
         """
         raise AttributeError('get_tar not defined for Database style')
+
+    def get_tars(self, records=None, name=None, style=None, raw=False):
+        """
+        Retrieves the tar archives associated with multiple records.  Records
+        without archives are skipped.  The default implementation calls
+        get_tar for each record, and database styles can override it to
+        retrieve the archives in bulk.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record, optional
+            The records to retrieve the associated tar archives for.  Cannot
+            be given with name or style.
+        name : str or list, optional
+            The name(s) of the records to retrieve the archives for.
+        style : str or list, optional
+            The style(s) of the records to retrieve the archives for.
+        raw : bool, optional
+            If True, return the archives as raw binary content. If
+            False, return as open tarfiles. (Default is False)
+        
+        Returns
+        -------
+        dict
+            The tar archives as open tarfiles or binary str, keyed by the
+            record names.
+        """
+        if records is None:
+            records = self.get_records(name=name, style=style) #pylint: disable=assignment-from-no-return
+        elif name is not None or style is not None:
+            raise ValueError('records cannot be given with name/style')
+        
+        tars = {}
+        for record in records:
+            try:
+                tars[record.name] = self.get_tar(record=record, raw=raw) #pylint: disable=assignment-from-no-return
+            except Exception:
+                pass
+        return tars
+    
+    def copy_tars(self, destinations, style=None):
+        """
+        Copies the tar archives associated with multiple records to files.
+        Records without archives are skipped.  The default implementation
+        retrieves the archives one at a time with get_tars, and database
+        styles can override it to copy the archives without holding them in
+        memory.
+        
+        Parameters
+        ----------
+        destinations : dict
+            The paths of the files to copy the archives to, keyed by the
+            record names.
+        style : str or list, optional
+            The style(s) of the records.
+        
+        Returns
+        -------
+        list of str
+            The names of the records whose archives were copied.
+        """
+        copied = []
+        for name, destination in destinations.items():
+            tars = self.get_tars(name=name, style=style, raw=True) #pylint: disable=assignment-from-no-return
+            if name not in tars:
+                continue
+            with open(destination, 'wb') as f:
+                f.write(tars.pop(name))
+            copied.append(name)
+        return copied
     
-    def add_tar(self, record=None, name=None, style=None, tar=None, root_dir=None):
+    def get_tar_versions(self, records=None, name=None, style=None):
+        """
+        Identifies the versions of the tar archives associated with multiple
+        records without retrieving the archives.  A record's archive version
+        changes whenever its archive is replaced, allowing for retrieved
+        archives to be cached.  Records without archives are skipped.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record, optional
+            The records to identify the archive versions for.  Cannot be
+            given with name or style.
+        name : str or list, optional
+            The name(s) of the records to identify the archive versions for.
+        style : str or list, optional
+            The style(s) of the records to identify the archive versions for.
+        
+        Returns
+        -------
+        dict
+            The archive versions as str, keyed by the record names.
+        
+        Raises
+        ------
+        AttributeError
+            If get_tar_versions is not defined for database style.
+        """
+        raise AttributeError('get_tar_versions not defined for Database style')
+    
+    def add_tar(self, record=None, name=None, style=None, tar=None, root_dir=None,
+                compression='gzip', level=None):
         """
         Archives and stores a folder associated with a record.  Issues an
         error if exactly one matching record is not found in the database, or
@@ -293,6 +480,16 @@ class Database(object):
             The directory to archive is at <root_dir>/<name>.  (Default is to
             set root_dir to the current working directory.)  tar cannot be given
             with root_dir.
+        compression : str, optional
+            The compression used when archiving root_dir: 'gzip' (default),
+            'zstd' or 'none'.  zstd requires the zstandard package.
+        level : int, optional
+            The compression level.  Default uses the algorithm's default.
+        
+        Returns
+        -------
+        iprPy.database.ArchiveStats
+            The size and write speed of the stored archive.
         
         Raises
         ------
@@ -302,7 +499,8 @@ class Database(object):
         """
         raise AttributeError('add_tar not defined for Database style')
     
-    def update_tar(self, record=None, name=None, style=None, tar=None, root_dir=None):
+    def update_tar(self, record=None, name=None, style=None, tar=None, root_dir=None,
+                   compression='gzip', level=None):
         """
         Replaces an existing tar archive for a record with a new one.  Issues
         an error if exactly one matching record is not found in the database.
@@ -326,6 +524,16 @@ class Database(object):
             The directory to archive is at <root_dir>/<name>.  (Default is to
             set root_dir to the current working directory.)  tar cannot be given
             with root_dir.
+        compression : str, optional
+            The compression used when archiving root_dir: 'gzip' (default),
+            'zstd' or 'none'.  zstd requires the zstandard package.
+        level : int, optional
+            The compression level.  Default uses the algorithm's default.
+        
+        Returns
+        -------
+        iprPy.database.ArchiveStats
+            The size and write speed of the stored archive.
         
         Raises
         ------
@@ -413,23 +621,55 @@ class Database(object):
         for record_style in include_list:
             style_path = Path(lib_directory, record_style)
                 
-            # Loop over all records of one style
+            # Load all records of one style
+            records = []
             for record_file in style_path.glob('*'):
                 if record_file.suffix.lower() in ['.xml', '.json']:
-                    record_name = record_file.stem
-                    
-                    # Add record if needed
                     try:
-                        self.add_record(content=record_file, style=record_style, name=record_name)
+                        records.append(load_record(record_style, record_file.stem,
+                                                   record_file))
+                    except:
+                        pass
+            
+            # Add new records
+            self.add_records(records, ignore_existing=True)
+            
+            # Add the records' tars if needed
+            for record in records:
+                if Path(style_path, record.name).is_dir():
+                    try:
+                        self.add_tar(root_dir=style_path, record=record)
                     except:
                         pass
-                    
-                    # Add a record's tar if needed
-                    if Path(style_path, record_name).is_dir():
-                        try:
-                            self.add_tar(root_dir=style_path, name=record_name)
-                        except:
-                            pass
+    
+    def count_records(self, style, groupby=None, **kwargs):
+        """
+        Counts the records of a given style.
+        
+        Parameters
+        ----------
+        style : str
+            The record style to count.
+        groupby : str, optional
+            The name of a flat input term, i.e. a todict(full=False,
+            flat=True) key, to count the records by each value of.
+        **kwargs : any, optional
+            Filters on the records' flat input terms, as with get_records.
+        
+        Returns
+        -------
+        int or dict
+            The number of matching records if groupby is None, otherwise
+            a dict of the number of matching records for each value of the
+            groupby term.
+        """
+        records = self.get_records_df(style=style, full=False, flat=True, **kwargs) #pylint: disable=assignment-from-no-return
+        if groupby is None:
+            return len(records)
+        elif len(records) == 0:
+            return {}
+        else:
+            return records[groupby].value_counts(dropna=False).to_dict()
     
     def check_records(self, record_style=None):
         """
@@ -446,20 +686,24 @@ class Database(object):
         
         if record_style is not None:
             # Display information about database records
-            records = self.get_records_df(style=record_style, full=False, flat=True) #pylint: disable=assignment-from-no-return
+            if 'calculation' in record_style:
+                counts = self.count_records(record_style, groupby='status')
+                total = sum(counts.values())
+            else:
+                total = self.count_records(record_style)
             print(f'In {self}:')
-            print(f'- {len(records)} of style {record_style}')
+            print(f'- {total} of style {record_style}')
             sys.stdout.flush()
-            if len(records) > 0 and 'calculation' in record_style:
-                count = len(records[records.status == 'finished'])
+            if total > 0 and 'calculation' in record_style:
+                count = counts.get('finished', 0)
                 print(f' - {count} are complete')
                 sys.stdout.flush()
                 
-                count = len(records[records.status == 'not calculated'])
+                count = counts.get('not calculated', 0)
                 print(f' - {count} still to run')
                 sys.stdout.flush()
                 
-                count = len(records[records.status == 'error'])
+                count = counts.get('error', 0)
                 print(f' - {count} issued errors')
                 sys.stdout.flush()
     
@@ -507,6 +751,11 @@ class Database(object):
         
         print(len(records), 'records to clean')
         
+        # Return any interrupted jobs to the run directory's job queue
+        jobqueue = load_jobqueue(run_directory)
+        if jobqueue is not None:
+            jobqueue.reset()
+        
         # Loop over all error records
         for record in records:
             # Check if record has saved tar
@@ -524,6 +773,8 @@ class Database(object):
                 else:
                     # Delete database version of tar
                     tar.close()
+                    if jobqueue is not None:
+                        jobqueue.add(record.name)
                     try:
                         self.delete_tar(record=record)
                     except:
@@ -587,25 +838,25 @@ class Database(object):
         record_count = 0
         tar_count = 0
         # Copy records
-        for record in records:
-            try:
-                # Add new records
-                dbase2.add_record(record=record)
-                record_count += 1
-            except:
-                # Update existing records
-                if overwrite:
-                    dbase2.update_record(record=record)
-                    record_count += 1
-            
-            # Copy archives
-            if includetar:
-                try:
-                    # get tar if it exists
-                    tar = self.get_tar(record=record, raw=True) #pylint: disable=assignment-from-no-return
-                except:
-                    pass
-                else:
+        added = dbase2.add_records(records, ignore_existing=True)
+        record_count += len(added)
+        if overwrite:
+            # Update existing records
+            added_names = set([record.name for record in added])
+            existing = [record for record in records if record.name not in added_names]
+            dbase2.update_records(existing)
+            record_count += len(existing)
+        
+        # Copy archives in chunks to limit memory use
+        if includetar:
+            chunksize = 100
+            for i in range(0, len(records), chunksize):
+                chunk = records[i:i+chunksize]
+                tars = self.get_tars(records=chunk, raw=True) #pylint: disable=assignment-from-no-return
+                for record in chunk:
+                    if record.name not in tars:
+                        continue
+                    tar = tars[record.name]
                     try:
                         # Add new tar
                         dbase2.add_tar(record=record, tar=tar)
@@ -637,19 +888,14 @@ class Database(object):
         if len(records) > 0:
             test = screen_input('Delete records? (must type yes):')
             if test == 'yes':
-                count = 0
                 for record in records:
                     try:
                         self.delete_tar(record=record)
                     except:
                         pass
-                    try:
-                        self.delete_record(record=record)
-                        count += 1
-                    except:
-                        pass
+                self.delete_records(records)
                 
-                print(count, 'records successfully deleted')
+                print(len(records), 'records successfully deleted')
     
     def select_record_style(self):
         """
@@ -673,22 +919,46 @@ class Database(object):
         
         return record_style
     
-    def get_parent_records(self, record=None, name=None, style=None):
+    def get_parent_records(self, record=None, name=None, style=None, cache=None):
         """
         Returns all records that are parents to the given one
+        
+        Parameters
+        ----------
+        record : iprPy.Record, optional
+            The record to find the parents of.  If not given, name and/or
+            style are needed to uniquely define the record.
+        name : str, optional
+            The name of the record to find the parents of.
+        style : str, optional
+            The style of the record to find the parents of.
+        cache : dict, optional
+            Dictionary used to memoize the parent lookups.  Passing the same
+            dict to multiple calls allows for shared ancestors, such as
+            potential or prototype records, to only be retrieved from the
+            database once.
+        
+        Returns
+        -------
+        list of iprPy.Record
+            The parent records and all of their ancestors.
         """
         if record is None:
             record = self.get_record(name=name, style=style) #pylint: disable=assignment-from-no-return
         elif name is not None or style is not None:
             raise ValueError('record cannot be given with name/style')
         
+        if cache is None:
+            cache = {}
+        
         parents = []
         try:
             model = record.content.find('system-info')
         except:
             pass
         else:
-            for load_file in model.finds('file'):
+            for artifact in model.finds('artifact'):
+                load_file = artifact['file']
                 directory = Path(load_file).parent.stem
                 name = Path(load_file).stem
 
@@ -696,19 +966,37 @@ class Database(object):
                     pname = directory
                 else:
                     pname = name
-
-                try:
-                    parent = self.get_record(name=pname) #pylint: disable=assignment-from-no-return
-                except:
-                    pass
-                else:
+                
+                # Use the parent's style saved in the record if available
+                pstyle = artifact.get('record-style',
+                                      self.__record_styles.get(pname, None))
+                
+                # Retrieve the parent and its ancestors once
+                if pname not in cache:
+                    try:
+                        parent = self.get_record(name=pname, style=pstyle) #pylint: disable=assignment-from-no-return
+                    except:
+                        cache[pname] = None
+                    else:
+                        self.__record_styles[pname] = parent.style
+                        cache[pname] = (parent, None)
+                        grandparents = self.get_parent_records(record=parent, cache=cache)
+                        cache[pname] = (parent, grandparents)
+                
+                if cache[pname] is not None:
+                    parent, grandparents = cache[pname]
                     parents.append(parent)
-                    grandparents = self.get_parent_records(record=parent)
-                    parents.extend(grandparents)
+                    if grandparents is not None:
+                        parents.extend(grandparents)
         return parents
     
     def prepare(self, run_directory, calculation, **kwargs):
         prepare(self, run_directory, calculation, **kwargs)
     
-    def runner(self, run_directory, orphan_directory=None, hold_directory=None):
-        runner(self, run_directory, orphan_directory=None, hold_directory=None)
\ No newline at end of file
+    def runner(self, run_directory, orphan_directory=None, hold_directory=None,
+               jobqueue=None, compression='gzip', compression_level=None,
+               finalize_workers=1, inprocess=False):
+        runner(self, run_directory, orphan_directory=orphan_directory,
+               hold_directory=hold_directory, jobqueue=jobqueue,
+               compression=compression, compression_level=compression_level,
+               finalize_workers=finalize_workers, inprocess=inprocess)
\ No newline at end of file
@@ -13,12 +13,22 @@ from ..tools import dynamic_import
 from .settings import *
 from .settings import __all__ as settings_all
 
+from .jobqueue import JobQueue, SQLiteJobQueue, load_jobqueue
+from .duplicates import DuplicateIndex
+from .assets import AssetStore
+from .tarcache import TarCache
+from .archive import ArchiveStats
 from .Database import Database
 
-ignorelist = ['Database', 'prepare', 'runner', 'settings', 'load_database']
-loaded, failed = dynamic_import(__file__, __name__, ignorelist=ignorelist)
+ignorelist = ['Database', 'prepare', 'runner', 'settings', 'load_database',
+              'todicts', 'jobqueue', 'duplicates', 'assets', 'tarcache',
+              'archive', 'calcworker']
+loaded, failed = dynamic_import(__file__, __name__, ignorelist=ignorelist, lazy=True)
 
 from .load_database import load_database
 
-__all__ = settings_all + ['Database', 'load_database', 'failed', 'loaded']
+__all__ = settings_all + ['Database', 'load_database', 'failed', 'loaded',
+                          'JobQueue', 'SQLiteJobQueue', 'load_jobqueue',
+                          'DuplicateIndex', 'AssetStore', 'TarCache',
+                          'ArchiveStats']
 __all__.sort()
\ No newline at end of file
@@ -0,0 +1,364 @@
+# Standard Python libraries
+from pathlib import Path
+from io import BytesIO
+import gzip
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+
+__all__ = ['ArchiveStats', 'write_archive', 'open_archive', 'ArchiveReader',
+           'compressions', 'extensions', 'content_compression']
+
+# Supported archive compression algorithms
+compressions = ['gzip', 'zstd', 'none']
+
+# File extensions of archives by compression algorithm
+extensions = {'gzip': '.tar.gz', 'zstd': '.tar.zst', 'none': '.tar'}
+
+# Leading bytes of gzip and zstd frames
+gzip_magic = b'\x1f\x8b'
+zstd_magic = b'\x28\xb5\x2f\xfd'
+
+def import_zstandard():
+    """Imports the zstandard package needed for zstd compression."""
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError('zstd compression requires the zstandard package')
+    return zstandard
+
+def check_compression(compression):
+    """
+    Checks that a compression algorithm is supported and available.
+
+    Parameters
+    ----------
+    compression : str
+        The compression algorithm.
+
+    Raises
+    ------
+    ValueError
+        If the algorithm is not supported or its package is not installed.
+    """
+    if compression not in compressions:
+        raise ValueError(f'unsupported compression {compression}: must be one of {compressions}')
+    if compression == 'zstd':
+        import_zstandard()
+
+def content_compression(content):
+    """
+    Identifies the compression algorithm of raw archive content.
+
+    Parameters
+    ----------
+    content : bytes
+        The raw archive content.
+
+    Returns
+    -------
+    str
+        'gzip' or 'zstd' if the content starts with the matching magic bytes,
+        otherwise 'none'.
+    """
+    if content[:len(gzip_magic)] == gzip_magic:
+        return 'gzip'
+    if content[:len(zstd_magic)] == zstd_magic:
+        return 'zstd'
+    return 'none'
+
+class ArchiveStats(object):
+    """
+    Class reporting the size and write speed of an archive.
+    """
+
+    def __init__(self, tar_bytes, bytes_written, seconds):
+        """
+        Parameters
+        ----------
+        tar_bytes : int
+            The size of the uncompressed tar stream.
+        bytes_written : int
+            The size of the compressed archive written.
+        seconds : float
+            The time spent building and writing the archive.
+        """
+        self.__tar_bytes = tar_bytes
+        self.__bytes_written = bytes_written
+        self.__seconds = seconds
+
+    def __str__(self):
+        return (f'{self.bytes_written} bytes written in {self.seconds:.3f} s '
+                f'({self.throughput / 1e6:.1f} MB/s)')
+
+    @property
+    def tar_bytes(self):
+        """int: The size of the uncompressed tar stream."""
+        return self.__tar_bytes
+
+    @property
+    def bytes_written(self):
+        """int: The size of the compressed archive written."""
+        return self.__bytes_written
+
+    @property
+    def seconds(self):
+        """float: The time spent building and writing the archive."""
+        return self.__seconds
+
+    @property
+    def throughput(self):
+        """float: The uncompressed bytes archived per second."""
+        if self.seconds == 0:
+            return 0.0
+        return self.tar_bytes / self.seconds
+
+class CountingWriter(object):
+    """
+    Minimal write-only file object that counts the bytes passed through it.
+    """
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.count = 0
+
+    def write(self, data):
+        self.fileobj.write(data)
+        self.count += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def tell(self):
+        return self.count
+
+def write_archive(fileobj, directory, arcname=None, compression='gzip',
+                  level=None):
+    """
+    Streams a compressed tar archive of a directory into a writable file
+    object without creating intermediate files.
+
+    Parameters
+    ----------
+    fileobj : file-like object
+        The writable destination, such as an open file or a GridFS input
+        file.
+    directory : path-like object
+        The directory to archive.
+    arcname : str, optional
+        The name of the directory in the archive.  Default is the
+        directory's name.
+    compression : str, optional
+        The compression algorithm: 'gzip' (default), 'zstd' or 'none'.
+        zstd requires the zstandard package.
+    level : int, optional
+        The compression level.  Default uses the algorithm's default level.
+
+    Returns
+    -------
+    ArchiveStats
+        The size and write speed of the archive.
+    """
+    start = time.perf_counter()
+    directory = Path(directory)
+    if arcname is None:
+        arcname = directory.name
+
+    output = CountingWriter(fileobj)
+    if compression == 'gzip':
+        if level is None:
+            level = 9
+        stream = gzip.GzipFile(filename='', mode='wb', fileobj=output,
+                               compresslevel=level)
+    elif compression == 'zstd':
+        zstandard = import_zstandard()
+        if level is None:
+            level = 3
+        compressor = zstandard.ZstdCompressor(level=level)
+        stream = compressor.stream_writer(output, closefd=False)
+    else:
+        check_compression(compression)
+        stream = output
+
+    tarstream = CountingWriter(stream)
+    with tarfile.open(fileobj=tarstream, mode='w|') as tar:
+        tar.add(directory, arcname)
+    if stream is not output:
+        stream.close()
+
+    return ArchiveStats(tarstream.count, output.count,
+                        time.perf_counter() - start)
+
+def open_archive(content, stream=False):
+    """
+    Opens a tar archive that is gzip, bz2, xz or zstd compressed, or
+    uncompressed.
+
+    Parameters
+    ----------
+    content : bytes, path-like or file-like object
+        The raw archive content, the path to an archive file, or a seekable
+        file object of an archive.
+    stream : bool, optional
+        If True, the archive is opened as a stream which only supports
+        iterating over the members in order.  Default is False.
+
+    Returns
+    -------
+    tarfile.TarFile
+        The open archive.
+    """
+    # Check for zstd compressed archives
+    if isinstance(content, bytes):
+        content = BytesIO(content)
+    if isinstance(content, (str, Path)):
+        with open(content, 'rb') as f:
+            magic = f.read(len(zstd_magic))
+        if magic == zstd_magic:
+            content = open(content, 'rb')
+    else:
+        magic = content.read(len(zstd_magic))
+        content.seek(0)
+
+    if magic == zstd_magic:
+        zstandard = import_zstandard()
+        reader = zstandard.ZstdDecompressor().stream_reader(content)
+        if stream:
+            return tarfile.open(fileobj=reader, mode='r|')
+        
+        # Random access needs the decompressed archive, which is only held
+        # in memory if it is small
+        decompressed = tempfile.SpooledTemporaryFile(max_size=spool_size)
+        shutil.copyfileobj(reader, decompressed, 1048576)
+        decompressed.seek(0)
+        return tarfile.open(fileobj=decompressed)
+
+    mode = 'r|*' if stream else 'r'
+    if isinstance(content, (str, Path)):
+        return tarfile.open(content, mode)
+    return tarfile.open(fileobj=content, mode=mode)
+
+# Decompressed zstd archives larger than this many bytes are opened from
+# temporary files
+spool_size = 268435456
+
+class ArchiveReader(object):
+    """
+    Readable file object whose content is an archive of a directory built
+    by a background thread.  Allows for the archive to be passed to upload
+    functions that read from file objects without saving it to disk.
+    """
+
+    def __init__(self, directory, arcname=None, compression='gzip', level=None,
+                 chunksize=1048576):
+        """
+        Starts building the archive.
+
+        Parameters
+        ----------
+        directory : path-like object
+            The directory to archive.
+        arcname : str, optional
+            The name of the directory in the archive.
+        compression : str, optional
+            The compression algorithm: 'gzip' (default), 'zstd' or 'none'.
+        level : int, optional
+            The compression level.
+        chunksize : int, optional
+            The number of bytes to buffer before handing them to the reader.
+            At most two chunks are held in memory at once.
+        """
+        self.__chunksize = chunksize
+        self.__buffer = bytearray()
+        self.__chunks = []
+        self.__done = False
+        self.__closed = False
+        self.__error = None
+        self.__stats = None
+        self.__condition = threading.Condition()
+        self.__thread = threading.Thread(target=self.__build, daemon=True,
+                                         args=(directory, arcname, compression, level))
+        self.__thread.start()
+
+    @property
+    def stats(self):
+        """ArchiveStats: The archive's size and speed once fully read."""
+        return self.__stats
+
+    def __build(self, directory, arcname, compression, level):
+        """Builds the archive, passing chunks to the reader."""
+        try:
+            stats = write_archive(self, directory, arcname=arcname,
+                                  compression=compression, level=level)
+            self.__put(bytes(self.__buffer))
+            self.__buffer = bytearray()
+            self.__stats = stats
+        except BaseException as e:
+            self.__error = e
+        with self.__condition:
+            self.__done = True
+            self.__condition.notify_all()
+
+    def __put(self, chunk):
+        """Waits for room, then queues a chunk for the reader."""
+        with self.__condition:
+            while len(self.__chunks) > 1 and not self.__closed:
+                self.__condition.wait()
+            if self.__closed:
+                return
+            self.__chunks.append(chunk)
+            self.__condition.notify_all()
+
+    def write(self, data):
+        """Receives archive bytes from write_archive."""
+        self.__buffer += data
+        if len(self.__buffer) >= self.__chunksize:
+            self.__put(bytes(self.__buffer))
+            self.__buffer = bytearray()
+        return len(data)
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        """
+        Reads archive bytes, waiting for them to be built.
+
+        Parameters
+        ----------
+        size : int, optional
+            The maximum number of bytes to read.  If negative (default), all
+            remaining bytes are read.
+
+        Returns
+        -------
+        bytes
+            The bytes read, which are empty once the archive is complete.
+        """
+        data = bytearray()
+        while size < 0 or len(data) < size:
+            with self.__condition:
+                while len(self.__chunks) == 0 and not self.__done:
+                    self.__condition.wait()
+                if len(self.__chunks) == 0:
+                    if self.__error is not None:
+                        raise self.__error
+                    break
+                chunk = self.__chunks.pop(0)
+                if size >= 0 and len(data) + len(chunk) > size:
+                    split = size - len(data)
+                    self.__chunks.insert(0, chunk[split:])
+                    chunk = chunk[:split]
+                self.__condition.notify_all()
+            data += chunk
+        return bytes(data)
+
+    def close(self):
+        """Stops reading.  Any remaining archive bytes are discarded."""
+        with self.__condition:
+            self.__closed = True
+            self.__chunks = []
+            self.__condition.notify_all()
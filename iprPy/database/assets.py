@@ -0,0 +1,275 @@
+# Standard Python libraries
+from pathlib import Path
+import os
+import hashlib
+import shutil
+import uuid
+
+__all__ = ['AssetStore']
+
+class AssetStore(object):
+    """
+    Content-addressed store of the files shared by prepared calculations,
+    such as calculation scripts, templates and extracted potential parameter
+    files.  Each unique file content is saved once in a hidden directory of
+    the run directory, and the calculation directories receive hard links to
+    the stored files.  As hard links are indistinguishable from regular
+    files, runners, archiving and clean_records handle the linked files as
+    before.  If hard links are not supported, the files are copied instead.
+
+    Files in the calculation directories that are rewritten by the runner,
+    i.e. parent record files, should not be linked to the store.
+    """
+
+    # Name of the store directory created in the run directory
+    dirname = '.assets'
+
+    # Size of the blocks read when hashing file contents
+    blocksize = 1048576
+
+    def __init__(self, run_directory):
+        """
+        Initializes the store for a run directory.
+
+        Parameters
+        ----------
+        run_directory : path-like object
+            The run directory that the store is in.
+        """
+        self.__path = Path(run_directory, self.dirname)
+        self.__files = {}
+
+    @property
+    def path(self):
+        """pathlib.Path: The store directory."""
+        return self.__path
+
+    def assetpath(self, digest):
+        """
+        Gives the path of a stored asset.
+
+        Parameters
+        ----------
+        digest : str
+            The hex digest of the asset's content.
+
+        Returns
+        -------
+        pathlib.Path
+            The asset's path.
+        """
+        return Path(self.path, digest[:2], digest)
+
+    def add_file(self, path):
+        """
+        Adds a file's content to the store.  Files are only hashed once per
+        AssetStore object unless their size or modification time changes.
+
+        Parameters
+        ----------
+        path : path-like object
+            The file to add.
+
+        Returns
+        -------
+        pathlib.Path
+            The path of the stored asset.
+        """
+        path = Path(path)
+        stat = path.stat()
+        key = (path.resolve(), stat.st_mtime_ns, stat.st_size)
+        if key not in self.__files:
+            sha = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(self.blocksize), b''):
+                    sha.update(block)
+            assetpath = self.assetpath(sha.hexdigest())
+            if not assetpath.is_file():
+                self.__save(assetpath, lambda tmppath: shutil.copy(path, tmppath))
+            self.__files[key] = assetpath
+        return self.__files[key]
+
+    def add_bytes(self, content, mode=None):
+        """
+        Adds bytes content to the store.
+
+        Parameters
+        ----------
+        content : bytes
+            The content to add.
+        mode : int, optional
+            The permission bits to give the stored file if it is new.
+
+        Returns
+        -------
+        pathlib.Path
+            The path of the stored asset.
+        """
+        assetpath = self.assetpath(hashlib.sha256(content).hexdigest())
+        if not assetpath.is_file():
+            def write(tmppath):
+                with open(tmppath, 'wb') as f:
+                    f.write(content)
+                if mode is not None:
+                    os.chmod(tmppath, mode)
+            self.__save(assetpath, write)
+        return assetpath
+
+    def add_fileobj(self, fileobj, mode=None):
+        """
+        Adds the content of a readable file object to the store, copying it
+        in blocks so that large files are not held in memory.
+
+        Parameters
+        ----------
+        fileobj : file-like object
+            The binary file object to read the content from.
+        mode : int, optional
+            The permission bits to give the stored file if it is new.
+
+        Returns
+        -------
+        pathlib.Path
+            The path of the stored asset.
+        """
+        # Copy to a temporary file while hashing, then move into place
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmppath = Path(self.path, f'.{uuid.uuid4()}.tmp')
+        try:
+            sha = hashlib.sha256()
+            with open(tmppath, 'wb') as f:
+                for block in iter(lambda: fileobj.read(self.blocksize), b''):
+                    sha.update(block)
+                    f.write(block)
+            if mode is not None:
+                os.chmod(tmppath, mode)
+            assetpath = self.assetpath(sha.hexdigest())
+            if not assetpath.is_file():
+                assetpath.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmppath, assetpath)
+        finally:
+            if tmppath.exists():
+                tmppath.unlink()
+        return assetpath
+
+    def __save(self, assetpath, write):
+        """Atomically creates an asset file using a write function."""
+        assetpath.parent.mkdir(parents=True, exist_ok=True)
+        tmppath = Path(assetpath.parent, f'.{uuid.uuid4()}.tmp')
+        try:
+            write(tmppath)
+            os.replace(tmppath, assetpath)
+        finally:
+            if tmppath.exists():
+                tmppath.unlink()
+
+    def link(self, assetpath, destination):
+        """
+        Places a stored asset at a destination path as a hard link, or as a
+        copy if hard links cannot be made.  Any existing file at destination
+        is replaced.
+
+        Parameters
+        ----------
+        assetpath : path-like object
+            The path of the stored asset.
+        destination : path-like object
+            The path to place the asset at.
+        """
+        destination = Path(destination)
+        if destination.exists() or destination.is_symlink():
+            destination.unlink()
+        try:
+            os.link(assetpath, destination)
+        except OSError:
+            shutil.copy(assetpath, destination)
+
+    def copy(self, path, directory):
+        """
+        Adds a file to the store and places it in a directory, similar to
+        shutil.copy.
+
+        Parameters
+        ----------
+        path : path-like object
+            The file to copy.
+        directory : path-like object
+            The directory to place the file in.
+        """
+        self.link(self.add_file(path), Path(directory, Path(path).name))
+
+    def add_members(self, members):
+        """
+        Adds the members of a tar archive to the store.
+
+        Parameters
+        ----------
+        members : iterable
+            The (name, mode, fileobj) of each member as given by
+            iprPy.database.tarcache.iter_tar.  fileobj is None for
+            directories.
+
+        Returns
+        -------
+        dict
+            The member names (keys) and the paths of the stored files
+            (values).  Values are None for directories.
+        """
+        stored = {}
+        for name, mode, fileobj in members:
+            if fileobj is None:
+                stored[name] = None
+            else:
+                stored[name] = self.add_fileobj(fileobj, mode=mode)
+        return stored
+
+    def extract(self, members, directory, name=None):
+        """
+        Places files added by add_members in a directory, similar to
+        TarFile.extractall and TarFile.extract.
+
+        Parameters
+        ----------
+        members : dict
+            The member names and stored paths returned by add_members.
+        directory : path-like object
+            The directory to extract to.
+        name : str, optional
+            The name of a single member to extract.  If not given, all members
+            are extracted.
+        """
+        if name is not None:
+            if name not in members:
+                raise KeyError(f'filename {name} not found')
+            members = {name: members[name]}
+
+        for name, assetpath in members.items():
+            destination = Path(directory, name)
+            if assetpath is None:
+                destination.mkdir(parents=True, exist_ok=True)
+            else:
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                self.link(assetpath, destination)
+
+    def prune(self):
+        """
+        Deletes stored assets that are no longer linked to by any
+        calculation directory.
+
+        Returns
+        -------
+        int
+            The number of assets deleted.
+        """
+        count = 0
+        if not self.path.is_dir():
+            return count
+        for assetpath in self.path.glob('*/*'):
+            try:
+                if assetpath.stat().st_nlink == 1:
+                    assetpath.unlink()
+                    count += 1
+            except OSError:
+                pass
+        self.__files = {}
+        return count
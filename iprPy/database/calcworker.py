@@ -0,0 +1,200 @@
+# Standard Python libraries
+import os
+import sys
+import io
+import json
+import subprocess
+import traceback
+import types
+from contextlib import redirect_stdout, redirect_stderr
+
+__all__ = ['CalcWorker']
+
+class CalcWorker(object):
+    """
+    Warm Python process that runs calculations by calling the main functions
+    of their calc_*.py scripts, so that the interpreter startup and the
+    imports of iprPy and its dependencies are paid once rather than for each
+    calculation.  Only calculations whose styles are in-process safe should
+    be run this way.  Jobs are sent to the worker as JSON lines, and each
+    calculation's stdout and stderr are captured and returned.  The worker
+    process is started on first use and restarted if it exits.
+    """
+
+    def __init__(self, py_exe=None, env=None, directory=None):
+        """
+        Initializes the worker without starting its process.
+
+        Parameters
+        ----------
+        py_exe : str, optional
+            The Python executable to run the worker with.  Default uses the
+            executable running this process.
+        env : dict, optional
+            The environment variables of the worker process.  Default
+            inherits the environment of this process.
+        directory : str, optional
+            The working directory of the worker process between
+            calculations, which must not be removed while the worker runs.
+            Default uses the current working directory.
+        """
+        if py_exe is None:
+            py_exe = sys.executable
+            if py_exe is None:
+                py_exe = 'python'
+        self.__py_exe = py_exe
+        self.__env = env
+        self.__directory = directory
+        self.__process = None
+
+    @property
+    def running(self):
+        """bool: Indicates if the worker process is running."""
+        return self.__process is not None and self.__process.poll() is None
+
+    def start(self):
+        """Starts the worker process if it is not running."""
+        if self.running:
+            return
+        self.close()
+        self.__process = subprocess.Popen(
+            [self.__py_exe, '-c', 'from iprPy.database.calcworker import serve; serve()'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=self.__env,
+            cwd=self.__directory, encoding='utf-8')
+
+    def run(self, script, directory, *args):
+        """
+        Runs a calculation in the worker process.
+
+        Parameters
+        ----------
+        script : str
+            The path to the calculation's calc_*.py script, relative to
+            directory.  The script's main function is called.
+        directory : str
+            The absolute path to the calculation's directory, which is used
+            as the working directory.
+        *args : str
+            The arguments to pass to the calculation's main function, i.e.
+            the calc_*.in file name and the calculation's name.
+
+        Returns
+        -------
+        stdout : str
+            The calculation's captured standard output.
+        stderr : str
+            The calculation's captured error output, including the traceback
+            of any uncaught exception.
+        """
+        self.start()
+        job = {'script': script, 'directory': directory, 'args': list(args)}
+        try:
+            self.__process.stdin.write(json.dumps(job) + '\n')
+            self.__process.stdin.flush()
+            response = self.__process.stdout.readline()
+        except OSError:
+            response = ''
+
+        if response == '':
+            process = self.__process
+            self.close()
+            return '', (f'calculation worker exited with code {process.returncode} '
+                        f'while running {script}')
+        response = json.loads(response)
+        return response['stdout'], response['stderr']
+
+    def close(self):
+        """Stops the worker process, if running."""
+        if self.__process is None:
+            return
+        try:
+            self.__process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.__process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.__process.kill()
+            self.__process.wait()
+        self.__process.stdout.close()
+        self.__process = None
+
+def load_script(path):
+    """
+    Loads a calc_*.py script as a new module, so that calculations run the
+    script that prepare copied into their directories.
+
+    Parameters
+    ----------
+    path : str
+        The path to the script.
+
+    Returns
+    -------
+    module
+        The loaded script.
+    """
+    path = os.path.abspath(path)
+    with open(path) as f:
+        code = compile(f.read(), path, 'exec')
+    module = types.ModuleType(os.path.splitext(os.path.basename(path))[0])
+    module.__file__ = path
+    exec(code, module.__dict__)
+    return module
+
+def run_job(script, directory, args, home):
+    """
+    Runs a calculation job in the worker process.
+
+    Parameters
+    ----------
+    script : str
+        The path to the calculation's calc_*.py script, relative to
+        directory.
+    directory : str
+        The working directory to run the calculation in.
+    args : list of str
+        The arguments to pass to the script's main function.
+    home : str
+        The working directory to return to, which is the worker's working
+        directory between calculations.
+
+    Returns
+    -------
+    dict
+        The captured 'stdout' and 'stderr' of the calculation.
+    """
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            os.chdir(directory)
+            load_script(script).main(*args)
+        except (Exception, SystemExit):
+            traceback.print_exc()
+        finally:
+            # Calculation directories are removed once finalized, so the
+            # worker must not stay in one.  Jobs use absolute directories, so
+            # a missing home does not stop later jobs.
+            try:
+                os.chdir(home)
+            except OSError:
+                pass
+
+    return {'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+
+def serve():
+    """
+    Main function of the worker process, which runs the jobs read from stdin
+    and writes the results to stdout until stdin is closed.
+    """
+    # Keep the job channel separate from any output of the calculations
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), 'w', encoding='utf-8')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    home = os.getcwd()
+    for line in sys.stdin:
+        job = json.loads(line)
+        result = run_job(job['script'], job['directory'], job['args'], home)
+        channel.write(json.dumps(result) + '\n')
+        channel.flush()
@@ -0,0 +1,355 @@
+# Standard Python libraries
+from pathlib import Path
+from itertools import product
+import math
+import pickle
+
+# http://www.numpy.org/
+import numpy as np
+
+__all__ = ['DuplicateIndex']
+
+class DuplicateIndex(object):
+    """
+    Hash-bucketed index of the compare terms of calculation records used for
+    identifying duplicate calculations.  Two records are duplicates if all of
+    their compare_terms values are equal and all of their compare_fterms
+    values are within the terms' absolute tolerances.  Records are bucketed
+    by the values of their compare_terms together with their compare_fterms
+    values binned to widths of binfactor times the tolerances.  Checking a
+    record then only requires comparing it to the records in the one or two
+    neighboring bins of each compare_fterm, making both building the index
+    and checking records scale linearly with the number of records.
+    """
+
+    def __init__(self, dterms, fterms, binfactor=10):
+        """
+        Initializes an empty index.
+
+        Parameters
+        ----------
+        dterms : list of str
+            The record terms that are compared exactly, i.e. compare_terms.
+        fterms : dict
+            The record terms (keys) that are compared with absolute
+            tolerances (values), i.e. compare_fterms.
+        binfactor : float, optional
+            The compare_fterms bin widths relative to the tolerances.  Larger
+            values bucket more records together.  Must be at least 2 so that
+            values within the tolerances of a value are in at most two
+            neighboring bins.  (Default is 10.)
+
+        Raises
+        ------
+        ValueError
+            If binfactor is less than 2.
+        """
+        if not binfactor >= 2:
+            raise ValueError('binfactor must be at least 2')
+        self.__dterms = list(dterms)
+        self.__fterms = dict(fterms)
+        self.__binfactor = binfactor
+        self.__entries = {}
+        self.__buckets = {}
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, name):
+        return name in self.__entries
+
+    @property
+    def dterms(self):
+        """list: The terms compared exactly."""
+        return self.__dterms
+
+    @property
+    def fterms(self):
+        """dict: The terms compared with absolute tolerances."""
+        return self.__fterms
+
+    @property
+    def names(self):
+        """set: The names of the indexed records."""
+        return set(self.__entries)
+
+    @staticmethod
+    def normalize(value):
+        """Converts missing (NaN or None) values to None so they compare equal."""
+        try:
+            if value is None or math.isnan(value):
+                return None
+        except TypeError:
+            pass
+        return value
+
+    def bins(self, fvalues, tolerance_shift=0):
+        """
+        Computes the bin indices of compare_fterms values.
+
+        Parameters
+        ----------
+        fvalues : tuple
+            The compare_fterms values.
+        tolerance_shift : int, optional
+            Multiple of the terms' tolerances to shift the values by before
+            binning.  (Default is 0.)
+
+        Returns
+        -------
+        tuple
+            The bin indices, with None for missing values and the values
+            themselves for terms with zero tolerances.
+        """
+        bins = []
+        for value, tol in zip(fvalues, self.__fterms.values()):
+            if value is None:
+                bins.append(None)
+            elif tol == 0:
+                bins.append(value)
+            else:
+                width = self.__binfactor * tol
+                bins.append(math.floor((value + tolerance_shift * tol) / width + 0.5))
+        return tuple(bins)
+
+    def rows(self, df):
+        """
+        Extracts the names, compare term values and bins from a records
+        DataFrame.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            The flat records DataFrame.  Must have a key column.
+
+        Yields
+        ------
+        tuple
+            The (name, dvalues, fvalues, bins) of each row.
+        """
+        columns = []
+        for term in self.__dterms + list(self.__fterms):
+            if term in df:
+                columns.append(self.normalized_column(df[term]))
+            else:
+                columns.append([None] * len(df))
+
+        # Bin the compare_fterms values
+        bincolumns = []
+        for term, tol in self.__fterms.items():
+            if term not in df or tol == 0:
+                bincolumns.append(columns[len(bincolumns) + len(self.__dterms)])
+                continue
+            values = df[term].to_numpy(dtype=float)
+            bins = np.floor(values / (self.__binfactor * tol) + 0.5)
+            isnan = np.isnan(bins)
+            bins = np.where(isnan, 0, bins).astype(np.int64).tolist()
+            if isnan.any():
+                for i in np.flatnonzero(isnan):
+                    bins[i] = None
+            bincolumns.append(bins)
+
+        # Transpose to rows, allowing for empty term lists
+        empty = [()] * len(df)
+        values = list(zip(*columns)) if len(columns) > 0 else empty
+        bins = list(zip(*bincolumns)) if len(bincolumns) > 0 else empty
+
+        ndterms = len(self.__dterms)
+        for name, values, bins in zip(df.key.tolist(), values, bins):
+            yield name, values[:ndterms], values[ndterms:], bins
+
+    def normalized_column(self, series):
+        """Lists the values of a DataFrame column with missing values as None."""
+        isna = series.isna()
+        if isna.any():
+            return series.astype(object).where(~isna, None).tolist()
+        return series.tolist()
+
+    def add(self, name, dvalues, fvalues, bins=None):
+        """
+        Adds a record to the index.
+
+        Parameters
+        ----------
+        name : str
+            The record's name.
+        dvalues : tuple
+            The record's normalized compare_terms values.
+        fvalues : tuple
+            The record's normalized compare_fterms values.
+        bins : tuple, optional
+            The bins of fvalues, if already computed.
+        """
+        if name in self.__entries:
+            self.remove(name)
+        if bins is None:
+            bins = self.bins(fvalues)
+        self.__entries[name] = (dvalues, fvalues, bins)
+        self.__buckets.setdefault((dvalues, bins), set()).add(name)
+
+    def remove(self, name):
+        """
+        Removes a record from the index.
+
+        Parameters
+        ----------
+        name : str
+            The record's name.
+        """
+        dvalues, fvalues, bins = self.__entries.pop(name)
+        key = (dvalues, bins)
+        bucket = self.__buckets[key]
+        bucket.discard(name)
+        if len(bucket) == 0:
+            del self.__buckets[key]
+
+    def find(self, dvalues, fvalues):
+        """
+        Finds an indexed record that duplicates the given values.
+
+        Parameters
+        ----------
+        dvalues : tuple
+            The normalized compare_terms values to check.
+        fvalues : tuple
+            The normalized compare_fterms values to check.
+
+        Returns
+        -------
+        str or None
+            The name of a duplicate record, or None if there are none.
+        """
+        # Find the bins that values within the tolerances can be in
+        lower = self.bins(fvalues, -1)
+        upper = self.bins(fvalues, 1)
+        binsets = [(lo,) if lo == hi else (lo, hi) for lo, hi in zip(lower, upper)]
+
+        for bins in product(*binsets):
+            bucket = self.__buckets.get((dvalues, bins), None)
+            if bucket is None:
+                continue
+            for name in bucket:
+                if self.isclose(fvalues, self.__entries[name][1]):
+                    return name
+        return None
+
+    def isclose(self, fvalues1, fvalues2):
+        """Checks if two sets of compare_fterms values are within the tolerances."""
+        for v1, v2, tol in zip(fvalues1, fvalues2, self.__fterms.values()):
+            if v1 is None or v2 is None:
+                if v1 is not v2:
+                    return False
+            elif abs(v1 - v2) > tol:
+                return False
+        return True
+
+    def sync(self, df):
+        """
+        Updates the index to contain exactly the records in a DataFrame,
+        adding new records and removing those that no longer exist.  Records
+        already in the index are not re-evaluated.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            The flat records DataFrame of all existing records.
+        """
+        if len(df) == 0:
+            names = set()
+        else:
+            names = set(df.key.tolist())
+        for name in set(self.__entries).difference(names):
+            self.remove(name)
+        if len(names) > len(self):
+            newdf = df[~df.key.isin(list(self.__entries))]
+            for name, dvalues, fvalues, bins in self.rows(newdf):
+                self.add(name, dvalues, fvalues, bins)
+
+    def isnew(self, df, add=True):
+        """
+        Checks which records in a DataFrame do not duplicate indexed records
+        or earlier records in the same DataFrame.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            The flat records DataFrame to check.
+        add : bool, optional
+            If True (default), the new records are added to the index.
+
+        Returns
+        -------
+        list of bool
+            True for each record that is new.
+        """
+        isnew = []
+        if len(df) == 0:
+            return isnew
+        added = []
+        for name, dvalues, fvalues, bins in self.rows(df):
+            if self.find(dvalues, fvalues) is None:
+                isnew.append(True)
+                self.add(name, dvalues, fvalues, bins)
+                added.append(name)
+            else:
+                isnew.append(False)
+        if not add:
+            for name in added:
+                self.remove(name)
+        return isnew
+
+    def save(self, path):
+        """
+        Saves the index to a file.
+
+        Parameters
+        ----------
+        path : path-like object
+            The file to save to.
+        """
+        path = Path(path)
+        tmppath = Path(path.parent, path.name + '.tmp')
+        with open(tmppath, 'wb') as f:
+            pickle.dump({'dterms': self.__dterms,
+                         'fterms': self.__fterms,
+                         'binfactor': self.__binfactor,
+                         'entries': self.__entries,
+                         'buckets': self.__buckets}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        tmppath.replace(path)
+
+    @classmethod
+    def load(cls, path, dterms, fterms):
+        """
+        Loads a saved index.  An empty index is returned if the file does not
+        exist, cannot be read, or was saved for different compare terms.
+
+        Parameters
+        ----------
+        path : path-like object
+            The file to load from.
+        dterms : list of str
+            The record terms that are compared exactly.
+        fterms : dict
+            The record terms that are compared with absolute tolerances.
+
+        Returns
+        -------
+        DuplicateIndex
+            The loaded index.
+        """
+        try:
+            with open(path, 'rb') as f:
+                data = pickle.load(f)
+            if (data['dterms'] != list(dterms)
+                or data['fterms'] != dict(fterms)):
+                return cls(dterms, fterms)
+            index = cls(dterms, fterms, binfactor=data['binfactor'])
+            entries = data['entries']
+            buckets = data['buckets']
+        except Exception:
+            return cls(dterms, fterms)
+
+        index.__entries = entries
+        index.__buckets = buckets
+        return index
@@ -0,0 +1,244 @@
+# Standard Python libraries
+from pathlib import Path
+import os
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+
+__all__ = ['JobQueue', 'SQLiteJobQueue', 'load_jobqueue']
+
+class JobQueue(object):
+    """
+    Class defining the interface for dependency-aware job queues used by
+    prepare to register calculations and by runner to select which
+    calculations to run.  Jobs are identified by the calculation names
+    (directory names in the run directory) and are only handed out once all
+    of their queued parent jobs have completed.
+    """
+
+    def add(self, name, parents=None):
+        """
+        Adds a job to the queue, or requeues it if it already exists.
+
+        Parameters
+        ----------
+        name : str
+            The name of the calculation.
+        parents : list of str, optional
+            The names of the parent calculations that must complete before
+            this job can be claimed.  Parents that are not jobs in the queue
+            are not waited on until the job has been released for them.
+        """
+        raise AttributeError('add not defined for JobQueue style')
+
+    def claim(self):
+        """
+        Claims the next job whose parents have completed.
+
+        Returns
+        -------
+        str or None
+            The name of the claimed job, or None if no jobs are ready.
+        """
+        raise AttributeError('claim not defined for JobQueue style')
+
+    def release(self, name, parents=None):
+        """
+        Returns a claimed job to the queue, placing it behind other jobs that
+        have been released fewer times.  If the job has parents that are not
+        jobs in the queue, it cannot be claimed again until a wait time has
+        passed that doubles with each release.
+
+        Parameters
+        ----------
+        name : str
+            The name of the job.
+        parents : list of str, optional
+            Additional parent jobs to wait on.
+        """
+        raise AttributeError('release not defined for JobQueue style')
+
+    def finish(self, name, status='finished'):
+        """
+        Marks a claimed job as done, allowing its children to be claimed.
+
+        Parameters
+        ----------
+        name : str
+            The name of the job.
+        status : str, optional
+            The final status of the job (Default is 'finished').
+        """
+        raise AttributeError('finish not defined for JobQueue style')
+
+    def reset(self):
+        """
+        Returns all claimed jobs to the queue.  Should only be used when no
+        runners are active, such as when cleaning records.
+        """
+        raise AttributeError('reset not defined for JobQueue style')
+
+    def count(self, status='queued'):
+        """
+        Counts the jobs with a given status.
+
+        Parameters
+        ----------
+        status : str or list, optional
+            The job status(es) to count (Default is 'queued').
+
+        Returns
+        -------
+        int
+            The number of matching jobs.
+        """
+        raise AttributeError('count not defined for JobQueue style')
+
+class SQLiteJobQueue(JobQueue):
+    """
+    JobQueue stored in a sqlite file inside the run directory.  Claims are
+    made within exclusive write transactions so that each job is given to
+    exactly one runner.  Note that sqlite's file locking may be unreliable
+    on some network filesystems.
+    """
+
+    # Name of the queue file created in the run directory
+    filename = '.jobqueue.sqlite'
+
+    # Seconds that a released job waits on parents outside of the queue
+    # after its first release, and the limit of the doubling wait time
+    parentwait = 10.0
+    maxparentwait = 600.0
+
+    def __init__(self, run_directory):
+        """
+        Initializes the queue for a run directory, creating the queue file if
+        needed.
+
+        Parameters
+        ----------
+        run_directory : path-like object
+            The run directory that the queue's jobs are located in.
+        """
+        self.__path = Path(run_directory, self.filename)
+        with self.transaction() as con:
+            con.execute('CREATE TABLE IF NOT EXISTS jobs '
+                        '(name TEXT PRIMARY KEY, status TEXT, pid INTEGER, '
+                        'releases INTEGER, updated REAL)')
+            con.execute('CREATE TABLE IF NOT EXISTS parents '
+                        '(name TEXT, parent TEXT, PRIMARY KEY (name, parent))')
+            con.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)')
+            con.execute('CREATE INDEX IF NOT EXISTS parents_parent ON parents (parent)')
+
+    def __str__(self):
+        return f'sqlite job queue at {self.path}'
+
+    @property
+    def path(self):
+        """pathlib.Path: The path to the queue file."""
+        return self.__path
+
+    def connect(self):
+        """sqlite3.Connection: Opens a new autocommit connection to the queue file."""
+        return sqlite3.connect(str(self.path), timeout=120, isolation_level=None)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Context manager that yields a connection inside of an exclusive write
+        transaction that is committed on exit or rolled back on errors.
+        """
+        with closing(self.connect()) as con:
+            con.execute('BEGIN IMMEDIATE')
+            try:
+                yield con
+            except:
+                con.execute('ROLLBACK')
+                raise
+            else:
+                con.execute('COMMIT')
+
+    def add(self, name, parents=None):
+        with self.transaction() as con:
+            con.execute('INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?)',
+                        (name, 'queued', None, 0, time.time()))
+            if parents is not None:
+                con.executemany('INSERT OR IGNORE INTO parents VALUES (?, ?)',
+                                [(name, parent) for parent in parents])
+
+    def claim(self):
+        with self.transaction() as con:
+            # Find the first queued job with no unfinished queued parents.
+            # Parents outside of the queue block released jobs until their
+            # wait time passes
+            row = con.execute(
+                "SELECT name FROM jobs WHERE status = 'queued' AND NOT EXISTS "
+                "(SELECT 1 FROM parents LEFT JOIN jobs AS p ON parents.parent = p.name "
+                "WHERE parents.name = jobs.name AND (p.status IN ('queued', 'running') "
+                "OR (p.name IS NULL AND jobs.releases > 0 AND jobs.updated + "
+                "MIN(?, ? * (1 << MIN(jobs.releases - 1, 30))) > ?))) "
+                "ORDER BY releases, rowid LIMIT 1",
+                (self.maxparentwait, self.parentwait, time.time())).fetchone()
+            if row is None:
+                return None
+            con.execute("UPDATE jobs SET status = 'running', pid = ?, updated = ? "
+                        "WHERE name = ?", (os.getpid(), time.time(), row[0]))
+        return row[0]
+
+    def release(self, name, parents=None):
+        with self.transaction() as con:
+            con.execute("UPDATE jobs SET status = 'queued', pid = NULL, "
+                        "releases = releases + 1, updated = ? WHERE name = ?",
+                        (time.time(), name))
+            if parents is not None:
+                con.executemany('INSERT OR IGNORE INTO parents VALUES (?, ?)',
+                                [(name, parent) for parent in parents])
+
+    def finish(self, name, status='finished'):
+        with self.transaction() as con:
+            con.execute('UPDATE jobs SET status = ?, updated = ? WHERE name = ?',
+                        (status, time.time(), name))
+
+    def reset(self):
+        with self.transaction() as con:
+            con.execute("UPDATE jobs SET status = 'queued', pid = NULL, updated = ? "
+                        "WHERE status = 'running'", (time.time(),))
+
+    def count(self, status='queued'):
+        if isinstance(status, str):
+            status = [status]
+        with closing(self.connect()) as con:
+            query = 'SELECT COUNT(*) FROM jobs WHERE status IN (%s)' % ', '.join('?' * len(status))
+            return con.execute(query, list(status)).fetchone()[0]
+
+def load_jobqueue(run_directory, jobqueue=None):
+    """
+    Resolves the job queue to use for a run directory.
+
+    Parameters
+    ----------
+    run_directory : path-like object
+        The run directory.
+    jobqueue : bool or JobQueue, optional
+        If None (default), a SQLiteJobQueue is returned if the run directory
+        already has a queue file, otherwise None.  If True, a SQLiteJobQueue
+        is returned, creating the file if needed.  If False, None is returned
+        so that the run directory is handled by listing its contents.  A
+        JobQueue object is returned as is.
+
+    Returns
+    -------
+    JobQueue or None
+        The job queue to use, or None for file-based operation.
+    """
+    if jobqueue is None:
+        if Path(run_directory, SQLiteJobQueue.filename).is_file():
+            return SQLiteJobQueue(run_directory)
+        else:
+            return None
+    elif jobqueue is True:
+        return SQLiteJobQueue(run_directory)
+    elif jobqueue is False:
+        return None
+    else:
+        return jobqueue
@@ -1,7 +1,8 @@
 # Standard Python libraries
 from pathlib import Path
+import os
 import shutil
-import tarfile
+import time
 
 # http://www.numpy.org/
 import numpy as np
@@ -12,12 +13,16 @@ import pandas as pd
 # iprPy imports
 from ...tools import aslist, iaslist
 from .. import Database
+from ..todicts import todicts, load_records
 from ... import load_record
 from ...record import loaded as record_styles
+from ..archive import (ArchiveStats, write_archive, open_archive, check_compression,
+                       extensions, content_compression)
+from .RecordIndex import RecordIndex
 
 class Local(Database):
     
-    def __init__(self, host):
+    def __init__(self, host, index=True):
         """
         Initializes a connection to a local database.
         
@@ -25,6 +30,11 @@ class Local(Database):
         ----------
         host : str
             The host name (local directory path) for the database.
+        index : bool, optional
+            If True (default), a sqlite index of the records' flat input
+            terms is kept in each record style directory and used to answer
+            queries without parsing every record file.  If False, all record
+            files are parsed for every query.
         """
         # Get absolute path to host
         host = Path(host).resolve()
@@ -33,11 +43,63 @@ class Local(Database):
         if not host.is_dir():
             host.mkdir(parents=True)
         
+        # Handle str values from settings file
+        if isinstance(index, str):
+            index = index.lower() not in ['false', 'no', '0']
+        self.__index = index
+        
         # Pass host to Database initializer
         Database.__init__(self, host)
     
+    @property
+    def index(self):
+        """bool: Indicates if the record index files are used."""
+        return self.__index
+    
+    def record_index(self, style):
+        """
+        Returns the RecordIndex for a record style.
+        
+        Parameters
+        ----------
+        style : str
+            The record style.
+        
+        Returns
+        -------
+        RecordIndex
+            The index object for the style's directory.
+        """
+        return RecordIndex(Path(self.host, style), style)
+    
+    def record_files(self, style, name=None):
+        """
+        Lists the paths to the stored record files of a given style.
+        
+        Parameters
+        ----------
+        style : str
+            The record style.
+        name : str or list, optional
+            The record name(s) to limit the search by.
+        
+        Returns
+        -------
+        list of pathlib.Path
+            The paths to all existing matching record files.
+        """
+        if name is None:
+            return list(Path(self.host, style).glob('*.xml'))
+        else:
+            record_files = []
+            for record_name in aslist(name):
+                record_file = Path(self.host, style, record_name+'.xml')
+                if record_file.is_file():
+                    record_files.append(record_file)
+            return record_files
+    
     def get_records(self, name=None, style=None, query=None, return_df=False,
-                    **kwargs):
+                    workers=None, executor=None, **kwargs):
         """
         Produces a list of all matching records in the database.
         
@@ -50,6 +112,16 @@ class Local(Database):
         query : str, optional
             A query str for identifying records.  Not supported by this style.
         return_df : bool, optional
+            If True, the records' flat input terms are also returned as a
+            pandas.DataFrame.
+        workers : int, optional
+            The number of processes to use for parsing the records.  Default
+            value of None handles all records serially.  Starting the
+            processes and sending them the records costs more than is saved
+            for small numbers of records, typically fewer than a few thousand.
+        executor : concurrent.futures.Executor, optional
+            An existing executor (i.e. process pool) to use for parsing the
+            records.  Cannot be given with workers.
             
         Returns
         ------
@@ -69,44 +141,44 @@ class Local(Database):
             raise ValueError('query not supported by this style')
         
         df = []
-        records = []
+        entries = []
         # Iterate through all files matching style, name values
         for record_style in style:
+            record_files = self.record_files(record_style, name)
             
-            # Iterate over all names using glob
-            if name is None:
-                for record_file in Path(self.host, record_style).glob('*.xml'):
-                    record_name = record_file.stem
-                    
-                    # Load as an iprPy.Record object
-                    record = load_record(record_style, record_name, record_file)
-                    records.append(record)
-                    df.append(record.todict(full=False, flat=True))
-            else:
-                # Iterate over given names
-                for record_name in aslist(name):
-                    record_file = Path(self.host, record_style, record_name+'.xml')
-                    if record_file.is_file():
-                        
-                        # Load as an iprPy.Record object
-                        record = load_record(record_style, record_name, record_file)
-                        records.append(record)
-                        df.append(record.todict(full=False, flat=True))
-        
-        records = np.array(records)
+            # Get flat terms from the index and delay loading records
+            if self.index:
+                df.extend(self.record_index(record_style).rows(record_files,
+                                                               complete=name is None))
+            for record_file in record_files:
+                entries.append((record_style, record_file.stem, record_file))
+        
+        # Load as iprPy.Record objects and get their flat terms
+        records = None
+        if not self.index:
+            records, df = load_records(entries, todict=True, workers=workers,
+                                       executor=executor)
+        
         df = pd.DataFrame(df)
         
         if len(df) > 0:
             for key in kwargs:
                 df = df[df[key].isin(aslist(kwargs[key]))]
         
+        # Load only the records that match the filters
+        if records is None:
+            entries = [entries[i] for i in df.index.tolist()]
+            records = load_records(entries, workers=workers, executor=executor)
+        else:
+            records = [records[i] for i in df.index.tolist()]
+        
         if return_df:
-            return list(records[df.index.tolist()]), df.reset_index(drop=True)
+            return records, df.reset_index(drop=True)
         else:
-            return list(records[df.index.tolist()])
+            return records
     
     def get_records_df(self, name=None, style=None, query=None, full=True,
-                       flat=False, **kwargs):
+                       flat=False, workers=None, executor=None, **kwargs):
         """
         Produces a list of all matching records in the database.
         
@@ -116,10 +188,29 @@ class Local(Database):
             The record name or id to limit the search by.
         style : str, optional
             The record style to limit the search by.
+        full : bool, optional
+            Flag used by the calculation records.  A True value will include
+            terms for both the calculation's input and results, while a value
+            of False will only include input terms (Default is True).
+        flat : bool, optional
+            Flag affecting the format of the dictionary terms.  If True, the
+            dictionary terms are limited to having only str, int, and float
+            values, which is useful for comparisons.  If False, the term
+            values can be of any data type, which is convenient for analysis.
+            (Default is False).
+        workers : int, optional
+            The number of processes to use for parsing the records and
+            building the dictionaries.  Default value of None handles all
+            records serially.  Starting the processes and sending them the
+            records costs more than is saved for small numbers of records,
+            typically fewer than a few thousand.
+        executor : concurrent.futures.Executor, optional
+            An existing executor (i.e. process pool) to use for parsing the
+            records.  Cannot be given with workers.
             
         Returns
         ------
-        list of iprPy.Records
+        pandas.DataFrame
             All records from the database matching the given parameters.
         """
         
@@ -135,27 +226,25 @@ class Local(Database):
             raise ValueError('query not supported by this style')
         
         df = []
-       # Iterate through all files matching style, name values
+        entries = []
+        # Iterate through all files matching style, name values
         for record_style in style:
+            record_files = self.record_files(record_style, name)
+            
+            # Use the index for flat input terms
+            if self.index and full is False and flat is True:
+                df.extend(self.record_index(record_style).rows(record_files,
+                                                               complete=name is None))
             
-            # Iterate over all names using glob
-            if name is None:
-                for record_file in Path(self.host, record_style).glob('*.xml'):
-                    record_name = record_file.stem
-
-                    # Load as an iprPy.Record object
-                    record = load_record(record_style, record_name, record_file)
-                    df.append(record.todict(full=full, flat=flat))
             else:
-                # Iterate over given names
-                for record_name in aslist(name):
-                    record_file = Path(self.host, record_style, record_name+'.xml')
-                    if record_file.is_file():
-                        
-                        # Load as an iprPy.Record object
-                        record = load_record(record_style, record_name, record_file)
-                        df.append(record.todict(full=full, flat=flat))                    
-                    
+                for record_file in record_files:
+                    entries.append((record_style, record_file.stem, record_file))
+        
+        # Load as iprPy.Record objects and convert to dicts
+        if len(entries) > 0:
+            df.extend(todicts(entries, full=full, flat=flat, workers=workers,
+                              executor=executor))
+        
         df = pd.DataFrame(df)
         
         if len(df) > 0:
@@ -238,19 +327,23 @@ class Local(Database):
             raise ValueError('kwargs style, name, and content cannot be given with kwarg record')
         
         # Verify that there isn't already a record with a matching name
-        if len(self.get_records(name=record.name, style=record.style)) > 0:
+        style_dir = Path(self.host, record.style)
+        xml_file = Path(style_dir, record.name+'.xml')
+        if xml_file.is_file():
             raise ValueError(f'Record {record.name} already exists')
         
         # Make record style directory if needed
-        style_dir = Path(self.host, record.style)
         if not style_dir.is_dir():
             style_dir.mkdir()
         
         # Save content to an .xml file
-        xml_file = Path(style_dir, record.name+'.xml')
         with open(xml_file, 'w') as f:
             record.content.xml(fp=f)
         
+        # Add record to the index
+        if self.index:
+            self.record_index(record.style).update(record, xml_file)
+        
         return record
 
     def update_record(self, record=None, style=None, name=None, content=None):
@@ -352,8 +445,142 @@ class Local(Database):
         
         # Delete record file
         xml_path.unlink()
+        
+        # Remove record from the index
+        if self.index:
+            self.record_index(record.style).delete(record.name)
 
-    def add_tar(self, record=None, name=None, style=None, tar=None, root_dir=None):
+    def add_records(self, records, ignore_existing=False):
+        """
+        Adds multiple new records to the database, updating the index of each
+        record style once.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record
+            The new records to add to the database.
+        ignore_existing : bool, optional
+            If False (default), a ValueError is issued if any of the records
+            already exist in the database, in which case no records are added.
+            If True, records that already exist are skipped and left
+            unchanged.
+        
+        Returns
+        -------
+        list of iprPy.Record
+            The records that were added.
+        """
+        # Check for existing records
+        added = []
+        for record in records:
+            xml_file = Path(self.host, record.style, record.name+'.xml')
+            if xml_file.is_file():
+                if not ignore_existing:
+                    raise ValueError(f'Record {record.name} already exists')
+            else:
+                added.append(record)
+        
+        # Save content to .xml files
+        styles = {}
+        for record in added:
+            style_dir = Path(self.host, record.style)
+            if record.style not in styles:
+                if not style_dir.is_dir():
+                    style_dir.mkdir()
+                styles[record.style] = ([], [])
+            xml_file = Path(style_dir, record.name+'.xml')
+            with open(xml_file, 'w') as f:
+                record.content.xml(fp=f)
+            styles[record.style][0].append(record)
+            styles[record.style][1].append(xml_file)
+        
+        # Add records to the indexes
+        if self.index:
+            for style, (style_records, xml_files) in styles.items():
+                self.record_index(style).update_many(style_records, xml_files)
+        
+        return added
+    
+    def update_records(self, records):
+        """
+        Replaces multiple existing records with new records of matching names
+        and styles, but new content, updating the index of each record style
+        once.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record
+            The records with new content to update in the database.
+        
+        Returns
+        -------
+        list of iprPy.Record
+            The updated records.
+        
+        Raises
+        ------
+        ValueError
+            If any of the records are not found, in which case no records are
+            updated.
+        """
+        # Verify that the records exist
+        for record in records:
+            xml_file = Path(self.host, record.style, record.name+'.xml')
+            if not xml_file.is_file():
+                raise ValueError(f'Cannot find matching record {record.name} ({record.style})')
+        
+        # Replace content in .xml files
+        styles = {}
+        for record in records:
+            xml_file = Path(self.host, record.style, record.name+'.xml')
+            with open(xml_file, 'w') as f:
+                record.content.xml(fp=f)
+            styles.setdefault(record.style, ([], []))
+            styles[record.style][0].append(record)
+            styles[record.style][1].append(xml_file)
+        
+        # Update the indexes
+        if self.index:
+            for style, (style_records, xml_files) in styles.items():
+                self.record_index(style).update_many(style_records, xml_files)
+        
+        return list(records)
+    
+    def delete_records(self, records):
+        """
+        Permanently deletes multiple records from the database, updating the
+        index of each record style once.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record
+            The records to delete from the database.
+        
+        Raises
+        ------
+        ValueError
+            If any of the records are not found, in which case no records are
+            deleted.
+        """
+        # Verify that the records exist
+        for record in records:
+            xml_file = Path(self.host, record.style, record.name+'.xml')
+            if not xml_file.is_file():
+                raise ValueError(f'Cannot find matching record {record.name} ({record.style})')
+        
+        # Delete record files
+        styles = {}
+        for record in records:
+            Path(self.host, record.style, record.name+'.xml').unlink()
+            styles.setdefault(record.style, []).append(record.name)
+        
+        # Remove records from the indexes
+        if self.index:
+            for style, names in styles.items():
+                self.record_index(style).delete_many(names)
+    
+    def add_tar(self, record=None, name=None, style=None, tar=None, root_dir=None,
+                compression='gzip', level=None):
         """
         Archives and stores a folder associated with a record.  Issues an
         error if exactly one matching record is not found in the database, or
@@ -379,6 +606,18 @@ class Local(Database):
             The directory to archive is at <root_dir>/<name>.  (Default is to
             set root_dir to the current working directory.)  tar cannot be given
             with root_dir.
+        compression : str, optional
+            The compression used when archiving root_dir: 'gzip' (default),
+            'zstd' or 'none'.  zstd requires the zstandard package.
+            The archive file is named <name>.tar.gz, <name>.tar.zst or
+            <name>.tar to match.
+        level : int, optional
+            The compression level.  Default uses the algorithm's default.
+        
+        Returns
+        -------
+        iprPy.database.ArchiveStats
+            The size and write speed of the stored archive.
         
         Raises
         ------
@@ -399,29 +638,43 @@ class Local(Database):
         else:
             record = self.get_record(name=record.name, style=record.style)
         
-        # Build path to record
-        record_path = Path(self.host, record.style, record.name)
-        tar_path = Path(self.host, record.style, f'{record.name}.tar.gz')
-        
         # Check if an archive already exists
-        if tar_path.is_file():
+        if self.__tar_path(record.style, record.name) is not None:
             raise ValueError('Record already has an archive')
         
-        # Make archive
+        # Name the archive by its compression
+        if tar is None:
+            check_compression(compression)
+        else:
+            compression = content_compression(tar)
+        tar_name = record.name + extensions[compression]
+        tar_path = Path(self.host, record.style, tar_name)
+        
+        # Stream archive to a temporary file, then move it into place
         if tar is None:
             if root_dir is None:
                 root_dir = '.'
             target = Path(root_dir, record.name)
-
-            tar = tarfile.open(tar_path, 'w:gz')
-            tar.add(target, target.name)
-            tar.close()
+            
+            tmp_path = Path(tar_path.parent, f'.{tar_name}.tmp')
+            try:
+                with open(tmp_path, 'wb') as f:
+                    stats = write_archive(f, target, compression=compression,
+                                          level=level)
+                tmp_path.replace(tar_path)
+            finally:
+                if tmp_path.is_file():
+                    tmp_path.unlink()
             
         elif root_dir is None:
+            start = time.perf_counter()
             with open(tar_path, 'wb') as f:
                 f.write(tar)
+            stats = ArchiveStats(len(tar), len(tar), time.perf_counter() - start)
         else:
             raise ValueError('tar and root_dir cannot both be given')
+        
+        return stats
     
     def get_tar(self, record=None, name=None, style=None, raw=False):
         """
@@ -465,15 +718,181 @@ class Local(Database):
         else:
             record = self.get_record(name=record.name, style=record.style)
         
-        # Build path to record
-        tar_path = Path(self.host, record.style, record.name+'.tar.gz')
+        # Find the archive, with the default path for a missing archive
+        tar_path = self.__tar_path(record.style, record.name)
+        if tar_path is None:
+            tar_path = Path(self.host, record.style, record.name+extensions['gzip'])
         
         # Return content
         if raw is True:
             with open(tar_path, 'rb') as f:
                 return f.read()
         else:
-            return tarfile.open(tar_path)
+            return open_archive(tar_path)
+
+    def __tar_path(self, style, name):
+        """
+        Finds the archive file of a record, which is named by the archive's
+        compression.
+        
+        Parameters
+        ----------
+        style : str
+            The record's style.
+        name : str
+            The record's name.
+        
+        Returns
+        -------
+        pathlib.Path or None
+            The path to the archive, or None if the record has no archive.
+        """
+        for extension in extensions.values():
+            tar_path = Path(self.host, style, name+extension)
+            if tar_path.is_file():
+                return tar_path
+        return None
+
+    def style_name_pairs(self, records=None, name=None, style=None):
+        """
+        Lists the styles and names of records.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record, optional
+            The records to list.  Cannot be given with name or style.
+        name : str or list, optional
+            The name(s) of the records to find and list.
+        style : str or list, optional
+            The style(s) of the records to find and list.
+        
+        Returns
+        -------
+        list of tuple
+            The (style, name) pair of each record.
+        """
+        if records is None:
+            if style is None:
+                style = list(record_styles.keys())
+            pairs = []
+            for record_style in aslist(style):
+                for record_file in self.record_files(record_style, name):
+                    pairs.append((record_style, record_file.stem))
+        elif name is not None or style is not None:
+            raise ValueError('records cannot be given with name/style')
+        else:
+            pairs = [(record.style, record.name) for record in records]
+        return pairs
+
+    def get_tars(self, records=None, name=None, style=None, raw=False):
+        """
+        Retrieves the tar archives associated with multiple records.  Records
+        without archives are skipped.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record, optional
+            The records to retrieve the associated tar archives for.  Cannot
+            be given with name or style.
+        name : str or list, optional
+            The name(s) of the records to retrieve the archives for.
+        style : str or list, optional
+            The style(s) of the records to retrieve the archives for.
+        raw : bool, optional
+            If True, return the archives as raw binary content. If
+            False, return as open tarfiles. (Default is False)
+        
+        Returns
+        -------
+        dict
+            The tar archives as open tarfiles or binary str, keyed by the
+            record names.
+        """
+        pairs = self.style_name_pairs(records=records, name=name, style=style)
+        
+        tars = {}
+        for record_style, record_name in pairs:
+            tar_path = self.__tar_path(record_style, record_name)
+            if tar_path is None:
+                continue
+            if raw is True:
+                with open(tar_path, 'rb') as f:
+                    tars[record_name] = f.read()
+            else:
+                tars[record_name] = open_archive(tar_path)
+        return tars
+
+    def copy_tars(self, destinations, style=None):
+        """
+        Copies the tar archives associated with multiple records to files.
+        The files are hard links to the stored archives if possible, which
+        is safe as stored archives are replaced rather than rewritten.
+        Records without archives are skipped.
+        
+        Parameters
+        ----------
+        destinations : dict
+            The paths of the files to copy the archives to, keyed by the
+            record names.
+        style : str or list, optional
+            The style(s) of the records.
+        
+        Returns
+        -------
+        list of str
+            The names of the records whose archives were copied.
+        """
+        pairs = self.style_name_pairs(name=list(destinations), style=style)
+        
+        copied = []
+        for record_style, record_name in pairs:
+            tar_path = self.__tar_path(record_style, record_name)
+            if tar_path is None:
+                continue
+            destination = Path(destinations[record_name])
+            if destination.exists():
+                destination.unlink()
+            try:
+                os.link(tar_path, destination)
+            except OSError:
+                shutil.copyfile(tar_path, destination)
+            copied.append(record_name)
+        return copied
+
+    def get_tar_versions(self, records=None, name=None, style=None):
+        """
+        Identifies the versions of the tar archives associated with multiple
+        records.  The version of an archive is given by its file's
+        modification time and size.  Records without archives are skipped.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record, optional
+            The records to identify the archive versions for.  Cannot be
+            given with name or style.
+        name : str or list, optional
+            The name(s) of the records to identify the archive versions for.
+        style : str or list, optional
+            The style(s) of the records to identify the archive versions for.
+        
+        Returns
+        -------
+        dict
+            The archive versions as str, keyed by the record names.
+        """
+        pairs = self.style_name_pairs(records=records, name=name, style=style)
+        
+        versions = {}
+        for record_style, record_name in pairs:
+            tar_path = self.__tar_path(record_style, record_name)
+            if tar_path is None:
+                continue
+            try:
+                stat = tar_path.stat()
+            except FileNotFoundError:
+                continue
+            versions[record_name] = f'{stat.st_mtime_ns}-{stat.st_size}'
+        return versions
 
     def delete_tar(self, record=None, name=None, style=None):
         """
@@ -509,14 +928,14 @@ class Local(Database):
         else:
             record = self.get_record(name=record.name, style=record.style)
         
-        # Build path to tar file
-        tar_path = Path(self.host, record.style, record.name+'.tar.gz')
-        
-        # Delete record if it exists
-        if tar_path.is_file():
-            tar_path.unlink()
+        # Delete the archive under any of the extensions
+        for extension in extensions.values():
+            tar_path = Path(self.host, record.style, record.name+extension)
+            if tar_path.is_file():
+                tar_path.unlink()
 
-    def update_tar(self, record=None, name=None, style=None, tar=None, root_dir=None):
+    def update_tar(self, record=None, name=None, style=None, tar=None, root_dir=None,
+                   compression='gzip', level=None):
         """
         Replaces an existing tar archive for a record with a new one.  Issues
         an error if exactly one matching record is not found in the database.
@@ -540,10 +959,25 @@ class Local(Database):
             The directory to archive is at <root_dir>/<name>.  (Default is to
             set root_dir to the current working directory.)  tar cannot be given
             with root_dir.
+        compression : str, optional
+            The compression used when archiving root_dir: 'gzip' (default),
+            'zstd' or 'none'.  zstd requires the zstandard package.
+        level : int, optional
+            The compression level.  Default uses the algorithm's default.
+        
+        Returns
+        -------
+        iprPy.database.ArchiveStats
+            The size and write speed of the stored archive.
         """
         
+        # Check compression before deleting the existing archive
+        if tar is None:
+            check_compression(compression)
+        
         # Delete the existing tar archive stored in the database
         self.delete_tar(record=record, name=name)
         
         # Add the new tar archive
-        self.add_tar(record=record, name=name, style=style, tar=tar, root_dir=root_dir)
\ No newline at end of file
+        return self.add_tar(record=record, name=name, style=style, tar=tar,
+                            root_dir=root_dir, compression=compression, level=level)
\ No newline at end of file
@@ -0,0 +1,217 @@
+# Standard Python libraries
+from pathlib import Path
+import json
+import sqlite3
+from contextlib import closing
+
+# http://www.numpy.org/
+import numpy as np
+
+# iprPy imports
+from ... import load_record
+
+class RecordIndex(object):
+    """
+    On-disk sqlite index of the records of one style stored in a Local
+    database.  For each record, the index stores the record file's mtime and
+    size along with the flat, input-only dictionary representation of the
+    record, i.e. todict(full=False, flat=True).  Entries are validated
+    against the record files on every query so that records added, changed
+    or removed outside of iprPy are re-indexed automatically.
+    """
+
+    # Name of the index file created in each record style directory
+    filename = '.index.sqlite'
+
+    # Max number of names to look up individually rather than loading all
+    max_lookup = 500
+
+    def __init__(self, style_dir, style):
+        """
+        Initializes the index for one record style directory.
+
+        Parameters
+        ----------
+        style_dir : path-like object
+            The directory where the records of the style are stored.
+        style : str
+            The record style.
+        """
+        self.__style_dir = Path(style_dir)
+        self.__style = style
+
+    @property
+    def style_dir(self):
+        """pathlib.Path: The record style directory being indexed."""
+        return self.__style_dir
+
+    @property
+    def style(self):
+        """str: The record style being indexed."""
+        return self.__style
+
+    @property
+    def path(self):
+        """pathlib.Path: The path to the sqlite index file."""
+        return Path(self.style_dir, self.filename)
+
+    def connect(self):
+        """
+        Opens a connection to the index file, creating the table if needed.
+
+        Returns
+        -------
+        sqlite3.Connection
+            The open connection.
+        """
+        con = sqlite3.connect(str(self.path), timeout=60)
+        con.execute('CREATE TABLE IF NOT EXISTS records '
+                    '(name TEXT PRIMARY KEY, mtime INTEGER, size INTEGER, '
+                    'data TEXT)')
+        return con
+
+    def rows(self, record_files, complete=False):
+        """
+        Returns the indexed flat dictionaries for a list of record files,
+        (re)parsing and indexing any files that are new or have changed.
+
+        Parameters
+        ----------
+        record_files : list of pathlib.Path
+            The record files to retrieve the indexed rows for.
+        complete : bool, optional
+            Indicates that record_files lists all record files of the style.
+            If True, index entries for files no longer present are removed.
+            (Default is False).
+
+        Returns
+        -------
+        list of dict
+            The todict(full=False, flat=True) representation of each record,
+            in the same order as record_files.
+        """
+        if not self.style_dir.is_dir():
+            return []
+
+        with closing(self.connect()) as con:
+            with con:
+
+                # Fetch existing index entries
+                stored = {}
+                if complete or len(record_files) > self.max_lookup:
+                    query = con.execute('SELECT name, mtime, size, data FROM records')
+                    for name, mtime, size, data in query:
+                        stored[name] = (mtime, size, data)
+                else:
+                    for record_file in record_files:
+                        query = con.execute('SELECT name, mtime, size, data FROM records '
+                                            'WHERE name = ?', (record_file.stem,))
+                        for name, mtime, size, data in query:
+                            stored[name] = (mtime, size, data)
+
+                rows = []
+                updates = []
+                for record_file in record_files:
+                    name = record_file.stem
+                    stat = record_file.stat()
+
+                    # Use the indexed values if the file is unchanged
+                    entry = stored.pop(name, None)
+                    if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+                        rows.append(json.loads(entry[2]))
+
+                    # Parse the record and (re)index it
+                    else:
+                        record = load_record(self.style, name, record_file)
+                        row = record.todict(full=False, flat=True)
+                        rows.append(row)
+                        updates.append((name, stat.st_mtime_ns, stat.st_size,
+                                        self.dumps(row)))
+
+                if len(updates) > 0:
+                    con.executemany('INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)',
+                                    updates)
+
+                # Remove entries for deleted record files
+                if complete and len(stored) > 0:
+                    con.executemany('DELETE FROM records WHERE name = ?',
+                                    [(name,) for name in stored])
+
+        return rows
+
+    def update(self, record, record_file):
+        """
+        Adds or replaces the index entry for a record.
+
+        Parameters
+        ----------
+        record : iprPy.Record
+            The record to index.
+        record_file : pathlib.Path
+            The file where the record's content is saved.
+        """
+        self.update_many([record], [record_file])
+
+    def update_many(self, records, record_files):
+        """
+        Adds or replaces the index entries for multiple records in a single
+        transaction.  The entries are built from the saved files rather than
+        the given record objects, as values such as empty strings do not
+        survive saving and the entries must match the ones built by rows.
+
+        Parameters
+        ----------
+        records : list of iprPy.Record
+            The records to index.
+        record_files : list of pathlib.Path
+            The files where the records' contents are saved.
+        """
+        updates = []
+        for record, record_file in zip(records, record_files):
+            stat = Path(record_file).stat()
+            record = load_record(self.style, record.name, Path(record_file))
+            row = record.todict(full=False, flat=True)
+            updates.append((record.name, stat.st_mtime_ns, stat.st_size,
+                            self.dumps(row)))
+        if len(updates) == 0:
+            return
+        with closing(self.connect()) as con:
+            with con:
+                con.executemany('INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)',
+                                updates)
+
+    def delete(self, name):
+        """
+        Removes the index entry for a record if it exists.
+
+        Parameters
+        ----------
+        name : str
+            The name of the record to remove.
+        """
+        self.delete_many([name])
+
+    def delete_many(self, names):
+        """
+        Removes the index entries for multiple records if they exist.
+
+        Parameters
+        ----------
+        names : list of str
+            The names of the records to remove.
+        """
+        if not self.path.is_file() or len(names) == 0:
+            return
+        with closing(self.connect()) as con:
+            with con:
+                con.executemany('DELETE FROM records WHERE name = ?',
+                                [(name,) for name in names])
+
+    @staticmethod
+    def dumps(row):
+        """Converts a flat dictionary to a JSON str, handling numpy types."""
+        def default(value):
+            if isinstance(value, np.generic):
+                return value.item()
+            raise TypeError(f'{type(value)} not JSON serializable')
+        return json.dumps(row, default=default)
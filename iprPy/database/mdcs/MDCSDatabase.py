@@ -1,7 +1,6 @@
 # Standard Python libraries
 from pathlib import Path
-import shutil
-import tarfile
+import time
 from io import BytesIO
 
 from mdcs import MDCS
@@ -18,6 +17,8 @@ from DataModelDict import DataModelDict as DM
 # iprPy imports
 from ...tools import aslist, iaslist
 from .. import Database
+from ..todicts import todicts, load_records
+from ..archive import ArchiveStats, ArchiveReader, open_archive
 from ... import load_record
 from ...record import loaded as record_styles
 
@@ -53,7 +54,7 @@ class MDCSDatabase(Database):
         Database.__init__(self, host)
     
     def get_records(self, name=None, style=None, query=None, return_df=False,
-                    **kwargs):
+                    workers=None, executor=None, **kwargs):
         """
         Produces a list of all matching records in the database.
         
@@ -63,14 +64,21 @@ class MDCSDatabase(Database):
             The record name or id to limit the search by.
         style : str, optional
             The record style to limit the search by.
+        workers : int, optional
+            The number of processes to use for parsing the records.  Default
+            value of None handles all records serially.  Starting the
+            processes and sending them the records costs more than is saved
+            for small numbers of records, typically fewer than a few thousand.
+        executor : concurrent.futures.Executor, optional
+            An existing executor (i.e. process pool) to use for parsing the
+            records.  Cannot be given with workers.
             
         Returns
         ------
         list of iprPy.Records
             All records from the database matching the given parameters.
         """
-        df = []
-        records = []
+        entries = []
         types = {}
         if query is not None:
             # Get data using query
@@ -79,11 +87,7 @@ class MDCSDatabase(Database):
                 
                 if row.schema not in types:
                     types[row.schema] = self.mdcs.template_select_one(id=row.schema).title
-                
-                # Load as Record object
-                record = load_record(types[row.schema], row.title, row.content)
-                records.append(record)
-                df.append(record.todict(full=False, flat=True))
+                entries.append((types[row.schema], row.title, row.content))
         else:
             # Iterate through all files matching style, name values
             for s in iaslist(style):
@@ -92,12 +96,11 @@ class MDCSDatabase(Database):
                     for row in data.itertuples():
                         if row.schema not in types:
                             types[row.schema] = self.mdcs.template_select_one(id=row.schema).title
-                        
-                        # Load as Record object
-                        record = load_record(types[row.schema], row.title, row.content)
-                        records.append(record)
-                        df.append(record.todict(full=False, flat=True))
+                        entries.append((types[row.schema], row.title, row.content))
         
+        # Load as Record objects and get their flat terms
+        records, df = load_records(entries, todict=True, workers=workers,
+                                   executor=executor)
         records = np.array(records)
         df = pd.DataFrame(df)
         
@@ -111,7 +114,7 @@ class MDCSDatabase(Database):
             return list(records[df.index.tolist()])
     
     def get_records_df(self, name=None, style=None, query=None, full=True,
-                       flat=False, **kwargs):
+                       flat=False, workers=None, executor=None, **kwargs):
         """
         Produces a list of all matching records in the database.
         
@@ -121,14 +124,33 @@ class MDCSDatabase(Database):
             The record name or id to limit the search by.
         style : str, optional
             The record style to limit the search by.
+        full : bool, optional
+            Flag used by the calculation records.  A True value will include
+            terms for both the calculation's input and results, while a value
+            of False will only include input terms (Default is True).
+        flat : bool, optional
+            Flag affecting the format of the dictionary terms.  If True, the
+            dictionary terms are limited to having only str, int, and float
+            values, which is useful for comparisons.  If False, the term
+            values can be of any data type, which is convenient for analysis.
+            (Default is False).
+        workers : int, optional
+            The number of processes to use for parsing the records and
+            building the dictionaries.  Default value of None handles all
+            records serially.  Starting the processes and sending them the
+            records costs more than is saved for small numbers of records,
+            typically fewer than a few thousand.
+        executor : concurrent.futures.Executor, optional
+            An existing executor (i.e. process pool) to use for parsing the
+            records.  Cannot be given with workers.
             
         Returns
         ------
-        list of iprPy.Records
+        pandas.DataFrame
             All records from the database matching the given parameters.
         """
         
-        df = []
+        entries = []
         types = {}
         if query is not None:
             # Get data using query
@@ -136,10 +158,7 @@ class MDCSDatabase(Database):
             for row in data.itertuples():
                 if row.schema not in types:
                     types[row.schema] = self.mdcs.template_select_one(id=row.schema).title
-                
-                # Load as Record object
-                record = load_record(types[row.schema], row.title, row.content)
-                df.append(record.todict(full=full, flat=flat))
+                entries.append((types[row.schema], row.title, row.content))
         else:
             # Iterate through all files matching style, name values
             for s in iaslist(style):
@@ -148,10 +167,11 @@ class MDCSDatabase(Database):
                     for row in data.itertuples():
                         if row.schema not in types:
                             types[row.schema] = self.mdcs.template_select_one(id=row.schema).title
-                        
-                        # Load as Record object
-                        record = load_record(types[row.schema], row.title, row.content)
-                        df.append(record.todict(full=full, flat=flat))
+                        entries.append((types[row.schema], row.title, row.content))
+        
+        # Load as Record objects and convert to dicts
+        df = todicts(entries, full=full, flat=flat, workers=workers,
+                     executor=executor)
         df = pd.DataFrame(df)
         
         if len(df) > 0:
@@ -343,7 +363,123 @@ class MDCSDatabase(Database):
         # Delete record
         self.mdcs.delete(record.name)
     
-    def add_tar(self, record=None, name=None, style=None, tar=None, root_dir=None):
+    def existing_names(self, style):
+        """
+        Lists the names of all records of a style with a single query.
+        
+        Parameters
+        ----------
+        style : str
+            The record style.
+        
+        Returns
+        -------
+        set of str
+            The names of the existing records.
+        """
+        data = self.mdcs.select(template=style)
+        if len(data) == 0:
+            return set()
+        return set(data.title)
+    
+    def add_records(self, records, ignore_existing=False):
+        """
+        Adds multiple new records to the database, checking which already
+        exist with one query per record style.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record
+            The new records to add to the database.
+        ignore_existing : bool, optional
+            If False (default), a ValueError is issued if any of the records
+            already exist in the database, in which case no records are added.
+            If True, records that already exist are skipped and left
+            unchanged.
+        
+        Returns
+        -------
+        list of iprPy.Record
+            The records that were added.
+        """
+        # Check for existing records
+        existing = {}
+        added = []
+        for record in records:
+            if record.style not in existing:
+                existing[record.style] = self.existing_names(record.style)
+            if record.name in existing[record.style]:
+                if not ignore_existing:
+                    raise ValueError(f'Record {record.name} already exists')
+            else:
+                added.append(record)
+        
+        # Upload records to database
+        for record in added:
+            self.mdcs.curate(record.content.xml(), record.name, record.style)
+        
+        return added
+    
+    def update_records(self, records):
+        """
+        Replaces multiple existing records with new records of matching names
+        and styles, but new content, checking that the records exist with one
+        query per record style.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record
+            The records with new content to update in the database.
+        
+        Returns
+        -------
+        list of iprPy.Record
+            The updated records.
+        
+        Raises
+        ------
+        ValueError
+            If any of the records are not found, in which case no records are
+            updated.
+        """
+        self.__check_existing(records)
+        for record in records:
+            self.mdcs.delete(record.name)
+            self.mdcs.curate(record.content.xml(), record.name, record.style)
+        
+        return list(records)
+    
+    def delete_records(self, records):
+        """
+        Permanently deletes multiple records from the database, checking that
+        the records exist with one query per record style.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record
+            The records to delete from the database.
+        
+        Raises
+        ------
+        ValueError
+            If any of the records are not found, in which case no records are
+            deleted.
+        """
+        self.__check_existing(records)
+        for record in records:
+            self.mdcs.delete(record.name)
+    
+    def __check_existing(self, records):
+        """Raises a ValueError if any of the records do not exist."""
+        existing = {}
+        for record in records:
+            if record.style not in existing:
+                existing[record.style] = self.existing_names(record.style)
+            if record.name not in existing[record.style]:
+                raise ValueError(f'Cannot find matching record {record.name} ({record.style})')
+    
+    def add_tar(self, record=None, name=None, style=None, tar=None, root_dir=None,
+                compression='gzip', level=None):
         """
         Archives and stores a folder associated with a record.  Issues an
         error if exactly one matching record is not found in the database, or
@@ -369,6 +505,16 @@ class MDCSDatabase(Database):
             The directory to archive is at <root_dir>/<name>.  (Default is to
             set root_dir to the current working directory.)  tar cannot be given
             with root_dir.
+        compression : str, optional
+            The compression used when archiving root_dir: 'gzip' (default),
+            'zstd' or 'none'.  zstd requires the zstandard package.
+        level : int, optional
+            The compression level.  Default uses the algorithm's default.
+        
+        Returns
+        -------
+        iprPy.database.ArchiveStats
+            The size and write speed of the stored archive.
         
         Raises
         ------
@@ -394,28 +540,21 @@ class MDCSDatabase(Database):
             raise ValueError('Record already has an archive')
         
         if tar is None: 
-            filename = Path(record.name + '.tar.gz')
-            
-            # Make archive
-            shutil.make_archive(record.name, 'gztar', root_dir=root_dir,
-                                base_dir=record.name)
-            
-            # Upload archive
-            tries = 0
-            while tries < 2:
-                if True:
-                    url = self.mdcs.blob_upload(filename.as_posix())
-                    break
-                else:
-                    tries += 1
-            if tries == 2:
-                raise ValueError('Failed to upload archive 2 times')
+            if root_dir is None:
+                root_dir = '.'
             
-            # Remove local archive copy
-            filename.unlink()
+            # Upload archive as it is built
+            archive = ArchiveReader(Path(root_dir, record.name),
+                                    compression=compression, level=level)
+            try:
+                url = self.mdcs.blob_upload(archive)
+            finally:
+                archive.close()
+            stats = archive.stats
             
         elif root_dir is None:
             # Upload archive
+            start = time.perf_counter()
             tries = 0
             while tries < 2:
                 if True:
@@ -425,6 +564,7 @@ class MDCSDatabase(Database):
                     tries += 1
             if tries == 2:
                 raise ValueError('Failed to upload archive 2 times')
+            stats = ArchiveStats(len(tar), len(tar), time.perf_counter() - start)
         
         else:
             raise ValueError('tar and root_dir cannot both be given')
@@ -435,6 +575,8 @@ class MDCSDatabase(Database):
         record.content[root_key]['archive']['url'] = url
         
         self.update_record(record=record)
+        
+        return stats
 
     def get_tar(self, record=None, name=None, style=None, raw=False):
         """
@@ -488,9 +630,86 @@ class MDCSDatabase(Database):
         if raw is True:
             return tardata
         else:
-            return tarfile.open(fileobj = BytesIO(tardata))
+            return open_archive(tardata)
+    
+    def get_tars(self, records=None, name=None, style=None, raw=False):
+        """
+        Retrieves the tar archives associated with multiple records.  The
+        archive urls are read from the given records without querying for
+        them again.  Records without archives are skipped.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record, optional
+            The records to retrieve the associated tar archives for.  Cannot
+            be given with name or style.
+        name : str or list, optional
+            The name(s) of the records to retrieve the archives for.
+        style : str or list, optional
+            The style(s) of the records to retrieve the archives for.
+        raw : bool, optional
+            If True, return the archives as raw binary content. If
+            False, return as open tarfiles. (Default is False)
+        
+        Returns
+        -------
+        dict
+            The tar archives as open tarfiles or binary str, keyed by the
+            record names.
+        """
+        if records is None:
+            records = self.get_records(name=name, style=style)
+        elif name is not None or style is not None:
+            raise ValueError('records cannot be given with name/style')
+        
+        tars = {}
+        for record in records:
+            archive = record.content.finds('archive')
+            if len(archive) == 0:
+                continue
+            tardata = self.mdcs.blob_download(archive[0]['url'])
+            if raw is True:
+                tars[record.name] = tardata
+            else:
+                tars[record.name] = open_archive(tardata)
+        return tars
+    
+    def get_tar_versions(self, records=None, name=None, style=None):
+        """
+        Identifies the versions of the tar archives associated with multiple
+        records.  The version of an archive is its blob url, which changes
+        whenever the archive is replaced.  Records without archives are
+        skipped.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record, optional
+            The records to identify the archive versions for.  Cannot be
+            given with name or style.
+        name : str or list, optional
+            The name(s) of the records to identify the archive versions for.
+        style : str or list, optional
+            The style(s) of the records to identify the archive versions for.
+        
+        Returns
+        -------
+        dict
+            The archive versions as str, keyed by the record names.
+        """
+        if records is None:
+            records = self.get_records(name=name, style=style)
+        elif name is not None or style is not None:
+            raise ValueError('records cannot be given with name/style')
+        
+        versions = {}
+        for record in records:
+            archive = record.content.finds('archive')
+            if len(archive) > 0:
+                versions[record.name] = archive[0]['url']
+        return versions
     
-    def update_tar(self, record=None, name=None, style=None, tar=None, root_dir=None):
+    def update_tar(self, record=None, name=None, style=None, tar=None, root_dir=None,
+                   compression='gzip', level=None):
         """
         Archives and stores a folder associated with a record.  Issues an
         error if exactly one matching record is not found in the database, or
@@ -516,6 +735,16 @@ class MDCSDatabase(Database):
             The directory to archive is at <root_dir>/<name>.  (Default is to
             set root_dir to the current working directory.)  tar cannot be given
             with root_dir.
+        compression : str, optional
+            The compression used when archiving root_dir: 'gzip' (default),
+            'zstd' or 'none'.  zstd requires the zstandard package.
+        level : int, optional
+            The compression level.  Default uses the algorithm's default.
+        
+        Returns
+        -------
+        iprPy.database.ArchiveStats
+            The size and write speed of the stored archive.
         
         Raises
         ------
@@ -537,28 +766,21 @@ class MDCSDatabase(Database):
             record = self.get_record(name=record.name, style=record.style)
         
         if tar is None: 
-            filename = Path(record.name+'.tar.gz')
-            
-            # Make archive
-            shutil.make_archive(record.name, 'gztar', root_dir=root_dir,
-                                base_dir=record.name)
+            if root_dir is None:
+                root_dir = '.'
             
-            # Upload archive
-            tries = 0
-            while tries < 2:
-                if True:
-                    url = self.mdcs.blob_upload(filename.as_posix())
-                    break
-                else:
-                    tries += 1
-            if tries == 2:
-                raise ValueError('Failed to upload archive 2 times')
-            
-            # Remove local archive copy
-            filename.unlink()
+            # Upload archive as it is built
+            archive = ArchiveReader(Path(root_dir, record.name),
+                                    compression=compression, level=level)
+            try:
+                url = self.mdcs.blob_upload(archive)
+            finally:
+                archive.close()
+            stats = archive.stats
             
         elif root_dir is None:
             # Upload archive
+            start = time.perf_counter()
             tries = 0
             while tries < 2:
                 if True:
@@ -568,6 +790,7 @@ class MDCSDatabase(Database):
                     tries += 1
             if tries == 2:
                 raise ValueError('Failed to upload archive 2 times')
+            stats = ArchiveStats(len(tar), len(tar), time.perf_counter() - start)
         
         else:
             raise ValueError('tar and root_dir cannot both be given')
@@ -577,4 +800,6 @@ class MDCSDatabase(Database):
         record.content[root_key]['archive'] = DM()
         record.content[root_key]['archive']['url'] = url
         
-        self.update_record(record=record)
\ No newline at end of file
+        self.update_record(record=record)
+        
+        return stats
@@ -1,7 +1,7 @@
 # Standard Python libraries
 from pathlib import Path
 import shutil
-import tarfile
+import time
 from collections import OrderedDict
 
 # http://www.numpy.org/
@@ -11,7 +11,8 @@ import numpy as np
 import pandas as pd
 
 # https://api.mongodb.com/python/current/
-from pymongo import MongoClient
+from pymongo import MongoClient, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 from gridfs import GridFS
 
 from DataModelDict import DataModelDict as DM
@@ -19,6 +20,8 @@ from DataModelDict import DataModelDict as DM
 # iprPy imports
 from ...tools import aslist, iaslist
 from .. import Database
+from ..todicts import todicts, load_records
+from ..archive import ArchiveStats, write_archive, open_archive, check_compression
 from ... import load_record
 from ...record import loaded as record_styles
 
@@ -47,6 +50,11 @@ class Mongo(Database):
         database = self.mongodb.name
         host = f'{host}:{port}.{database}'
         
+        # Collections that have been checked and indexed
+        self.__checked = set()
+        self.__unique = set()
+        self.__legacy = set()
+        
         # Pass host to Database initializer
         Database.__init__(self, host)
     
@@ -55,8 +63,287 @@ class Mongo(Database):
         """pymongo.Database : The underlying database API object."""
         return self.__mongodb
     
+    # Name of the subdocument where the flat input terms are stored
+    datafield = 'data'
+    
+    @staticmethod
+    def flatdata(record):
+        """
+        Builds the flat input terms of a record to store with its content.
+        
+        Parameters
+        ----------
+        record : iprPy.Record
+            The record.
+        
+        Returns
+        -------
+        dict
+            The record's todict(full=False, flat=True) terms with numpy
+            scalars converted to Python values.
+        """
+        data = {}
+        for key, value in record.todict(full=False, flat=True).items():
+            if isinstance(value, np.generic):
+                value = value.item()
+            data[key] = value
+        return data
+    
+    # Flat input terms that are indexed as they are commonly searched by
+    indexed_terms = ['status', 'script', 'family', 'potential_LAMMPS_key',
+                     'potential_LAMMPS_id', 'potential_key', 'potential_id']
+    
+    def collection(self, style, create=False):
+        """
+        Returns the collection for a record style.  The first time each
+        existing collection is accessed, a unique index is built for the
+        record names and indexes for the indexed_terms fields, and the
+        collection is checked for entries stored without flat input terms by
+        older versions.  Indexes are not built if the user cannot write to
+        the database.
+        
+        Parameters
+        ----------
+        style : str
+            The record style.
+        create : bool, optional
+            If True, the collection's indexes are built even if it does not
+            exist yet, i.e. before records are inserted.  (Default is False.)
+        
+        Returns
+        -------
+        pymongo.collection.Collection
+            The style's collection.
+        """
+        collection = self.mongodb[style]
+        if (style not in self.__checked
+            and (create or style in self.mongodb.list_collection_names())):
+            
+            # Fall back on a non-unique index if names are already duplicated
+            try:
+                try:
+                    collection.create_index('name', unique=True)
+                except OperationFailure as e:
+                    if e.code in self.unauthorized:
+                        raise
+                    collection.create_index('name')
+                else:
+                    self.__unique.add(style)
+                for term in self.indexed_terms:
+                    collection.create_index(f'{self.datafield}.{term}')
+            except OperationFailure as e:
+                if e.code not in self.unauthorized:
+                    raise
+            
+            # Check for entries saved by older versions
+            if collection.find_one({self.datafield: {'$exists': False}},
+                                   projection=['_id']) is not None:
+                self.__legacy.add(style)
+            self.__checked.add(style)
+        return collection
+    
+    # Mongo error codes for operations that the user is not allowed to do
+    unauthorized = (13, 8000)
+    
+    def migrate(self, style=None):
+        """
+        Adds the flat input terms to entries that were stored without them
+        by older versions of iprPy.  Until migrated, such entries are
+        filtered after being transferred rather than by the Mongo server.
+        
+        Parameters
+        ----------
+        style : str or list, optional
+            The record style(s) to migrate.  Default value of None migrates
+            all record styles.
+        
+        Returns
+        -------
+        int
+            The number of entries that were updated.
+        """
+        if style is None:
+            style = list(record_styles.keys())
+        else:
+            style = aslist(style)
+        
+        count = 0
+        for s in style:
+            collection = self.collection(s)
+            query = {self.datafield: {'$exists': False}}
+            updates = []
+            for entry in collection.find(query, projection=['name', 'content']):
+                record = load_record(s, entry['name'], entry['content'])
+                updates.append(UpdateOne({'_id': entry['_id']},
+                                         {'$set': {self.datafield: self.flatdata(record)}}))
+                
+                # Send updates in batches
+                if len(updates) == 1000:
+                    count += collection.bulk_write(updates, ordered=False).modified_count
+                    updates = []
+            if len(updates) > 0:
+                count += collection.bulk_write(updates, ordered=False).modified_count
+            self.__legacy.discard(s)
+        return count
+    
+    def find(self, style, name=None, query=None, projection=None, **kwargs):
+        """
+        Iterates over the entries of a style's collection that match the
+        get_records parameters.  Entries stored without flat input terms by
+        older versions are given terms built from their content and filtered
+        by them.
+        
+        Parameters
+        ----------
+        style : str
+            The record style.
+        name : str or list, optional
+            The record name(s) to limit the search by.
+        query : dict, optional
+            A Mongo query to include.  Cannot be given with name.
+        projection : list, optional
+            The entry fields to return.  Default value of None returns all
+            fields.
+        **kwargs : any, optional
+            Values of the flat input terms to limit the search by.
+        
+        Yields
+        ------
+        dict
+            The matching entries.
+        """
+        collection = self.collection(style)
+        if style not in self.__legacy:
+            yield from collection.find(self.buildquery(style, name=name,
+                                                       query=query, **kwargs),
+                                       projection=projection)
+            return
+        
+        # Filter entries with stored terms on the server
+        exists = {self.datafield: {'$exists': True}}
+        stored = self.buildquery(style, name=name, query=query, **kwargs)
+        if len(stored) > 0:
+            stored = {'$and': [stored, exists]}
+        else:
+            stored = exists
+        yield from collection.find(stored, projection=projection)
+        
+        # Build terms for older entries and filter them here
+        legacy = self.buildquery(style, name=name, query=query)
+        missing = {self.datafield: {'$exists': False}}
+        if len(legacy) > 0:
+            legacy = {'$and': [legacy, missing]}
+        else:
+            legacy = missing
+        if projection is not None:
+            projection = list(set(projection) | {'name', 'content'})
+        for entry in collection.find(legacy, projection=projection):
+            record = load_record(style, entry['name'], entry['content'])
+            entry[self.datafield] = data = self.flatdata(record)
+            match = True
+            for key in kwargs:
+                values = [value.item() if isinstance(value, np.generic) else value
+                          for value in aslist(kwargs[key])]
+                if data.get(key, None) not in values:
+                    match = False
+                    break
+            if match:
+                yield entry
+    
+    def buildentry(self, record):
+        """
+        Builds the Mongo entry for a record.
+        
+        Parameters
+        ----------
+        record : iprPy.Record
+            The record.
+        
+        Returns
+        -------
+        collections.OrderedDict
+            The entry containing the record's name, content and flat input
+            terms.
+        """
+        entry = OrderedDict()
+        entry['name'] = record.name
+        entry['content'] = record.content
+        entry[self.datafield] = self.flatdata(record)
+        return entry
+    
+    def existing_names(self, style, names):
+        """
+        Finds which of a list of record names exist in a style's collection.
+        
+        Parameters
+        ----------
+        style : str
+            The record style.
+        names : list of str
+            The record names to check.
+        
+        Returns
+        -------
+        set of str
+            The names that exist.
+        """
+        collection = self.collection(style)
+        existing = set()
+        chunksize = 10000
+        for i in range(0, len(names), chunksize):
+            query = {'name': {'$in': names[i:i+chunksize]}}
+            for entry in collection.find(query, projection=['name']):
+                existing.add(entry['name'])
+        return existing
+    
+    def buildquery(self, style, name=None, query=None, **kwargs):
+        """
+        Builds a native Mongo filter from the get_records parameters.
+        
+        Parameters
+        ----------
+        style : str
+            The record style being searched.
+        name : str or list, optional
+            The record name(s) to limit the search by.
+        query : dict, optional
+            A Mongo query to include.  Cannot be given with name.
+        **kwargs : any, optional
+            Values of the flat input terms to limit the search by.  Each
+            term is matched if it equals any of the given values.
+        
+        Returns
+        -------
+        dict
+            The combined Mongo filter.
+        """
+        filters = []
+        if query is None:
+            if name is not None:
+                filters.append({'name': {'$in': aslist(name)}})
+        elif name is not None:
+            raise ValueError('name and query cannot both be given')
+        else:
+            filters.append(query)
+        
+        for key in kwargs:
+            field = f'{self.datafield}.{key}'
+            values = []
+            for value in aslist(kwargs[key]):
+                if isinstance(value, np.generic):
+                    value = value.item()
+                values.append(value)
+            filters.append({field: {'$in': values}})
+        
+        if len(filters) == 0:
+            return {}
+        elif len(filters) == 1:
+            return filters[0]
+        else:
+            return {'$and': filters}
+    
     def get_records(self, name=None, style=None, query=None, return_df=False,
-                    **kwargs):
+                    workers=None, executor=None, **kwargs):
         """
         Produces a list of all matching records in the database.
         
@@ -66,9 +353,22 @@ class Mongo(Database):
             The record name or id to limit the search by.
         style : str, optional
             The record style to limit the search by.
-        query : str, optional
-            A query str for identifying records.  Not supported by this style.
+        query : dict, optional
+            A Mongo query for identifying records.  Cannot be given with name.
         return_df : bool, optional
+            If True, the records' flat input terms are also returned as a
+            pandas.DataFrame.
+        workers : int, optional
+            The number of processes to use for parsing the records.  Default
+            value of None handles all records serially.  Starting the
+            processes and sending them the records costs more than is saved
+            for small numbers of records, typically fewer than a few thousand.
+        executor : concurrent.futures.Executor, optional
+            An existing executor (i.e. process pool) to use for parsing the
+            records.  Cannot be given with workers.
+        **kwargs : any, optional
+            Values of the records' flat input terms to limit the search by.
+            The filters are applied by the Mongo server.
             
         Returns
         ------
@@ -81,40 +381,23 @@ class Mongo(Database):
         else:
             style = aslist(style)
 
-        # Handle query-based parameters
-        if query is None:
-            query = {}
-            if name is not None:
-                query['name'] = {}
-                query['name']['$in'] = aslist(name)
-        elif name is not None:
-            raise ValueError('name and query cannot both be given')
-        
         df = []
-        records = []
+        entries = []
         for s in style:
-            collection = self.mongodb[s]
-            for entry in collection.find(query):
-                
-                # Load as Record object
-                record = load_record(s, entry['name'], entry['content'])
-                records.append(record)
-                df.append(record.todict(full=False, flat=True))
-                
-        records = np.array(records)
-        df = pd.DataFrame(df)
-
-        if len(df) > 0:
-            for key in kwargs:
-                df = df[df[key].isin(aslist(kwargs[key]))]
-
+            for entry in self.find(s, name=name, query=query, **kwargs):
+                entries.append((s, entry['name'], entry['content']))
+                df.append(entry[self.datafield])
+        
+        # Load as Record objects
+        records = load_records(entries, workers=workers, executor=executor)
+        
         if return_df:
-            return list(records[df.index.tolist()]), df.reset_index(drop=True)
+            return records, pd.DataFrame(df)
         else:
-            return list(records[df.index.tolist()])
+            return records
 
     def get_records_df(self, name=None, style=None, query=None, full=True,
-                       flat=False, **kwargs):
+                       flat=False, workers=None, executor=None, **kwargs):
         """
         Produces a list of all matching records in the database.
         
@@ -124,10 +407,34 @@ class Mongo(Database):
             The record name or id to limit the search by.
         style : str, optional
             The record style to limit the search by.
+        query : dict, optional
+            A Mongo query for identifying records.  Cannot be given with name.
+        full : bool, optional
+            Flag used by the calculation records.  A True value will include
+            terms for both the calculation's input and results, while a value
+            of False will only include input terms (Default is True).
+        flat : bool, optional
+            Flag affecting the format of the dictionary terms.  If True, the
+            dictionary terms are limited to having only str, int, and float
+            values, which is useful for comparisons.  If False, the term
+            values can be of any data type, which is convenient for analysis.
+            (Default is False).
+        workers : int, optional
+            The number of processes to use for parsing the records and
+            building the dictionaries.  Default value of None handles all
+            records serially.  Starting the processes and sending them the
+            records costs more than is saved for small numbers of records,
+            typically fewer than a few thousand.
+        executor : concurrent.futures.Executor, optional
+            An existing executor (i.e. process pool) to use for parsing the
+            records.  Cannot be given with workers.
+        **kwargs : any, optional
+            Values of the records' flat input terms to limit the search by.
+            The filters are applied by the Mongo server.
             
         Returns
         ------
-        list of iprPy.Records
+        pandas.DataFrame
             All records from the database matching the given parameters.
         """
         
@@ -136,31 +443,66 @@ class Mongo(Database):
         else:
             style = aslist(style)
 
-        # Handle query-based parameters
-        if query is None:
-            query = {}
-            if name is not None:
-                query['name'] = {}
-                query['name']['$in'] = aslist(name)
-        elif name is not None:
-            raise ValueError('name and query cannot both be given')
+        # The stored flat input terms are used directly if requested
+        stored = full is False and flat is True
+        if stored:
+            projection = [self.datafield]
+        else:
+            projection = ['name', 'content']
         
         df = []
+        entries = []
         for s in style:
-            collection = self.mongodb[s]
-            for entry in collection.find(query):
-                    
-                # Load as Record object
-                record = load_record(s, entry['name'], entry['content'])
-                df.append(record.todict(full=full, flat=flat))
-                
-        df = pd.DataFrame(df)
+            for entry in self.find(s, name=name, query=query,
+                                   projection=projection, **kwargs):
+                if stored:
+                    df.append(entry[self.datafield])
+                else:
+                    entries.append((s, entry['name'], entry['content']))
         
-        if len(df) > 0:
-            for key in kwargs:
-                df = df[df[key].isin(aslist(kwargs[key]))]
+        # Load as Record objects and convert to dicts
+        if not stored:
+            df = todicts(entries, full=full, flat=flat, workers=workers,
+                         executor=executor)
+        
+        return pd.DataFrame(df)
+    
+    def count_records(self, style, groupby=None, **kwargs):
+        """
+        Counts the records of a given style on the Mongo server.
+        
+        Parameters
+        ----------
+        style : str
+            The record style to count.
+        groupby : str, optional
+            The name of a flat input term, i.e. a todict(full=False,
+            flat=True) key, to count the records by each value of.
+        **kwargs : any, optional
+            Filters on the records' flat input terms, as with get_records.
         
-        return df.reset_index(drop=True)
+        Returns
+        -------
+        int or dict
+            The number of matching records if groupby is None, otherwise
+            a dict of the number of matching records for each value of the
+            groupby term.
+        """
+        collection = self.collection(style)
+        
+        # Count older entries without stored terms with the flat terms
+        if style in self.__legacy:
+            return super().count_records(style, groupby=groupby, **kwargs)
+        
+        query = self.buildquery(style, **kwargs)
+        if groupby is None:
+            return collection.count_documents(query)
+        else:
+            pipeline = [{'$match': query},
+                        {'$group': {'_id': f'${self.datafield}.{groupby}',
+                                    'count': {'$sum': 1}}}]
+            return {group['_id']: group['count']
+                    for group in collection.aggregate(pipeline)}
     
     def get_record(self, name=None, style=None, query=None, **kwargs):
         """
@@ -235,19 +577,155 @@ class Mongo(Database):
         elif style is not None or name is not None or content is not None:
             raise ValueError('kwargs style, name, and content cannot be given with kwarg record')
 
-        # Verify that there isn't already a record with a matching name
-        if len(self.get_records(name=record.name, style=record.style)) > 0:
-            raise ValueError(f'Record {record.name} already exists')
-
         # Create meta mongo entry
-        entry = OrderedDict()
-        entry['name'] = record.name
-        entry['content'] = record.content
+        entry = self.buildentry(record)
+        collection = self.collection(record.style, create=True)
+        
+        # Verify that there isn't already a record with a matching name
+        if record.style not in self.__unique:
+            if collection.count_documents({'name': record.name}, limit=1) > 0:
+                raise ValueError(f'Record {record.name} already exists')
         
         # Upload to mongodb
-        self.mongodb[record.style].insert_one(entry)
+        try:
+            collection.insert_one(entry)
+        except DuplicateKeyError:
+            raise ValueError(f'Record {record.name} already exists')
 
         return record
+    
+    def add_records(self, records, ignore_existing=False):
+        """
+        Adds multiple new records to the database using one insert_many call
+        for each record style.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record
+            The new records to add to the database.
+        ignore_existing : bool, optional
+            If False (default), a ValueError is issued if any of the records
+            already exist in the database, in which case no records are added.
+            If True, records that already exist are skipped and left
+            unchanged.
+        
+        Returns
+        -------
+        list of iprPy.Record
+            The records that were added.
+        """
+        # Group records by style
+        styles = OrderedDict()
+        for record in records:
+            styles.setdefault(record.style, []).append(record)
+        
+        # Check for existing records
+        added = {}
+        for style, style_records in styles.items():
+            self.collection(style, create=True)
+            existing = self.existing_names(style, [record.name for record in style_records])
+            if len(existing) > 0 and not ignore_existing:
+                raise ValueError(f'Record {sorted(existing)[0]} already exists')
+            added[style] = [record for record in style_records
+                            if record.name not in existing]
+        
+        # Insert new records, skipping any added since the check
+        for style, style_records in added.items():
+            if len(style_records) == 0:
+                continue
+            entries = [self.buildentry(record) for record in style_records]
+            try:
+                self.collection(style).insert_many(entries, ordered=False)
+            except BulkWriteError as err:
+                failed = set()
+                for error in err.details['writeErrors']:
+                    if error['code'] != 11000:
+                        raise
+                    failed.add(error['index'])
+                if not ignore_existing:
+                    name = style_records[min(failed)].name
+                    raise ValueError(f'Record {name} already exists')
+                added[style] = [record for i, record in enumerate(style_records)
+                                if i not in failed]
+        
+        added_names = set()
+        for style_records in added.values():
+            added_names.update([(record.style, record.name) for record in style_records])
+        return [record for record in records
+                if (record.style, record.name) in added_names]
+    
+    def update_records(self, records):
+        """
+        Replaces multiple existing records with new records of matching names
+        and styles, but new content, using one bulk_write call for each record
+        style.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record
+            The records with new content to update in the database.
+        
+        Returns
+        -------
+        list of iprPy.Record
+            The updated records.
+        
+        Raises
+        ------
+        ValueError
+            If any of the records are not found, in which case no records are
+            updated.
+        """
+        # Group records by style
+        styles = OrderedDict()
+        for record in records:
+            styles.setdefault(record.style, []).append(record)
+        
+        # Verify that the records exist
+        for style, style_records in styles.items():
+            names = [record.name for record in style_records]
+            missing = set(names).difference(self.existing_names(style, names))
+            if len(missing) > 0:
+                raise ValueError(f'Cannot find matching record {sorted(missing)[0]} ({style})')
+        
+        # Replace the entries
+        for style, style_records in styles.items():
+            requests = [ReplaceOne({'name': record.name}, self.buildentry(record))
+                        for record in style_records]
+            self.collection(style).bulk_write(requests, ordered=False)
+        
+        return list(records)
+    
+    def delete_records(self, records):
+        """
+        Permanently deletes multiple records from the database using one
+        delete_many call for each record style.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record
+            The records to delete from the database.
+        
+        Raises
+        ------
+        ValueError
+            If any of the records are not found, in which case no records are
+            deleted.
+        """
+        # Group record names by style
+        styles = OrderedDict()
+        for record in records:
+            styles.setdefault(record.style, []).append(record.name)
+        
+        # Verify that the records exist
+        for style, names in styles.items():
+            missing = set(names).difference(self.existing_names(style, names))
+            if len(missing) > 0:
+                raise ValueError(f'Cannot find matching record {sorted(missing)[0]} ({style})')
+        
+        # Delete the entries
+        for style, names in styles.items():
+            self.collection(style).delete_many({'name': {'$in': names}})
 
     def update_record(self, record=None, style=None, name=None, content=None):
         """
@@ -350,7 +828,8 @@ class Mongo(Database):
         # Delete record 
         self.mongodb[record.style].delete_one(query)
 
-    def add_tar(self, record=None, name=None, style=None, tar=None, root_dir=None):
+    def add_tar(self, record=None, name=None, style=None, tar=None, root_dir=None,
+                compression='gzip', level=None):
         """
         Archives and stores a folder associated with a record.  Issues an
         error if exactly one matching record is not found in the database, or
@@ -376,6 +855,16 @@ class Mongo(Database):
             The directory to archive is at <root_dir>/<name>.  (Default is to
             set root_dir to the current working directory.)  tar cannot be given
             with root_dir.
+        compression : str, optional
+            The compression used when archiving root_dir: 'gzip' (default),
+            'zstd' or 'none'.  zstd requires the zstandard package.
+        level : int, optional
+            The compression level.  Default uses the algorithm's default.
+        
+        Returns
+        -------
+        iprPy.database.ArchiveStats
+            The size and write speed of the stored archive.
         
         Raises
         ------
@@ -403,41 +892,29 @@ class Mongo(Database):
             raise ValueError('Record already has an archive')
         
         if tar is None:
-        
-            # Make archive
-            shutil.make_archive(record.name, 'gztar', root_dir=root_dir,
-                                base_dir=record.name)
-        
-            # Upload archive
-            filename = Path(record.name + '.tar.gz')
-            with open(filename, 'rb') as f:
-                tries = 0
-                while tries < 2:
-                    if True:
-                        mongofs.put(f, recordname=record.name)
-                        break
-                    else:
-                        tries += 1
-                if tries == 2:
-                    raise ValueError('Failed to upload archive 2 times')
-        
-            # Remove local archive copy
-            filename.unlink()
+            if root_dir is None:
+                root_dir = '.'
+            
+            # Stream archive directly into GridFS
+            gridin = mongofs.new_file(recordname=record.name)
+            try:
+                stats = write_archive(gridin, Path(root_dir, record.name),
+                                      compression=compression, level=level)
+            except:
+                gridin.abort()
+                raise
+            gridin.close()
             
         elif root_dir is None:
             # Upload archive
-            tries = 0
-            while tries < 2:
-                if True:
-                    mongofs.put(tar, recordname=record.name)
-                    break
-                else:
-                    tries += 1
-            if tries == 2:
-                raise ValueError('Failed to upload archive 2 times')
+            start = time.perf_counter()
+            mongofs.put(tar, recordname=record.name)
+            stats = ArchiveStats(len(tar), len(tar), time.perf_counter() - start)
         else:
             raise ValueError('tar and root_dir cannot both be given')
         
+        return stats
+        
     def get_tar(self, record=None, name=None, style=None, raw=False):
         """
         Retrives the tar archive associated with a record in the database.
@@ -500,7 +977,145 @@ class Mongo(Database):
         if raw is True:
             return tar.read()
         else:
-            return tarfile.open(fileobj=tar)
+            return open_archive(tar)
+
+    def names_by_style(self, records=None, name=None, style=None):
+        """
+        Groups the names of records by their styles.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record, optional
+            The records to group.  Cannot be given with name or style.
+        name : str or list, optional
+            The name(s) of the records to find and group.
+        style : str or list, optional
+            The style(s) of the records to find and group.
+        
+        Returns
+        -------
+        collections.OrderedDict
+            The lists of record names (values) for each record style (keys).
+        """
+        styles = OrderedDict()
+        if records is None:
+            if style is None:
+                style = list(record_styles.keys())
+            collections = self.mongodb.list_collection_names()
+            for s in aslist(style):
+                if s not in collections:
+                    continue
+                query = self.buildquery(s, name=name)
+                names = [entry['name'] for entry in
+                         self.collection(s).find(query, projection=['name'])]
+                if len(names) > 0:
+                    styles[s] = names
+        elif name is not None or style is not None:
+            raise ValueError('records cannot be given with name/style')
+        else:
+            for record in records:
+                styles.setdefault(record.style, []).append(record.name)
+        return styles
+
+    def get_tars(self, records=None, name=None, style=None, raw=False):
+        """
+        Retrieves the tar archives associated with multiple records using one
+        GridFS query for each record style.  Records without archives are
+        skipped.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record, optional
+            The records to retrieve the associated tar archives for.  Cannot
+            be given with name or style.
+        name : str or list, optional
+            The name(s) of the records to retrieve the archives for.
+        style : str or list, optional
+            The style(s) of the records to retrieve the archives for.
+        raw : bool, optional
+            If True, return the archives as raw binary content. If
+            False, return as open tarfiles. (Default is False)
+        
+        Returns
+        -------
+        dict
+            The tar archives as open tarfiles or binary str, keyed by the
+            record names.
+        """
+        styles = self.names_by_style(records=records, name=name, style=style)
+        
+        tars = {}
+        for s, names in styles.items():
+            mongofs = GridFS(self.mongodb, collection=s)
+            for tar in mongofs.find({'recordname': {'$in': names}}):
+                if raw is True:
+                    tars[tar.recordname] = tar.read()
+                else:
+                    tars[tar.recordname] = open_archive(tar)
+        return tars
+
+    def copy_tars(self, destinations, style=None):
+        """
+        Copies the tar archives associated with multiple records to files,
+        streaming them from GridFS in chunks using one query for each record
+        style.  Records without archives are skipped.
+        
+        Parameters
+        ----------
+        destinations : dict
+            The paths of the files to copy the archives to, keyed by the
+            record names.
+        style : str or list, optional
+            The style(s) of the records.
+        
+        Returns
+        -------
+        list of str
+            The names of the records whose archives were copied.
+        """
+        styles = self.names_by_style(name=list(destinations), style=style)
+        
+        copied = []
+        for s, names in styles.items():
+            mongofs = GridFS(self.mongodb, collection=s)
+            for tar in mongofs.find({'recordname': {'$in': names}}):
+                with open(destinations[tar.recordname], 'wb') as f:
+                    shutil.copyfileobj(tar, f, 1048576)
+                copied.append(tar.recordname)
+        return copied
+
+    def get_tar_versions(self, records=None, name=None, style=None):
+        """
+        Identifies the versions of the tar archives associated with multiple
+        records using one query of the GridFS files for each record style.
+        The version of an archive is the id of its GridFS file, which changes
+        whenever the archive is replaced.  Records without archives are
+        skipped.
+        
+        Parameters
+        ----------
+        records : list of iprPy.Record, optional
+            The records to identify the archive versions for.  Cannot be
+            given with name or style.
+        name : str or list, optional
+            The name(s) of the records to identify the archive versions for.
+        style : str or list, optional
+            The style(s) of the records to identify the archive versions for.
+        
+        Returns
+        -------
+        dict
+            The archive versions as str, keyed by the record names.
+        """
+        styles = self.names_by_style(records=records, name=name, style=style)
+        
+        versions = {}
+        for s, names in styles.items():
+            files = self.mongodb[f'{s}.files']
+            for entry in files.find({'recordname': {'$in': names}},
+                                    projection=['recordname']):
+                versions[entry['recordname']] = str(entry['_id'])
+        return versions
 
     def delete_tar(self, record=None, name=None, style=None):
         """
@@ -555,7 +1170,8 @@ class Mongo(Database):
         # Delete tar
         mongofs.delete(tar._id)
     
-    def update_tar(self, record=None, name=None, style=None, tar=None, root_dir=None):
+    def update_tar(self, record=None, name=None, style=None, tar=None, root_dir=None,
+                   compression='gzip', level=None):
         """
         Replaces an existing tar archive for a record with a new one.  Issues
         an error if exactly one matching record is not found in the database.
@@ -579,10 +1195,25 @@ class Mongo(Database):
             The directory to archive is at <root_dir>/<name>.  (Default is to
             set root_dir to the current working directory.)  tar cannot be given
             with root_dir.
+        compression : str, optional
+            The compression used when archiving root_dir: 'gzip' (default),
+            'zstd' or 'none'.  zstd requires the zstandard package.
+        level : int, optional
+            The compression level.  Default uses the algorithm's default.
+        
+        Returns
+        -------
+        iprPy.database.ArchiveStats
+            The size and write speed of the stored archive.
         """
         
+        # Check compression before deleting the existing archive
+        if tar is None:
+            check_compression(compression)
+        
         # Delete the existing tar archive stored in the database
         self.delete_tar(record=record, name=name, style=style)
         
         # Add the new tar archive
-        self.add_tar(record=record, name=name, style=style, tar=tar, root_dir=root_dir)
\ No newline at end of file
+        return self.add_tar(record=record, name=name, style=style, tar=tar,
+                            root_dir=root_dir, compression=compression, level=level)
\ No newline at end of file
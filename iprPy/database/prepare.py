@@ -1,19 +1,29 @@
 # Standard Python libraries
 from pathlib import Path
+import os
 import uuid
 import shutil
 from copy import deepcopy
 
-import atomman as am
-
 import pandas as pd
 
 # iprPy imports
-from ..tools import aslist, filltemplate
+from ..tools import (aslist, filltemplate, lammps_capabilities,
+                     potential_pair_styles)
 from .. import load_record
-from ..input import buildcombos, parse
-
-def prepare(database, run_directory, calculation, input_script=None, **kwargs):
+from ..input import buildcombos, parse, parsecache
+from .jobqueue import load_jobqueue
+from .duplicates import DuplicateIndex
+from .assets import AssetStore
+from .tarcache import TarCache, iter_tar
+from .archive import open_archive
+
+# Default archive cache shared by prepare calls
+default_tar_cache = TarCache()
+
+def prepare(database, run_directory, calculation, input_script=None,
+            jobqueue=None, index_file=None, shared_assets=True, tar_cache=None,
+            skip_unsupported=False, **kwargs):
     """
     Function for preparing any iprPy calculation for high-throughput execution.
     Input parameters for preparing can either be given within an input script
@@ -31,6 +41,29 @@ def prepare(database, run_directory, calculation, input_script=None, **kwargs):
     input_script : str or file-like object, optional
         The file, path to file, or contents of an input script containing
         parameters for preparing the calculation.  Cannot be given with kwargs.
+    jobqueue : bool or iprPy.database.JobQueue, optional
+        The job queue to add the prepared calculations to.  If None (default),
+        the run directory's sqlite job queue is used if it has one.  If True,
+        the run directory's sqlite job queue is used and created if needed.
+        If False, no job queue is used.
+    index_file : path-like object, optional
+        A file for saving the DuplicateIndex of the calculation records'
+        compare terms between prepare runs.  If given, only the records added
+        or removed since the last run are re-indexed.
+    shared_assets : bool, optional
+        If True (default), the calculation files and the files extracted from
+        tar archives are saved once to the run directory's AssetStore and
+        hard linked into each calculation directory.  If False, the files
+        are copied and extracted into each calculation directory separately.
+    tar_cache : iprPy.database.TarCache, optional
+        The cache to retrieve the tar archives of parent records through.  If
+        not given, a cache shared by all prepare calls in the process is
+        used.
+    skip_unsupported : bool, optional
+        If True, combinations with potentials that use pair styles not
+        available in the lammps_command executable are not prepared.  The
+        executable's pair styles are taken from the LammpsCapabilities
+        registry.  Default value is False.
     **kwargs : str or list
         Input parameters for preparing the calculation.  Values must be strings
         or list of strings if allowed by the calculation.
@@ -55,14 +88,80 @@ def prepare(database, run_directory, calculation, input_script=None, **kwargs):
     kwargs, content_dict = fill_kwargs(database, calculation, kwargs)
 
     # Build all combinations
-    test_records, test_record_df, test_inputfiles, test_contents, content_dict = build_testrecords(database, calculation, content_dict, **kwargs)
+    test_records, test_record_df, test_inputfiles, test_contents, content_dict = build_testrecords(database, calculation, content_dict, skip_unsupported=skip_unsupported, **kwargs)
     print(len(test_record_df), 'record combinations to check', flush=True)
     if len(test_record_df) == 0:
         return
     
     # Find new unique combinations
-    newrecord_df = new_calculations(record_df, test_record_df, record.compare_terms, record.compare_fterms)
+    if index_file is not None:
+        index = DuplicateIndex.load(index_file, record.compare_terms, record.compare_fterms)
+    else:
+        index = None
+    newrecord_df = new_calculations(record_df, test_record_df, record.compare_terms,
+                                    record.compare_fterms, index=index)
     print(len(newrecord_df), 'new records to prepare', flush=True)
+    if index is not None:
+        index.save(index_file)
+    
+    # Get the job queue, if any
+    jobqueue = load_jobqueue(run_directory, jobqueue)
+    
+    # Identify the tar archive members needed: None indicates all members
+    tar_names = {}
+    for i in newrecord_df.index:
+        for content in test_contents[i]:
+            terms = content.split()
+            if terms[0] == 'tar':
+                tar_names[terms[1]] = None
+            elif terms[0] == 'tarfile':
+                file_names = tar_names.setdefault(terms[1], set())
+                if file_names is not None:
+                    file_names.add(terms[1] + '/' + ' '.join(terms[2:]))
+    
+    # Retrieve all tar archives to copy content from at once
+    if len(tar_names) > 0:
+        if tar_cache is None:
+            tar_cache = default_tar_cache
+        tars = tar_cache.get_tars(database, list(tar_names))
+        for tar_name in tar_names:
+            if tar_name not in tars:
+                raise ValueError(f'No tar found for record {tar_name}')
+    
+    # Set up the shared asset store for calculation files and tar members
+    if shared_assets and len(newrecord_df) > 0:
+        assets = AssetStore(run_directory)
+        assets.prune()
+    else:
+        assets = None
+    
+    # Read the needed members of each tar archive in a single pass
+    for tar_name, file_names in tar_names.items():
+        tar = tars[tar_name]
+        
+        # Without the asset store, only archives held in memory are read
+        # into memory and larger ones are extracted from their files
+        if assets is None and not isinstance(tar, bytes):
+            continue
+        
+        try:
+            if assets is not None:
+                members = assets.add_members(iter_tar(tar, file_names))
+            else:
+                members = {}
+                for name, mode, fileobj in iter_tar(tar, file_names):
+                    if fileobj is None:
+                        members[name] = None
+                    else:
+                        members[name] = (mode, fileobj.read())
+        
+        # Archives with other member types are extracted directly
+        except ValueError:
+            continue
+        tars[tar_name] = members
+    
+    # Add all new records to the database before their calculations are visible
+    database.add_records([test_records[i] for i in newrecord_df.index])
 
     # Iterate over new records and prepare
     for i, newrecord_series in newrecord_df.iterrows():
@@ -81,9 +180,13 @@ def prepare(database, run_directory, calculation, input_script=None, **kwargs):
 
         # Copy calculation files to calculation folder
         for calc_file in calculation.files:
-            shutil.copy(calc_file, calc_directory)
+            if assets is not None:
+                assets.copy(calc_file, calc_directory)
+            else:
+                shutil.copy(calc_file, calc_directory)
 
         # Copy/generate content files keys
+        parents = []
         for content in copy_content:
             terms = content.split()
 
@@ -92,20 +195,73 @@ def prepare(database, run_directory, calculation, input_script=None, **kwargs):
                 record_file = Path(calc_directory, record_name+'.json')
                 with open(record_file, 'w') as f:
                     content_dict[record_name].json(fp=f, indent=4)
+                
+                # Unfinished parent calculations are job dependencies
+                try:
+                    status = content_dict[record_name].find('status')
+                except:
+                    pass
+                else:
+                    if status == 'not calculated':
+                        parents.append(record_name)
 
             elif terms[0] == 'tarfile':
-                tar = database.get_tar(name=terms[1])
                 file_name = terms[1] + '/' + ' '.join(terms[2:])
-                tar.extract(file_name, calc_directory)
-                tar.close()
+                extract_tar(tars[terms[1]], calc_directory, file_name, assets)
             
             elif terms[0] == 'tar':
-                tar = database.get_tar(name=terms[1])
-                tar.extractall(calc_directory)
-                tar.close()
+                extract_tar(tars[terms[1]], calc_directory, None, assets)
         
-        # Add record to database
-        database.add_record(record=newrecord)
+        # Add job to queue
+        if jobqueue is not None:
+            jobqueue.add(newrecord.name, parents=parents)
+
+def extract_tar(tar, directory, name=None, assets=None):
+    """
+    Extracts one or all members of a tar archive to a directory.
+    
+    Parameters
+    ----------
+    tar : bytes, pathlib.Path or dict
+        The raw tar archive, the path to an archive file, or the dict of its
+        members read in prepare.
+        The dict values are either paths in assets or (mode, content)
+        tuples, with None for directories.
+    directory : path-like object
+        The directory to extract to.
+    name : str, optional
+        The name of the member to extract.  If not given, all members are
+        extracted.
+    assets : iprPy.database.AssetStore, optional
+        The asset store that the members were added to, if any.
+    """
+    # Extract directly from raw archives
+    if isinstance(tar, (bytes, Path)):
+        with open_archive(tar) as tar:
+            if name is None:
+                tar.extractall(directory)
+            else:
+                tar.extract(name, directory)
+    
+    # Link members from the asset store
+    elif assets is not None:
+        assets.extract(tar, directory, name)
+    
+    # Write members read from the archive
+    else:
+        if name is not None:
+            if name not in tar:
+                raise KeyError(f'filename {name} not found')
+            tar = {name: tar[name]}
+        for member_name, member in tar.items():
+            path = Path(directory, member_name)
+            if member is None:
+                path.mkdir(parents=True, exist_ok=True)
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(member[1])
+                os.chmod(path, member[0])
 
 def fill_kwargs(database, calculation, kwargs):
     """
@@ -183,7 +339,8 @@ def fill_kwargs(database, calculation, kwargs):
     
     return kwargs, content_dict
 
-def build_testrecords(database, calculation, content_dict, **kwargs):
+def build_testrecords(database, calculation, content_dict,
+                      skip_unsupported=False, **kwargs):
 
     # Start calculation_dict with all singularkeys
     calculation_dict = {}
@@ -195,56 +352,128 @@ def build_testrecords(database, calculation, content_dict, **kwargs):
     new_inputfiles = []
     copy_contents = []
     
-    # Iterate over multidict combinations
-    for subdict in itermultidict(calculation.multikeys, **kwargs):
-        calculation_dict.update(subdict)
+    # Iterate over multidict combinations, reusing the systems, models and
+    # potentials parsed for previous combinations
+    content_json = {}
+    unsupported = {}
+    with parsecache():
+        for subdict in itermultidict(calculation.multikeys, **kwargs):
+            calculation_dict.update(subdict)
+
+            # Skip potentials that lammps_command cannot run
+            if skip_unsupported:
+                if len(unsupported_pair_styles(database, content_dict,
+                                               calculation_dict, unsupported)) > 0:
+                    continue
         
-        # Generate inputfile
-        inputfile = filltemplate(calculation.template, calculation_dict, '<', '>')
-
-        # Create calc_key
-        calc_key = str(uuid.uuid4())
-
-        # Build input_dict from calculation_dict
-        input_dict = {}
-        copy_content = []
-        for key in calculation_dict:
-            if calculation_dict[key] != '':
-                input_dict[key] = deepcopy(calculation_dict[key])
-
-                if key[-8:] == '_content':
-                    copy_content.append(calculation_dict[key])
-                    terms = calculation_dict[key].split()
-
-                    if terms[0] == 'record':
-                        record_name = terms[1]
-                        try:
-                            input_dict[key] = content_dict[record_name].json()
-                        except:
-                            crecord = database.get_record(name=record_name)
-                            input_dict[key] = crecord.content.json()
-                            content_dict[record_name] = crecord.content
-
-        # Build incomplete record
-        #try:
-        calculation.process_input(input_dict, calc_key, build=False)
-        #except:
-        #    continue
+            # Generate inputfile
+            inputfile = filltemplate(calculation.template, calculation_dict, '<', '>')
+
+            # Create calc_key
+            calc_key = str(uuid.uuid4())
+
+            # Build input_dict from calculation_dict
+            input_dict = {}
+            copy_content = []
+            for key in calculation_dict:
+                if calculation_dict[key] != '':
+                    input_dict[key] = deepcopy(calculation_dict[key])
+
+                    if key[-8:] == '_content':
+                        copy_content.append(calculation_dict[key])
+                        terms = calculation_dict[key].split()
+
+                        if terms[0] == 'record':
+                            record_name = terms[1]
+                            if record_name not in content_json:
+                                if record_name not in content_dict:
+                                    crecord = database.get_record(name=record_name)
+                                    content_dict[record_name] = crecord.content
+                                content_json[record_name] = content_dict[record_name].json()
+                            input_dict[key] = content_json[record_name]
+
+            # Build incomplete record
+            #try:
+            calculation.process_input(input_dict, calc_key, build=False)
+            #except:
+            #    continue
         
-        new_record = load_record(style=calculation.record_style, name=calc_key)
-        new_record.buildcontent('calc_' + calculation.style, input_dict)
-
-        # Check if record is valid
-        if new_record.isvalid():
-            new_records.append(new_record)
-            new_record_df.append(new_record.todict(full=False, flat=True))
-            new_inputfiles.append(inputfile)
-            copy_contents.append(copy_content)
+            new_record = load_record(style=calculation.record_style, name=calc_key)
+            new_record.buildcontent('calc_' + calculation.style, input_dict)
+
+            # Check if record is valid
+            if new_record.isvalid():
+                new_records.append(new_record)
+                new_record_df.append(new_record.todict(full=False, flat=True))
+                new_inputfiles.append(inputfile)
+                copy_contents.append(copy_content)
             
     new_record_df = pd.DataFrame(new_record_df)
+
+    skipped = [name for name in unsupported if len(unsupported[name]) > 0]
+    if len(skipped) > 0:
+        print(len(skipped), 'potentials skipped for pair styles unsupported by',
+              calculation_dict['lammps_command'], flush=True)
     
     return new_records, new_record_df, new_inputfiles, copy_contents, content_dict
 
+def unsupported_pair_styles(database, content_dict, calculation_dict,
+                            unsupported=None):
+    """
+    Lists the pair styles of the potentials in a combination that are not
+    available in the combination's lammps_command executable.
+
+    Parameters
+    ----------
+    database : iprPy.database.Database
+        The database to get potential records from.
+    content_dict : dict
+        The record contents already retrieved, keyed by record name.
+    calculation_dict : dict
+        The combination's calculation input terms.
+    unsupported : dict, optional
+        The unsupported pair styles found for previous combinations, keyed
+        by potential record name.  Updated with the results for any new
+        potentials.
+
+    Returns
+    -------
+    list of str
+        The unsupported pair styles.
+    """
+    if unsupported is None:
+        unsupported = {}
+    lammps_command = calculation_dict.get('lammps_command', '')
+    if lammps_command == '':
+        return []
+
+    pair_styles = []
+    for key in calculation_dict:
+        if key[-17:] != 'potential_content' or calculation_dict[key] == '':
+            continue
+        terms = calculation_dict[key].split()
+        if terms[0] != 'record':
+            continue
+        record_name = terms[1]
+
+        if record_name not in unsupported:
+            if record_name not in content_dict:
+                crecord = database.get_record(name=record_name)
+                content_dict[record_name] = crecord.content
+            try:
+                styles = potential_pair_styles(content_dict[record_name])
+            except (KeyError, ValueError):
+                styles = []
+            available = lammps_capabilities(lammps_command)['pair_styles']
+            if available is None:
+                unsupported[record_name] = []
+            else:
+                unsupported[record_name] = [style for style in styles
+                                            if style not in available]
+        pair_styles.extend(unsupported[record_name])
+
+    return pair_styles
+
 def itermultidict(multikeys, **kwargs):
     """
     Generates each combination of kwargs by iterating over 
@@ -273,18 +502,51 @@ def merge_dicts(dict1, dict2):
     newdict.update(dict2)
     return newdict
 
-def new_calculations(old, test, dterms, fterms):
-    old_count = len(old)
-    allrecords = pd.concat([old, test], ignore_index=True)
+def new_calculations(old, test, dterms, fterms, index=None):
+    """
+    Identifies which test records are not duplicates of existing records or
+    of each other.
     
-    if 'a_mult' in dterms:
-        allrecords['a_mult'] = allrecords.a_mult2 - allrecords.a_mult1
-    if 'b_mult' in dterms:
-        allrecords['b_mult'] = allrecords.b_mult2 - allrecords.b_mult1
-    if 'c_mult' in dterms:
-        allrecords['c_mult'] = allrecords.c_mult2 - allrecords.c_mult1
+    Parameters
+    ----------
+    old : pandas.DataFrame
+        The flat records DataFrame of the existing records.
+    test : pandas.DataFrame
+        The flat records DataFrame of the records to check.
+    dterms : list of str
+        The record terms that are compared exactly.
+    fterms : dict
+        The record terms that are compared with absolute tolerances.
+    index : DuplicateIndex, optional
+        An existing index of the records' compare terms, such as one saved
+        by a previous prepare run.  It is synchronized with old, and the new
+        test records are added to it.  If not given, a new index is built
+        from old.
     
-    isdup = am.tools.duplicates_allclose(allrecords, dterms, fterms)
+    Returns
+    -------
+    pandas.DataFrame
+        The rows of test that are new.
+    """
+    old = with_mult_terms(old, dterms)
+    test = with_mult_terms(test, dterms)
+    
+    if index is None:
+        index = DuplicateIndex(dterms, fterms)
+    index.sync(old)
     
-    isnew = ~isdup[old_count:].values
-    return test[isnew]
\ No newline at end of file
+    isnew = index.isnew(test)
+    return test.loc[isnew]
+
+def with_mult_terms(df, dterms):
+    """
+    Adds the a_mult, b_mult and c_mult size multiplier terms to a records
+    DataFrame if they are used as compare terms.
+    """
+    if len(df) == 0:
+        return df
+    df = df.copy()
+    for mult in ['a_mult', 'b_mult', 'c_mult']:
+        if mult in dterms:
+            df[mult] = df[mult + '2'] - df[mult + '1']
+    return df
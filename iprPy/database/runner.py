@@ -7,15 +7,26 @@ import shutil
 import time
 import glob
 import datetime
+import threading
+import queue
 import requests
+from pathlib import Path
 
 # https://github.com/usnistgov/DataModelDict
 from DataModelDict import DataModelDict as DM
 
 # iprPy imports
 from .. import rootdir
+from ..calculation import loaded as calculation_loaded
+from ..record import get_record_style
+from ..tools import ReferenceCache
+from .jobqueue import load_jobqueue
+from .archive import write_archive, extensions
+from .calcworker import CalcWorker
 
-def runner(dbase, run_directory, orphan_directory=None, hold_directory=None):
+def runner(dbase, run_directory, orphan_directory=None, hold_directory=None,
+           jobqueue=None, compression='gzip', compression_level=None,
+           finalize_workers=1, inprocess=False):
     """
     High-throughput calculation runner.
     
@@ -34,6 +45,29 @@ def runner(dbase, run_directory, orphan_directory=None, hold_directory=None):
         The path for the hold directory where tar archives that failed to be
         uploaded are moved to.  If None (default) then will use 'hold' at the
         same level as the run_directory.
+    jobqueue : bool or iprPy.database.JobQueue, optional
+        The job queue to take calculations from.  If None (default), the run
+        directory's sqlite job queue is used if it has one, otherwise
+        calculations are selected by listing the run directory.  If True, the
+        sqlite job queue is used.  If False, the run directory is listed.
+    compression : str, optional
+        The compression of the uploaded calculation archives: 'gzip'
+        (default), 'zstd' or 'none'.  zstd requires the zstandard package.
+    compression_level : int, optional
+        The compression level of the uploaded archives.  Default uses the
+        algorithm's default level.
+    finalize_workers : int, optional
+        The number of background threads that update the records, upload
+        the archives and remove the directories of finished calculations
+        while the runner starts the next calculations.  If 0, finished
+        calculations are finalized before starting the next one.  (Default
+        is 1.)
+    inprocess : bool, optional
+        If True, calculations whose styles are in-process safe are run by
+        calling the main functions of their calc_*.py scripts in a warm
+        Python worker process rather than starting a new Python process for
+        each calculation.  All other calculations, such as those running
+        LAMMPS, are always run as separate processes.  (Default is False.)
     """
     # Get path to Python executable running this script
     py_exe = sys.executable
@@ -43,6 +77,9 @@ def runner(dbase, run_directory, orphan_directory=None, hold_directory=None):
     # Get absolute path to run_directory
     run_directory = os.path.abspath(run_directory)
     
+    # Get the job queue, if any
+    jobqueue = load_jobqueue(run_directory, jobqueue)
+    
     # Get original working directory
     original_dir = os.getcwd()
     
@@ -68,193 +105,524 @@ def runner(dbase, run_directory, orphan_directory=None, hold_directory=None):
         hold_directory = os.path.join(os.path.dirname(run_directory), 'hold')
     
     # Start runner log file
-    with open(log_file, 'a') as log:
+    with open(log_file, 'a') as logfile:
+        log = LockedWriter(logfile)
         
         # Change to the run directory
         os.chdir(run_directory)
         
-        # Initialize bidfailcount counter
-        bidfailcount = 0
-        
         # Announce the runner's pid
         print(f'Runner started with pid {pid}', flush=True)
         
-        # flist is the running list of calculations
-        flist = os.listdir(run_directory)
-        while len(flist) > 0:
+        # Start finalizing finished calculations in the background
+        finalizer = Finalizer(dbase, run_directory, hold_directory, log,
+                              jobqueue=jobqueue, workers=finalize_workers,
+                              compression=compression,
+                              compression_level=compression_level)
+        
+        # Share relaxed reference systems between the calculations
+        env = dict(os.environ)
+        env.setdefault(ReferenceCache.envvar,
+                       os.path.join(run_directory, ReferenceCache.dirname))
+        
+        # Start a warm worker for in-process safe calculations on first use
+        if inprocess:
+            worker = CalcWorker(py_exe, env=env, directory=run_directory)
+        else:
+            worker = None
+        
+        stats = RunStats()
+        try:
+            runloop(dbase, run_directory, orphan_directory, jobqueue, py_exe,
+                    log, finalizer, stats, env, worker=worker)
+        finally:
+            if worker is not None:
+                worker.close()
+            finalizer.close()
+            os.chdir(original_dir)
             
-            # Pick a random calculation from the list
-            index = random.randint(0, len(flist)-1)
-            sim = flist[index]
+            # Report the calculation throughput of each run mode
+            for line in stats.report():
+                print(line, flush=True)
+                log.write(line + '\n')
+        print('No simulations left to run', flush=True)
+
+def runloop(dbase, run_directory, orphan_directory, jobqueue, py_exe, log,
+            finalizer, stats, env, worker=None):
+    """
+    The runner's main loop, which selects, bids on and runs calculations
+    until none remain.  In-process safe calculations are run by the worker
+    if given, and all others as processes with the env environment.
+    Finished calculations are passed to the finalizer, and the run times
+    are added to stats.
+    """
+    def next_calcs_():
+        # Calculations being finalized are still in the run directory
+        return [sim for sim in next_calcs(run_directory, jobqueue)
+                if sim not in finalizer.pending]
+    
+    # Initialize bidfailcount counter
+    bidfailcount = 0
+    
+    # flist is the running list of calculations
+    flist = next_calcs_()
+    while len(flist) > 0:
+        
+        # Pick a random calculation from the list
+        index = random.randint(0, len(flist)-1)
+        sim = flist[index]
+        
+        # Submit a bid and check if it succeeded
+        if bid(sim):
             
-            # Submit a bid and check if it succeeded
-            if bid(sim):
-                
-                # Reset bidfailcount
-                bidfailcount = 0
-                
-                # Move to simulation directory
-                os.chdir(sim)
-                log.write('%s\n' % sim)
-                
-                # Check that the calculation has calc_*.py, calc_*.in and
-                # record in the database
-                try:
-                    record = dbase.get_record(name=sim)
-                    calc_py = get_file('calc_*.py')
-                    calc_in = get_file('calc_*.in')
-                
-                # Pass ConnectionErrors forward killing runner
-                except requests.ConnectionError as e:
-                    raise requests.ConnectionError(e)
-                
-                # If not complete, zip and move to the orphan directory
-                except:
-                    log.write('Incomplete simulation: moved to orphan directory\n\n')
-                    os.chdir(run_directory)
-                    if not os.path.isdir(orphan_directory):
-                        os.makedirs(orphan_directory)
-                    shutil.make_archive(os.path.join(orphan_directory, sim),
-                                        'gztar', root_dir=run_directory,
-                                        base_dir=sim)
-                    removecalc(os.path.join(run_directory, sim))
-                    flist = os.listdir(run_directory)
-                    continue
-                
-                # Check if any files in the calculation folder are incomplete
-                # records
-                error_flag = False
-                ready_flag = True
-                
-                for fname in glob.iglob('*'):
-                    parent_sim, ext = os.path.splitext(os.path.basename(fname))
-                    if ext in ('.json', '.xml'):
-                        parent = DM(fname)
-                        try:
-                            status = parent.find('status')
-                            
-                            # Check parent record in database to see if it has completed
-                            if status == 'not calculated':
-                                parent_record = dbase.get_record(name=parent_sim)
-                                try:
-                                    status = parent_record.content.find('status')
-                                    
-                                    # Mark flag if still incomplete
-                                    if status == 'not calculated':
-                                        ready_flag = False
-                                        break
-                                    
-                                    # Skip if parent calculation failed
-                                    elif status == 'error':
-                                        with open(os.path.basename(fname), 'w') as f:
-                                            parent_record.content.json(fp=f, indent=4)
-                                        error_flag = True
-                                        error_message = 'parent calculation issued an error'
-                                        break
-                                    
-                                    # Ignore if unknown status
-                                    else:
-                                        raise ValueError('unknown status')
-                                        
-                                # Copy parent record to calculation folder if it is now complete
-                                except:
+            # Reset bidfailcount
+            bidfailcount = 0
+            
+            # Move to simulation directory
+            os.chdir(sim)
+            log.write('%s\n' % sim)
+            
+            # Check that the calculation has calc_*.py, calc_*.in and
+            # record in the database
+            try:
+                calc_py = get_file('calc_*.py')
+                calc_in = get_file('calc_*.in')
+                record_style = get_calc_record_style(calc_py)
+                record = dbase.get_record(name=sim, style=record_style)
+            
+            # Pass ConnectionErrors forward killing runner
+            except requests.ConnectionError as e:
+                raise requests.ConnectionError(e)
+            
+            # If not complete, zip and move to the orphan directory
+            except:
+                log.write('Incomplete simulation: moved to orphan directory\n\n')
+                os.chdir(run_directory)
+                if not os.path.isdir(orphan_directory):
+                    os.makedirs(orphan_directory)
+                shutil.make_archive(os.path.join(orphan_directory, sim),
+                                    'gztar', root_dir=run_directory,
+                                    base_dir=sim)
+                removecalc(os.path.join(run_directory, sim))
+                if jobqueue is not None:
+                    jobqueue.finish(sim, 'orphan')
+                flist = next_calcs_()
+                continue
+            
+            # Check if any files in the calculation folder are incomplete
+            # records
+            error_flag = False
+            ready_flag = True
+            
+            for fname in glob.iglob('*'):
+                parent_sim, ext = os.path.splitext(os.path.basename(fname))
+                if ext in ('.json', '.xml'):
+                    parent = DM(fname)
+                    try:
+                        status = parent.find('status')
+                        
+                        # Check parent record in database to see if it has completed
+                        if status == 'not calculated':
+                            parent_record = dbase.get_record(name=parent_sim,
+                                                             style=get_record_style(parent))
+                            try:
+                                status = parent_record.content.find('status')
+                                
+                                # Mark flag if still incomplete
+                                if status == 'not calculated':
+                                    ready_flag = False
+                                    break
+                                
+                                # Skip if parent calculation failed
+                                elif status == 'error':
                                     with open(os.path.basename(fname), 'w') as f:
                                         parent_record.content.json(fp=f, indent=4)
-                                    log.write('parent %s copied to sim folder\n' % parent_sim)
-                            
-                            # skip if parent calculation failed
-                            elif status == 'error':
-                                error_flag = True
-                                error_message = 'parent calculation issued an error'
-                                break
-                        except:
-                            continue
+                                    error_flag = True
+                                    error_message = 'parent calculation issued an error'
+                                    break
+                                
+                                # Ignore if unknown status
+                                else:
+                                    raise ValueError('unknown status')
+                                    
+                            # Copy parent record to calculation folder if it is now complete
+                            except:
+                                with open(os.path.basename(fname), 'w') as f:
+                                    parent_record.content.json(fp=f, indent=4)
+                                log.write('parent %s copied to sim folder\n' % parent_sim)
+                        
+                        # skip if parent calculation failed
+                        elif status == 'error':
+                            error_flag = True
+                            error_message = 'parent calculation issued an error'
+                            break
+                    except:
+                        continue
+            
+            # Handle calculations that have unfinished parents
+            if not ready_flag:
+                bid_files = glob.glob('*.bid')
+                os.chdir(run_directory)
+                for bid_file in bid_files:
+                    os.remove(os.path.join(sim, bid_file))
+                log.write('parent %s not ready\n\n' % parent_sim)
                 
-                # Handle calculations that have unfinished parents
-                if not ready_flag:
-                    bid_files = glob.glob('*.bid')
-                    os.chdir(run_directory)
-                    for bid_file in bid_files:
-                        os.remove(os.path.join(sim, bid_file))
-                    flist = [parent_sim]
-                    log.write('parent %s not ready\n\n' % parent_sim)
-                    continue
+                # Return to queue to wait on the parent
+                if jobqueue is not None:
+                    jobqueue.release(sim, parents=[parent_sim])
+                    flist = next_calcs_()
+                    if flist == [sim]:
+                        time.sleep(10)
                 
-                # Run the calculation
-                try:
-                    assert not error_flag, error_message
+                # Try running the parent instead
+                else:
+                    flist = [parent_sim]
+                continue
+            
+            # Run the calculation
+            try:
+                assert not error_flag, error_message
+                start = time.perf_counter()
+                if worker is not None and get_calc_inprocess(calc_py):
+                    mode = 'in-process'
+                    output, error_message = worker.run(calc_py,
+                                                       os.path.join(run_directory, sim),
+                                                       calc_in, sim)
+                    print(output, end='', flush=True)
+                else:
+                    mode = 'subprocess'
                     run = subprocess.Popen([py_exe, calc_py, calc_in, sim],
-                                           stderr=subprocess.PIPE)
+                                           stderr=subprocess.PIPE, env=env)
                     error_message = run.stderr.read()
-                    
-                    # Load results.json
-                    try:
-                        model = DM('results.json')
-                    
-                    # Throw errors if no results.json
-                    except:
-                        error_flag = True
-                    assert not error_flag, error_message
-                    log.write('sim calculated successfully\n')
+                    run.wait()
+                stats.add(mode, time.perf_counter() - start)
                 
-                # Catch any errors and build results.json
-                except:
-                    model = record.content
-                    keys = list(model.keys())
-                    record_type = keys[0]
-                    model[record_type]['status'] = 'error'
-                    model[record_type]['error'] = str(sys.exc_info()[1])
-                    with open('results.json', 'w') as f:
-                        model.json(fp=f, indent=4)
-                    log.write('error: %s\n' % model[record_type]['error'])
+                # Load results.json
+                try:
+                    model = DM('results.json')
                 
-                # Update record
-                tries = 0
-                while tries < 10:
-                    try:
-                        dbase.update_record(content=model, name=sim)
-                        break
-                    except:
-                        tries += 1
-                if tries == 10:
-                    os.chdir(run_directory)
-                    log.write('failed to update record\n')
-                else:
-                    # Archive calculation and add to database or hold_directory
-                    try:
-                        dbase.add_tar(root_dir=run_directory, name=sim)
-                    except:
-                        log.write('failed to upload archive\n')
-                        if not os.path.isdir(hold_directory):
-                            os.makedirs(hold_directory)
-                        shutil.move(sim+'.tar.gz', hold_directory)
-                    os.chdir(run_directory)
-                    removecalc(os.path.join(run_directory, sim))
-                log.write('\n')
+                # Throw errors if no results.json
+                except:
+                    error_flag = True
+                assert not error_flag, error_message
+                log.write('sim calculated successfully\n')
+                job_status = 'finished'
             
-            # Else if bid(sim) failed
-            else:
-                bidfailcount += 1
-                
-                # Stop unproductive worker after 10 consecutive bid fails
-                if bidfailcount > 10:
-                    print("Didn't find an open simulation", flush=True)
+            # Catch any errors and build results.json
+            except:
+                model = record.content
+                keys = list(model.keys())
+                record_type = keys[0]
+                model[record_type]['status'] = 'error'
+                model[record_type]['error'] = str(sys.exc_info()[1])
+                with open('results.json', 'w') as f:
+                    model.json(fp=f, indent=4)
+                log.write('error: %s\n' % model[record_type]['error'])
+                job_status = 'error'
+            
+            # Update record, archive and remove the calculation
+            os.chdir(run_directory)
+            finalizer.submit(sim, model, record.style, job_status)
+            log.write('\n')
+        
+        # Else if bid(sim) failed
+        else:
+            
+            # Claimed by a runner not using the queue or removed
+            if jobqueue is not None:
+                jobqueue.finish(sim, 'skipped')
+                flist = next_calcs_()
+                continue
+            
+            # Immediately try the other listed calculations
+            del flist[index]
+            if len(flist) > 0:
+                continue
+            
+            bidfailcount += 1
+            
+            # Stop unproductive worker after 10 consecutive failed passes
+            if bidfailcount > 10:
+                print("Didn't find an open simulation", flush=True)
+                break
+            
+            # Pause for 10 seconds before trying again
+            time.sleep(10)
+        
+        # Regenerate flist and flush log file
+        flist = next_calcs_()
+        log.flush()
+        os.fsync(log.fileno())
+
+class RunStats(object):
+    """
+    Counts the calculations run by each run mode and the seconds spent
+    running them.
+    """
+    
+    def __init__(self):
+        self.__counts = {}
+        self.__seconds = {}
+    
+    def add(self, mode, seconds):
+        """
+        Adds a calculation's run time.
+        
+        Parameters
+        ----------
+        mode : str
+            The run mode, i.e. 'subprocess' or 'in-process'.
+        seconds : float
+            The seconds spent running the calculation.
+        """
+        self.__counts[mode] = self.__counts.get(mode, 0) + 1
+        self.__seconds[mode] = self.__seconds.get(mode, 0.0) + seconds
+    
+    def jobs_per_second(self, mode):
+        """float: The calculations run per second by a run mode."""
+        return self.__counts[mode] / self.__seconds[mode]
+    
+    def report(self):
+        """
+        list of str: Lines giving the calculations run and jobs/second of
+        each run mode used.
+        """
+        lines = []
+        for mode in sorted(self.__counts):
+            lines.append(f'{self.__counts[mode]} {mode} calculations in '
+                         f'{self.__seconds[mode]:.3f} seconds: '
+                         f'{self.jobs_per_second(mode):.3f} jobs/second')
+        return lines
+
+class LockedWriter(object):
+    """
+    Wraps a text file so that the runner's threads can write to it.
+    """
+    
+    def __init__(self, f):
+        self.__f = f
+        self.__lock = threading.Lock()
+    
+    def write(self, text):
+        with self.__lock:
+            self.__f.write(text)
+    
+    def flush(self):
+        with self.__lock:
+            self.__f.flush()
+    
+    def fileno(self):
+        return self.__f.fileno()
+
+class Finalizer(object):
+    """
+    Finalizes finished calculations by updating their records, uploading
+    their archives and removing their directories.  With workers, the
+    calculations are finalized by background threads so that the runner can
+    start the next calculation.  Failed record updates and uploads are
+    retried with exponentially increasing delays, and archives that still
+    fail to upload are saved to the hold directory.
+    """
+    
+    def __init__(self, dbase, run_directory, hold_directory, log,
+                 jobqueue=None, workers=1, compression='gzip',
+                 compression_level=None, update_tries=10, upload_tries=3,
+                 delay=1.0, maxdelay=60.0):
+        """
+        Initializes the finalizer and starts its worker threads.
+        
+        Parameters
+        ----------
+        dbase : iprPy.Database
+            The database to update the records of and upload archives to.
+        run_directory : str
+            The absolute path to the run directory.
+        hold_directory : str
+            The path to save archives that fail to upload to.
+        log : file-like object
+            The thread-safe runner log to write to.
+        jobqueue : iprPy.database.JobQueue, optional
+            The job queue to mark finalized calculations as finished in.
+            Jobs whose records fail to update are left claimed.
+        workers : int, optional
+            The number of worker threads.  If 0, calculations are finalized
+            when they are submitted.  At most two calculations per worker
+            wait to be finalized before submit blocks.  (Default is 1.)
+        compression : str, optional
+            The compression of the uploaded archives.
+        compression_level : int, optional
+            The compression level of the uploaded archives.
+        update_tries : int, optional
+            The number of times to try updating a record.  (Default is 10.)
+        upload_tries : int, optional
+            The number of times to try uploading an archive.  (Default is 3.)
+        delay : float, optional
+            The seconds to wait before the first retry.  The delay doubles
+            with each following retry.  (Default is 1.0.)
+        maxdelay : float, optional
+            The maximum seconds to wait between retries.  (Default is 60.0.)
+        """
+        self.dbase = dbase
+        self.run_directory = run_directory
+        self.hold_directory = hold_directory
+        self.log = log
+        self.jobqueue = jobqueue
+        self.compression = compression
+        self.compression_level = compression_level
+        self.update_tries = update_tries
+        self.upload_tries = upload_tries
+        self.delay = delay
+        self.maxdelay = maxdelay
+        
+        self.__pending = set()
+        self.__lock = threading.Lock()
+        self.__queue = queue.Queue(maxsize=2 * workers)
+        self.__threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self.__work, daemon=True)
+            thread.start()
+            self.__threads.append(thread)
+    
+    @property
+    def pending(self):
+        """set: The names of the calculations waiting to be finalized."""
+        with self.__lock:
+            return set(self.__pending)
+    
+    def submit(self, sim, model, record_style, job_status):
+        """
+        Submits a finished calculation to be finalized.
+        
+        Parameters
+        ----------
+        sim : str
+            The name of the calculation.
+        model : DataModelDict.DataModelDict
+            The calculation's updated record content.
+        record_style : str
+            The calculation's record style.
+        job_status : str
+            The status to give the job in the job queue.
+        """
+        with self.__lock:
+            self.__pending.add(sim)
+        if len(self.__threads) == 0:
+            self.finalize(sim, model, record_style, job_status)
+        else:
+            self.__queue.put((sim, model, record_style, job_status))
+    
+    def __work(self):
+        """Finalizes submitted calculations until None is received."""
+        while True:
+            job = self.__queue.get()
+            try:
+                if job is None:
                     break
-                
-                # Pause for 10 seconds before trying again
-                time.sleep(10)
+                self.finalize(*job)
+            finally:
+                self.__queue.task_done()
+    
+    def retry(self, func, tries):
+        """
+        Calls a function until it succeeds, waiting between tries.
+        
+        Parameters
+        ----------
+        func : function
+            The function to call without arguments.
+        tries : int
+            The maximum number of calls.
+        
+        Returns
+        -------
+        The function's return value.
+        
+        Raises
+        ------
+        Exception
+            The exception raised by the last try.
+        """
+        delay = self.delay
+        for i in range(tries):
+            try:
+                return func()
+            except Exception:
+                if i == tries - 1:
+                    raise
+            time.sleep(delay)
+            delay = min(2 * delay, self.maxdelay)
+    
+    def finalize(self, sim, model, record_style, job_status):
+        """
+        Updates a finished calculation's record, uploads its archive and
+        removes its directory.
+        
+        Parameters
+        ----------
+        sim : str
+            The name of the calculation.
+        model : DataModelDict.DataModelDict
+            The calculation's updated record content.
+        record_style : str
+            The calculation's record style.
+        job_status : str
+            The status to give the job in the job queue.
+        """
+        try:
+            # Update record
+            try:
+                self.retry(lambda: self.dbase.update_record(content=model, name=sim,
+                                                            style=record_style),
+                           self.update_tries)
+            # Leave the job claimed so that its children wait for the record
+            except Exception:
+                self.log.write(f'{sim}: failed to update record\n')
             
-            # Regenerate flist and flush log file
-            flist = os.listdir(run_directory)
-            log.flush()
-            os.fsync(log.fileno())
-        print('No simulations left to run', flush=True)
-        os.chdir(original_dir)
+            else:
+                # Archive calculation and add to database or hold_directory
+                try:
+                    stats = self.retry(lambda: self.dbase.add_tar(root_dir=self.run_directory,
+                                                                  name=sim, style=record_style,
+                                                                  compression=self.compression,
+                                                                  level=self.compression_level),
+                                       self.upload_tries)
+                    if stats is not None:
+                        self.log.write(f'{sim}: archive uploaded: {stats}\n')
+                except Exception:
+                    self.log.write(f'{sim}: failed to upload archive\n')
+                    if not os.path.isdir(self.hold_directory):
+                        os.makedirs(self.hold_directory, exist_ok=True)
+                    hold_name = sim + extensions[self.compression]
+                    with open(os.path.join(self.hold_directory, hold_name), 'wb') as f:
+                        write_archive(f, os.path.join(self.run_directory, sim),
+                                      compression=self.compression,
+                                      level=self.compression_level)
+                removecalc(os.path.join(self.run_directory, sim))
+                
+                if self.jobqueue is not None:
+                    self.jobqueue.finish(sim, job_status)
+        
+        except Exception as e:
+            self.log.write(f'{sim}: failed to finalize: {e}\n')
+        
+        finally:
+            with self.__lock:
+                self.__pending.discard(sim)
+    
+    def close(self):
+        """Waits for all submitted calculations to be finalized."""
+        for thread in self.__threads:
+            self.__queue.put(None)
+        for thread in self.__threads:
+            thread.join()
+        self.__threads = []
 
 def bid(sim):
     """
     Bids for the chance to run a calculation instance. Used to help avoid
-    runner collisions.
+    runner collisions.  A bid is placed by exclusively creating the
+    calculation's runner.bid file, which the filesystem guarantees only one
+    process can do.
     
     Parameters
     ----------
@@ -266,32 +634,123 @@ def bid(sim):
     bool
         True if bidding is successful, False if bidding fails.
     """
+    pid = os.getpid()
     try:
-        # Wait to make sure sim is not being deleted
-        time.sleep(1)
-        
-        # Check if bid already exists
-        for fname in os.listdir(sim):
-            if fname[-4:] == '.bid':
-                return False
+        fd = os.open(os.path.join(sim, bidfile),
+                     os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    
+    # Fails if bid already exists or sim no longer exists
+    except OSError:
+        return False
+    
+    with os.fdopen(fd, 'w') as f:
+        f.write('bid for pid: %i' % pid)
+    return True
+
+# Name of the file that marks a calculation as claimed by a runner
+bidfile = 'runner.bid'
+
+def list_calcs(run_directory):
+    """
+    Lists the calculation instances in a run directory, ignoring hidden
+    names such as calculations that are in the process of being removed.
+    
+    Parameters
+    ----------
+    run_directory : str
+        The path to the run directory.
+    
+    Returns
+    -------
+    list of str
+        The calculation instance names.
+    """
+    return [name for name in os.listdir(run_directory) if name[:1] != '.']
+
+def next_calcs(run_directory, jobqueue=None):
+    """
+    Gives the calculation instances for a runner to select from next.
+    
+    Parameters
+    ----------
+    run_directory : str
+        The path to the run directory.
+    jobqueue : iprPy.database.JobQueue, optional
+        The job queue to claim calculations from.  If None, all calculation
+        instances in run_directory are listed.
+    
+    Returns
+    -------
+    list of str
+        All calculation instances in run_directory if no jobqueue is given.
+        Otherwise, a list containing the one calculation claimed from the
+        queue, or an empty list if the queue has no remaining jobs.  If jobs
+        remain but are waiting on their parents, the queue is rechecked every
+        10 seconds, up to 10 times.
+    """
+    if jobqueue is None:
+        return list_calcs(run_directory)
+    
+    waitcount = 0
+    while True:
+        sim = jobqueue.claim()
+        if sim is not None:
+            return [sim]
         
-        # Place a bid
-        pid = os.getpid()
-        with open(os.path.join(sim, str(pid)+'.bid'), 'w') as f:
-            f.write('bid for pid: %i' % pid)
+        # Stop if the queue is empty
+        if jobqueue.count('queued') == 0:
+            return []
         
-        # Wait to make sure all bids are in
-        time.sleep(1)
+        # Stop after 10 consecutive failed claims
+        waitcount += 1
+        if waitcount > 10:
+            print("Didn't find an open simulation", flush=True)
+            return []
         
-        # Check bids
-        bids = []
-        for fname in os.listdir(sim):
-            if fname[-4:] == '.bid':
-                bids.append(int(fname[:-4]))
-        if min(bids) == pid:
-            return True
-        else:
-            return False
+        # Pause for 10 seconds before trying again
+        time.sleep(10)
+
+def get_calc_record_style(calc_py):
+    """
+    Identifies the record style of a prepared calculation from the name of
+    its calc_*.py script.
+    
+    Parameters
+    ----------
+    calc_py : str
+        The path to the calculation's calc_*.py script.
+    
+    Returns
+    -------
+    str or None
+        The calculation's record style, or None if the calculation style is
+        not loaded.
+    """
+    calc_style = Path(calc_py).stem[5:]
+    try:
+        return calculation_loaded[calc_style]().record_style
+    except:
+        return None
+
+def get_calc_inprocess(calc_py):
+    """
+    Identifies if a prepared calculation can be run in-process from the name
+    of its calc_*.py script.
+    
+    Parameters
+    ----------
+    calc_py : str
+        The path to the calculation's calc_*.py script.
+    
+    Returns
+    -------
+    bool
+        The calculation style's inprocess value, or False if the calculation
+        style is not loaded.
+    """
+    calc_style = Path(calc_py).stem[5:]
+    try:
+        return calculation_loaded[calc_style]().inprocess
     except:
         return False
 
@@ -328,14 +787,25 @@ def get_file(path):
 
 def removecalc(dir):
     """
-    Removes the specified calculation instance directory leaving .bid files
-    for last to help avoid runner collisions.
+    Removes the specified calculation instance directory.  The directory is
+    first renamed to a hidden name so that other runners cannot bid on it
+    while its contents are deleted.  .bid files are deleted last to help
+    avoid runner collisions.
     
     Parameters
     ----------
     dir : str
         The path to the calculation instance directory to delete.
     """
+    # Atomically hide the directory from other runners
+    parent, name = os.path.split(os.path.abspath(dir))
+    hidden = os.path.join(parent, '.%s.%i.remove' % (name, os.getpid()))
+    try:
+        os.rename(dir, hidden)
+    except OSError:
+        pass
+    else:
+        dir = hidden
     
     # Loop over all files and directories in dir
     for fname in glob.iglob(os.path.join(dir, '*')):
@@ -0,0 +1,305 @@
+# Standard Python libraries
+from pathlib import Path
+from collections import OrderedDict
+import hashlib
+import shutil
+import tempfile
+import uuid
+import weakref
+
+# iprPy imports
+from .archive import open_archive
+
+__all__ = ['TarCache', 'iter_tar']
+
+class TarCache(object):
+    """
+    Least-recently-used cache of the raw tar archives of database records,
+    keyed by the record names and the archive versions reported by the
+    database's get_tar_versions method.  Archives are retrieved to files in
+    a spill directory, which is limited to maxspill bytes.  Archives of up
+    to maxsize bytes are also held in memory, with the least recently used
+    ones dropped from memory once their total exceeds maxsize.  Spilled
+    archives are named by their keys, so a persistent spill directory can be
+    shared by multiple processes and prepare runs.
+    """
+
+    def __init__(self, maxsize=268435456, directory=None, maxspill=4294967296):
+        """
+        Initializes an empty cache.
+
+        Parameters
+        ----------
+        maxsize : int, optional
+            The maximum number of bytes of archives to hold in memory.
+            Larger archives are only kept on disk.  (Default is 256 MiB.)
+        directory : path-like object, optional
+            The directory to spill archives to.  If not given, a temporary
+            directory is created when first needed and deleted with the
+            cache.
+        maxspill : int, optional
+            The maximum number of bytes of archives to keep in the spill
+            directory.  Archives being returned by get_tars are kept even if
+            they exceed the limit.  (Default is 4 GiB.)
+        """
+        self.__maxsize = maxsize
+        self.__maxspill = maxspill
+        self.__directory = None if directory is None else Path(directory)
+        self.__memory = OrderedDict()
+        self.__size = 0
+
+    @property
+    def maxsize(self):
+        """int: The maximum number of bytes of archives held in memory."""
+        return self.__maxsize
+
+    @property
+    def maxspill(self):
+        """int: The maximum number of bytes of archives in the spill directory."""
+        return self.__maxspill
+
+    @property
+    def size(self):
+        """int: The number of bytes of archives held in memory."""
+        return self.__size
+
+    @property
+    def directory(self):
+        """pathlib.Path: The directory that archives are spilled to."""
+        if self.__directory is None:
+            tmpdir = tempfile.mkdtemp(prefix='iprPy-tarcache-')
+            weakref.finalize(self, shutil.rmtree, tmpdir, ignore_errors=True)
+            self.__directory = Path(tmpdir)
+        return self.__directory
+
+    def spillpath(self, key):
+        """pathlib.Path: The spill file path for a (name, version) key."""
+        digest = hashlib.sha256('\0'.join(key).encode()).hexdigest()
+        return Path(self.directory, digest + '.tar')
+
+    def get(self, name, version):
+        """
+        Retrieves a cached archive.
+
+        Parameters
+        ----------
+        name : str
+            The record name.
+        version : str
+            The archive version.
+
+        Returns
+        -------
+        bytes, pathlib.Path or None
+            The raw archive content if it is held in memory, the path to the
+            spilled archive if it is only on disk, or None if it is not
+            cached.
+        """
+        key = (name, version)
+        if key in self.__memory:
+            self.__memory.move_to_end(key)
+            return self.__memory[key]
+
+        # Check spilled archives
+        if self.__directory is None:
+            return None
+        path = self.spillpath(key)
+        try:
+            size = path.stat().st_size
+            self.__touch(path)
+        except OSError:
+            return None
+        return self.__load(key, path, size)
+
+    def put(self, name, version, content):
+        """
+        Adds an archive to the cache.
+
+        Parameters
+        ----------
+        name : str
+            The record name.
+        version : str
+            The archive version.
+        content : bytes
+            The raw archive content.
+        """
+        key = (name, version)
+        if key in self.__memory:
+            self.__size -= len(self.__memory.pop(key))
+        if len(content) <= self.__maxsize:
+            self.__store(key, content)
+        else:
+            self.__spill(key, content)
+        self.__trim()
+
+    def __load(self, key, path, size):
+        """Reads a spilled archive into memory if it is small enough."""
+        if size > self.__maxsize:
+            return path
+        with open(path, 'rb') as f:
+            content = f.read()
+        self.__store(key, content)
+        return content
+
+    def __store(self, key, content):
+        """Adds content to memory, spilling the least recently used archives."""
+        self.__memory[key] = content
+        self.__size += len(content)
+        while self.__size > self.__maxsize and len(self.__memory) > 0:
+            key, content = self.__memory.popitem(last=False)
+            self.__size -= len(content)
+            self.__spill(key, content)
+
+    def __spill(self, key, content):
+        """Writes an archive to the spill directory if it is not there."""
+        path = self.spillpath(key)
+        if path.is_file():
+            self.__touch(path)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmppath = Path(path.parent, f'.{uuid.uuid4()}.tmp')
+        with open(tmppath, 'wb') as f:
+            f.write(content)
+        tmppath.replace(path)
+
+    def __touch(self, path):
+        """
+        Marks a spilled archive as recently used.  Files that are hard links
+        to database archives are not touched, as that would change the
+        archives' versions.
+        """
+        if path.stat().st_nlink == 1:
+            path.touch()
+
+    def __trim(self, keep=None):
+        """Deletes the oldest spilled archives beyond maxspill bytes."""
+        if self.__directory is None:
+            return
+        if keep is None:
+            keep = set()
+        files = []
+        for path in self.directory.glob('*.tar'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(f[1] for f in files)
+        for mtime, size, path in sorted(files):
+            if total <= self.__maxspill:
+                break
+            if path in keep:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Removes all archives held in memory."""
+        self.__memory = OrderedDict()
+        self.__size = 0
+
+    def get_tars(self, database, names):
+        """
+        Retrieves the raw tar archives of multiple records, only retrieving
+        from the database the archives that are not cached in their current
+        versions.  Archives are copied from the database to spill files with
+        the database's copy_tars method, so that archives larger than
+        maxsize are never held in memory.  If the database style does not
+        define get_tar_versions, all archives are retrieved and none are
+        cached.
+
+        Parameters
+        ----------
+        database : iprPy.database.Database
+            The database to retrieve archives from.
+        names : list of str
+            The names of the records to retrieve the archives for.
+
+        Returns
+        -------
+        dict
+            The archives keyed by the record names, given as raw bytes if
+            held in memory or as the paths to the spilled archive files
+            otherwise.  Records without archives are skipped.
+        """
+        try:
+            versions = database.get_tar_versions(name=names)
+        except AttributeError:
+            return database.get_tars(name=names, raw=True)
+
+        keys = {}
+        missing = {}
+        for name in names:
+            if name not in versions:
+                continue
+            keys[name] = (name, versions[name])
+            if self.get(name, versions[name]) is None:
+                missing[name] = Path(self.directory, f'.{uuid.uuid4()}.tmp')
+
+        # Copy the missing archives to spill files
+        if len(missing) > 0:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            try:
+                for name in database.copy_tars(missing):
+                    path = self.spillpath(keys[name])
+                    missing[name].replace(path)
+                    self.__load(keys[name], path, path.stat().st_size)
+            finally:
+                for tmppath in missing.values():
+                    if tmppath.exists():
+                        tmppath.unlink()
+
+        # Collect the archives after all have been loaded, giving paths for
+        # those no longer held in memory
+        tars = {}
+        for name, key in keys.items():
+            if key in self.__memory:
+                tars[name] = self.__memory[key]
+            else:
+                path = self.spillpath(key)
+                if path.is_file():
+                    tars[name] = path
+        self.__trim(keep={tar for tar in tars.values() if isinstance(tar, Path)})
+        return tars
+
+def iter_tar(content, names=None):
+    """
+    Iterates over the members of a raw tar archive in a single pass over its
+    stream.
+
+    Parameters
+    ----------
+    content : bytes or path-like object
+        The raw tar archive or the path to an archive file.
+    names : set of str, optional
+        The names of the file members to read.  If not given, all members
+        are read.
+
+    Yields
+    ------
+    tuple
+        The (name, mode, fileobj) of each read member.  fileobj is a file
+        object of the member's content that can only be read before the
+        next member is yielded, or None for directories, which are only
+        included if names is not given.
+
+    Raises
+    ------
+    ValueError
+        If the archive contains members other than regular files and
+        directories.
+    """
+    with open_archive(content, stream=True) as tar:
+        for member in tar:
+            if member.isdir():
+                if names is None:
+                    yield member.name, member.mode, None
+            elif member.isfile():
+                if names is None or member.name in names:
+                    yield member.name, member.mode, tar.extractfile(member)
+            else:
+                raise ValueError(f'unsupported tar member type for {member.name}')
@@ -0,0 +1,229 @@
+# Standard Python libraries
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+
+# iprPy imports
+from .. import load_record
+
+def todicts(entries, full=True, flat=False, workers=None, executor=None,
+            chunksize=None):
+    """
+    Loads records and converts them to dictionaries using the style-specific
+    todict() methods.  The work can optionally be distributed over a pool of
+    processes, in which case the entries are handled in chunks and the
+    results are returned in the same order as the entries.
+
+    Parameters
+    ----------
+    entries : iterable of tuples
+        Each entry is a (style, name, content) tuple of values that can be
+        passed to iprPy.load_record.  content can be a path to a record file,
+        a str or a DataModelDict.
+    full : bool, optional
+        Flag used by the calculation records.  A True value will include
+        terms for both the calculation's input and results, while a value
+        of False will only include input terms (Default is True).
+    flat : bool, optional
+        Flag affecting the format of the dictionary terms.  If True, the
+        dictionary terms are limited to having only str, int, and float
+        values, which is useful for comparisons.  If False, the term
+        values can be of any data type, which is convenient for analysis.
+        (Default is False).
+    workers : int, optional
+        The number of processes to use.  If neither workers nor executor is
+        given, or workers is 1, the entries are handled serially in the
+        current process.  Starting the processes and sending them the entries
+        costs more than is saved for small numbers of entries, typically fewer
+        than a few thousand.
+    executor : concurrent.futures.Executor, optional
+        An existing executor to submit the work to.  Allows for a process pool
+        to be reused across multiple calls.  Cannot be given with workers.
+    chunksize : int, optional
+        The number of entries to handle in each submitted task.  Default value
+        splits the entries into about four chunks per worker, with each chunk
+        containing between 100 and 5000 entries.
+
+    Returns
+    -------
+    list of dict
+        The todict() representations of the records.
+    """
+    return pool_map(todicts_chunk, entries, full, flat, workers=workers,
+                    executor=executor, chunksize=chunksize)
+
+def load_records(entries, todict=False, full=False, flat=True, workers=None,
+                 executor=None, chunksize=None):
+    """
+    Loads records, optionally along with their todict() representations.
+    The work can optionally be distributed over a pool of processes, in
+    which case the entries are handled in chunks and the records are
+    returned in the same order as the entries.
+
+    Parameters
+    ----------
+    entries : iterable of tuples
+        Each entry is a (style, name, content) tuple of values that can be
+        passed to iprPy.load_record.
+    todict : bool, optional
+        If True, the todict() representations of the records are also
+        built and returned (Default is False).
+    full : bool, optional
+        Passed to the records' todict() methods (Default is False).
+    flat : bool, optional
+        Passed to the records' todict() methods (Default is True).
+    workers : int, optional
+        The number of processes to use.  If neither workers nor executor is
+        given, or workers is 1, the entries are handled serially in the
+        current process.  Starting the processes and sending them the entries
+        costs more than is saved for small numbers of entries, typically fewer
+        than a few thousand.
+    executor : concurrent.futures.Executor, optional
+        An existing executor to submit the work to.  Cannot be given with
+        workers.
+    chunksize : int, optional
+        The number of entries to handle in each submitted task.
+
+    Returns
+    -------
+    records : list of iprPy.Record
+        The loaded records.
+    dicts : list of dict
+        The todict() representations of the records.  Only returned if
+        todict is True.
+    """
+    results = pool_map(load_records_chunk, entries, todict, full, flat,
+                       workers=workers, executor=executor, chunksize=chunksize)
+    if todict:
+        records = [result[0] for result in results]
+        dicts = [result[1] for result in results]
+        return records, dicts
+    else:
+        return results
+
+def pool_map(function, entries, *args, workers=None, executor=None,
+             chunksize=None):
+    """
+    Applies a chunk function to entries either serially or in chunks
+    submitted to a process pool, and joins the chunk results in order.
+
+    Parameters
+    ----------
+    function : callable
+        A picklable function that takes a list of entries followed by args
+        and returns a list with one result per entry.
+    entries : iterable
+        The entries to handle.
+    *args : any
+        Any additional arguments to pass to function.
+    workers : int, optional
+        The number of processes to use.  If neither workers nor executor is
+        given, or workers is 1, the entries are handled serially in the
+        current process.  Starting the processes and sending them the entries
+        costs more than is saved for small numbers of entries, typically fewer
+        than a few thousand.
+    executor : concurrent.futures.Executor, optional
+        An existing executor to submit the work to.  Cannot be given with
+        workers.
+    chunksize : int, optional
+        The number of entries to handle in each submitted task.  Default value
+        splits the entries into about four chunks per worker, with each chunk
+        containing between 100 and 5000 entries.
+
+    Returns
+    -------
+    list
+        The joined results of all entries.
+    """
+    if workers is not None and executor is not None:
+        raise ValueError('workers and executor cannot both be given')
+
+    # Serial evaluation
+    if executor is None and (workers is None or int(workers) <= 1):
+        return function(entries, *args)
+
+    entries = list(entries)
+    if len(entries) == 0:
+        return []
+
+    # Set default chunksize
+    if chunksize is None:
+        if executor is not None:
+            nworkers = getattr(executor, '_max_workers', 1)
+        else:
+            nworkers = int(workers)
+        chunksize = len(entries) // (4 * nworkers) + 1
+        chunksize = min(max(chunksize, 100), 5000)
+
+    # Split entries into chunks
+    iterentries = iter(entries)
+    chunks = iter(lambda: list(islice(iterentries, chunksize)), [])
+    argslists = [[arg] * len(entries) for arg in args]
+
+    # Build and close a process pool if needed
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=int(workers)) as pool:
+            results = list(pool.map(function, chunks, *argslists))
+    else:
+        results = list(executor.map(function, chunks, *argslists))
+
+    # Reassemble the chunks in order
+    joined = []
+    for result in results:
+        joined.extend(result)
+    return joined
+
+def todicts_chunk(entries, full=True, flat=False):
+    """
+    Loads records and converts them to dictionaries serially.
+
+    Parameters
+    ----------
+    entries : iterable of tuples
+        Each entry is a (style, name, content) tuple of values that can be
+        passed to iprPy.load_record.
+    full : bool, optional
+        Passed to the records' todict() methods.
+    flat : bool, optional
+        Passed to the records' todict() methods.
+
+    Returns
+    -------
+    list of dict
+        The todict() representations of the records.
+    """
+    dicts = []
+    for style, name, content in entries:
+        record = load_record(style, name, content)
+        dicts.append(record.todict(full=full, flat=flat))
+    return dicts
+
+def load_records_chunk(entries, todict=False, full=False, flat=True):
+    """
+    Loads records serially.
+
+    Parameters
+    ----------
+    entries : iterable of tuples
+        Each entry is a (style, name, content) tuple of values that can be
+        passed to iprPy.load_record.
+    todict : bool, optional
+        If True, each record is returned in a (record, dict) tuple with its
+        todict() representation.
+    full : bool, optional
+        Passed to the records' todict() methods.
+    flat : bool, optional
+        Passed to the records' todict() methods.
+
+    Returns
+    -------
+    list
+        The loaded records, or (record, dict) tuples if todict is True.
+    """
+    results = []
+    for style, name, content in entries:
+        record = load_record(style, name, content)
+        if todict:
+            results.append((record, record.todict(full=full, flat=flat)))
+        else:
+            results.append(record)
+    return results
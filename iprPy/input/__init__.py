@@ -1,6 +1,7 @@
 # Basic imports
 from .boolean import boolean
 from .parse import parse
+from .parsecache import ParseCache, parsecache
 from .termtodict import termtodict
 from .value import value
 
@@ -48,6 +48,9 @@ def atomicarchive(database, keys, content_dict=None, record=None, load_key='atom
     for key in keys:
         inputs[key] = []   
 
+    # Shared cache for ancestor lookups
+    parent_cache = {}
+
     # Loop over all parents
     for i, parent_series in parent_df.iterrows():
         parent = parents[i]
@@ -59,7 +62,7 @@ def atomicarchive(database, keys, content_dict=None, record=None, load_key='atom
             except:
                 # Search grandparents for name of potential
                 potential_id = None
-                for grandparent in database.get_parent_records(record=parent):
+                for grandparent in database.get_parent_records(record=parent, cache=parent_cache):
                     try:
                         potential_id = grandparent.todict(full=False, flat=True)['potential_LAMMPS_id']
                     except:
@@ -51,6 +51,9 @@ def atomicparent(database, keys, content_dict=None, record=None,
     for key in keys:
         inputs[key] = []
 
+    # Shared cache for ancestor lookups
+    parent_cache = {}
+
     # Loop over all parents
     for i, parent_series in parent_df.iterrows():
         parent = parents[i]
@@ -63,7 +66,7 @@ def atomicparent(database, keys, content_dict=None, record=None,
             except:
                 # Search grandparents for name of potential
                 potential_id = None
-                for grandparent in database.get_parent_records(record=parent):
+                for grandparent in database.get_parent_records(record=parent, cache=parent_cache):
                     try:
                         potential_id = grandparent.todict(full=False, flat=True)['potential_LAMMPS_id']
                     except:
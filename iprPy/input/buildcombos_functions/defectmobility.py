@@ -137,6 +137,9 @@ def defectmobility(database, keys, record=None, content_dict=None, query=None, *
     inputs = {}
     for key in keys:
         inputs[key] = []
+
+    # Shared cache for ancestor lookups
+    parent_cache = {}
     
     # Beginning the process to generate all possible combinations of the defect_mobility calculation
     
@@ -150,7 +153,7 @@ def defectmobility(database, keys, record=None, content_dict=None, query=None, *
             except:
                 # Search grandparents for name of potential
                 potential_id = None
-                for grandparent in database.get_parent_records(record=parent):
+                for grandparent in database.get_parent_records(record=parent, cache=parent_cache):
                     try:
                         potential_id = grandparent.todict(full=False, flat=True)['potential_LAMMPS_id']
                     except:
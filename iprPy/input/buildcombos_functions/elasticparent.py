@@ -16,6 +16,9 @@ def elasticparent(database, keys, content_dict=None, record=None,
     inputs = {}
     for key in keys:
         inputs[key] = []
+
+    # Shared cache for ancestor lookups
+    parent_cache = {}
     
     if 'potential_file' in keys:
         include_potential = True
@@ -90,7 +93,7 @@ def elasticparent(database, keys, content_dict=None, record=None,
                 except:
                     # Search grandparents for name of potential
                     potential_name = None
-                    for grandparent_record in database.get_parent_records(record=parent_record):
+                    for grandparent_record in database.get_parent_records(record=parent_record, cache=parent_cache):
                         grandparent = grandparent_record.content
                         try:
                             potential_name = grandparent.find('potential-LAMMPS')['id']
@@ -1,5 +1,5 @@
-# https://github.com/usnistgov/atomman
-from atomman.tools import uber_open_rmode
+# Standard Python libraries
+import io
                        
 # iprPy imports
 from ..tools import aslist
@@ -53,6 +53,13 @@ def parse(inscript, singularkeys=[], allsingular=False):
     
     params = {}
     
+    # Function-specific imports
+    from atomman.tools import uber_open_rmode
+    
+    # Read text mode files, which uber_open_rmode only accepts in bytes mode
+    if isinstance(inscript, io.TextIOBase):
+        inscript = inscript.read().encode('utf-8')
+    
     # Open inscript
     with uber_open_rmode(inscript) as infile:
         
@@ -0,0 +1,219 @@
+# Standard Python libraries
+from collections import OrderedDict
+from contextlib import contextmanager
+import hashlib
+
+# https://github.com/usnistgov/DataModelDict
+from DataModelDict import DataModelDict as DM
+
+# iprPy imports
+from ..tools import lammps_checkversion
+
+__all__ = ['ParseCache', 'parsecache', 'load_system', 'load_model',
+           'load_potential', 'checkversion']
+
+class ParseCache(object):
+    """
+    Bounded least-recently-used cache of the systems, data models and LAMMPS
+    potentials parsed when interpreting calculation inputs, along with the
+    LAMMPS version info of each LAMMPS command.  Objects are keyed by a hash
+    of the content or file name they were parsed from and the loading
+    options.  Cached objects are shared between all users and must not be
+    modified.
+    """
+
+    def __init__(self, maxsize=1024):
+        """
+        Initializes an empty cache.
+
+        Parameters
+        ----------
+        maxsize : int, optional
+            The maximum number of parsed objects to hold (default is 1024).
+        """
+        self.__maxsize = maxsize
+        self.__cache = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def maxsize(self):
+        """int: The maximum number of parsed objects held."""
+        return self.__maxsize
+
+    @property
+    def hits(self):
+        """int: The number of parses avoided."""
+        return self.__hits
+
+    @property
+    def misses(self):
+        """int: The number of parses performed."""
+        return self.__misses
+
+    def __len__(self):
+        return len(self.__cache)
+
+    def clear(self):
+        """Removes all cached objects."""
+        self.__cache = OrderedDict()
+
+    @staticmethod
+    def contentkey(content):
+        """
+        Gives the key term for content to parse, which is a hash for str and
+        bytes content, and None for anything else, i.e. open files and data
+        models, which are not cached.
+        """
+        if isinstance(content, str):
+            return hashlib.sha256(content.encode()).hexdigest()
+        elif isinstance(content, bytes):
+            return hashlib.sha256(content).hexdigest()
+        else:
+            return None
+
+    def get(self, key, parse):
+        """
+        Retrieves a cached object, parsing and caching it if needed.
+        Exceptions raised by the parse function are also cached and raised
+        again for repeated calls.
+
+        Parameters
+        ----------
+        key : tuple
+            The hashable key identifying the parsed object.
+        parse : function
+            Called with no arguments to parse the object if not cached.
+
+        Returns
+        -------
+        any
+            The parsed object.
+        """
+        if key in self.__cache:
+            self.__hits += 1
+            self.__cache.move_to_end(key)
+            value, error = self.__cache[key]
+        else:
+            self.__misses += 1
+            try:
+                value, error = parse(), None
+            except Exception as e:
+                value, error = None, e
+            self.__cache[key] = (value, error)
+            while len(self.__cache) > self.__maxsize:
+                self.__cache.popitem(last=False)
+
+        if error is not None:
+            raise error
+        return value
+
+    def load_system(self, style, content, **kwargs):
+        """Cached version of atomman.load()."""
+        # Function-specific imports
+        import atomman as am
+
+        contentkey = self.contentkey(content)
+        try:
+            key = ('system', style, contentkey, tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError:
+            contentkey = None
+        if contentkey is None:
+            return am.load(style, content, **kwargs)
+        return self.get(key, lambda: am.load(style, content, **kwargs))
+
+    def load_model(self, content):
+        """Cached version of DataModelDict()."""
+        contentkey = self.contentkey(content)
+        if contentkey is None:
+            return DM(content)
+        return self.get(('model', contentkey), lambda: DM(content))
+
+    def load_potential(self, content, pot_dir=None):
+        """Cached version of atomman.lammps.Potential()."""
+        # Function-specific imports
+        import atomman.lammps as lmp
+
+        contentkey = self.contentkey(content)
+        if contentkey is None:
+            return lmp.Potential(content, pot_dir)
+        return self.get(('potential', contentkey, pot_dir),
+                        lambda: lmp.Potential(content, pot_dir))
+
+    def checkversion(self, lammps_command, mpi_command=None):
+        """Cached version of iprPy.tools.lammps_checkversion()."""
+        return self.get(('checkversion', lammps_command, mpi_command),
+                        lambda: lammps_checkversion(lammps_command, mpi_command))
+
+# The cache in use by the load functions, if any
+active = None
+
+@contextmanager
+def parsecache(maxsize=1024):
+    """
+    Context manager that caches the objects parsed by load_system, load_model
+    and load_potential, and the LAMMPS versions found by checkversion, until
+    the context exits.  Used by prepare while interpreting the inputs of all
+    calculation combinations.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        The maximum number of parsed objects to hold (default is 1024).
+
+    Yields
+    ------
+    ParseCache
+        The active cache.
+    """
+    global active
+    previous = active
+    active = ParseCache(maxsize=maxsize)
+    try:
+        yield active
+    finally:
+        active.clear()
+        active = previous
+
+def load_system(style, content, **kwargs):
+    """
+    Loads a system with atomman.load(), reusing a previously loaded system if
+    a parsecache context is active.  Systems loaded inside a parsecache
+    context are shared and should not be modified.
+    """
+    if active is None:
+        import atomman as am
+        return am.load(style, content, **kwargs)
+    return active.load_system(style, content, **kwargs)
+
+def load_model(content):
+    """
+    Parses a data model with DataModelDict, reusing a previously parsed model
+    if a parsecache context is active.  Models parsed inside a parsecache
+    context are shared and should not be modified.
+    """
+    if active is None:
+        return DM(content)
+    return active.load_model(content)
+
+def load_potential(content, pot_dir=None):
+    """
+    Builds an atomman.lammps.Potential, reusing a previously built potential
+    if a parsecache context is active.  Potentials built inside a parsecache
+    context are shared and should not be modified.
+    """
+    if active is None:
+        import atomman.lammps as lmp
+        return lmp.Potential(content, pot_dir)
+    return active.load_potential(content, pot_dir)
+
+def checkversion(lammps_command, mpi_command=None):
+    """
+    Gets the version info of the LAMMPS used for a LAMMPS and MPI command
+    with iprPy.tools.lammps_checkversion(), reusing the info found previously
+    if a parsecache context is active.
+    """
+    if active is None:
+        return lammps_checkversion(lammps_command, mpi_command)
+    return active.checkversion(lammps_command, mpi_command)
@@ -13,7 +13,9 @@ import atomman.unitconvert as uc
 
 from ..Subset import Subset
 from ... import termtodict
+from ...parsecache import load_system, load_model
 from ....tools import aslist
+from ....record import get_record_style
 
 class AtommanSystemLoad(Subset):
     """
@@ -55,6 +57,7 @@ class AtommanSystemLoad(Subset):
                     'ucell',
                     'potential',
                     'elasticconstants_content',
+                    'load_record_style',
                 ]
 
     def template(self, header=None):
@@ -157,7 +160,7 @@ class AtommanSystemLoad(Subset):
             # Try to get symbols by loading file
             if symbols is None:
                 try:
-                    ucell = am.load(load_style, load_file, **load_options_kwargs)
+                    ucell = load_system(load_style, load_file, **load_options_kwargs)
                 except:
                     pass
                 else:
@@ -166,12 +169,20 @@ class AtommanSystemLoad(Subset):
         
         # Extract system_family (and possibly symbols) from parent model
         if elastic_file is not None:
-            model = DM(elastic_file)
+            model = load_model(elastic_file)
         elif load_style == 'system_model':
-            model = DM(load_file)
+            model = load_model(load_file)
         else:
             model = None
         
+        # Identify the record style of a parent record being loaded
+        load_record_style = None
+        if load_style == 'system_model':
+            try:
+                load_record_style = get_record_style(load_model(load_file))
+            except:
+                pass
+        
         if model is not None:    
             # Check if family in model
             if family is None:
@@ -206,6 +217,7 @@ class AtommanSystemLoad(Subset):
         input_dict[keymap['family']] = family
         input_dict[keymap['ucell']] = ucell
         input_dict[keymap['symbols']] = symbols
+        input_dict[keymap['load_record_style']] = load_record_style
 
     def buildcontent(self, record_model, input_dict, results_dict=None):
         """
@@ -231,6 +243,8 @@ class AtommanSystemLoad(Subset):
         system['artifact']['file'] = input_dict[f'{prefix}load_file']
         system['artifact']['format'] = input_dict[f'{prefix}load_style']
         system['artifact']['load_options'] = input_dict[f'{prefix}load_options']
+        if input_dict.get(f'{prefix}load_record_style', None) is not None:
+            system['artifact']['record-style'] = input_dict[f'{prefix}load_record_style']
         system['symbol'] = input_dict[f'{prefix}symbols']
         
     def todict(self, record_model, params, full=True, flat=False):
@@ -1,8 +1,7 @@
-import atomman.lammps as lmp
-
 from DataModelDict import DataModelDict as DM
 
 from ..Subset import Subset
+from ...parsecache import checkversion
 
 class LammpsCommands(Subset):
     """
@@ -65,7 +64,7 @@ class LammpsCommands(Subset):
         mpi_command = input_dict.get(keymap['mpi_command'], None)
         
         # Retrieve lammps_version info
-        lammps_version = lmp.checkversion(lammps_command)
+        lammps_version = checkversion(lammps_command, mpi_command)
         
         # Save processed terms
         input_dict[keymap['mpi_command']] = mpi_command
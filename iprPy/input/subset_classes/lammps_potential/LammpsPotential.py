@@ -1,8 +1,7 @@
-import atomman.lammps as lmp
-
 from DataModelDict import DataModelDict as DM
 
 from ..Subset import Subset
+from ...parsecache import load_potential
 
 class LammpsPotential(Subset):
     """
@@ -72,8 +71,8 @@ class LammpsPotential(Subset):
         
         # Save processed terms
         input_dict[keymap['potential_dir']] = potential_dir
-        input_dict[keymap['potential']] = lmp.Potential(potential_file,
-                                                        potential_dir)
+        input_dict[keymap['potential']] = load_potential(potential_file,
+                                                         potential_dir)
 
     def buildcontent(self, record_model, input_dict, results_dict=None):
         """
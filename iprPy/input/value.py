@@ -1,6 +1,3 @@
-# https://github.com/usnistgov/atomman
-import atomman.unitconvert as uc
-
 __all__ = ['value']
 
 def value(input_dict, key, default_unit=None, default_term=None):
@@ -34,6 +31,9 @@ def value(input_dict, key, default_unit=None, default_term=None):
         The interpreted value of the input parameter's str value in the
         working units.
     """
+    # Function-specific imports
+    import atomman.unitconvert as uc
+    
     term = input_dict.get(key, default_term)
     
     try:
@@ -8,9 +8,6 @@ import numpy as np
 # https://pandas.pydata.org/
 import pandas as pd
 
-# https://github.com/usnistgov/atomman
-import atomman as am
-
 # https://github.com/usnistgov/DataModelDict
 from DataModelDict import DataModelDict as DM
 
@@ -78,6 +75,9 @@ class CalculationRecord(Record):
         AttributeError
             If buildcontent is not defined for record style.
         """
+        # Function-specific imports
+        import atomman as am
+        
         # Create the root of the DataModelDict
         content = DM()
         content[self.contentroot] = calc = DM()
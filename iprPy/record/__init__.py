@@ -14,9 +14,44 @@ from .Record import Record
 from .CalculationRecord import CalculationRecord
 
 ignorelist = ['Record']
-loaded, failed = dynamic_import(__file__, __name__, ignorelist=ignorelist)
+loaded, failed = dynamic_import(__file__, __name__, ignorelist=ignorelist, lazy=True)
 
 def load_record(style, name=None, content=None):
     return loaded[style](name=name, content=content)
 
-__all__ = ['Record', 'load_record', 'failed', 'loaded']
\ No newline at end of file
+def get_record_style(model):
+    """
+    Identifies the record style of record content based on its root element.
+    
+    Parameters
+    ----------
+    model : DataModelDict.DataModelDict
+        The record content.
+    
+    Returns
+    -------
+    str or None
+        The matching record style, or None if the content's root element is
+        not unique to one loaded record style.
+    """
+    # Build mapping of root elements to record styles on first call
+    if len(record_roots) == 0:
+        for record_style, record_class in loaded.items():
+            try:
+                root = record_class().contentroot
+            except:
+                continue
+            
+            # Roots shared by multiple styles cannot identify the style
+            if root in record_roots:
+                record_roots[root] = None
+            else:
+                record_roots[root] = record_style
+    
+    root = list(model.keys())[0]
+    return record_roots.get(root, None)
+
+# Maps record content root elements to record styles
+record_roots = {}
+
+__all__ = ['Record', 'load_record', 'get_record_style', 'failed', 'loaded']
\ No newline at end of file
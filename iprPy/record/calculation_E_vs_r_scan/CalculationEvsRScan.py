@@ -93,6 +93,9 @@ class CalculationEvsRScan(CalculationRecord):
         run_params['maximum_r'] = uc.model(input_dict['maximum_r'],
                                            input_dict['length_unit'])
         run_params['number_of_steps_r'] = input_dict['number_of_steps_r']
+        if input_dict.get('refine_tolerance_r', None) is not None:
+            run_params['refine_tolerance_r'] = uc.model(input_dict['refine_tolerance_r'],
+                                                        input_dict['length_unit'])
         
         # Copy over potential data model info
         subset('lammps_potential').buildcontent(calc, input_dict, results_dict=results_dict)
@@ -146,6 +149,10 @@ class CalculationEvsRScan(CalculationRecord):
         params['minimum_r'] = uc.value_unit(calc['calculation']['run-parameter']['minimum_r'])
         params['maximum_r'] = uc.value_unit(calc['calculation']['run-parameter']['maximum_r'])
         params['number_of_steps_r'] = calc['calculation']['run-parameter']['number_of_steps_r']
+        if 'refine_tolerance_r' in calc['calculation']['run-parameter']:
+            params['refine_tolerance_r'] = uc.value_unit(calc['calculation']['run-parameter']['refine_tolerance_r'])
+        else:
+            params['refine_tolerance_r'] = np.nan
         
         # Extract potential info
         subset('lammps_potential').todict(calc, params, full=full, flat=flat)
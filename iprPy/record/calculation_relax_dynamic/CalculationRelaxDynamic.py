@@ -94,6 +94,10 @@ class CalculationRelaxDynamic(CalculationRecord):
         run_params['runsteps'] = input_dict['runsteps']
         run_params['equilsteps'] = input_dict['equilsteps']
         run_params['randomseed'] = input_dict['randomseed']
+        run_params['chunksteps'] = input_dict['chunksteps']
+        run_params['energy-uncertainty'] = uc.model(input_dict['energy_uncertainty'],
+                                                    input_dict['energy_unit'])
+        run_params['length-uncertainty'] = input_dict['length_uncertainty']
         
         # Copy over potential data model info
         subset('lammps_potential').buildcontent(calc, input_dict, results_dict=results_dict)
@@ -184,6 +188,19 @@ class CalculationRelaxDynamic(CalculationRecord):
             calc['cohesive-energy'] = uc.model(results_dict['E_coh'],
                                                input_dict['energy_unit'],
                                                results_dict.get('E_coh_std', None))
+            
+            # Save the equilibration time and standard errors of the means
+            if 'E_coh_err' in results_dict:
+                calc['equilibration-steps'] = results_dict['equilsteps']
+                calc['standard-error'] = se = DM()
+                se['lx'] = uc.model(results_dict['lx_err'] / (input_dict['sizemults'][0][1] - input_dict['sizemults'][0][0]),
+                                    input_dict['length_unit'])
+                se['ly'] = uc.model(results_dict['ly_err'] / (input_dict['sizemults'][1][1] - input_dict['sizemults'][1][0]),
+                                    input_dict['length_unit'])
+                se['lz'] = uc.model(results_dict['lz_err'] / (input_dict['sizemults'][2][1] - input_dict['sizemults'][2][0]),
+                                    input_dict['length_unit'])
+                se['cohesive-energy'] = uc.model(results_dict['E_coh_err'],
+                                                 input_dict['energy_unit'])
     
     def todict(self, full=True, flat=False):
         """
@@ -257,5 +274,12 @@ class CalculationRelaxDynamic(CalculationRecord):
             params['measured_pressure_xz_std'] = uc.error_unit(calc['measured-phase-state']['pressure-xz'])
             params['measured_pressure_yz'] = uc.value_unit(calc['measured-phase-state']['pressure-yz'])
             params['measured_pressure_xyz_std'] = uc.error_unit(calc['measured-phase-state']['pressure-yz'])
+            
+            if 'standard-error' in calc:
+                params['equilibration_steps'] = calc['equilibration-steps']
+                params['lx_err'] = uc.value_unit(calc['standard-error']['lx'])
+                params['ly_err'] = uc.value_unit(calc['standard-error']['ly'])
+                params['lz_err'] = uc.value_unit(calc['standard-error']['lz'])
+                params['E_cohesive_err'] = uc.value_unit(calc['standard-error']['cohesive-energy'])
         
         return params
\ No newline at end of file
@@ -3,6 +3,14 @@ from .aslist import aslist, iaslist
 from .filltemplate import filltemplate
 from .screen_input import screen_input
 from .dynamic_import import dynamic_import
+from .neighbor_distances import neighbor_pairs, shortest_distance
+from .timeseries import (statistical_inefficiency, detect_equilibration,
+                         standard_error)
+from .reference_cache import ReferenceCache
+from .lammps_capabilities import (LammpsCapabilities, lammps_capabilities,
+                                  potential_pair_styles)
+from .lammps_backend import (LammpsSession, lammps_run, lammps_checkversion,
+                             lammps_backend, lammps_session)
 
 from .get_mp_structures import get_mp_structures
 from .get_oqmd_structures import get_oqmd_structures
@@ -13,6 +21,11 @@ from .generate_potential_record import generate_potential_record
 from .save_potential_record import save_potential_record
 
 __all__ = ['aslist', 'iaslist', 'filltemplate', 'screen_input', 'dynamic_import',
+           'neighbor_pairs', 'shortest_distance', 'ReferenceCache',
+           'statistical_inefficiency', 'detect_equilibration', 'standard_error',
+           'LammpsCapabilities', 'lammps_capabilities', 'potential_pair_styles',
+           'LammpsSession', 'lammps_run', 'lammps_checkversion', 'lammps_backend',
+           'lammps_session',
            'get_mp_structures', 'get_oqmd_structures',
            'loaded_formats', 'failed_formats', 'PotentialGenerator',
            'generate_potential_record', 'save_potential_record']
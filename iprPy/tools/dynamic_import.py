@@ -1,55 +1,250 @@
 # Standard Python libraries
 import sys
+import time
+import threading
+from collections.abc import Mapping
 from pathlib import Path
 from importlib import import_module
 
-def dynamic_import(module_file, module_name, ignorelist=None):
+__all__ = ['dynamic_import', 'StyleRegistry', 'import_times']
+
+# Seconds spent importing each style module, keyed by full module name
+import_times = {}
+
+def find_styles(module_file, ignorelist=None):
     """
-    Dynamically imports classes stored in submodules and makes them directly
-    accessible by style name within the returned loaded dictionary.
-    
+    Lists the style names of the submodules in a module's directory.
+
     Parameters
     ----------
-    
+    module_file : str
+        The path to the module's __init__ file.
+    ignorelist : list, optional
+        Submodule names that are not styles.
+
     Returns
     -------
-    loaded : dict
-        Contains the derived classes that were successfully loaded and
-        accessible by style name (root submodule).
-    failed : dict
-        
+    list of str
+        The style names.
     """
     if ignorelist is None:
         ignorelist = []
     names = []
     parent = Path(module_file).parent
     ignorelist = ['__init__', '__pycache__'] + ignorelist
-    loaded = {}
-    failed = {}
-    
+
     for child in parent.iterdir():
         if child.is_dir():
             name = child.name
             if name not in ignorelist:
                 names.append(name)
-        
+
         elif child.is_file():
             name = child.stem
             ext = child.suffix
-            
+
             if ext.lower() in ('.py', '.pyc'):
                 if name not in ignorelist and name not in names:
                     names.append(name)
-    
-    for name in names:
+
+    return names
+
+def import_style(name, module_name):
+    """
+    Imports a style submodule and returns the single attribute listed in its
+    __all__.
+    """
+    start = time.perf_counter()
+    try:
+        module = import_module('.' + name, module_name)
+        all = getattr(module, '__all__')
+        if len(all) != 1:
+            raise AttributeError("module's __all__ must have only one attribute")
+        return getattr(module, all[0])
+    finally:
+        import_times[f'{module_name}.{name}'] = time.perf_counter() - start
+
+class StyleRegistry(object):
+    """
+    Registry of the styles of a module that discovers the style names from
+    the module's directory and only imports each style's submodule when the
+    style is first accessed.  The loaded and failed attributes are dict-like
+    views matching the dicts returned by eager dynamic_import: accessing a
+    single style imports only that style, while listing the styles in either
+    view imports all of them.
+    """
+
+    def __init__(self, module_file, module_name, ignorelist=None):
+        """
+        Discovers the styles of a module.
+
+        Parameters
+        ----------
+        module_file : str
+            The path to the module's __init__ file.
+        module_name : str
+            The module's full name.
+        ignorelist : list, optional
+            Submodule names that are not styles.
+        """
+        self.__module_name = module_name
+        self.__names = find_styles(module_file, ignorelist=ignorelist)
+        self.__loaded = {}
+        self.__failed = {}
+        self.__lock = threading.RLock()
+        self.loaded = LoadedStyles(self)
+        self.failed = FailedStyles(self)
+
+    @property
+    def module_name(self):
+        """str: The full name of the module."""
+        return self.__module_name
+
+    @property
+    def names(self):
+        """list: The discovered style names, including any that fail import."""
+        return list(self.__names)
+
+    @property
+    def imported(self):
+        """list: The names of the styles that have been imported or tried."""
+        return list(self.__loaded) + list(self.__failed)
+
+    def load(self, name):
+        """
+        Imports a style if it has not already been tried.
+
+        Parameters
+        ----------
+        name : str
+            The style name.
+
+        Returns
+        -------
+        bool
+            True if the style is loaded, False if it failed or is not a
+            discovered style.
+        """
+        if name in self.__loaded:
+            return True
+        if name in self.__failed or name not in self.__names:
+            return False
+        with self.__lock:
+            if name not in self.__loaded and name not in self.__failed:
+                try:
+                    self.__loaded[name] = import_style(name, self.module_name)
+                except:
+                    self.__failed[name] = '%s: %s' % sys.exc_info()[:2]
+        return name in self.__loaded
+
+    def load_all(self):
+        """Imports all styles that have not already been tried."""
+        for name in self.__names:
+            self.load(name)
+
+    def get_loaded(self, name):
+        """Returns a loaded style, raising a KeyError if it failed."""
+        if not self.load(name):
+            raise KeyError(name)
+        return self.__loaded[name]
+
+    def get_failed(self, name):
+        """Returns the error of a failed style, raising a KeyError if loaded."""
+        self.load(name)
+        return self.__failed[name]
+
+    def loaded_names(self):
+        """list: The names of all successfully loaded styles."""
+        self.load_all()
+        return [name for name in self.__names if name in self.__loaded]
+
+    def failed_names(self):
+        """list: The names of all styles that failed import."""
+        self.load_all()
+        return [name for name in self.__names if name in self.__failed]
+
+class LoadedStyles(Mapping):
+    """Dict-like view of the successfully loaded styles of a StyleRegistry."""
+
+    def __init__(self, registry):
+        self.__registry = registry
+
+    def __getitem__(self, name):
+        return self.__registry.get_loaded(name)
+
+    def __contains__(self, name):
+        return self.__registry.load(name)
+
+    def __iter__(self):
+        return iter(self.__registry.loaded_names())
+
+    def __len__(self):
+        return len(self.__registry.loaded_names())
+
+    def __repr__(self):
+        return repr(dict(self))
+
+class FailedStyles(Mapping):
+    """Dict-like view of the error messages of the styles that failed import."""
+
+    def __init__(self, registry):
+        self.__registry = registry
+
+    def __getitem__(self, name):
+        return self.__registry.get_failed(name)
+
+    def __contains__(self, name):
+        try:
+            self.__registry.get_failed(name)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(self.__registry.failed_names())
+
+    def __len__(self):
+        return len(self.__registry.failed_names())
+
+    def __repr__(self):
+        return repr(dict(self))
+
+def dynamic_import(module_file, module_name, ignorelist=None, lazy=False):
+    """
+    Dynamically imports classes stored in submodules and makes them directly
+    accessible by style name within the returned loaded dictionary.
+
+    Parameters
+    ----------
+    module_file : str
+        The path to the module's __init__ file.
+    module_name : str
+        The module's full name.
+    ignorelist : list, optional
+        Submodule names that are not styles.
+    lazy : bool, optional
+        If True, the submodules are only imported when their styles are
+        accessed, and loaded and failed are dict-like views of a
+        StyleRegistry.  Default value is False.
+
+    Returns
+    -------
+    loaded : dict
+        Contains the derived classes that were successfully loaded and
+        accessible by style name (root submodule).
+    failed : dict
+        Contains the error messages of the styles that failed import.
+    """
+    if lazy:
+        registry = StyleRegistry(module_file, module_name, ignorelist=ignorelist)
+        return registry.loaded, registry.failed
+
+    loaded = {}
+    failed = {}
+    for name in find_styles(module_file, ignorelist=ignorelist):
         try:
-            module = import_module('.' + name, module_name)
-            all = getattr(module, '__all__')
-            if len(all) != 1:
-                raise AttributeError("module's __all__ must have only one attribute")
+            loaded[name] = import_style(name, module_name)
         except:
             failed[name] = '%s: %s' % sys.exc_info()[:2]
-        else:
-            loaded[name] = getattr(module, all[0])
-    
-    return loaded, failed
\ No newline at end of file
+
+    return loaded, failed
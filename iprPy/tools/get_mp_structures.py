@@ -5,9 +5,6 @@ import uuid
 # https://github.com/usnistgov/DataModelDict
 from DataModelDict import DataModelDict as DM
 
-# https://github.com/usnistgov/atomman
-import atomman as am
-
 # iprPy imports
 from .. import libdir
 
@@ -53,6 +50,7 @@ def get_mp_structures(elements, api_key=None, lib_directory=None):
     """
     # Function-specific imports
     import pymatgen as pmg
+    import atomman as am
     from pymatgen.ext.matproj import MPRester
     
     # Set source name and link
@@ -5,9 +5,6 @@ import uuid
 # https://github.com/usnistgov/DataModelDict
 from DataModelDict import DataModelDict as DM
 
-# https://github.com/usnistgov/atomman
-import atomman as am
-
 # iprPy imports
 from .. import libdir
 
@@ -41,6 +38,7 @@ def get_oqmd_structures(elements, lib_directory=None):
     """
     # Function-specific imports
     import requests
+    import atomman as am
     
     sourcename = "Open Quantum Materials Database"
     sourcelink = "http://oqmd.org/"
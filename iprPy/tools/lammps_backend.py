@@ -0,0 +1,343 @@
+# Standard Python libraries
+import os
+import datetime
+import tempfile
+import threading
+from pathlib import Path
+
+# iprPy imports
+from .lammps_capabilities import get_registry
+
+__all__ = ['LammpsSession', 'lammps_run', 'lammps_checkversion',
+           'lammps_backend', 'lammps_session']
+
+# Environment variable selecting the LAMMPS backend
+backend_envvar = 'IPRPY_LAMMPS_BACKEND'
+
+# Supported backends
+backends = ['subprocess', 'library']
+
+def lammps_backend():
+    """
+    Returns the LAMMPS backend selected by the IPRPY_LAMMPS_BACKEND
+    environment variable: 'subprocess' (default), which runs the
+    lammps_command executable for each simulation, or 'library', which runs
+    the simulations in a persistent session of the LAMMPS shared library
+    found by the lammps Python module.
+
+    Raises
+    ------
+    ValueError
+        If the environment variable is set to an unsupported backend.
+    """
+    backend = os.environ.get(backend_envvar, 'subprocess')
+    if backend == '':
+        backend = 'subprocess'
+    if backend not in backends:
+        raise ValueError(f'unsupported {backend_envvar} {backend}: must be one of {backends}')
+    return backend
+
+class LammpsSession(object):
+    """
+    Persistent in-process LAMMPS session that runs input scripts through the
+    LAMMPS Python module.  Each run starts from a cleared state and writes
+    the same log file as running the executable would, so that the results
+    can be read the same way.  This avoids the LAMMPS process startup cost
+    of each simulation, which dominates the run time of small and iterative
+    simulations.  A session that has issued an error is closed, as errors can
+    leave it unusable.  A session must only be used by one thread at a time.
+    """
+
+    def __init__(self):
+        """
+        Starts a serial LAMMPS session.
+
+        Raises
+        ------
+        ImportError
+            If the lammps Python module is not installed.
+        OSError
+            If the LAMMPS shared library cannot be loaded.
+        """
+        import lammps
+        self.__lammps = lammps.lammps(cmdargs=['-screen', 'none', '-log', 'none'])
+        self.__date = datetime.date.fromisoformat(str(self.__lammps.version()))
+        self.__version = f'{self.__date.day} {self.__date:%b %Y}'
+        self.__closed = False
+
+    @property
+    def lammps(self):
+        """
+        lammps.lammps: The LAMMPS Python interface object, which can be used
+        to extract the final state of the last run as numpy arrays.
+        """
+        return self.__lammps
+
+    @property
+    def date(self):
+        """datetime.date: The LAMMPS version date."""
+        return self.__date
+
+    @property
+    def version(self):
+        """str: The LAMMPS version as given in log file headers."""
+        return self.__version
+
+    @property
+    def closed(self):
+        """bool: Indicates if the session has been closed."""
+        return self.__closed
+
+    def close(self):
+        """Closes the LAMMPS session."""
+        if not self.__closed:
+            self.__closed = True
+            self.__lammps.close()
+
+    def reset(self):
+        """Clears all atoms, settings, variables and warning counts."""
+        self.__lammps.command('clear')
+
+        # The warning count persists through clear, and the message printed
+        # once it passes the limit breaks atomman's reading of thermo data
+        self.__lammps.command('thermo_modify warn reset')
+        for name in self.__lammps.available_ids('variable'):
+            self.__lammps.command(f'variable {name} delete')
+
+    def run(self, script_name=None, script=None, logfile='log.lammps'):
+        """
+        Runs a LAMMPS input script.
+
+        Parameters
+        ----------
+        script_name : str, optional
+            Path of the LAMMPS input script file to use.  Either script_name
+            or script must be given.
+        script : str, optional
+            The LAMMPS input script command lines to use.  Either script_name
+            or script must be given.
+        logfile : str, optional
+            The log file to write (default is 'log.lammps').  If None, the
+            log is read from a temporary file.
+
+        Returns
+        -------
+        atomman.lammps.Log
+            The simulation's log.
+
+        Raises
+        ------
+        atomman.lammps.LammpsError
+            If LAMMPS issues an error.
+        """
+        if script_name is not None:
+            if script is not None:
+                raise ValueError('Cannot give both script and script_name')
+        elif script is None:
+            raise ValueError('script or script_name must be given')
+
+        # Function-specific imports
+        import atomman.lammps as lmp
+
+        tmpdir = None
+        if logfile is None:
+            tmpdir = tempfile.TemporaryDirectory()
+            logfile = Path(tmpdir.name, 'log.lammps').as_posix()
+
+        try:
+            # Start log with the header that atomman reads the version from
+            with open(logfile, 'w') as f:
+                f.write(f'LAMMPS ({self.version})\n')
+
+            self.reset()
+            self.__lammps.command(f'log {logfile} append')
+            try:
+                if script_name is not None:
+                    self.__lammps.file(str(script_name))
+                else:
+                    self.__lammps.commands_string(script)
+            except Exception as e:
+                self.close()
+                raise lmp.LammpsError(str(e)) from e
+            self.__lammps.command('log none')
+
+            return lmp.Log(logfile)
+        finally:
+            if tmpdir is not None:
+                tmpdir.cleanup()
+
+    def commands(self, script, logfile=None):
+        """
+        Runs LAMMPS command lines, continuing from the current state of the
+        session.  This allows for iterative simulations to update and
+        evaluate a system without reading it in again.
+
+        Parameters
+        ----------
+        script : str
+            The LAMMPS command lines to run.
+        logfile : str, optional
+            If given, the LAMMPS output is appended to this log file.
+
+        Raises
+        ------
+        atomman.lammps.LammpsError
+            If LAMMPS issues an error.
+        """
+        # Function-specific imports
+        import atomman.lammps as lmp
+
+        if logfile is not None:
+            self.__lammps.command(f'log {logfile} append')
+        try:
+            self.__lammps.commands_string(script)
+        except Exception as e:
+            self.close()
+            raise lmp.LammpsError(str(e)) from e
+        if logfile is not None:
+            self.__lammps.command('log none')
+
+# atomman.lammps.run parameters supported by the library backend
+library_kwargs = ['script', 'logfile', 'screen', 'return_log']
+
+# The sessions used by lammps_run, started on first use in each thread
+sessions = threading.local()
+
+def get_session():
+    """
+    Returns the calling thread's persistent LammpsSession, starting it if
+    needed.  Each thread has its own session, as runs clear the session's
+    state and calculations may run simulations from several threads.
+    """
+    session = getattr(sessions, 'session', None)
+    if session is None or session.closed:
+        session = LammpsSession()
+        sessions.session = session
+    return session
+
+def library_matches(lammps_command, libsession):
+    """
+    Checks if the LAMMPS library can stand in for a LAMMPS executable, which
+    requires that both are the same LAMMPS version.  The version of the
+    executable is taken from the LammpsCapabilities registry.
+
+    Raises
+    ------
+    ValueError
+        If lammps_command is not found or fails to run, as its version
+        cannot then be compared.
+    """
+    version = get_registry().checkversion(lammps_command)
+    return version['date'] == libsession.date
+
+def lammps_session(mpi_command=None, lammps_command=None):
+    """
+    Gets the calling thread's persistent LammpsSession for calculations that
+    drive iterative simulations through the LAMMPS library directly.
+
+    Parameters
+    ----------
+    mpi_command : str, optional
+        The MPI command of the simulations, as sessions only run serially.
+    lammps_command : str, optional
+        The LAMMPS command of the simulations.  If given, the session is
+        only returned if the library is the same LAMMPS version as the
+        executable.
+
+    Returns
+    -------
+    LammpsSession or None
+        The session if the library backend is selected, mpi_command is None,
+        the LAMMPS library can be loaded and it matches lammps_command,
+        otherwise None.
+
+    Raises
+    ------
+    ValueError
+        If the library backend is used and lammps_command is given but is
+        not found or fails to run.
+    """
+    if lammps_backend() != 'library' or mpi_command is not None:
+        return None
+    try:
+        libsession = get_session()
+    except (ImportError, OSError):
+        return None
+    if lammps_command is not None and not library_matches(lammps_command, libsession):
+        return None
+    return libsession
+
+def lammps_run(lammps_command, script_name=None, mpi_command=None, **kwargs):
+    """
+    Runs a LAMMPS simulation with the backend selected by lammps_backend().
+    Takes the same parameters as atomman.lammps.run.  The library backend
+    only handles serial runs using the script, logfile, screen and
+    return_log parameters with a LAMMPS library of the same version as
+    lammps_command, and falls back on atomman.lammps.run for all other runs
+    or if the LAMMPS library cannot be loaded.
+
+    Returns
+    -------
+    atomman.lammps.Log
+        The simulation's log.
+
+    Raises
+    ------
+    ValueError
+        If the library backend would be used but lammps_command is not found
+        or fails to run, so the library's version cannot be verified.
+    """
+    # Function-specific imports
+    import atomman.lammps as lmp
+
+    if all(key in library_kwargs for key in kwargs):
+        libsession = lammps_session(mpi_command, lammps_command)
+        if libsession is not None:
+            log = libsession.run(script_name=script_name,
+                                 script=kwargs.get('script', None),
+                                 logfile=kwargs.get('logfile', 'log.lammps'))
+            if kwargs.get('return_log', True):
+                return log
+            return None
+
+    return lmp.run(lammps_command, script_name, mpi_command=mpi_command, **kwargs)
+
+def close_session():
+    """Closes the calling thread's persistent LammpsSession if it is open."""
+    session = getattr(sessions, 'session', None)
+    if session is not None:
+        try:
+            session.close()
+        finally:
+            sessions.session = None
+
+def lammps_checkversion(lammps_command, mpi_command=None):
+    """
+    Gets the version info of the LAMMPS used by lammps_run: the LAMMPS
+    library if lammps_run will run the simulations with it, otherwise
+    lammps_command.  The version of lammps_command is taken from the
+    LammpsCapabilities registry, so the executable is only run the first
+    time it is seen.
+
+    Parameters
+    ----------
+    lammps_command : str
+        The LAMMPS command.
+    mpi_command : str, optional
+        The MPI command of the simulations.
+
+    Returns
+    -------
+    dict
+        Contains 'version', the str LAMMPS version, and 'date', the
+        corresponding datetime.date.
+    """
+    libsession = lammps_session(mpi_command, lammps_command)
+    if libsession is not None:
+        return {'version': libsession.version, 'date': libsession.date}
+
+    try:
+        return get_registry().checkversion(lammps_command)
+    except ValueError:
+        import atomman.lammps as lmp
+        return lmp.checkversion(lammps_command)
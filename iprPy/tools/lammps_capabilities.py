@@ -0,0 +1,351 @@
+# Standard Python libraries
+import os
+import datetime
+import getpass
+import json
+import shlex
+import shutil
+import subprocess
+import tempfile
+import uuid
+from pathlib import Path
+
+__all__ = ['LammpsCapabilities', 'lammps_capabilities', 'potential_pair_styles']
+
+class LammpsCapabilities(object):
+    """
+    Persistent registry of what LAMMPS executables can run: the version, the
+    installed packages and the available pair styles.  Each executable is
+    probed once and the results are saved to a JSON registry file along with
+    the executable's resolved path, modification time and size, so that the
+    executable is only probed again after it is replaced.
+
+    The registry file used is named by the IPRPY_LAMMPS_CAPABILITIES
+    environment variable, or is lammpscapabilities.json in the user's iprPy
+    cache directory if it is not set.  The cache directory is iprPy in
+    XDG_CACHE_HOME or ~/.cache, or iprPy-<user> in the temporary directory
+    if that cannot be written.
+    """
+
+    # Environment variable giving the registry file
+    envvar = 'IPRPY_LAMMPS_CAPABILITIES'
+
+    # Name of the default registry file
+    defaultname = 'lammpscapabilities.json'
+
+    def __init__(self, registryfile=None):
+        """
+        Initializes the registry.
+
+        Parameters
+        ----------
+        registryfile : path-like object, optional
+            The JSON file where the capabilities are saved.  If not given,
+            the file named by the IPRPY_LAMMPS_CAPABILITIES environment
+            variable or the default file is used.
+        """
+        if registryfile is None:
+            registryfile = os.environ.get(self.envvar, '')
+            if registryfile == '':
+                registryfile = self.defaultfile()
+        self.__registryfile = Path(registryfile)
+        self.__entries = {}
+
+    @property
+    def registryfile(self):
+        """pathlib.Path: The JSON file where the capabilities are saved."""
+        return self.__registryfile
+
+    @classmethod
+    def defaultfile(cls):
+        """
+        Finds the default registry file in the first writable cache
+        directory.
+
+        Returns
+        -------
+        pathlib.Path
+            The path to the default registry file.
+        """
+        directories = []
+        cachehome = os.environ.get('XDG_CACHE_HOME', '')
+        if cachehome == '':
+            try:
+                cachehome = Path(Path.home(), '.cache')
+            except RuntimeError:
+                cachehome = None
+        if cachehome is not None:
+            directories.append(Path(cachehome, 'iprPy'))
+        try:
+            user = getpass.getuser()
+        except Exception:
+            user = 'user'
+        directories.append(Path(tempfile.gettempdir(), f'iprPy-{user}'))
+
+        for directory in directories:
+            try:
+                directory.mkdir(parents=True, exist_ok=True)
+            except OSError:
+                continue
+            if os.access(directory, os.W_OK):
+                return Path(directory, cls.defaultname)
+        return Path(directories[0], cls.defaultname)
+
+    @staticmethod
+    def executable(lammps_command):
+        """
+        Finds the executable file of a LAMMPS command.
+
+        Parameters
+        ----------
+        lammps_command : str
+            The LAMMPS command, which may include command line arguments.
+
+        Returns
+        -------
+        pathlib.Path
+            The resolved path to the executable.
+
+        Raises
+        ------
+        ValueError
+            If the executable is not found.
+        """
+        command = shlex.split(str(lammps_command))[0]
+        path = shutil.which(command)
+        if path is None:
+            raise ValueError(f'LAMMPS executable {command} not found')
+        return Path(path).resolve()
+
+    @staticmethod
+    def probe(lammps_command):
+        """
+        Runs a LAMMPS executable to find its capabilities.
+
+        Parameters
+        ----------
+        lammps_command : str
+            The LAMMPS command.
+
+        Returns
+        -------
+        dict
+            Contains 'version', the str LAMMPS version, 'date', the
+            corresponding datetime.date, 'packages', the list of installed
+            packages, and 'pair_styles', the list of available pair styles or
+            None if they could not be identified.
+
+        Raises
+        ------
+        ValueError
+            If the command fails to run.
+        """
+        # Function-specific imports
+        import atomman.lammps as lmp
+
+        # Run the full command, as atomman.lammps.checkversion() drops the
+        # arguments that wrapper executables need
+        try:
+            log = lmp.run(str(lammps_command), script='', logfile=None)
+        except Exception as e:
+            raise ValueError(f'Failed to run simulation with lammps_command {lammps_command}') from e
+        capabilities = {'version': log.lammps_version, 'date': log.lammps_date}
+
+        # Parse the package and style lists printed by the help option
+        command = shlex.split(str(lammps_command))
+        try:
+            result = subprocess.run(command + ['-h'], stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL, check=True,
+                                    encoding='utf-8', errors='replace')
+        except (OSError, subprocess.CalledProcessError):
+            lines = []
+        else:
+            lines = result.stdout.splitlines()
+
+        packages = []
+        pair_styles = None
+        section = None
+        for line in lines:
+            if line.startswith('Installed packages:'):
+                section = 'packages'
+            elif line.startswith('* Pair styles'):
+                section = 'pair_styles'
+                pair_styles = []
+            elif line.startswith('* ') or line.startswith('List of'):
+                section = None
+            elif section == 'packages':
+                packages.extend(line.split())
+            elif section == 'pair_styles':
+                pair_styles.extend(line.split())
+
+        capabilities['packages'] = packages
+        capabilities['pair_styles'] = pair_styles
+        return capabilities
+
+    def get(self, lammps_command):
+        """
+        Gets the capabilities of a LAMMPS executable, probing it only if it
+        is not in the registry or has changed since it was probed.
+
+        Parameters
+        ----------
+        lammps_command : str
+            The LAMMPS command.
+
+        Returns
+        -------
+        dict
+            Contains 'version', the str LAMMPS version, 'date', the
+            corresponding datetime.date, 'packages', the list of installed
+            packages, and 'pair_styles', the list of available pair styles or
+            None if they could not be identified.
+
+        Raises
+        ------
+        ValueError
+            If the executable is not found or fails to run.
+        """
+        path = self.executable(lammps_command)
+        stat = path.stat()
+
+        # Commands are identified by the executable and their arguments, as
+        # wrapper executables run LAMMPS named by the arguments
+        arguments = shlex.split(str(lammps_command))[1:]
+        name = shlex.join([path.as_posix()] + arguments)
+
+        entry = self.__entries.get(name, None)
+        if not self.__current(entry, stat):
+            entry = self.__load().get(name, None)
+            if not self.__current(entry, stat):
+                entry = self.probe(lammps_command)
+                entry['date'] = entry['date'].isoformat()
+                entry['mtime'] = stat.st_mtime_ns
+                entry['size'] = stat.st_size
+                self.__save(name, entry)
+            self.__entries[name] = entry
+
+        capabilities = {}
+        capabilities['version'] = entry['version']
+        capabilities['date'] = datetime.date.fromisoformat(entry['date'])
+        capabilities['packages'] = list(entry['packages'])
+        if entry['pair_styles'] is None:
+            capabilities['pair_styles'] = None
+        else:
+            capabilities['pair_styles'] = list(entry['pair_styles'])
+        return capabilities
+
+    def checkversion(self, lammps_command):
+        """
+        Registry version of atomman.lammps.checkversion().
+
+        Returns
+        -------
+        dict
+            Contains 'version', the str LAMMPS version, and 'date', the
+            corresponding datetime.date.
+        """
+        capabilities = self.get(lammps_command)
+        return {'version': capabilities['version'],
+                'date': capabilities['date']}
+
+    def clear(self):
+        """Removes all executables from the registry."""
+        self.__entries = {}
+        if self.registryfile.is_file():
+            self.registryfile.unlink()
+
+    @staticmethod
+    def __current(entry, stat):
+        """Checks if an entry was probed from the executable's current file."""
+        return (entry is not None and entry.get('mtime') == stat.st_mtime_ns
+                and entry.get('size') == stat.st_size)
+
+    def __load(self):
+        """Reads the registry file."""
+        try:
+            with open(self.registryfile) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def __save(self, name, entry):
+        """
+        Adds an entry to the registry file.  The file is replaced atomically
+        so that concurrent calculations never read a partial file.  Failing
+        to save only means the executable is probed again later.
+        """
+        entries = self.__load()
+        entries[name] = entry
+        try:
+            self.registryfile.parent.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            return
+        tmpfile = Path(self.registryfile.parent,
+                       f'.{self.registryfile.name}-{uuid.uuid4()}')
+        try:
+            with open(tmpfile, 'w') as f:
+                json.dump(entries, f, indent=4)
+            os.replace(tmpfile, self.registryfile)
+        except OSError:
+            if tmpfile.is_file():
+                tmpfile.unlink()
+
+# The registry used by lammps_capabilities, created on first use
+registry = None
+
+def get_registry():
+    """Returns the LammpsCapabilities registry, creating it if needed."""
+    global registry
+    if registry is None:
+        registry = LammpsCapabilities()
+    return registry
+
+def lammps_capabilities(lammps_command):
+    """
+    Gets the capabilities of a LAMMPS executable from the registry named by
+    the IPRPY_LAMMPS_CAPABILITIES environment variable, probing the
+    executable only the first time it is seen.
+
+    Parameters
+    ----------
+    lammps_command : str
+        The LAMMPS command.
+
+    Returns
+    -------
+    dict
+        Contains 'version', the str LAMMPS version, 'date', the corresponding
+        datetime.date, 'packages', the list of installed packages, and
+        'pair_styles', the list of available pair styles or None if they
+        could not be identified.
+    """
+    return get_registry().get(lammps_command)
+
+def potential_pair_styles(model):
+    """
+    Lists the LAMMPS pair styles used by a potential_LAMMPS record.
+
+    Parameters
+    ----------
+    model : DataModelDict.DataModelDict
+        The potential_LAMMPS record content.
+
+    Returns
+    -------
+    list of str
+        The pair style, followed by the sub-styles of hybrid pair styles.
+    """
+    pot = model.find('potential-LAMMPS')
+    pair_style = pot['pair_style']['type']
+    pair_styles = [pair_style]
+
+    # Hybrid sub-styles are the first term of each pair_coeff line
+    if pair_style.startswith('hybrid'):
+        for pair_coeff in pot.aslist('pair_coeff'):
+            terms = pair_coeff.aslist('term')
+            if len(terms) > 0 and 'option' in terms[0]:
+                substyle = terms[0]['option'].split()[0]
+                if substyle not in pair_styles:
+                    pair_styles.append(substyle)
+
+    return pair_styles
@@ -0,0 +1,147 @@
+# http://www.numpy.org/
+import numpy as np
+
+__all__ = ['neighbor_pairs', 'shortest_distance']
+
+def image_shifts(box, pbc, cutoff):
+    """
+    Builds the periodic image shifts needed to find all neighbors within a
+    cutoff of positions that have been wrapped to within half a box length
+    of each other.
+
+    Parameters
+    ----------
+    box : atomman.Box
+        The system's box.
+    pbc : list of bool
+        The system's periodic boundary conditions.
+    cutoff : float
+        The neighbor cutoff distance.
+
+    Returns
+    -------
+    numpy.ndarray
+        (M, 3) array of integer image shifts in box vector units.
+    """
+    vects = box.vects
+    volume = abs(np.linalg.det(vects))
+    ranges = []
+    for k in range(3):
+        if pbc[k]:
+            # Spacing between the box faces normal to the other two vectors
+            spacing = volume / np.linalg.norm(np.cross(vects[(k+1) % 3],
+                                                       vects[(k+2) % 3]))
+            n = int(np.floor(cutoff / spacing + 0.5))
+            ranges.append(np.arange(-n, n+1))
+        else:
+            ranges.append(np.array([0]))
+    return np.array(np.meshgrid(*ranges, indexing='ij')).reshape(3, -1).T
+
+def neighbor_pairs(system, cutoff, points=None, chunksize=1000000):
+    """
+    Identifies all neighbor pairs within a cutoff distance using the
+    minimum image convention generalized to triclinic boxes and to cutoffs
+    larger than half the box size, i.e. every periodic image within the
+    cutoff is included.  The search is vectorized using numpy with the pair
+    evaluations done in chunks to limit memory use.
+
+    Parameters
+    ----------
+    system : atomman.System
+        The system to search.
+    cutoff : float
+        The neighbor cutoff distance.
+    points : array-like object, optional
+        (P, 3) Cartesian positions to find the atom neighbors of.  If not
+        given (default), the neighbors of each atom are found, with an
+        atom's own periodic images counted as its neighbors.
+    chunksize : int, optional
+        The approximate maximum number of pair-image vectors to evaluate at
+        once (Default is 1000000).
+
+    Returns
+    -------
+    i : numpy.ndarray of int
+        The indices of the atoms (or points) for each pair.
+    j : numpy.ndarray of int
+        The indices of the neighbor atoms for each pair.  Both orderings of
+        atom pairs are included.
+    dvects : numpy.ndarray of float
+        (K, 3) Cartesian vectors from i to the j neighbors.
+    """
+    vects = system.box.vects
+    pbc = np.asarray(system.pbc, dtype=bool)
+
+    # Convert positions to box vector units
+    inverse = np.linalg.inv(vects)
+    spos = np.dot(system.atoms.pos - system.box.origin, inverse)
+    if points is None:
+        qpos = spos
+    else:
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        qpos = np.dot(points - system.box.origin, inverse)
+
+    shifts = image_shifts(system.box, pbc, cutoff)
+    natoms = len(spos)
+    chunk = max(1, chunksize // max(1, natoms * len(shifts)))
+    cutoff2 = cutoff ** 2
+
+    i_list = []
+    j_list = []
+    dvect_list = []
+    for start in range(0, len(qpos), chunk):
+        # Relative scaled positions reduced to the nearest image
+        delta = spos[np.newaxis, :, :] - qpos[start:start+chunk, np.newaxis, :]
+        delta[:, :, pbc] -= np.round(delta[:, :, pbc])
+
+        # Add image shifts and convert to Cartesian
+        dvects = (delta[:, :, np.newaxis, :] + shifts) @ vects
+        dmag2 = np.einsum('...i,...i', dvects, dvects)
+
+        within = dmag2 <= cutoff2
+        if points is None:
+            # Exclude each atom's zero vector to itself
+            within &= dmag2 > 1e-20 * cutoff2
+        ii, jj, mm = np.nonzero(within)
+        i_list.append(ii + start)
+        j_list.append(jj)
+        dvect_list.append(dvects[ii, jj, mm])
+
+    if len(i_list) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros((0, 3))
+    return (np.concatenate(i_list), np.concatenate(j_list),
+            np.concatenate(dvect_list))
+
+def shortest_distance(system):
+    """
+    Finds the shortest interatomic distance in a system, including the
+    distances between atoms and their own periodic images.
+
+    Parameters
+    ----------
+    system : atomman.System
+        The system to evaluate.
+
+    Returns
+    -------
+    float
+        The shortest interatomic distance, or numpy.inf if the system has no
+        atom pairs.
+    """
+    # The periodic box vectors bound the shortest distance
+    vects = system.box.vects
+    lengths = [np.linalg.norm(vects[k]) for k in range(3) if system.pbc[k]]
+    if len(lengths) == 3:
+        # So does the close-packed sphere density: N pi d^3 / 6 <= 0.74048 V
+        packing = (2**0.5 * system.box.volume / system.natoms) ** (1 / 3)
+        cutoff = min(lengths + [packing]) * (1 + 1e-8)
+    elif len(lengths) > 0:
+        cutoff = min(lengths) * (1 + 1e-8)
+    else:
+        pos = system.atoms.pos
+        cutoff = np.linalg.norm(pos.max(axis=0) - pos.min(axis=0)) * (1 + 1e-8)
+
+    dvects = neighbor_pairs(system, cutoff)[2]
+    if len(dvects) == 0:
+        return np.inf
+    return np.sqrt(np.einsum('...i,...i', dvects, dvects).min())
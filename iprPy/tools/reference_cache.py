@@ -0,0 +1,173 @@
+# Standard Python libraries
+from pathlib import Path
+import os
+import json
+import hashlib
+import shutil
+import uuid
+
+# http://www.numpy.org/
+import numpy as np
+
+__all__ = ['ReferenceCache']
+
+class ReferenceCache(object):
+    """
+    Content-addressed cache of the results of relaxing perfect-crystal
+    reference systems, allowing for calculations of different defects in the
+    same bulk system to relax the bulk only once.  Each entry is a directory
+    named by the hash of the terms that determine the relaxation, i.e. the
+    calculation, potential, system, LAMMPS version and minimization
+    parameters, containing the result values and files.
+
+    Calculations use the cache named by the IPRPY_REFERENCE_CACHE environment
+    variable, which the runner sets to a hidden directory of the run
+    directory unless the variable is already set.
+    """
+
+    # Environment variable giving the cache directory
+    envvar = 'IPRPY_REFERENCE_CACHE'
+
+    # Name of the cache directory created in run directories
+    dirname = '.referencecache'
+
+    def __init__(self, directory):
+        """
+        Initializes the cache.
+
+        Parameters
+        ----------
+        directory : path-like object
+            The directory where cache entries are stored.
+        """
+        self.__directory = Path(directory)
+
+    @classmethod
+    def from_environ(cls):
+        """
+        Returns the cache named by the IPRPY_REFERENCE_CACHE environment
+        variable, or None if it is not set.
+        """
+        directory = os.environ.get(cls.envvar, '')
+        if directory == '':
+            return None
+        return cls(directory)
+
+    @property
+    def directory(self):
+        """pathlib.Path: The directory where cache entries are stored."""
+        return self.__directory
+
+    @staticmethod
+    def fingerprint(system, potential):
+        """
+        Hashes a system's atomic configuration as it is passed to LAMMPS.
+
+        Parameters
+        ----------
+        system : atomman.System
+            The system.
+        potential : atomman.lammps.Potential
+            The potential that the system is to be evaluated with.
+
+        Returns
+        -------
+        str
+            The hex digest of the system's LAMMPS data file content along
+            with its symbols and periodic boundaries.
+        """
+        sha = hashlib.sha256()
+        sha.update(system.dump('atom_data', units=potential.units,
+                               atom_style=potential.atom_style,
+                               return_info=False).encode())
+        sha.update(repr((list(system.symbols), list(system.pbc))).encode())
+        return sha.hexdigest()
+
+    @staticmethod
+    def key(**terms):
+        """
+        Builds a cache key by hashing keyword terms.  Values must be
+        JSON serializable, numpy values, or have reproducible str
+        representations.
+
+        Returns
+        -------
+        str
+            The hex digest of the terms.
+        """
+        def default(value):
+            if isinstance(value, (np.generic, np.ndarray)):
+                return value.tolist()
+            return str(value)
+        content = json.dumps(terms, sort_keys=True, default=default)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def get(self, key, directory='.'):
+        """
+        Retrieves a cache entry, copying its files to a directory.
+
+        Parameters
+        ----------
+        key : str
+            The entry's key.
+        directory : path-like object, optional
+            The directory to copy the entry's files to.  Default is the
+            current working directory.
+
+        Returns
+        -------
+        dict or None
+            The entry's values, or None if the entry does not exist.
+        """
+        entry = Path(self.directory, key)
+        try:
+            with open(Path(entry, 'values.json')) as f:
+                values = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        for fname in values.pop('files'):
+            shutil.copy(Path(entry, fname), Path(directory, fname))
+        return values
+
+    def put(self, key, values, files=None, directory='.'):
+        """
+        Saves a cache entry.  If an entry with the key already exists, it is
+        left unchanged.
+
+        Parameters
+        ----------
+        key : str
+            The entry's key.
+        values : dict
+            The result values to save.  Must be JSON serializable, with numpy
+            arrays converted to lists.
+        files : list of str, optional
+            The names of result files to save.
+        directory : path-like object, optional
+            The directory containing the files.  Default is the current
+            working directory.
+        """
+        if files is None:
+            files = []
+        entry = Path(self.directory, key)
+        if entry.is_dir():
+            return
+
+        # Build entry in a temporary directory then move it into place
+        tmpentry = Path(self.directory, f'.{uuid.uuid4()}.tmp')
+        tmpentry.mkdir(parents=True)
+        try:
+            for fname in files:
+                shutil.copy(Path(directory, fname), Path(tmpentry, fname))
+            values = dict(values, files=list(files))
+            with open(Path(tmpentry, 'values.json'), 'w') as f:
+                json.dump(values, f)
+            try:
+                os.rename(tmpentry, entry)
+            except OSError:
+                # Another process saved the entry first
+                pass
+        finally:
+            if tmpentry.is_dir():
+                shutil.rmtree(tmpentry, ignore_errors=True)
@@ -0,0 +1,119 @@
+# http://www.numpy.org/
+import numpy as np
+
+__all__ = ['statistical_inefficiency', 'detect_equilibration',
+           'standard_error']
+
+def statistical_inefficiency(values, mintime=3):
+    """
+    Estimates the statistical inefficiency of a correlated time series, i.e.
+    the number of consecutive samples per uncorrelated sample.  The
+    normalized autocorrelation function is integrated up to the first lag
+    after mintime where it is no longer positive.
+
+    Parameters
+    ----------
+    values : array-like object
+        The time series values, sampled at a constant interval.
+    mintime : int, optional
+        The minimum lag to integrate the autocorrelation function to before
+        checking if it is positive (Default is 3).
+
+    Returns
+    -------
+    float
+        The statistical inefficiency, which is at least 1.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n < 2:
+        return 1.0
+
+    delta = values - values.mean()
+    variance = np.dot(delta, delta) / n
+    if variance == 0.0:
+        return 1.0
+
+    # Autocorrelation function of all lags from a zero-padded FFT
+    size = 2 ** int(np.ceil(np.log2(2 * n)))
+    transform = np.fft.rfft(delta, size)
+    autocorrelation = np.fft.irfft(transform * np.conj(transform), size)[1:n]
+    lags = np.arange(1, n)
+    autocorrelation /= (n - lags) * variance
+
+    # Only integrate up to the first non-positive value after mintime
+    cut = np.nonzero((autocorrelation <= 0.0) & (lags > mintime))[0]
+    if len(cut) > 0:
+        lags = lags[:cut[0]]
+        autocorrelation = autocorrelation[:cut[0]]
+
+    g = 1.0 + 2.0 * np.sum(autocorrelation * (1.0 - lags / n))
+    return max(g, 1.0)
+
+def detect_equilibration(values, nskip=1):
+    """
+    Detects the end of the equilibration period of a time series as the
+    starting sample that maximizes the number of effectively uncorrelated
+    samples that remain.  This balances the bias of including unequilibrated
+    samples against the variance of discarding equilibrated ones (Chodera,
+    J. Chem. Theory Comput. 12, 1799 (2016)).
+
+    Parameters
+    ----------
+    values : array-like object
+        The time series values, sampled at a constant interval.
+    nskip : int, optional
+        Only every nskip sample is tested as the starting sample (Default is
+        1).
+
+    Returns
+    -------
+    start : int
+        The index of the first equilibrated sample.
+    g : float
+        The statistical inefficiency of the equilibrated samples.
+    neff : float
+        The number of effectively uncorrelated equilibrated samples.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n == 0:
+        raise ValueError('values is empty')
+
+    start = 0
+    g = statistical_inefficiency(values)
+    neff = n / g
+    for t0 in range(nskip, n - 1, nskip):
+        t0_g = statistical_inefficiency(values[t0:])
+        t0_neff = (n - t0) / t0_g
+        if t0_neff > neff:
+            start = t0
+            g = t0_g
+            neff = t0_neff
+
+    return start, g, neff
+
+def standard_error(values, g=None):
+    """
+    Estimates the standard error of the mean of a correlated time series.
+
+    Parameters
+    ----------
+    values : array-like object
+        The time series values, sampled at a constant interval.
+    g : float, optional
+        The statistical inefficiency of the values.  If not given, it is
+        estimated with statistical_inefficiency().
+
+    Returns
+    -------
+    float
+        The standard error of the mean.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n < 2:
+        return 0.0
+    if g is None:
+        g = statistical_inefficiency(values)
+    return values.std(ddof=1) * np.sqrt(g / n)
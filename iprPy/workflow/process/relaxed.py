@@ -3,17 +3,15 @@ import uuid
 # http://www.numpy.org/
 import numpy as np
 
-# https://github.com/usnistgov/atomman
-import atomman.unitconvert as uc
-import atomman.lammps as lmp
-import atomman as am
-
 # https://pandas.pydata.org/
 import pandas as pd
 
 from ... import load_database, load_record
 
 def relaxed(database_name, crystal_match_file, all_crystals_file, unique_crystals_file):
+    # Function-specific imports
+    import atomman.lammps as lmp
+
     # !!!!!!!!!!!!!!!!!!!!!!!!!!!!! Load records !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!! #
 
     database = load_database(database_name)
@@ -120,6 +118,7 @@ def relaxed(database_name, crystal_match_file, all_crystals_file, unique_crystal
     # !!!!!!!!!!!!!!!!!!!!!!!!! Process new results !!!!!!!!!!!!!!!!!!!!!!!!!!!!! #
 
     newresults = []
+    parent_cache = {}
     old_keys = results.calc_key.values
     for series in calc_records.itertuples():
         if series.key in old_keys:
@@ -153,7 +152,7 @@ def relaxed(database_name, crystal_match_file, all_crystals_file, unique_crystal
                                     and family_series.pearson_symbol == series.pearson_symbol))
         
         # Extract info from parent calculations
-        for parent in database.get_parent_records(name=series.key):
+        for parent in database.get_parent_records(name=series.key, cache=parent_cache):
             
             parent_dict = parent.todict()
 
@@ -0,0 +1,181 @@
+# Standard Python libraries
+from pathlib import Path
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# https://docs.pytest.org/
+import pytest
+
+# https://github.com/usnistgov/iprPy
+from iprPy.database import SQLiteJobQueue, load_jobqueue
+from iprPy.database.runner import bid, bidfile
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replaces time.time with a clock that only moves when advanced."""
+    now = [1.0e9]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    return now
+
+def claims(queue):
+    """Claims jobs until none are ready."""
+    names = []
+    while True:
+        name = queue.claim()
+        if name is None:
+            return names
+        names.append(name)
+
+def test_dependency_order(tmp_path):
+    queue = SQLiteJobQueue(tmp_path)
+    queue.add('a')
+    queue.add('b', parents=['a'])
+    queue.add('c', parents=['a', 'b'])
+    queue.add('d')
+
+    assert claims(queue) == ['a', 'd']
+    assert queue.count() == 2
+    assert queue.count('running') == 2
+
+    queue.finish('a')
+    assert claims(queue) == ['b']
+
+    # Any final status allows children to be claimed
+    queue.finish('b', status='error')
+    assert claims(queue) == ['c']
+    queue.finish('c')
+    queue.finish('d')
+
+    assert queue.count() == 0
+    assert queue.count(['finished', 'error']) == 4
+
+def test_release_order(tmp_path):
+    queue = SQLiteJobQueue(tmp_path)
+    for name in 'abc':
+        queue.add(name)
+
+    # Released jobs are placed behind jobs released fewer times
+    assert queue.claim() == 'a'
+    queue.release('a')
+    assert queue.claim() == 'b'
+    queue.release('b')
+    assert claims(queue) == ['c', 'a', 'b']
+
+def test_release_parents(tmp_path):
+    queue = SQLiteJobQueue(tmp_path)
+    queue.add('a')
+    queue.add('b')
+    assert queue.claim() == 'a'
+    assert queue.claim() == 'b'
+
+    # Parents added on release are waited on if they are in the queue
+    queue.release('a', parents=['b'])
+    assert queue.claim() is None
+    queue.finish('b')
+    assert queue.claim() == 'a'
+
+def test_outside_parents_backoff(tmp_path, clock):
+    queue = SQLiteJobQueue(tmp_path)
+    queue.parentwait = 10.0
+    queue.maxparentwait = 600.0
+
+    # Parents outside of the queue are not waited on before a release
+    queue.add('a', parents=['outside'])
+    queue.add('b', parents=['a'])
+    assert queue.claim() == 'a'
+
+    # The wait time doubles with each release
+    for wait in [10.0, 20.0, 40.0]:
+        queue.release('a')
+        clock[0] += wait - 0.5
+        assert queue.claim() is None
+        clock[0] += 1.0
+        assert queue.claim() == 'a'
+
+    # and is capped at maxparentwait
+    for i in range(40):
+        queue.release('a')
+        assert queue.claim() is None
+    clock[0] += 599.5
+    assert queue.claim() is None
+    clock[0] += 1.0
+    assert queue.claim() == 'a'
+
+    # Children wait on their parents regardless of the wait time
+    clock[0] += 1000.0
+    assert queue.claim() is None
+    queue.finish('a')
+    assert queue.claim() == 'b'
+
+def test_exclusive_claims(tmp_path):
+    names = [f'job{i}' for i in range(200)]
+    queue = SQLiteJobQueue(tmp_path)
+    for name in names:
+        queue.add(name)
+
+    # Each thread claims with its own queue object and connections
+    nthreads = 8
+    barrier = threading.Barrier(nthreads)
+    def runner():
+        runnerqueue = SQLiteJobQueue(tmp_path)
+        barrier.wait()
+        return claims(runnerqueue)
+
+    with ThreadPoolExecutor(max_workers=nthreads) as executor:
+        futures = [executor.submit(runner) for i in range(nthreads)]
+        claimed = [name for future in futures for name in future.result()]
+
+    assert sorted(claimed) == sorted(names)
+    assert queue.count('running') == len(names)
+
+def test_reset(tmp_path):
+    queue = SQLiteJobQueue(tmp_path)
+    queue.add('a')
+    queue.add('b')
+    assert claims(queue) == ['a', 'b']
+    queue.finish('a')
+
+    queue.reset()
+    assert queue.count() == 1
+    assert claims(queue) == ['b']
+
+def test_load_jobqueue(tmp_path):
+    assert load_jobqueue(tmp_path) is None
+    assert load_jobqueue(tmp_path, jobqueue=False) is None
+    queue = load_jobqueue(tmp_path, jobqueue=True)
+    assert isinstance(queue, SQLiteJobQueue)
+    assert queue.path.is_file()
+    assert isinstance(load_jobqueue(tmp_path), SQLiteJobQueue)
+    assert load_jobqueue(tmp_path, jobqueue=queue) is queue
+
+def test_bid(tmp_path):
+    sim = Path(tmp_path, 'sim')
+    sim.mkdir()
+    assert bid(sim.as_posix()) is True
+    with open(Path(sim, bidfile)) as f:
+        assert f.read() == f'bid for pid: {os.getpid()}'
+
+    # Existing bids and missing calculations are not won
+    assert bid(sim.as_posix()) is False
+    assert bid(Path(tmp_path, 'missing').as_posix()) is False
+
+def test_bid_exclusive(tmp_path):
+    sims = []
+    for i in range(20):
+        sim = Path(tmp_path, f'sim{i}')
+        sim.mkdir()
+        sims.append(sim.as_posix())
+
+    nthreads = 8
+    barrier = threading.Barrier(nthreads)
+    def runner():
+        barrier.wait()
+        return [sim for sim in sims if bid(sim)]
+
+    with ThreadPoolExecutor(max_workers=nthreads) as executor:
+        futures = [executor.submit(runner) for i in range(nthreads)]
+        won = [sim for future in futures for sim in future.result()]
+
+    assert sorted(won) == sorted(sims)
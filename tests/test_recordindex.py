@@ -0,0 +1,171 @@
+# Standard Python libraries
+from pathlib import Path
+import json
+import os
+from contextlib import closing
+
+# https://pandas.pydata.org/
+import pandas as pd
+
+# https://docs.pytest.org/
+import pytest
+
+# https://github.com/usnistgov/atomman
+import atomman.lammps as lmp
+
+# https://github.com/usnistgov/iprPy
+import iprPy
+
+style = 'calculation_relax_box'
+
+@pytest.fixture(scope='module')
+def potential():
+    return lmp.Potential(Path(iprPy.libdir, 'potential_LAMMPS',
+                              '2001--Mishin-Y--Cu-1--LAMMPS--ipr1.json'))
+
+@pytest.fixture
+def database(tmp_path):
+    return iprPy.load_database(style='local', host=tmp_path.as_posix())
+
+def relax_record(potential, key, temperature=0.0):
+    """Builds an unfinished calculation_relax_box record."""
+    input_dict = {}
+    input_dict['calc_key'] = key
+    input_dict['strainrange'] = 1e-6
+    input_dict['sizemults'] = [[0, 3], [0, 3], [0, 3]]
+    input_dict['potential'] = potential
+    input_dict['load_file'] = 'A1--Cu--fcc.json'
+    input_dict['load_style'] = 'system_model'
+    input_dict['load_options'] = ''
+    input_dict['family'] = 'A1--Cu--fcc'
+    input_dict['symbols'] = potential.symbols[:1]
+    input_dict['temperature'] = temperature
+    for key in ['xx', 'yy', 'zz', 'xy', 'xz', 'yz']:
+        input_dict[f'pressure_{key}'] = 0.0
+    input_dict['pressure_unit'] = 'GPa'
+
+    record = iprPy.load_record(style, name=input_dict['calc_key'])
+    record.buildcontent('calc_relax_box', input_dict)
+    return record
+
+def indexed(database):
+    """Returns the flat terms stored in the index file by record name."""
+    with closing(database.record_index(style).connect()) as con:
+        rows = con.execute('SELECT name, data FROM records').fetchall()
+    return {name: json.loads(data) for name, data in rows}
+
+def temperatures(database, **kwargs):
+    """Returns the temperatures by record name given by the index."""
+    record_files = database.record_files(style)
+    rows = database.record_index(style).rows(record_files, **kwargs)
+    return {row['key']: row['temperature'] for row in rows}
+
+def rewrite(database, record, mtime_ns):
+    """Replaces a record file outside of the database with a given mtime."""
+    record_file = Path(database.host, style, record.name + '.xml')
+    with open(record_file, 'w') as f:
+        record.content.xml(fp=f)
+    os.utime(record_file, ns=(mtime_ns, mtime_ns))
+    return record_file
+
+def test_stale_mtime(database, potential):
+    database.add_record(relax_record(potential, 'a', 1.0))
+    record_file = Path(database.host, style, 'a.xml')
+    stat = record_file.stat()
+
+    # Same size, new mtime
+    rewrite(database, relax_record(potential, 'a', 2.0), stat.st_mtime_ns + 10**9)
+    assert record_file.stat().st_size == stat.st_size
+    assert temperatures(database) == {'a': 2.0}
+    assert indexed(database)['a']['temperature'] == 2.0
+
+def test_stale_size(database, potential):
+    database.add_record(relax_record(potential, 'a', 1.0))
+    record_file = Path(database.host, style, 'a.xml')
+    stat = record_file.stat()
+
+    # Same mtime, new size
+    rewrite(database, relax_record(potential, 'a', 100.0), stat.st_mtime_ns)
+    assert record_file.stat().st_size != stat.st_size
+    assert temperatures(database) == {'a': 100.0}
+    assert indexed(database)['a']['temperature'] == 100.0
+
+def test_unchanged_uses_index(database, potential):
+    database.add_record(relax_record(potential, 'a', 1.0))
+    record_file = Path(database.host, style, 'a.xml')
+    stat = record_file.stat()
+
+    # Entries matching the file's mtime and size are not reparsed
+    with closing(database.record_index(style).connect()) as con:
+        with con:
+            con.execute('UPDATE records SET data = ? WHERE name = ?',
+                        (json.dumps({'key': 'a', 'temperature': 5.0}), 'a'))
+    assert temperatures(database) == {'a': 5.0}
+
+    os.utime(record_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert temperatures(database) == {'a': 1.0}
+
+def test_external_files(database, potential):
+    database.add_records([relax_record(potential, name) for name in 'ab'])
+    assert sorted(indexed(database)) == ['a', 'b']
+
+    # Files added and removed outside of iprPy
+    rewrite(database, relax_record(potential, 'c', 3.0), 10**18)
+    Path(database.host, style, 'a.xml').unlink()
+
+    # Only queries of all records remove entries of missing files
+    assert temperatures(database) == {'b': 0.0, 'c': 3.0}
+    assert sorted(indexed(database)) == ['a', 'b', 'c']
+    assert temperatures(database, complete=True) == {'b': 0.0, 'c': 3.0}
+    assert sorted(indexed(database)) == ['b', 'c']
+
+def test_bulk_changes(database, potential):
+    added = database.add_records([relax_record(potential, name, 1.0)
+                                  for name in 'abcd'])
+    assert len(added) == 4
+    assert {name: row['temperature'] for name, row in indexed(database).items()} == {
+        'a': 1.0, 'b': 1.0, 'c': 1.0, 'd': 1.0}
+
+    # Existing records are rejected unless ignored
+    with pytest.raises(ValueError):
+        database.add_records([relax_record(potential, 'a'), relax_record(potential, 'e')])
+    assert 'e' not in indexed(database)
+    added = database.add_records([relax_record(potential, 'a'), relax_record(potential, 'e')],
+                                 ignore_existing=True)
+    assert [record.name for record in added] == ['e']
+
+    database.update_records([relax_record(potential, name, 2.0) for name in 'bc'])
+    database.delete_records([relax_record(potential, name) for name in 'ad'])
+
+    expected = {'b': 2.0, 'c': 2.0, 'e': 0.0}
+    assert {name: row['temperature'] for name, row in indexed(database).items()} == expected
+    assert temperatures(database, complete=True) == expected
+
+    # Missing records are rejected without changing any records
+    with pytest.raises(ValueError):
+        database.update_records([relax_record(potential, 'b', 3.0),
+                                 relax_record(potential, 'a', 3.0)])
+    with pytest.raises(ValueError):
+        database.delete_records([relax_record(potential, 'b'),
+                                 relax_record(potential, 'a')])
+    assert temperatures(database) == expected
+
+def test_index_matches_no_index(database, potential):
+    database.add_records([relax_record(potential, f'r{i}', float(i % 3))
+                          for i in range(6)])
+    noindex = iprPy.load_database(style='local', host=database.host, index=False)
+
+    for kwargs in [{}, {'temperature': 1.0}, {'name': ['r0', 'r4', 'missing']},
+                   {'temperature': [0.0, 2.0], 'status': 'not calculated'}]:
+        dfs = []
+        names = []
+        for db in [database, noindex]:
+            df = db.get_records_df(style=style, full=False, flat=True, **kwargs)
+            dfs.append(df.sort_values('key').reset_index(drop=True))
+
+            records, df = db.get_records(style=style, return_df=True, **kwargs)
+            assert [record.name for record in records] == df.key.tolist()
+            names.append(sorted(df.key))
+        pd.testing.assert_frame_equal(dfs[0], dfs[1])
+        assert names[0] == names[1] == dfs[0].key.tolist()
+        assert len(names[0]) > 0
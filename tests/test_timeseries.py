@@ -0,0 +1,83 @@
+# http://www.numpy.org/
+import numpy as np
+
+# https://docs.pytest.org/
+import pytest
+
+# https://github.com/usnistgov/iprPy
+from iprPy.tools import (statistical_inefficiency, detect_equilibration,
+                         standard_error)
+
+def ar1(phi, n, seed, sigma=1.0):
+    """
+    Generates a stationary AR(1) time series x[t] = phi * x[t-1] + e[t]
+    with normally distributed e[t] of standard deviation sigma.  Its
+    autocorrelation at lag k is phi**k, so its statistical inefficiency is
+    (1 + phi) / (1 - phi) and its variance is sigma**2 / (1 - phi**2).
+    """
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(scale=sigma, size=n)
+    values = np.empty(n)
+    values[0] = noise[0] / np.sqrt(1.0 - phi**2)
+    for t in range(1, n):
+        values[t] = phi * values[t - 1] + noise[t]
+    return values
+
+@pytest.mark.parametrize('phi', [0.5, 0.8, 0.9])
+def test_statistical_inefficiency_ar1(phi):
+    values = ar1(phi, 200000, seed=1)
+    g = (1.0 + phi) / (1.0 - phi)
+    assert statistical_inefficiency(values) == pytest.approx(g, rel=0.1)
+
+def test_statistical_inefficiency_uncorrelated():
+    values = ar1(0.0, 100000, seed=2)
+    assert statistical_inefficiency(values) == pytest.approx(1.0, abs=0.1)
+
+def test_statistical_inefficiency_trivial():
+    assert statistical_inefficiency([1.0]) == 1.0
+    assert statistical_inefficiency(np.full(100, 3.0)) == 1.0
+
+def test_standard_error_ar1():
+    phi = 0.8
+    n = 200000
+    values = ar1(phi, n, seed=3)
+    g = (1.0 + phi) / (1.0 - phi)
+    expected = np.sqrt(g / (1.0 - phi**2) / n)
+    assert standard_error(values) == pytest.approx(expected, rel=0.1)
+    assert standard_error(values, g=g) == pytest.approx(expected, rel=0.02)
+
+def test_standard_error_covers_means():
+    # The means of independent series scatter by their standard errors
+    phi = 0.8
+    means = []
+    errors = []
+    for seed in range(200):
+        values = ar1(phi, 2000, seed=100 + seed)
+        means.append(values.mean())
+        errors.append(standard_error(values))
+    assert np.std(means) == pytest.approx(np.mean(errors), rel=0.2)
+
+def test_detect_equilibration_ar1():
+    phi = 0.8
+    n = 20000
+    values = ar1(phi, n, seed=4)
+
+    # Add a decaying offset to the start of the series
+    transient = 1000
+    values[:transient] += np.linspace(20.0, 0.0, transient)
+
+    start, g, neff = detect_equilibration(values, nskip=10)
+    assert transient * 0.5 <= start <= transient * 2
+    assert g == pytest.approx((1.0 + phi) / (1.0 - phi), rel=0.2)
+    assert neff == pytest.approx((n - start) / g)
+
+def test_detect_equilibration_stationary():
+    phi = 0.8
+    n = 20000
+    values = ar1(phi, n, seed=5)
+    start, g, neff = detect_equilibration(values, nskip=10)
+    assert start < n // 10
+
+def test_detect_equilibration_empty():
+    with pytest.raises(ValueError):
+        detect_equilibration([])